@@ -18,7 +18,7 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from playwright.async_api import BrowserContext, BrowserType, Playwright
 
@@ -99,6 +99,25 @@ class AbstractStore(ABC):
     async def store_creator(self, creator: Dict):
         pass
 
+    # 批量写入，默认逐条调用单条接口，各存储按需覆盖为一次写入整批
+    async def store_contents(self, content_items: List[Dict]):
+        for content_item in content_items:
+            await self.store_content(content_item)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        for comment_item in comment_items:
+            await self.store_comment(comment_item)
+
+    # 生命周期钩子，由 store.store_manager.StoreManager 在每次运行中调用，默认不做任何事
+    async def open(self):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def close(self):
+        pass
+
 
 class AbstractStoreImage(ABC):
     # TODO: support all platform
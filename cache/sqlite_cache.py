@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/cache/sqlite_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 基于 SQLite 的磁盘缓存，进程重启后依然有效
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional
+
+from cache.abs_cache import AbstractCache
+from config import db_config
+
+
+class SqliteCache(AbstractCache):
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化 SQLite 缓存
+        :param db_path: 缓存文件路径，默认取 db_config.CACHE_SQLITE_PATH
+        :return:
+        """
+        self._db_path = db_path or db_config.CACHE_SQLITE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self._db_path)), exist_ok=True)
+        # 允许在 asyncio.to_thread 的工作线程中使用，读写通过锁串行化
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expire_at REAL NOT NULL)"
+            )
+            # 启动时顺带清理已过期的数据
+            self._conn.execute("DELETE FROM cache WHERE expire_at < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        从缓存中获取键的值, 并且反序列化
+        :param key:
+        :return:
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value, expire_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expire_at = row
+            if expire_at < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        将键的值设置到缓存中, 并且序列化
+        :param key:
+        :param value:
+        :param expire_time: 过期时间（秒）
+        :return:
+        """
+        data = pickle.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expire_at) VALUES (?, ?, ?)",
+                (key, data, time.time() + expire_time),
+            )
+
+    def keys(self, pattern: str) -> List[str]:
+        """
+        获取所有符合pattern的未过期key，pattern 中的 * 匹配任意字符
+        :param pattern: 匹配模式
+        :return:
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM cache WHERE key GLOB ? AND expire_at >= ?", (pattern, time.time())
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """
+        关闭数据库连接
+        :return:
+        """
+        with self._lock:
+            self._conn.close()
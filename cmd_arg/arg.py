@@ -70,6 +70,7 @@ class SaveDataOptionEnum(str, Enum):
     CSV = "csv"
     DB = "db"
     JSON = "json"
+    JSONL = "jsonl"
     SQLITE = "sqlite"
     MONGODB = "mongodb"
     EXCEL = "excel"
@@ -210,7 +211,7 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
             SaveDataOptionEnum,
             typer.Option(
                 "--save_data_option",
-                help="数据保存方式 (csv=CSV文件 | db=MySQL数据库 | json=JSON文件 | sqlite=SQLite数据库 | mongodb=MongoDB数据库 | excel=Excel文件)",
+                help="数据保存方式 (csv=CSV文件 | db=MySQL数据库 | json=JSON文件 | jsonl=JSON Lines文件 | sqlite=SQLite数据库 | mongodb=MongoDB数据库 | excel=Excel文件)",
                 rich_help_panel="存储配置",
             ),
         ] = _coerce_enum(
@@ -220,7 +221,7 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
             Optional[InitDbOptionEnum],
             typer.Option(
                 "--init_db",
-                help="初始化数据库表结构 (sqlite | mysql)",
+                help="初始化数据库表结构，已有数据库会执行结构升级和数据回填 (sqlite | mysql)",
                 rich_help_panel="存储配置",
             ),
         ] = None,
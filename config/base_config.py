@@ -34,6 +34,35 @@ IP_PROXY_POOL_COUNT = 2
 # 代理IP提供商名称
 IP_PROXY_PROVIDER_NAME = "kuaidaili"  # kuaidaili | wandouhttp
 
+# 验证代理是否可用的地址和超时时间（秒）
+IP_PROXY_VALIDATE_URL = "https://echo.apifox.cn/"
+IP_PROXY_VALIDATE_TIMEOUT_SEC = 10
+
+# 同时验证的代理数量
+IP_PROXY_VALIDATE_CONCURRENCY = 5
+
+# 代理池中可用代理少于该数量时在后台补充，不等到池子用完
+IP_PROXY_POOL_MIN_HEALTHY = 1
+
+# 后台巡检间隔（秒）：剔除过期代理、重新验证并更新评分、按需补充
+IP_PROXY_POOL_CHECK_INTERVAL_SEC = 60
+
+# 触发 IPBlockError 的代理在该时间（秒）内不再分配
+IP_PROXY_BLOCK_COOLDOWN_SEC = 600
+
+# 连续验证失败该次数后移出代理池
+IP_PROXY_MAX_CONSECUTIVE_FAILURES = 3
+
+# 是否按任务分配代理租约：并发任务各自固定使用一个代理（尽量互不相同），任务结束后归还
+# 同一登录态从多个出口 IP 请求可能被平台风控，默认关闭；开启时建议代理池数量不少于 MAX_CONCURRENCY_NUM
+ENABLE_PROXY_AFFINITY = False
+
+# 是否在 redis 中登记代理租约，多个爬虫进程（节点）共用同一个代理商额度时开启，避免分到同一个代理
+ENABLE_PROXY_REGISTRY = False
+
+# 代理租约有效期（秒），由后台巡检续期，需大于 IP_PROXY_POOL_CHECK_INTERVAL_SEC；进程异常退出后租约到期自动释放
+IP_PROXY_LEASE_TTL_SEC = 180
+
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
 # 小红书如果一直扫码登录不通过，打开浏览器手动过一下滑动验证码
@@ -70,8 +99,33 @@ BROWSER_LAUNCH_TIMEOUT = 60
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、excel, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "db"  # csv or db or json or sqlite or excel
+# 数据保存类型选项配置,支持六种类型：csv、db、json、jsonl、sqlite、excel, 最好保存到DB，有排重的功能。
+# jsonl 为追加写的 JSON Lines 格式，每条记录一行，适合大批量爬取
+SAVE_DATA_OPTION = "db"  # csv or db or json or jsonl or sqlite or excel
+
+# JSON Lines 保存模式（SAVE_DATA_OPTION = "jsonl"）相关配置
+# 缓冲的记录条数达到该值时写盘
+JSONL_FLUSH_BATCH_SIZE = 100
+# 距离上次写盘超过该秒数时写盘
+JSONL_FLUSH_INTERVAL_SEC = 5
+# fsync 间隔（秒），控制异常退出时最多丢失的数据量
+JSONL_FSYNC_INTERVAL_SEC = 30
+# 爬虫结束时是否额外生成一份标准 JSON 数组文件（保存在 data/<platform>/json/ 下）
+JSONL_FINALIZE_TO_JSON = False
+
+# Excel 保存模式（SAVE_DATA_OPTION = "excel"）相关配置
+# 是否使用流式写入：基于 openpyxl write-only 工作表，内存占用不随数据量增长，适合大批量爬取
+EXCEL_STREAMING_MODE = False
+# 流式写入时，每个工作表先缓冲该条数的行用于估算列宽，之后的行直接写入临时文件
+EXCEL_COLUMN_WIDTH_SAMPLE_ROWS = 200
+# 流式写入时，每写入该条数的行保存一个分段文件（xxx.xlsx、xxx_part2.xlsx ...），异常退出时最多丢失一段数据
+EXCEL_CHECKPOINT_ROWS = 5000
+
+# CSV 保存模式（SAVE_DATA_OPTION = "csv"）相关配置
+# 缓冲的记录条数达到该值时写盘
+CSV_FLUSH_BATCH_SIZE = 100
+# 距离上次写盘超过该秒数时写盘
+CSV_FLUSH_INTERVAL_SEC = 5
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
@@ -117,6 +171,115 @@ FONT_PATH = "./docs/STZHONGS.TTF"
 # 爬取间隔时间
 CRAWLER_MAX_SLEEP_SEC = 2
 
+# ==================== 流水线爬取配置 ====================
+# 关键词搜索按 搜索 -> 详情 -> 存储/媒体/评论 分阶段流水线执行，下一页搜索与上一页的评论爬取可以同时进行
+# 各阶段之间队列的长度上限，队列满时上游阶段等待
+PIPELINE_QUEUE_SIZE = 50
+
+# 各阶段的 worker 数；调用平台 API 的阶段（搜索、详情、评论）共用 MAX_CONCURRENCY_NUM 个并发名额，
+# 同时发出的 API 请求数不会超过 MAX_CONCURRENCY_NUM，worker 数只决定各阶段最多有多少任务在排队等待名额
+PIPELINE_DETAIL_WORKERS = 2
+PIPELINE_STORE_WORKERS = 1
+PIPELINE_MEDIA_WORKERS = 2
+PIPELINE_COMMENT_WORKERS = 2
+
+# ==================== 媒体下载配置 ====================
+# 开启 ENABLE_GET_MEIDAS 后，图片/视频下载任务进入共享下载队列，由后台 worker 流式写盘，爬取流程不等待下载完成
+# 下载 worker 数
+MEDIA_DOWNLOAD_WORKERS = 4
+
+# 同一域名（CDN 主机）同时下载的文件数上限
+MEDIA_DOWNLOAD_PER_HOST_LIMIT = 2
+
+# 下载队列长度上限，队列满时提交任务的一方等待
+MEDIA_DOWNLOAD_QUEUE_SIZE = 1000
+
+# 每次读取并写入文件的块大小（字节）
+MEDIA_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# 连接中断或服务端 5xx 时的重试次数，重试时通过 HTTP Range 从已下载的位置继续
+MEDIA_DOWNLOAD_MAX_RETRIES = 3
+
+# 连接/读取单个数据块的超时时间（秒），不限制整个文件的下载时长
+MEDIA_DOWNLOAD_TIMEOUT_SEC = 30
+
+# 是否使用内容寻址的媒体存储：文件保存为 data/<平台>/media/blobs/<哈希>.<后缀>，相同内容只存一份，
+# 每条内容的文件列表写在 data/<平台>/media/manifests/<内容ID>.json，下载过的 URL 不再重复请求
+# 关闭时按旧的 data/<平台>/images/<内容ID>/<序号>.jpg 目录结构保存
+# 开启会改变磁盘上的媒体目录结构，依赖旧目录结构的脚本需要改为读取 manifests，因此默认关闭；需要去重时改为 True 即可
+ENABLE_MEDIA_DEDUP = False
+
+# ==================== 请求限速配置 ====================
+# 开启后各平台 client 在发起请求前从令牌桶取令牌（等待期间让出并发名额），不再在持有并发名额时固定 sleep(CRAWLER_MAX_SLEEP_SEC)
+# 开启会改变现有的请求节奏（由 RATE_LIMIT_* 决定而不是 CRAWLER_MAX_SLEEP_SEC），默认关闭
+ENABLE_RATE_LIMITER = False
+
+# 单个接口的持续请求速率（次/秒）和允许的突发请求数，可在 config/<platform>_config.py 的 *_RATE_LIMITS 中按接口覆盖
+RATE_LIMIT_REQUESTS_PER_SEC = 0.5
+RATE_LIMIT_BURST = 2
+
+# 视为风控的 HTTP 状态码（小红书 461/471 为验证码），出现时整个平台降速
+RATE_LIMIT_BLOCK_STATUS_CODES = (429, 461, 471)
+
+# 被风控后速率乘以该系数，最低不低于 RATE_LIMIT_MIN_REQUESTS_PER_SEC
+RATE_LIMIT_BACKOFF_FACTOR = 0.5
+RATE_LIMIT_MIN_REQUESTS_PER_SEC = 0.05
+
+# 距上次风控超过该秒数后逐步恢复速率
+RATE_LIMIT_RECOVERY_SEC = 60
+
+# ==================== HTTP 连接复用配置 ====================
+# 各平台 API client 按 (平台, 代理) 共享一个长连接 httpx 客户端
+# 是否启用 HTTP/2，依赖 h2（已通过 httpx[http2] 声明），缺少 h2 时回退到 HTTP/1.1 并打印警告
+ENABLE_HTTP2 = True
+
+# 单个共享客户端的最大连接数
+HTTP_MAX_CONNECTIONS = 100
+
+# 单个共享客户端保持的最大空闲长连接数
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+
+# 空闲长连接的保活时间（秒）
+HTTP_KEEPALIVE_EXPIRY = 30
+
+# 代理切换后旧客户端延迟关闭的时间（秒），保证进行中的请求可以正常结束
+HTTP_CLIENT_RETIRE_GRACE_SEC = 60
+
+# ==================== 接口响应缓存配置 ====================
+# 是否缓存详情/主页类接口的返回值，重复爬取同一批内容时命中缓存可跳过签名和网络请求
+# 各接口的缓存时间见 config/<platform>_config.py 中的 *_RESPONSE_CACHE_TTL
+ENABLE_RESPONSE_CACHE = False
+
+# 缓存后端 memory | redis | sqlite，sqlite 缓存在进程重启后依然有效
+RESPONSE_CACHE_TYPE = "sqlite"
+
+# ==================== 已入库内容去重配置 ====================
+# 启动时从 SAVE_DATA_OPTION 对应的存储（db/sqlite/json/jsonl/csv）加载已保存的内容 ID，
+# 爬取前跳过已入库的内容详情和评论请求，适合每天增量爬取
+ENABLE_SEEN_INDEX = False
+
+# 新鲜窗口（小时）：最近入库时间在窗口内的内容直接跳过，超出窗口的内容重新爬取以刷新点赞/评论等计数
+# 设置为 0 表示已入库的内容一律跳过
+SEEN_INDEX_FRESHNESS_HOURS = 24
+
+# ==================== JS 签名引擎配置 ====================
+# 抖音 a_bogus、知乎 x-zse-96 等签名由常驻的 Node 进程池计算，不再每次调用都新起进程
+# Node 可执行文件，找不到时回退到 execjs（在线程池中执行，不阻塞事件循环）
+JS_SIGN_NODE_PATH = "node"
+
+# 每个签名脚本常驻的 Node 进程数
+JS_SIGN_WORKER_COUNT = 2
+
+# 单次签名超时时间（秒），超时的进程会被重启
+JS_SIGN_TIMEOUT_SEC = 10
+
+# ==================== 数据列表接口配置 ====================
+# /api/v2/data/list 的总数缓存时间（秒），同一筛选条件在缓存期内不再重复执行 COUNT(*)
+DATA_LIST_COUNT_CACHE_TTL_SEC = 60
+
+# /api/v2/data/keywords 读取 keyword_catalog 表的进程内缓存时间（秒）
+KEYWORD_CATALOG_CACHE_TTL_SEC = 30
+
 from .bilibili_config import *
 from .xhs_config import *
 from .dy_config import *
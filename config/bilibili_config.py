@@ -65,3 +65,14 @@ CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES = 100
 
 # 单个视频/帖子最大爬取动态数
 CRAWLER_MAX_DYNAMICS_COUNT_SINGLENOTES = 50
+
+# 接口响应缓存时间（秒），需开启 ENABLE_RESPONSE_CACHE，未列出或为 0 的接口不缓存
+BILI_RESPONSE_CACHE_TTL = {
+    "get_video_info": 1800,  # 视频详情
+    "get_creator_info": 3600,  # UP主信息
+}
+
+# 按接口路径前缀覆盖限速规则 (每秒请求数, 突发请求数)，需开启 ENABLE_RATE_LIMITER，未列出的接口使用 RATE_LIMIT_* 默认值
+BILI_RATE_LIMITS = {
+    "/x/v2/reply": (0.5, 2),  # 评论/回复翻页
+}
@@ -45,6 +45,10 @@ REDIS_DB_NUM = os.getenv("REDIS_DB_NUM", 0)  # your redis db num
 # cache type
 CACHE_TYPE_REDIS = "redis"
 CACHE_TYPE_MEMORY = "memory"
+CACHE_TYPE_SQLITE = "sqlite"
+
+# sqlite cache config
+CACHE_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache", "response_cache.db")
 
 # sqlite config
 SQLITE_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "sqlite_tables.db")
@@ -53,6 +57,19 @@ sqlite_db_config = {
     "db_path": SQLITE_DB_PATH
 }
 
+# SQL 连接池配置
+# MySQL 连接池常驻连接数、允许临时溢出的连接数
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 20
+# 连接回收时间（秒），需小于 MySQL 的 wait_timeout，避免拿到已被服务端断开的连接
+DB_POOL_RECYCLE_SEC = 1800
+# 从连接池获取连接的超时时间（秒）
+DB_POOL_TIMEOUT_SEC = 30
+# SQLite 遇到写锁时的等待时间（秒），超过后才抛出 database is locked
+SQLITE_BUSY_TIMEOUT_SEC = 30
+# SQLite 页缓存大小（KB）
+SQLITE_CACHE_SIZE_KB = 64 * 1024
+
 # mongodb config
 MONGODB_HOST = os.getenv("MONGODB_HOST", "localhost")
 MONGODB_PORT = os.getenv("MONGODB_PORT", 27017)
@@ -67,3 +84,15 @@ mongodb_config = {
     "password": MONGODB_PWD,
     "db_name": MONGODB_DB_NAME,
 }
+
+# SQL 批量写入配置（db/sqlite）
+# 单表缓冲达到该条数时立即批量 upsert
+DB_BULK_BATCH_SIZE = 200
+# 定时刷新间隔（秒），保证低频写入的数据也能及时落库
+DB_BULK_FLUSH_INTERVAL_SEC = 5
+
+# MongoDB 批量写入配置
+# 单个集合缓冲达到该条数时立即执行一次无序 bulk_write
+MONGO_BULK_BATCH_SIZE = 200
+# 定时刷新间隔（秒）
+MONGO_BULK_FLUSH_INTERVAL_SEC = 5
@@ -44,3 +44,14 @@ DY_CREATOR_ID_LIST = [
     "MS4wLjABAAAATJPY7LAlaa5X-c8uNdWkvz0jUGgpw4eeXIwu_8BhvqE"
     # ........................
 ]
+
+# 接口响应缓存时间（秒），需开启 ENABLE_RESPONSE_CACHE，未列出或为 0 的接口不缓存
+DY_RESPONSE_CACHE_TTL = {
+    "get_video_by_id": 1800,  # 视频详情
+    "get_user_info": 3600,  # 创作者主页信息
+}
+
+# 按接口路径前缀覆盖限速规则 (每秒请求数, 突发请求数)，需开启 ENABLE_RATE_LIMITER，未列出的接口使用 RATE_LIMIT_* 默认值
+DY_RATE_LIMITS = {
+    "/aweme/v1/web/comment/list": (0.5, 2),  # 评论/回复翻页
+}
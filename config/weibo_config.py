@@ -34,3 +34,12 @@ WEIBO_CREATOR_ID_LIST = [
     "5533390220",
     # ........................
 ]
+
+# 接口响应缓存时间（秒），需开启 ENABLE_RESPONSE_CACHE，未列出或为 0 的接口不缓存
+WEIBO_RESPONSE_CACHE_TTL = {
+    "get_note_info_by_id": 1800,  # 帖子详情
+    "get_creator_info_by_id": 3600,  # 创作者主页信息
+}
+
+# 按接口路径前缀覆盖限速规则 (每秒请求数, 突发请求数)，需开启 ENABLE_RATE_LIMITER，未列出的接口使用 RATE_LIMIT_* 默认值
+WEIBO_RATE_LIMITS = {}
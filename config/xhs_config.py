@@ -35,3 +35,25 @@ XHS_CREATOR_ID_LIST = [
     "https://www.xiaohongshu.com/user/profile/5f58bd990000000001003753?xsec_token=ABYVg1evluJZZzpMX-VWzchxQ1qSNVW3r-jOEnKqMcgZw=&xsec_source=pc_search"
     # ........................
 ]
+
+# ==================== 签名上下文配置 ====================
+# 同一窗口期内的签名请求合并到一次 page.evaluate 中完成
+# 合并等待时间（毫秒），0 表示不主动等待，只合并上一批签名执行期间排队的请求
+XHS_SIGN_BATCH_WINDOW_MS = 5
+
+# 单次 evaluate 最多签名的请求数
+XHS_SIGN_BATCH_MAX_SIZE = 16
+
+# localStorage 中 b1 的缓存时间（秒），更新 cookie 时会立即失效
+XHS_SIGN_B1_TTL_SEC = 300
+
+# 接口响应缓存时间（秒），需开启 ENABLE_RESPONSE_CACHE，未列出或为 0 的接口不缓存
+XHS_RESPONSE_CACHE_TTL = {
+    "get_note_by_id": 1800,  # 笔记详情
+    "get_creator_info": 3600,  # 创作者主页信息
+}
+
+# 按接口路径前缀覆盖限速规则 (每秒请求数, 突发请求数)，需开启 ENABLE_RATE_LIMITER，未列出的接口使用 RATE_LIMIT_* 默认值
+XHS_RATE_LIMITS = {
+    "/api/sns/web/v2/comment": (0.5, 2),  # 一级/二级评论翻页
+}
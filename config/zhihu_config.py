@@ -32,3 +32,11 @@ ZHIHU_SPECIFIED_ID_LIST = [
     "https://zhuanlan.zhihu.com/p/673461588",  # 文章
     "https://www.zhihu.com/zvideo/1539542068422144000",  # 视频
 ]
+
+# 接口响应缓存时间（秒），需开启 ENABLE_RESPONSE_CACHE，未列出或为 0 的接口不缓存
+ZHIHU_RESPONSE_CACHE_TTL = {
+    "get_creator_info": 3600,  # 创作者主页信息
+}
+
+# 按接口路径前缀覆盖限速规则 (每秒请求数, 突发请求数)，需开启 ENABLE_RATE_LIMITER，未列出的接口使用 RATE_LIMIT_* 默认值
+ZHIHU_RATE_LIMITS = {}
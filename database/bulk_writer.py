@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/bulk_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""SQL 批量写入：按表缓冲待写入的行，按条数/时间批量 upsert"""
+import asyncio
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, Table, bindparam, inspect, insert, select, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import config
+from tools import utils
+
+from .db_session import get_async_engine, get_session
+from .keyword_catalog import CATALOG_TABLES, build_catalog_rows, count_keywords
+from .models import KeywordCatalog
+
+# upsert 命中已有记录时不覆盖的列
+IMMUTABLE_COLUMNS = ("id", "add_ts")
+
+
+def _coerce_integer_columns(table: Table, row: Dict) -> Dict:
+    """
+    整数列上的字符串值（如计数 "1.2万"、数字 ID "123"）在写入前转成整数，
+    空字符串和无法识别的值（如 "None"、"赞"）写为 NULL，与迁移回填的处理一致，
+    避免 SQLite 整数列存入文本、MySQL 严格模式拒绝整批写入
+    """
+    for column in table.c:
+        value = row.get(column.name)
+        if isinstance(value, str) and isinstance(column.type, Integer):
+            row[column.name] = utils.parse_count(value)
+    return row
+
+
+class _TableBuffer:
+    """单张表的待写入缓冲：同一主键的多次写入在缓冲内合并，只保留最新值"""
+
+    def __init__(self, table: Table, key_columns: Tuple[str, ...], update_columns: Optional[Tuple[str, ...]]):
+        self.table = table
+        self.key_columns = key_columns
+        self.update_columns = update_columns
+        self.rows: Dict[Tuple, Dict] = {}
+
+    def add(self, row: Dict):
+        key = tuple(row.get(c) for c in self.key_columns)
+        if key in self.rows:
+            self.rows[key].update(row)
+        else:
+            self.rows[key] = row
+
+    def drain(self) -> List[Dict]:
+        rows = list(self.rows.values())
+        self.rows = {}
+        return rows
+
+
+class BulkUpsertWriter:
+    """
+    SQL 存储的写后缓冲（write-behind）
+
+    - store 调用 add() 只把行放入内存缓冲，不直接访问数据库
+    - 单表缓冲达到 DB_BULK_BATCH_SIZE 或距上次刷新超过 DB_BULK_FLUSH_INTERVAL_SEC 时批量写入
+    - 表上存在主键列的唯一索引时使用数据库原生 upsert（MySQL ON DUPLICATE KEY UPDATE / SQLite ON CONFLICT），
+      否则（旧版本建的表）回退为一次批量查询 + 批量 insert + 批量 update
+    """
+
+    _instances: Dict[str, "BulkUpsertWriter"] = {}
+
+    @classmethod
+    def get_instance(cls, db_type: Optional[str] = None) -> "BulkUpsertWriter":
+        """
+        获取 db_type 对应的写入器单例
+        Args:
+            db_type: 数据库类型 db/mysql/sqlite，默认取 SAVE_DATA_OPTION
+        """
+        if db_type is None:
+            db_type = config.SAVE_DATA_OPTION
+        if db_type not in cls._instances:
+            cls._instances[db_type] = cls(db_type)
+        return cls._instances[db_type]
+
+    @classmethod
+    async def close_all(cls):
+        """
+        刷新并关闭所有写入器，在爬虫退出时调用
+        """
+        writers = list(cls._instances.values())
+        cls._instances.clear()
+        for writer in writers:
+            await writer.close()
+
+    def __init__(self, db_type: str):
+        self.db_type = db_type
+        self._buffers: Dict[str, _TableBuffer] = {}
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._native_upsert_cache: Dict[str, bool] = {}
+        self._keyword_catalog_ready: Optional[bool] = None
+
+    async def add(
+        self,
+        model,
+        row: Dict,
+        key_columns: Sequence[str],
+        update_columns: Optional[Iterable[str]] = None,
+    ):
+        """
+        放入一行待写入数据
+        Args:
+            model: ORM 模型类
+            row: 列名 -> 值，未知列会被忽略
+            key_columns: 判断记录是否存在的业务主键列，如 ("note_id",)
+            update_columns: 记录已存在时需要更新的列，默认为除主键/add_ts 外本行包含的全部列
+        """
+        await self.add_many(model, [row], key_columns, update_columns)
+
+    async def add_many(
+        self,
+        model,
+        rows: Iterable[Dict],
+        key_columns: Sequence[str],
+        update_columns: Optional[Iterable[str]] = None,
+    ):
+        """
+        放入一批同表的待写入数据，只加一次锁，参数同 add()
+        """
+        table: Table = model.__table__
+        key_columns = tuple(key_columns)
+        rows = [_coerce_integer_columns(table, {k: v for k, v in row.items() if k in table.c}) for row in rows]
+        rows = [row for row in rows if all(row.get(c) is not None for c in key_columns)]
+        if not rows:
+            return
+
+        batch_ready = False
+        async with self._lock:
+            buffer = self._buffers.get(table.name)
+            if buffer is None:
+                buffer = _TableBuffer(
+                    table, key_columns, tuple(update_columns) if update_columns is not None else None
+                )
+                self._buffers[table.name] = buffer
+            for row in rows:
+                buffer.add(row)
+            batch_ready = len(buffer.rows) >= config.DB_BULK_BATCH_SIZE
+            self._ensure_flush_task()
+
+        if batch_ready:
+            await self.flush(table.name)
+
+    def _ensure_flush_task(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(config.DB_BULK_FLUSH_INTERVAL_SEC)
+            try:
+                await self.flush()
+            except Exception as e:
+                utils.logger.error(f"[BulkUpsertWriter._flush_loop] Periodic flush error: {e}")
+
+    async def flush(self, table_name: Optional[str] = None):
+        """
+        把缓冲写入数据库
+        Args:
+            table_name: 只刷新指定表，默认刷新全部表
+        """
+        async with self._lock:
+            names = [table_name] if table_name else list(self._buffers.keys())
+            pending: List[Tuple[_TableBuffer, List[Dict]]] = []
+            for name in names:
+                buffer = self._buffers.get(name)
+                if buffer and buffer.rows:
+                    pending.append((buffer, buffer.drain()))
+
+        for buffer, rows in pending:
+            await self._write_rows(buffer, rows)
+
+    async def close(self):
+        """
+        停止定时刷新并把剩余缓冲写入数据库
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _write_rows(self, buffer: _TableBuffer, rows: List[Dict]):
+        table = buffer.table
+        # 列集合不同的行不能放进同一条多值 INSERT，按列集合分组
+        groups: Dict[Tuple[str, ...], List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+
+        native = await self._supports_native_upsert(table, buffer.key_columns)
+        async with get_session() as session:
+            if session is None:
+                return
+            for columns, group_rows in groups.items():
+                update_columns = self._resolve_update_columns(buffer, columns)
+                if native:
+                    await self._native_upsert(session, table, buffer.key_columns, update_columns, group_rows)
+                else:
+                    await self._select_then_write(session, table, buffer.key_columns, update_columns, group_rows)
+            await self._refresh_keyword_catalog(session, table, rows)
+        utils.logger.info(f"[BulkUpsertWriter] Flushed {len(rows)} rows to {table.name}")
+
+    async def _refresh_keyword_catalog(self, session, table: Table, rows: List[Dict]):
+        """
+        内容表写入后，在同一事务内重新统计本批涉及的关键词条数并 upsert 到 keyword_catalog
+        """
+        platform = CATALOG_TABLES.get(table.name)
+        keywords = {row.get("source_keyword") for row in rows} - {None, ""}
+        if not platform or not keywords:
+            return
+        if self._keyword_catalog_ready is None:
+            self._keyword_catalog_ready = await self._supports_native_upsert(
+                KeywordCatalog.__table__, ("keyword", "platform")
+            )
+            if not self._keyword_catalog_ready:
+                utils.logger.warning(
+                    "[BulkUpsertWriter] keyword_catalog table is missing, run --init_db to create and backfill it"
+                )
+        if not self._keyword_catalog_ready:
+            return
+        counts = await count_keywords(session, table, keywords)
+        await self._native_upsert(
+            session, KeywordCatalog.__table__, ("keyword", "platform"), ["item_count", "last_seen_ts"],
+            build_catalog_rows(platform, keywords, counts),
+        )
+
+    @staticmethod
+    def _resolve_update_columns(buffer: _TableBuffer, columns: Tuple[str, ...]) -> List[str]:
+        candidates = buffer.update_columns if buffer.update_columns is not None else columns
+        return [
+            c for c in candidates
+            if c in columns and c not in buffer.key_columns and c not in IMMUTABLE_COLUMNS
+        ]
+
+    async def _native_upsert(self, session, table: Table, key_columns, update_columns: List[str], rows: List[Dict]):
+        if self.db_type == "sqlite":
+            stmt = sqlite_insert(table).values(rows)
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(key_columns),
+                    set_={c: stmt.excluded[c] for c in update_columns},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+        else:
+            stmt = mysql_insert(table).values(rows)
+            # 没有需要更新的列时用主键列自赋值，等价于 INSERT IGNORE 但不吞掉其它错误
+            set_columns = update_columns or [key_columns[0]]
+            stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in set_columns})
+        await session.execute(stmt)
+
+    @staticmethod
+    async def _select_then_write(session, table: Table, key_columns, update_columns: List[str], rows: List[Dict]):
+        key_cols = [table.c[c] for c in key_columns]
+        keys = [tuple(row[c] for c in key_columns) for row in rows]
+        if len(key_cols) == 1:
+            exist_stmt = select(key_cols[0]).where(key_cols[0].in_([k[0] for k in keys]))
+        else:
+            exist_stmt = select(*key_cols).where(tuple_(*key_cols).in_(keys))
+        result = await session.execute(exist_stmt)
+        # 数据库里的类型可能与爬虫数据不一致（如 BigInteger 列传入字符串），统一转成字符串比较
+        existing = {tuple(str(v) for v in r) for r in result.all()}
+
+        new_rows, update_rows = [], []
+        for row, key in zip(rows, keys):
+            if tuple(str(v) for v in key) in existing:
+                update_rows.append(row)
+            else:
+                new_rows.append(row)
+
+        if new_rows:
+            await session.execute(insert(table), new_rows)
+        if update_rows and update_columns:
+            stmt = (
+                update(table)
+                .where(*[table.c[c] == bindparam(f"_key_{c}") for c in key_columns])
+                .values({c: bindparam(c) for c in update_columns})
+            )
+            params = [
+                {**{c: row[c] for c in update_columns}, **{f"_key_{c}": row[c] for c in key_columns}}
+                for row in update_rows
+            ]
+            await session.execute(stmt, params)
+
+    async def _supports_native_upsert(self, table: Table, key_columns: Tuple[str, ...]) -> bool:
+        """
+        检查实际数据库表上是否存在覆盖主键列的唯一索引（结果按表缓存）
+        """
+        if table.name in self._native_upsert_cache:
+            return self._native_upsert_cache[table.name]
+
+        def _inspect_unique_sets(sync_conn) -> List[set]:
+            inspector = inspect(sync_conn)
+            unique_sets = [set(ix["column_names"]) for ix in inspector.get_indexes(table.name) if ix.get("unique")]
+            unique_sets += [set(uc["column_names"]) for uc in inspector.get_unique_constraints(table.name)]
+            return unique_sets
+
+        supported = False
+        engine = get_async_engine(self.db_type)
+        if engine is not None:
+            try:
+                async with engine.connect() as conn:
+                    unique_sets = await conn.run_sync(_inspect_unique_sets)
+                supported = set(key_columns) in unique_sets
+            except Exception as e:
+                utils.logger.error(f"[BulkUpsertWriter._supports_native_upsert] Inspect table {table.name} error: {e}")
+        if not supported:
+            utils.logger.info(
+                f"[BulkUpsertWriter] Table {table.name} has no unique index on {key_columns}, "
+                f"fallback to batched select + insert/update"
+            )
+        self._native_upsert_cache[table.name] = supported
+        return supported
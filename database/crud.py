@@ -1,13 +1,15 @@
 # file: database/crud.py
-import json
 from typing import Optional, Dict, Any, List, Coroutine
 
-from sqlalchemy import literal_column
+from sqlalchemy import JSON, literal_column
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.future import select
 from sqlalchemy.sql.expression import union_all
 
-from database.data_registry import KEYWORD_TABLES
+from database.data_registry import KEYWORD_TABLES, PLATFORM_MODELS
 from database.db_session import get_session
+from database.keyword_catalog import get_catalog_keywords
+from database.pagination import get_paginated_list
 from store.BaseStore import BaseStore
 from store.bilibili import BiliDbStoreImplement
 from store.douyin._store_impl import DouyinDbStoreImplement
@@ -35,77 +37,54 @@ def get_store_by_platform(platform: str) -> Optional[BaseStore]:
     return STORE_REGISTRY.get(platform)
 
 
+def _json_list(value) -> List[str]:
+    """JSON 列由驱动反序列化后已经是 list，NULL 返回空列表"""
+    return value or []
+
+
+def _single_url_list(value) -> List[str]:
+    """单个封面 URL（或空字符串占位）包装成列表"""
+    return [value] if value else []
+
+
+def _image_list_converter(platform: str):
+    """按 image_list 列的类型为每个平台选一次转换函数，不再逐行判断字符串格式"""
+    columns = PLATFORM_MODELS.get(platform, (None, []))[1]
+    column = next((c for c in columns if c.name == "image_list"), None)
+    if column is not None and isinstance(column.element.type, JSON):
+        return _json_list
+    return _single_url_list
+
+
 async def get_paginated_data_list(
         platform: str,
         **kwargs
 ) -> Dict[str, Any]:
     store = get_store_by_platform(platform)
-    if not store:
-        raise ValueError(f"不支持的平台: {platform}")
-
-    result = await store.get_paginated_list(**kwargs)
-
-    if "list" in result:
-        for item in result["list"]:
-            # --- 核心修改：针对逗号分隔字符串的清洗逻辑 ---
-            if "image_list" in item:
-                raw_val = item["image_list"]
-
-                # 情况 0: 如果已经是 list (某些数据库驱动自动转了)，直接跳过
-                if isinstance(raw_val, list):
-                    continue
-
-                if isinstance(raw_val, str):
-                    try:
-                        # 第一步：去除首尾可能存在的 多余引号
-                        # 比如数据库里是 "\"http://a.com,http://b.com\""
-                        # strip后变成 "http://a.com,http://b.com"
-                        clean_str = raw_val.strip().strip('"').strip("'")
-
-                        # 第二步：判断格式
-                        if clean_str.startswith("["):
-                            # A. 如果是 JSON 数组格式 "['url1', 'url2']"
-                            try:
-                                loaded = json.loads(clean_str)
-                                # 再次确保里面是干净的字符串
-                                item["image_list"] = [
-                                    u.strip() for u in loaded if isinstance(u, str)
-                                ]
-                            except:
-                                item["image_list"] = []
-                        elif "," in clean_str:
-                            # B. 🔥 你的情况：逗号分隔的字符串 "url1,url2,url3"
-                            item["image_list"] = [
-                                url.strip() for url in clean_str.split(",") if url.strip()
-                            ]
-                        elif clean_str.startswith("http"):
-                            # C. 只有一张图，且没有逗号
-                            item["image_list"] = [clean_str]
-                        else:
-                            # D. 空或者脏数据
-                            item["image_list"] = []
-
-                    except Exception as e:
-                        print(f"[Warning] 图片列表解析失败: {e}, 原始数据: {raw_val}")
-                        item["image_list"] = []
-                else:
-                    item["image_list"] = []
-
-            # --- tag_list 也建议做类似处理 ---
-            if "tag_list" in item and isinstance(item["tag_list"], str):
-                raw_tag = item["tag_list"].strip().strip('"').strip("'")
-                if raw_tag.startswith("["):
-                    try:
-                        item["tag_list"] = json.loads(raw_tag)
-                    except:
-                        item["tag_list"] = []
-                elif "," in raw_tag:
-                    item["tag_list"] = raw_tag.split(",")
+    if store:
+        result = await store.get_paginated_list(**kwargs)
+    else:
+        # 没有注册 Store 的平台（如贴吧）直接按 PLATFORM_MODELS 查询，不支持的平台抛出 ValueError
+        result = await get_paginated_list(platform, **kwargs)
+
+    image_list_of = _image_list_converter(platform)
+    for item in result.get("list", ()):
+        item["image_list"] = image_list_of(item.get("image_list"))
 
     return result
 
 
 async def get_distinct_keywords() -> List[Dict[str, Any]]:
+    """获取关键词及其所属平台，读取 keyword_catalog（带进程内缓存），旧库未执行 --init_db 升级时回退为全表扫描"""
+    try:
+        return await get_catalog_keywords()
+    except DBAPIError as e:
+        print(f"[Warning] keyword_catalog 不可用，回退为扫描内容表: {e}")
+        return await _scan_distinct_keywords()
+
+
+async def _scan_distinct_keywords() -> List[Dict[str, Any]]:
+    """扫描全部内容表获取关键词，仅在 keyword_catalog 尚未创建时使用"""
     # 1. 定义对应的平台 Key (顺序必须与 KEYWORD_TABLES 一致!)
     # xhs, dy, bili, ks, wb, tieba, zhihu
     platform_keys = ["xhs", "dy", "bili", "ks", "wb", "tieba", "zhihu"]
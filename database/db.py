@@ -30,7 +30,9 @@ if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
 from tools import utils
-from database.db_session import create_tables
+from database.bulk_writer import BulkUpsertWriter
+from database.db_session import create_tables, dispose_engines
+from database.migrations import run_migrations
 
 async def init_table_schema(db_type: str):
     """
@@ -41,6 +43,10 @@ async def init_table_schema(db_type: str):
     """
     utils.logger.info(f"[init_table_schema] begin init {db_type} table schema ...")
     await create_tables(db_type)
+    # 已有的旧表不会被 create_all 修改，通过迁移升级列类型、回填数据并补齐索引
+    executed = await run_migrations(db_type)
+    if executed:
+        utils.logger.info(f"[init_table_schema] applied migrations: {executed}")
     utils.logger.info(f"[init_table_schema] {db_type} table schema init successful")
 
 async def init_db(db_type: str = None):
@@ -48,6 +54,7 @@ async def init_db(db_type: str = None):
 
 async def close():
     """
-    Placeholder for closing database connections if needed in the future.
+    刷新批量写入缓冲中尚未落库的数据，然后关闭数据库连接池
     """
-    pass
+    await BulkUpsertWriter.close_all()
+    await dispose_engines()
@@ -16,16 +16,20 @@
 # 详细许可条款请参阅项目根目录下的LICENSE文件。
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from contextlib import asynccontextmanager
+from .json_codec import json_dumps, json_loads
 from .models import Base
 import config
 from config.db_config import mysql_db_config, sqlite_db_config
 
 # Keep a cache of engines
 _engines = {}
+# db_type -> (engine, session factory)，engine 被替换后重新创建 factory
+_session_factories: Dict[str, Tuple[AsyncEngine, async_sessionmaker]] = {}
 
 
 async def create_database_if_not_exists(db_type: str):
@@ -50,16 +54,73 @@ def get_async_engine(db_type: str = None):
 
     if db_type == "sqlite":
         db_url = f"sqlite+aiosqlite:///{sqlite_db_config['db_path']}"
+        engine = create_async_engine(
+            db_url,
+            echo=False,
+            connect_args={"timeout": config.SQLITE_BUSY_TIMEOUT_SEC},
+            json_serializer=json_dumps,
+            json_deserializer=json_loads,
+        )
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
     elif db_type == "mysql" or db_type == "db":
         db_url = f"mysql+asyncmy://{mysql_db_config['user']}:{mysql_db_config['password']}@{mysql_db_config['host']}:{mysql_db_config['port']}/{mysql_db_config['db_name']}"
+        engine = create_async_engine(
+            db_url,
+            echo=False,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_recycle=config.DB_POOL_RECYCLE_SEC,
+            pool_timeout=config.DB_POOL_TIMEOUT_SEC,
+            pool_pre_ping=True,
+            json_serializer=json_dumps,
+            json_deserializer=json_loads,
+        )
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
-    engine = create_async_engine(db_url, echo=False)
     _engines[db_type] = engine
     return engine
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    每个新的 SQLite 连接建立时设置：WAL 日志（读写不互斥）、synchronous=NORMAL、更大的页缓存和写锁等待时间
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_SEC * 1000)}")
+    cursor.close()
+
+
+def get_session_factory(db_type: str = None) -> Optional[async_sessionmaker]:
+    """
+    获取 db_type 对应的 session 工厂（按 engine 缓存），json/csv 等非数据库存储返回 None
+    """
+    if db_type is None:
+        db_type = config.SAVE_DATA_OPTION
+    engine = get_async_engine(db_type)
+    if engine is None:
+        return None
+    cached = _session_factories.get(db_type)
+    if cached is None or cached[0] is not engine:
+        cached = (engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+        _session_factories[db_type] = cached
+    return cached[1]
+
+
+async def dispose_engines():
+    """
+    关闭所有 engine 的连接池，在爬虫退出时调用
+    """
+    engines = list(_engines.values())
+    _engines.clear()
+    _session_factories.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
 async def create_tables(db_type: str = None):
     if db_type is None:
         db_type = config.SAVE_DATA_OPTION
@@ -72,12 +133,11 @@ async def create_tables(db_type: str = None):
 
 @asynccontextmanager
 async def get_session() -> AsyncSession:
-    engine = get_async_engine(config.SAVE_DATA_OPTION)
-    if not engine:
+    session_factory = get_session_factory(config.SAVE_DATA_OPTION)
+    if session_factory is None:
         yield None
         return
-    AsyncSessionFactory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    session = AsyncSessionFactory()
+    session = session_factory()
     try:
         yield session
         await session.commit()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/json_codec.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""JSON 列的编解码：使用 orjson（已在依赖中声明，未安装时回退到标准库 json），并提供写入前把列表类字段规范化为 JSON 数组的工具"""
+import json
+from typing import Any, List
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_dumps(value: Any) -> str:
+    """engine 的 json_serializer"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_loads(value: str) -> Any:
+    """engine 的 json_deserializer"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+def normalize_str_list(value: Any) -> List[str]:
+    """
+    把爬虫数据和旧库中各种形式的列表字段统一成字符串列表，只在写入时调用
+    支持: list、JSON 数组字符串、带多余引号的字符串、逗号分隔的字符串、单个值，空值和 "null" 返回 []
+    """
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if v is not None and str(v).strip()]
+
+    text = str(value).strip()
+    # 旧数据写入时多做了一次 json.dumps，如 "\"url1,url2\""
+    while len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        text = text[1:-1].strip()
+    if text == "null":
+        return []
+    if text.startswith("["):
+        try:
+            return normalize_str_list(json_loads(text))
+        except ValueError:
+            text = text.strip("[]")
+    return [part.strip() for part in text.split(",") if part.strip()]
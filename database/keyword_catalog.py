@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/keyword_catalog.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""关键词目录：keyword_catalog 表按 (关键词, 平台) 记录内容条数和首次/最近出现时间，由 BulkUpsertWriter 在写入时维护"""
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Table, delete, func, insert, inspect, select
+from sqlalchemy.engine import Connection
+
+import config
+from tools import utils
+
+from .data_registry import PLATFORM_MODELS
+from .db_session import get_session
+from .models import KeywordCatalog
+
+# 内容表名 -> 平台 key（与 PLATFORM_MODELS 一致）
+CATALOG_TABLES: Dict[str, str] = {model.__tablename__: key for key, (model, _) in PLATFORM_MODELS.items()}
+
+# (过期时间, 关键词列表)
+_keywords_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+
+
+async def count_keywords(session, table: Table, keywords: Iterable[str]) -> Dict[str, int]:
+    """
+    统计内容表中各关键词的条数，走 source_keyword 开头的组合索引
+    """
+    result = await session.execute(
+        select(table.c.source_keyword, func.count())
+        .where(table.c.source_keyword.in_(list(keywords)))
+        .group_by(table.c.source_keyword)
+    )
+    return {keyword: count for keyword, count in result.all()}
+
+
+def build_catalog_rows(platform: str, keywords: Iterable[str], counts: Dict[str, int]) -> List[Dict]:
+    now_ts = utils.get_current_timestamp()
+    return [
+        dict(keyword=keyword, platform=platform, item_count=counts.get(keyword, 0),
+             first_seen_ts=now_ts, last_seen_ts=now_ts)
+        for keyword in keywords
+    ]
+
+
+def backfill_catalog(conn: Connection):
+    """
+    按内容表重新生成 keyword_catalog（迁移时一次性执行，可重复执行）
+    """
+    inspector = inspect(conn)
+    catalog = KeywordCatalog.__table__
+    catalog.create(conn, checkfirst=True)
+    conn.execute(delete(catalog))
+    total = 0
+    for key, (model, _) in PLATFORM_MODELS.items():
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            continue
+        query = (
+            select(table.c.source_keyword, func.count(), func.min(table.c.add_ts), func.max(table.c.add_ts))
+            .where(table.c.source_keyword.isnot(None), table.c.source_keyword != "")
+            .group_by(table.c.source_keyword)
+        )
+        rows = [
+            dict(keyword=keyword, platform=key, item_count=count, first_seen_ts=first_ts, last_seen_ts=last_ts)
+            for keyword, count, first_ts, last_ts in conn.execute(query).all()
+        ]
+        if rows:
+            conn.execute(insert(catalog), rows)
+            total += len(rows)
+    utils.logger.info(f"[keyword_catalog] Backfilled {total} keyword entries")
+
+
+async def get_catalog_keywords() -> List[Dict[str, Any]]:
+    """
+    从 keyword_catalog 读取关键词及其所属平台，结果在进程内缓存 KEYWORD_CATALOG_CACHE_TTL_SEC 秒
+
+    Returns:
+        [{"value": 关键词, "platforms": [平台 key, ...]}]
+    """
+    global _keywords_cache
+    now = time.monotonic()
+    if _keywords_cache and _keywords_cache[0] > now:
+        return _keywords_cache[1]
+
+    async with get_session() as session:
+        result = await session.execute(
+            select(KeywordCatalog.keyword, KeywordCatalog.platform)
+            .where(KeywordCatalog.item_count > 0)
+            .order_by(KeywordCatalog.last_seen_ts.desc())
+        )
+        rows = result.all()
+
+    data_map: Dict[str, List[str]] = {}
+    for keyword, platform in rows:
+        if not keyword or not keyword.strip():
+            continue
+        data_map.setdefault(keyword, []).append(platform)
+    keywords = [{"value": keyword, "platforms": platforms} for keyword, platforms in data_map.items()]
+
+    if config.KEYWORD_CATALOG_CACHE_TTL_SEC > 0:
+        _keywords_cache = (now + config.KEYWORD_CATALOG_CACHE_TTL_SEC, keywords)
+    return keywords
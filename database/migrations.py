@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/migrations.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""数据库结构升级：按顺序执行的迁移，已执行的版本记录在 schema_migrations 表中"""
+from typing import Any, Callable, Dict, List, Tuple
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import (
+    JSON, BigInteger, Column, Integer, MetaData, String, Table, Text, UniqueConstraint, and_, bindparam, delete, func,
+    inspect, select, update,
+)
+from sqlalchemy.engine import Connection
+
+from tools import utils
+
+from .db_session import get_async_engine
+from .json_codec import json_dumps, normalize_str_list
+from .keyword_catalog import backfill_catalog
+from .models import Base
+
+# 本次升级从 Text 改为 BigInteger 的计数列
+COUNTER_COLUMNS: Dict[str, List[str]] = {
+    "xhs_note": ["liked_count", "collected_count", "comment_count", "share_count"],
+    "xhs_note_comment": ["like_count"],
+    "douyin_aweme": ["liked_count", "comment_count", "share_count", "collected_count"],
+    "douyin_aweme_comment": ["sub_comment_count", "like_count"],
+    "kuaishou_video": ["liked_count", "viewd_count"],
+    "kuaishou_video_comment": ["sub_comment_count"],
+    "weibo_note": ["liked_count", "comments_count", "shared_count"],
+    "weibo_note_comment": ["comment_like_count", "sub_comment_count"],
+    "bilibili_video": [
+        "disliked_count", "video_play_count", "video_favorite_count", "video_share_count",
+        "video_coin_count", "video_danmaku", "video_comment",
+    ],
+    "bilibili_video_comment": ["sub_comment_count", "like_count"],
+}
+
+# source_keyword 改为 String(255) 以便参与组合索引（MySQL 不能直接索引 TEXT 列）
+KEYWORD_INDEX_TABLES = [
+    "xhs_note", "douyin_aweme", "kuaishou_video", "bilibili_video", "weibo_note", "tieba_note", "zhihu_content",
+]
+
+# 需要补齐索引的表：计数/时间组合索引和评论表的内容 ID 索引
+INDEXED_TABLES = KEYWORD_INDEX_TABLES + [
+    "xhs_note_comment", "douyin_aweme_comment", "kuaishou_video_comment", "bilibili_video_comment",
+    "weibo_note_comment", "tieba_comment", "zhihu_comment",
+]
+
+BACKFILL_BATCH_SIZE = 1000
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("revision", String(64), primary_key=True),
+    Column("applied_ts", BigInteger),
+)
+
+
+def _backfill_columns(conn: Connection, table_name: str, columns: List[str], convert: Callable[[Any], Any]):
+    """
+    按 id 分批读出指定列，用 convert 转换后写回
+    """
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values({c: bindparam(c) for c in columns})
+    )
+    last_id, total = 0, 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, *[table.c[c] for c in columns])
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = [
+            {"_id": row[0], **{c: convert(v) for c, v in zip(columns, row[1:])}}
+            for row in rows
+        ]
+        conn.execute(stmt, params)
+        last_id = rows[-1][0]
+        total += len(rows)
+    utils.logger.info(f"[migrations] Backfilled {total} rows of {table_name}: {columns}")
+
+
+def _alter_columns(op: Operations, conn: Connection, table_name: str, changes: List[Tuple[str, object, object]]):
+    """修改列类型，SQLite 不支持 ALTER COLUMN，使用 alembic 的 batch 模式重建表"""
+    if conn.dialect.name == "sqlite":
+        with op.batch_alter_table(table_name) as batch_op:
+            for name, existing_type, new_type in changes:
+                batch_op.alter_column(name, type_=new_type, existing_type=existing_type)
+    else:
+        for name, existing_type, new_type in changes:
+            op.alter_column(table_name, name, type_=new_type, existing_type=existing_type, existing_nullable=True)
+
+
+def _upgrade_numeric_counters(op: Operations, conn: Connection):
+    """计数列改为整数（先回填再改类型），source_keyword 改为 String(255)，补齐组合索引"""
+    inspector = inspect(conn)
+    for table_name in set(COUNTER_COLUMNS) | set(KEYWORD_INDEX_TABLES):
+        if not inspector.has_table(table_name):
+            continue
+        existing = {c["name"]: c["type"] for c in inspector.get_columns(table_name)}
+        counters = [
+            c for c in COUNTER_COLUMNS.get(table_name, [])
+            if c in existing and not isinstance(existing[c], Integer)
+        ]
+        if counters:
+            # 把 "1.2万"、"10+" 等文本改写成纯数字，无法识别的值置为 NULL
+            _backfill_columns(conn, table_name, counters, utils.parse_count)
+        changes = [(c, existing[c], BigInteger()) for c in counters]
+        keyword_type = existing.get("source_keyword")
+        if table_name in KEYWORD_INDEX_TABLES and isinstance(keyword_type, Text):
+            changes.append(("source_keyword", existing["source_keyword"], String(255)))
+        if changes:
+            _alter_columns(op, conn, table_name, changes)
+            utils.logger.info(f"[migrations] Altered {table_name}: {[c[0] for c in changes]}")
+
+    inspector = inspect(conn)
+    for table_name in INDEXED_TABLES:
+        if not inspector.has_table(table_name):
+            continue
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table_name)}
+        existing_columns = {c["name"] for c in inspector.get_columns(table_name)}
+        for index in Base.metadata.tables[table_name].indexes:
+            # 缺少列的旧表由 test/test_db_sync.py 同步字段，这里只补齐列已存在的索引
+            # 唯一索引需要先去重，由 0004_unique_keys 处理
+            if index.unique or index.name in existing_indexes:
+                continue
+            if not {c.name for c in index.columns} <= existing_columns:
+                continue
+            index.create(conn)
+            utils.logger.info(f"[migrations] Created index {index.name}")
+
+
+# 改为 JSON 类型、以规范 JSON 数组存储的列表字段
+JSON_LIST_COLUMNS: Dict[str, List[str]] = {
+    "xhs_note": ["image_list", "tag_list"],
+}
+
+
+def _upgrade_json_list_columns(op: Operations, conn: Connection):
+    """列表字段回填为规范的 JSON 数组文本（如 ["url1","url2"]），再把列类型改为 JSON"""
+    inspector = inspect(conn)
+    for table_name, columns in JSON_LIST_COLUMNS.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {c["name"]: c["type"] for c in inspector.get_columns(table_name)}
+        columns = [c for c in columns if c in existing and not isinstance(existing[c], JSON)]
+        if not columns:
+            continue
+        _backfill_columns(conn, table_name, columns, lambda v: json_dumps(normalize_str_list(v)))
+        _alter_columns(op, conn, table_name, [(c, existing[c], JSON()) for c in columns])
+        utils.logger.info(f"[migrations] Altered {table_name}: {columns}")
+
+
+def _create_keyword_catalog(op: Operations, conn: Connection):
+    """创建 keyword_catalog 并按现有内容表回填"""
+    backfill_catalog(conn)
+
+
+def _unique_keys(table: Table) -> List[Tuple[str, List[str]]]:
+    """模型上声明的唯一键：(索引名, 列名列表)，包括 unique=True 的列索引和 UniqueConstraint"""
+    keys = [(ix.name, [c.name for c in ix.columns]) for ix in table.indexes if ix.unique]
+    keys += [
+        (uc.name, [c.name for c in uc.columns])
+        for uc in table.constraints if isinstance(uc, UniqueConstraint) and uc.name
+    ]
+    return keys
+
+
+def _delete_duplicate_keys(conn: Connection, table_name: str, columns: List[str]) -> int:
+    """
+    按唯一键去重，每组只保留 id 最大（最后写入）的一行，键为 NULL 的行不受唯一索引约束，不做处理
+    Returns:
+        删除的行数
+    """
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    key_columns = [table.c[c] for c in columns]
+    not_null = and_(*[c.isnot(None) for c in key_columns])
+    duplicated = conn.execute(
+        select(*key_columns).where(not_null).group_by(*key_columns).having(func.count() > 1).limit(1)
+    ).first()
+    if duplicated is None:
+        return 0
+    # MySQL 不允许在 DELETE 的子查询中直接引用被删除的表，多包一层派生表
+    keep = select(func.max(table.c.id).label("id")).where(not_null).group_by(*key_columns).subquery()
+    result = conn.execute(delete(table).where(not_null, table.c.id.notin_(select(keep.c.id))))
+    return result.rowcount
+
+
+def _upgrade_unique_keys(op: Operations, conn: Connection):
+    """
+    旧版本建表时内容/评论/创作者 ID 列只有普通索引（或没有索引），批量写入无法使用原生 upsert，
+    这里按模型把同名普通索引重建为唯一索引、补齐缺少的唯一索引，建索引前先删除重复的行
+    """
+    inspector = inspect(conn)
+    for table_name, table in Base.metadata.tables.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing_columns = {c["name"] for c in inspector.get_columns(table_name)}
+        existing_indexes = {ix["name"]: ix for ix in inspector.get_indexes(table_name)}
+        unique_sets = [set(ix["column_names"]) for ix in existing_indexes.values() if ix.get("unique")]
+        unique_sets += [set(uc["column_names"]) for uc in inspector.get_unique_constraints(table_name)]
+        for name, columns in _unique_keys(table):
+            current = existing_indexes.get(name)
+            if current is not None and current.get("unique"):
+                continue
+            if current is None and set(columns) in unique_sets:
+                continue
+            # 缺少列的旧表由 test/test_db_sync.py 同步字段
+            if not set(columns) <= existing_columns:
+                continue
+            deleted = _delete_duplicate_keys(conn, table_name, columns)
+            if deleted:
+                utils.logger.warning(f"[migrations] Deleted {deleted} duplicate rows of {table_name} on {columns}")
+            if current is not None:
+                op.drop_index(name, table_name=table_name)
+            op.create_index(name, table_name, columns, unique=True)
+            utils.logger.info(f"[migrations] Created unique index {name} on {table_name}{columns}")
+
+
+# (版本号, 升级函数)，只能在末尾追加
+MIGRATIONS: List[Tuple[str, Callable[[Operations, Connection], None]]] = [
+    ("0001_numeric_counters", _upgrade_numeric_counters),
+    ("0002_keyword_catalog", _create_keyword_catalog),
+    ("0003_json_list_columns", _upgrade_json_list_columns),
+    ("0004_unique_keys", _upgrade_unique_keys),
+]
+
+
+def _run_migrations(conn: Connection) -> List[str]:
+    schema_migrations.create(conn, checkfirst=True)
+    applied = set(conn.execute(select(schema_migrations.c.revision)).scalars())
+    op = Operations(MigrationContext.configure(conn))
+    executed = []
+    for revision, upgrade in MIGRATIONS:
+        if revision in applied:
+            continue
+        utils.logger.info(f"[migrations] Applying {revision} ...")
+        upgrade(op, conn)
+        conn.execute(schema_migrations.insert().values(revision=revision, applied_ts=utils.get_current_timestamp()))
+        executed.append(revision)
+    return executed
+
+
+async def run_migrations(db_type: str = None) -> List[str]:
+    """
+    执行尚未执行的迁移（含数据回填），在 --init_db 时调用，重复执行无副作用
+    Args:
+        db_type: 数据库类型 db/mysql/sqlite
+
+    Returns:
+        本次执行的版本号列表
+    """
+    engine = get_async_engine(db_type)
+    if engine is None:
+        return []
+    async with engine.begin() as conn:
+        return await conn.run_sync(_run_migrations)
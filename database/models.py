@@ -16,7 +16,7 @@
 # 详细许可条款请参阅项目根目录下的LICENSE文件。
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
-from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger
+from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger, UniqueConstraint, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -24,6 +24,10 @@ Base = declarative_base()
 
 class BilibiliVideo(Base):
     __tablename__ = 'bilibili_video'
+    __table_args__ = (
+        Index('idx_bilibili_video_kw_liked', 'source_keyword', 'liked_count'),
+        Index('idx_bilibili_video_kw_time', 'source_keyword', 'create_time'),
+    )
     id = Column(Integer, primary_key=True)
     video_id = Column(BigInteger, nullable=False, index=True, unique=True)
     video_url = Column(Text, nullable=False)
@@ -37,15 +41,15 @@ class BilibiliVideo(Base):
     title = Column(Text)
     desc = Column(Text)
     create_time = Column(BigInteger, index=True)
-    disliked_count = Column(Text)
-    video_play_count = Column(Text)
-    video_favorite_count = Column(Text)
-    video_share_count = Column(Text)
-    video_coin_count = Column(Text)
-    video_danmaku = Column(Text)
-    video_comment = Column(Text)
+    disliked_count = Column(BigInteger)
+    video_play_count = Column(BigInteger)
+    video_favorite_count = Column(BigInteger)
+    video_share_count = Column(BigInteger)
+    video_coin_count = Column(BigInteger)
+    video_danmaku = Column(BigInteger)
+    video_comment = Column(BigInteger)
     video_cover_url = Column(Text)
-    source_keyword = Column(Text, default='')
+    source_keyword = Column(String(255), default='')
 
 class BilibiliVideoComment(Base):
     __tablename__ = 'bilibili_video_comment'
@@ -57,18 +61,18 @@ class BilibiliVideoComment(Base):
     avatar = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     video_id = Column(BigInteger, index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
-    sub_comment_count = Column(Text)
+    sub_comment_count = Column(BigInteger)
     parent_comment_id = Column(String(255))
-    like_count = Column(Text, default='0')
+    like_count = Column(BigInteger, default=0)
 
 class BilibiliUpInfo(Base):
     __tablename__ = 'bilibili_up_info'
     id = Column(Integer, primary_key=True)
-    user_id = Column(BigInteger, index=True)
+    user_id = Column(BigInteger, index=True, unique=True)
     nickname = Column(Text)
     sex = Column(Text)
     sign = Column(Text)
@@ -82,6 +86,7 @@ class BilibiliUpInfo(Base):
 
 class BilibiliContactInfo(Base):
     __tablename__ = 'bilibili_contact_info'
+    __table_args__ = (UniqueConstraint('up_id', 'fan_id', name='uk_bilibili_contact_up_fan'),)
     id = Column(Integer, primary_key=True)
     up_id = Column(BigInteger, index=True)
     fan_id = Column(BigInteger, index=True)
@@ -97,7 +102,7 @@ class BilibiliContactInfo(Base):
 class BilibiliUpDynamic(Base):
     __tablename__ = 'bilibili_up_dynamic'
     id = Column(Integer, primary_key=True)
-    dynamic_id = Column(BigInteger, index=True)
+    dynamic_id = Column(BigInteger, index=True, unique=True)
     user_id = Column(String(255))
     user_name = Column(Text)
     text = Column(Text)
@@ -111,6 +116,10 @@ class BilibiliUpDynamic(Base):
 
 class DouyinAweme(Base):
     __tablename__ = 'douyin_aweme'
+    __table_args__ = (
+        Index('idx_douyin_aweme_kw_liked', 'source_keyword', 'liked_count'),
+        Index('idx_douyin_aweme_kw_time', 'source_keyword', 'create_time'),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(String(255))
     sec_uid = Column(String(255))
@@ -122,21 +131,21 @@ class DouyinAweme(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    aweme_id = Column(BigInteger, index=True)
+    aweme_id = Column(BigInteger, index=True, unique=True)
     aweme_type = Column(Text)
     title = Column(Text)
     desc = Column(Text)
     create_time = Column(BigInteger, index=True)
-    liked_count = Column(Text)
-    comment_count = Column(Text)
-    share_count = Column(Text)
-    collected_count = Column(Text)
+    liked_count = Column(BigInteger)
+    comment_count = Column(BigInteger)
+    share_count = Column(BigInteger)
+    collected_count = Column(BigInteger)
     aweme_url = Column(Text)
     cover_url = Column(Text)
     video_download_url = Column(Text)
     music_download_url = Column(Text)
     note_download_url = Column(Text)
-    source_keyword = Column(Text, default='')
+    source_keyword = Column(String(255), default='')
 
 class DouyinAwemeComment(Base):
     __tablename__ = 'douyin_aweme_comment'
@@ -151,19 +160,19 @@ class DouyinAwemeComment(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     aweme_id = Column(BigInteger, index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
-    sub_comment_count = Column(Text)
+    sub_comment_count = Column(BigInteger)
     parent_comment_id = Column(String(255))
-    like_count = Column(Text, default='0')
+    like_count = Column(BigInteger, default=0)
     pictures = Column(Text, default='')
 
 class DyCreator(Base):
     __tablename__ = 'dy_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(255))
+    user_id = Column(String(255), index=True, unique=True)
     nickname = Column(Text)
     avatar = Column(Text)
     ip_location = Column(Text)
@@ -178,23 +187,27 @@ class DyCreator(Base):
 
 class KuaishouVideo(Base):
     __tablename__ = 'kuaishou_video'
+    __table_args__ = (
+        Index('idx_kuaishou_video_kw_liked', 'source_keyword', 'liked_count'),
+        Index('idx_kuaishou_video_kw_time', 'source_keyword', 'create_time'),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(String(64))
     nickname = Column(Text)
     avatar = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    video_id = Column(String(255), index=True)
+    video_id = Column(String(255), index=True, unique=True)
     video_type = Column(Text)
     title = Column(Text)
     desc = Column(Text)
     create_time = Column(BigInteger, index=True)
-    liked_count = Column(Text)
-    viewd_count = Column(Text)
+    liked_count = Column(BigInteger)
+    viewd_count = Column(BigInteger)
     video_url = Column(Text)
     video_cover_url = Column(Text)
     video_play_url = Column(Text)
-    source_keyword = Column(Text, default='')
+    source_keyword = Column(String(255), default='')
 
 class KuaishouVideoComment(Base):
     __tablename__ = 'kuaishou_video_comment'
@@ -204,14 +217,18 @@ class KuaishouVideoComment(Base):
     avatar = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     video_id = Column(String(255), index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
-    sub_comment_count = Column(Text)
+    sub_comment_count = Column(BigInteger)
 
 class WeiboNote(Base):
     __tablename__ = 'weibo_note'
+    __table_args__ = (
+        Index('idx_weibo_note_kw_liked', 'source_keyword', 'liked_count'),
+        Index('idx_weibo_note_kw_time', 'source_keyword', 'create_time'),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(String(255))
     nickname = Column(Text)
@@ -221,15 +238,15 @@ class WeiboNote(Base):
     ip_location = Column(Text, default='')
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    note_id = Column(BigInteger, index=True)
+    note_id = Column(BigInteger, index=True, unique=True)
     content = Column(Text)
     create_time = Column(BigInteger, index=True)
     create_date_time = Column(String(255), index=True)
-    liked_count = Column(Text)
-    comments_count = Column(Text)
-    shared_count = Column(Text)
+    liked_count = Column(BigInteger)
+    comments_count = Column(BigInteger)
+    shared_count = Column(BigInteger)
     note_url = Column(Text)
-    source_keyword = Column(Text, default='')
+    source_keyword = Column(String(255), default='')
 
 class WeiboNoteComment(Base):
     __tablename__ = 'weibo_note_comment'
@@ -242,19 +259,19 @@ class WeiboNoteComment(Base):
     ip_location = Column(Text, default='')
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(BigInteger, index=True)
+    comment_id = Column(BigInteger, index=True, unique=True)
     note_id = Column(BigInteger, index=True)
     content = Column(Text)
     create_time = Column(BigInteger)
     create_date_time = Column(String(255), index=True)
-    comment_like_count = Column(Text)
-    sub_comment_count = Column(Text)
+    comment_like_count = Column(BigInteger)
+    sub_comment_count = Column(BigInteger)
     parent_comment_id = Column(String(255))
 
 class WeiboCreator(Base):
     __tablename__ = 'weibo_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(255))
+    user_id = Column(String(255), index=True, unique=True)
     nickname = Column(Text)
     avatar = Column(Text)
     ip_location = Column(Text)
@@ -269,7 +286,7 @@ class WeiboCreator(Base):
 class XhsCreator(Base):
     __tablename__ = 'xhs_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(255))
+    user_id = Column(String(255), index=True, unique=True)
     nickname = Column(Text)
     avatar = Column(Text)
     ip_location = Column(Text)
@@ -284,6 +301,10 @@ class XhsCreator(Base):
 
 class XhsNote(Base):
     __tablename__ = 'xhs_note'
+    __table_args__ = (
+        Index('idx_xhs_note_kw_liked', 'source_keyword', 'liked_count'),
+        Index('idx_xhs_note_kw_time', 'source_keyword', 'time'),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(String(255))
     nickname = Column(Text)
@@ -291,21 +312,21 @@ class XhsNote(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    note_id = Column(String(255), index=True)
+    note_id = Column(String(255), index=True, unique=True)
     type = Column(Text)
     title = Column(Text)
     desc = Column(Text)
     video_url = Column(Text)
     time = Column(BigInteger, index=True)
     last_update_time = Column(BigInteger)
-    liked_count = Column(Text)
-    collected_count = Column(Text)
-    comment_count = Column(Text)
-    share_count = Column(Text)
-    image_list = Column(Text)
-    tag_list = Column(Text)
+    liked_count = Column(BigInteger)
+    collected_count = Column(BigInteger)
+    comment_count = Column(BigInteger)
+    share_count = Column(BigInteger)
+    image_list = Column(JSON)
+    tag_list = Column(JSON)
     note_url = Column(Text)
-    source_keyword = Column(Text, default='')
+    source_keyword = Column(String(255), default='')
     xsec_token = Column(Text)
 
 class XhsNoteComment(Base):
@@ -317,19 +338,22 @@ class XhsNoteComment(Base):
     ip_location = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    comment_id = Column(String(255), index=True)
+    comment_id = Column(String(255), index=True, unique=True)
     create_time = Column(BigInteger, index=True)
-    note_id = Column(String(255))
+    note_id = Column(String(255), index=True)
     content = Column(Text)
     sub_comment_count = Column(Integer)
     pictures = Column(Text)
     parent_comment_id = Column(String(255))
-    like_count = Column(Text)
+    like_count = Column(BigInteger)
 
 class TiebaNote(Base):
     __tablename__ = 'tieba_note'
+    __table_args__ = (
+        Index('idx_tieba_note_kw_time', 'source_keyword', 'publish_time'),
+    )
     id = Column(Integer, primary_key=True)
-    note_id = Column(String(644), index=True)
+    note_id = Column(String(644), index=True, unique=True)
     title = Column(Text)
     desc = Column(Text)
     note_url = Column(Text)
@@ -345,12 +369,12 @@ class TiebaNote(Base):
     ip_location = Column(Text, default='')
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
-    source_keyword = Column(Text, default='')
+    source_keyword = Column(String(255), default='')
 
 class TiebaComment(Base):
     __tablename__ = 'tieba_comment'
     id = Column(Integer, primary_key=True)
-    comment_id = Column(String(255), index=True)
+    comment_id = Column(String(255), index=True, unique=True)
     parent_comment_id = Column(String(255), default='')
     content = Column(Text)
     user_link = Column(Text, default='')
@@ -370,7 +394,7 @@ class TiebaComment(Base):
 class TiebaCreator(Base):
     __tablename__ = 'tieba_creator'
     id = Column(Integer, primary_key=True)
-    user_id = Column(String(64))
+    user_id = Column(String(64), index=True, unique=True)
     user_name = Column(Text)
     nickname = Column(Text)
     avatar = Column(Text)
@@ -384,8 +408,12 @@ class TiebaCreator(Base):
 
 class ZhihuContent(Base):
     __tablename__ = 'zhihu_content'
+    __table_args__ = (
+        Index('idx_zhihu_content_kw_liked', 'source_keyword', 'voteup_count'),
+        Index('idx_zhihu_content_kw_time', 'source_keyword', 'created_time'),
+    )
     id = Column(Integer, primary_key=True)
-    content_id = Column(String(64), index=True)
+    content_id = Column(String(64), index=True, unique=True)
     content_type = Column(Text)
     content_text = Column(Text)
     content_url = Column(Text)
@@ -396,7 +424,7 @@ class ZhihuContent(Base):
     updated_time = Column(Text)
     voteup_count = Column(Integer, default=0)
     comment_count = Column(Integer, default=0)
-    source_keyword = Column(Text)
+    source_keyword = Column(String(255))
     user_id = Column(String(255))
     user_link = Column(Text)
     user_nickname = Column(Text)
@@ -413,7 +441,7 @@ class ZhihuContent(Base):
 class ZhihuComment(Base):
     __tablename__ = 'zhihu_comment'
     id = Column(Integer, primary_key=True)
-    comment_id = Column(String(64), index=True)
+    comment_id = Column(String(64), index=True, unique=True)
     parent_comment_id = Column(String(64))
     content = Column(Text)
     publish_time = Column(String(32), index=True)
@@ -450,3 +478,13 @@ class ZhihuCreator(Base):
     get_voteup_count = Column(Integer, default=0)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
+
+class KeywordCatalog(Base):
+    __tablename__ = 'keyword_catalog'
+    __table_args__ = (UniqueConstraint('keyword', 'platform', name='uk_keyword_catalog_keyword_platform'),)
+    id = Column(Integer, primary_key=True)
+    keyword = Column(String(255), nullable=False)
+    platform = Column(String(32), nullable=False)
+    item_count = Column(BigInteger, default=0)
+    first_seen_ts = Column(BigInteger)
+    last_seen_ts = Column(BigInteger)
@@ -18,11 +18,24 @@
 
 """MongoDB存储基类：提供连接管理和通用存储方法"""
 import asyncio
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import UpdateOne
+import config
 from config import db_config
 from tools import utils
 
+# 各平台集合 upsert 使用的业务主键：{平台前缀: {集合后缀: 字段}}，启动时据此创建唯一索引
+MONGO_UNIQUE_KEYS: Dict[str, Dict[str, str]] = {
+    "xhs": {"contents": "note_id", "comments": "comment_id", "creators": "user_id"},
+    "douyin": {"contents": "aweme_id", "comments": "comment_id", "creators": "user_id"},
+    "kuaishou": {"contents": "video_id", "comments": "comment_id", "creators": "user_id"},
+    "bilibili": {"contents": "video_id", "comments": "comment_id", "creators": "user_id"},
+    "weibo": {"contents": "note_id", "comments": "comment_id", "creators": "user_id"},
+    "tieba": {"contents": "note_id", "comments": "comment_id", "creators": "user_id"},
+    "zhihu": {"contents": "note_id", "comments": "comment_id", "creators": "user_id"},
+}
+
 
 class MongoDBConnection:
     """MongoDB连接管理（单例模式）"""
@@ -88,6 +101,9 @@ class MongoDBConnection:
 class MongoDBStoreBase:
     """MongoDB存储基类：提供通用的CRUD操作"""
 
+    # 已创建过唯一索引的平台前缀
+    _indexed_prefixes: Set[str] = set()
+
     def __init__(self, collection_prefix: str):
         """初始化存储基类
         Args:
@@ -95,12 +111,16 @@ class MongoDBStoreBase:
         """
         self.collection_prefix = collection_prefix
         self._connection = MongoDBConnection()
+        self._collections: Dict[str, AsyncIOMotorCollection] = {}
 
     async def get_collection(self, collection_suffix: str) -> AsyncIOMotorCollection:
-        """获取集合：{prefix}_{suffix}"""
-        db = await self._connection.get_db()
-        collection_name = f"{self.collection_prefix}_{collection_suffix}"
-        return db[collection_name]
+        """获取集合：{prefix}_{suffix}，集合对象按后缀缓存"""
+        collection = self._collections.get(collection_suffix)
+        if collection is None:
+            db = await self._connection.get_db()
+            collection = db[f"{self.collection_prefix}_{collection_suffix}"]
+            self._collections[collection_suffix] = collection
+        return collection
 
     async def save_or_update(self, collection_suffix: str, query: Dict, data: Dict) -> bool:
         """保存或更新数据（upsert）"""
@@ -112,6 +132,26 @@ class MongoDBStoreBase:
             utils.logger.error(f"[MongoDBStoreBase] Save failed ({self.collection_prefix}_{collection_suffix}): {e}")
             return False
 
+    async def bulk_save_or_update(self, collection_suffix: str, key_field: str, items: List[Dict]) -> bool:
+        """批量保存或更新：按 key_field 生成 upsert 操作，一次 bulk_write 提交（无序执行）"""
+        operations = [
+            UpdateOne({key_field: item[key_field]}, {"$set": item}, upsert=True)
+            for item in items if item.get(key_field)
+        ]
+        if not operations:
+            return True
+        try:
+            collection = await self.get_collection(collection_suffix)
+            await collection.bulk_write(operations, ordered=False)
+            return True
+        except Exception as e:
+            utils.logger.error(f"[MongoDBStoreBase] Bulk save failed ({self.collection_prefix}_{collection_suffix}): {e}")
+            return False
+
+    async def buffered_save_or_update(self, collection_suffix: str, key_field: str, items: List[Dict]):
+        """放入批量写入缓冲，由 MongoBulkWriter 按条数/时间合并成 bulk_write 提交"""
+        await MongoBulkWriter.get_instance().add_many(self, collection_suffix, key_field, items)
+
     async def find_one(self, collection_suffix: str, query: Dict) -> Optional[Dict]:
         """查询单条数据"""
         try:
@@ -141,3 +181,148 @@ class MongoDBStoreBase:
             utils.logger.info(f"[MongoDBStoreBase] Index created on {self.collection_prefix}_{collection_suffix}")
         except Exception as e:
             utils.logger.error(f"[MongoDBStoreBase] Create index failed: {e}")
+
+    async def ensure_indexes(self):
+        """为本平台各集合的业务主键创建唯一索引（每个平台前缀每个进程只执行一次）"""
+        if self.collection_prefix in MongoDBStoreBase._indexed_prefixes:
+            return
+        MongoDBStoreBase._indexed_prefixes.add(self.collection_prefix)
+        for collection_suffix, key_field in MONGO_UNIQUE_KEYS.get(self.collection_prefix, {}).items():
+            collection_name = f"{self.collection_prefix}_{collection_suffix}"
+            try:
+                collection = await self.get_collection(collection_suffix)
+                await collection.create_index([(key_field, 1)], unique=True)
+            except Exception as e:
+                # 旧数据中已有重复记录时无法建唯一索引，退回普通索引，至少避免 upsert 全表扫描
+                utils.logger.warning(
+                    f"[MongoDBStoreBase.ensure_indexes] Create unique index on {collection_name}.{key_field} failed: {e}, "
+                    f"fallback to non-unique index"
+                )
+                await self.create_index(collection_suffix, [(key_field, 1)])
+
+
+class _CollectionBuffer:
+    """单个集合的待写入缓冲：同一主键的多次写入在缓冲内合并，只保留最新值"""
+
+    def __init__(self, store: MongoDBStoreBase, collection_suffix: str, key_field: str):
+        self.store = store
+        self.collection_suffix = collection_suffix
+        self.key_field = key_field
+        self.items: Dict[Any, Dict] = {}
+
+    def add(self, item: Dict):
+        key = item[self.key_field]
+        if key in self.items:
+            self.items[key].update(item)
+        else:
+            self.items[key] = dict(item)
+
+    def drain(self) -> List[Dict]:
+        items = list(self.items.values())
+        self.items = {}
+        return items
+
+
+class MongoBulkWriter:
+    """
+    MongoDB 存储的写后缓冲（write-behind）
+
+    - store 调用 add_many() 只把文档放入内存缓冲
+    - 单个集合缓冲达到 MONGO_BULK_BATCH_SIZE 或距上次刷新超过 MONGO_BULK_FLUSH_INTERVAL_SEC 时，
+      通过 MongoDBStoreBase.bulk_save_or_update 一次无序 bulk_write 提交
+    """
+
+    _instance: Optional["MongoBulkWriter"] = None
+
+    @classmethod
+    def get_instance(cls) -> "MongoBulkWriter":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    async def close_all(cls):
+        """
+        刷新并关闭写入器，在爬虫退出时调用
+        """
+        writer, cls._instance = cls._instance, None
+        if writer is not None:
+            await writer.close()
+
+    def __init__(self):
+        self._buffers: Dict[str, _CollectionBuffer] = {}
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def add_many(self, store: MongoDBStoreBase, collection_suffix: str, key_field: str, items: List[Dict]):
+        """
+        放入一批同集合的待写入文档
+        Args:
+            store: 集合所属的 MongoDBStoreBase
+            collection_suffix: 集合后缀
+            key_field: upsert 使用的业务主键字段
+            items: 文档列表，缺少主键的文档会被忽略
+        """
+        items = [item for item in items if item.get(key_field)]
+        if not items:
+            return
+
+        collection_name = f"{store.collection_prefix}_{collection_suffix}"
+        async with self._lock:
+            buffer = self._buffers.get(collection_name)
+            if buffer is None:
+                buffer = _CollectionBuffer(store, collection_suffix, key_field)
+                self._buffers[collection_name] = buffer
+            for item in items:
+                buffer.add(item)
+            batch_ready = len(buffer.items) >= config.MONGO_BULK_BATCH_SIZE
+            self._ensure_flush_task()
+
+        if batch_ready:
+            await self.flush(collection_name)
+
+    def _ensure_flush_task(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(config.MONGO_BULK_FLUSH_INTERVAL_SEC)
+            try:
+                await self.flush()
+            except Exception as e:
+                utils.logger.error(f"[MongoBulkWriter._flush_loop] Periodic flush error: {e}")
+
+    async def flush(self, collection_name: Optional[str] = None):
+        """
+        把缓冲写入 MongoDB
+        Args:
+            collection_name: 只刷新指定集合，默认刷新全部集合
+        """
+        async with self._lock:
+            names = [collection_name] if collection_name else list(self._buffers.keys())
+            pending: List[Tuple[_CollectionBuffer, List[Dict]]] = []
+            for name in names:
+                buffer = self._buffers.get(name)
+                if buffer and buffer.items:
+                    pending.append((buffer, buffer.drain()))
+
+        for buffer, items in pending:
+            await buffer.store.bulk_save_or_update(buffer.collection_suffix, buffer.key_field, items)
+            utils.logger.info(
+                f"[MongoBulkWriter] Flushed {len(items)} documents to "
+                f"{buffer.store.collection_prefix}_{buffer.collection_suffix}"
+            )
+
+    async def close(self):
+        """
+        停止定时刷新并把剩余缓冲写入 MongoDB
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/database/pagination.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""统一数据列表查询：按 PLATFORM_MODELS 的标准化列分页，支持页码和游标（keyset）两种方式"""
+import base64
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, desc, func, or_, select
+
+import config
+
+from .data_registry import PLATFORM_MODELS
+from .db_session import get_session
+
+# (平台, 标题关键词, 源关键词) -> (过期时间, 总数)
+_count_cache: Dict[Tuple[str, Optional[str], Optional[str]], Tuple[float, int]] = {}
+
+
+def encode_cursor(sort_by: str, sort_value: Any, row_id: int) -> str:
+    """把上一页最后一行的 (排序列名, 排序值, 主键) 编码成不透明的游标字符串"""
+    raw = json.dumps([sort_by, sort_value, row_id], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str) -> Tuple[Any, int]:
+    """
+    解析游标，游标无效或与当前排序列不一致时抛出 ValueError
+    Returns:
+        (排序值, 主键)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort_by, sort_value, row_id = json.loads(raw)
+    except Exception:
+        raise ValueError(f"无效的游标: {cursor}")
+    if cursor_sort_by != sort_by or not isinstance(row_id, int):
+        raise ValueError(f"游标与排序字段 {sort_by} 不匹配")
+    return sort_value, row_id
+
+
+async def _get_total_count(session, platform: str, table, where_clauses, keyword, source_keyword) -> int:
+    """总数按筛选条件缓存 DATA_LIST_COUNT_CACHE_TTL_SEC 秒，翻页时不再每次 COUNT(*)"""
+    cache_key = (platform, keyword, source_keyword)
+    cached = _count_cache.get(cache_key)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+
+    count_query = select(func.count()).select_from(table)
+    if where_clauses:
+        count_query = count_query.where(*where_clauses)
+    total = (await session.execute(count_query)).scalar_one_or_none() or 0
+    if config.DATA_LIST_COUNT_CACHE_TTL_SEC > 0:
+        _count_cache[cache_key] = (now + config.DATA_LIST_COUNT_CACHE_TTL_SEC, total)
+    return total
+
+
+async def get_paginated_list(
+        platform: str,
+        *,
+        keyword: Optional[str] = None,
+        source_keyword: Optional[str] = None,
+        sort_by: str = "liked_count",
+        page: int = 1,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    按 (排序列, 主键) 倒序分页查询某个平台的内容
+    Args:
+        platform: PLATFORM_MODELS 中的平台 key
+        keyword: 标题模糊匹配
+        source_keyword: 源关键词精确匹配
+        sort_by: 标准化列名，如 liked_count / comment_count / create_time
+        page: 页码，未传 cursor 时使用 OFFSET 分页
+        page_size: 每页数量
+        cursor: 上一页返回的 next_cursor，传入后按 keyset 定位，深翻页不再扫描被跳过的行
+
+    Returns:
+        {"total": 总数（可能有缓存延迟）, "list": [...], "next_cursor": 下一页游标，没有更多数据时为 None}
+    """
+    if platform not in PLATFORM_MODELS:
+        raise ValueError(f"不支持的平台: {platform}")
+    model, normalized_columns = PLATFORM_MODELS[platform]
+    table = model.__table__
+
+    sort_label = next((c for c in normalized_columns if c.name == sort_by), None)
+    if sort_label is None:
+        sort_by = "create_time"
+        sort_label = next(c for c in normalized_columns if c.name == sort_by)
+    sort_column = sort_label.element
+    id_column = table.c.id
+
+    where_clauses = []
+    if keyword:
+        # `keyword` 用于模糊搜索标题
+        where_clauses.append(next(c for c in normalized_columns if c.name == "title").element.like(f"%{keyword}%"))
+    if source_keyword:
+        # `source_keyword` 用于精确匹配源关键词
+        where_clauses.append(table.c.source_keyword == source_keyword)
+
+    async with get_session() as session:
+        total = await _get_total_count(session, platform, table, where_clauses, keyword, source_keyword)
+        if total == 0:
+            return {"total": 0, "list": [], "next_cursor": None}
+
+        data_query = select(*normalized_columns, sort_column.label("_sort_value"), id_column.label("_row_id"))
+        page_clauses = list(where_clauses)
+        if cursor:
+            sort_value, row_id = decode_cursor(cursor, sort_by)
+            # 倒序时 NULL 排在最后（MySQL/SQLite 一致）
+            if sort_value is None:
+                page_clauses.append(and_(sort_column.is_(None), id_column < row_id))
+            else:
+                page_clauses.append(or_(
+                    sort_column < sort_value,
+                    and_(sort_column == sort_value, id_column < row_id),
+                    sort_column.is_(None),
+                ))
+        if page_clauses:
+            data_query = data_query.where(*page_clauses)
+        data_query = data_query.order_by(desc(sort_column), desc(id_column))
+        if not cursor:
+            data_query = data_query.offset((page - 1) * page_size)
+        # 多取一行判断是否还有下一页
+        rows = (await session.execute(data_query.limit(page_size + 1))).all()
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    data_list = []
+    for row in rows:
+        item = dict(row._mapping)
+        item.pop("_sort_value")
+        item.pop("_row_id")
+        data_list.append(item)
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(sort_by, last["_sort_value"], last["_row_id"])
+    return {"total": total, "list": data_list, "next_cursor": next_cursor}
@@ -0,0 +1,52 @@
+// 常驻签名进程：加载指定的签名脚本后，按行从 stdin 读取 JSON 请求并把结果按行写回 stdout
+// 请求格式: {"id": 1, "fn": "sign_datail", "args": ["...", "..."]}
+// 响应格式: {"id": 1, "result": "..."} 或 {"id": 1, "error": "..."}
+// 由 tools/js_sign_engine.py 启动和管理，请勿直接运行
+const fs = require('fs');
+const vm = require('vm');
+const readline = require('readline');
+
+const scriptPath = process.argv[2];
+const source = fs.readFileSync(scriptPath, 'utf-8').replace(/^\uFEFF/, '');
+
+// 签名脚本里的 console 输出转到 stderr，避免破坏 stdout 上的响应协议
+const sandbox = {
+    require: require,
+    console: new console.Console(process.stderr, process.stderr),
+    Buffer: Buffer,
+    process: process,
+    setTimeout: setTimeout,
+    clearTimeout: clearTimeout,
+};
+const context = vm.createContext(sandbox);
+vm.runInContext(source, context, {filename: scriptPath});
+
+function reply(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+const rl = readline.createInterface({input: process.stdin, terminal: false});
+rl.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (e) {
+        reply({id: null, error: 'invalid request: ' + e.message});
+        return;
+    }
+    try {
+        const fn = context[request.fn];
+        if (typeof fn !== 'function') {
+            throw new Error('function not found: ' + request.fn);
+        }
+        reply({id: request.id, result: fn.apply(null, request.args || [])});
+    } catch (e) {
+        reply({id: request.id, error: String(e && e.stack ? e.stack : e)});
+    }
+});
+rl.on('close', () => process.exit(0));
+
+reply({id: 0, result: 'ready'});
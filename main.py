@@ -32,7 +32,15 @@ from media_platform.tieba import TieBaCrawler
 from media_platform.weibo import WeiboCrawler
 from media_platform.xhs import XiaoHongShuCrawler
 from media_platform.zhihu import ZhihuCrawler
+from proxy.proxy_ip_pool import ProxyIpPool
+from proxy.proxy_registry import ProxyRegistry
+from store.media_store import ContentAddressedMediaStore
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools.async_file_writer import AsyncFileWriter
+from tools.http_transport import SharedHttpTransport
+from tools.js_sign_engine import JsSignEngine
+from tools.media_downloader import MediaDownloader
 from var import crawler_type_var
 
 
@@ -82,8 +90,18 @@ def _flush_excel_if_needed() -> None:
         print(f"[Main] Error flushing Excel data: {e}")
 
 
+async def _close_file_writers_if_needed() -> None:
+    if config.SAVE_DATA_OPTION not in ("csv", "jsonl"):
+        return
+
+    try:
+        await AsyncFileWriter.close_all()
+    except Exception as e:
+        print(f"[Main] Error closing file writers: {e}")
+
+
 async def _generate_wordcloud_if_needed() -> None:
-    if config.SAVE_DATA_OPTION != "json" or not config.ENABLE_GET_WORDCLOUD:
+    if config.SAVE_DATA_OPTION not in ("json", "jsonl") or not config.ENABLE_GET_WORDCLOUD:
         return
 
     try:
@@ -106,12 +124,17 @@ async def main() -> None:
         return
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+    await SeenIndex.get_instance(config.PLATFORM).load()
     await crawler.start()
+    # 等待后台媒体下载队列清空
+    await MediaDownloader.close_all()
+    ContentAddressedMediaStore.close_all()
 
     _flush_excel_if_needed()
+    await _close_file_writers_if_needed()
 
     # Generate wordcloud after crawling is complete
-    # Only for JSON save mode
+    # Only for JSON / JSON Lines save mode
     await _generate_wordcloud_if_needed()
 
 
@@ -134,6 +157,37 @@ async def async_cleanup() -> None:
                 if "closed" not in error_msg and "disconnected" not in error_msg:
                     print(f"[Main] 关闭浏览器上下文时出错: {e}")
 
+    # main 不会调用 crawler.close()，这里兜底关闭存储，重复调用无副作用
+    try:
+        await StoreManager.close_all()
+    except Exception as e:
+        print(f"[Main] 关闭存储时出错: {e}")
+
+    await _close_file_writers_if_needed()
+
+    # 中断退出时不再等待剩余下载，未完成的 .part 文件下次运行时续传
+    try:
+        await MediaDownloader.close_all(wait=False)
+        ContentAddressedMediaStore.close_all()
+    except Exception as e:
+        print(f"[Main] 关闭媒体下载器时出错: {e}")
+
+    try:
+        await ProxyIpPool.close_all()
+        await ProxyRegistry.close_all()
+    except Exception as e:
+        print(f"[Main] 关闭代理池时出错: {e}")
+
+    try:
+        await SharedHttpTransport.close_all()
+    except Exception as e:
+        print(f"[Main] 关闭共享HTTP客户端时出错: {e}")
+
+    try:
+        await JsSignEngine.close_all()
+    except Exception as e:
+        print(f"[Main] 关闭JS签名进程时出错: {e}")
+
     if config.SAVE_DATA_OPTION in ("db", "sqlite"):
         await db.close()
 
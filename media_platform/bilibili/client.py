@@ -34,6 +34,8 @@ import config
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.response_cache import cache_response
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
@@ -63,13 +65,16 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
         self.cookie_dict = cookie_dict
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
+        # 平台级令牌桶限速，取令牌时不占用并发名额
+        self.rate_limiter = RateLimiter.get_instance("bili")
 
     async def request(self, method, url, **kwargs) -> Any:
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
+        self.rate_limiter.observe(response.status_code)
         try:
             data: Dict = response.json()
         except json.JSONDecodeError:
@@ -180,6 +185,7 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.get(uri, post_data)
 
+    @cache_response("bili")
     async def get_video_info(self, aid: Union[int, None] = None, bvid: Union[str, None] = None) -> Dict:
         """
         Bilibli web video detail api, aid 和 bvid任选一个参数
@@ -222,19 +228,19 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
 
     async def get_video_media(self, url: str) -> Union[bytes, None]:
         # Follow CDN 302 redirects and treat any 2xx as success (some endpoints return 206)
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=True) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-                response.raise_for_status()
-                if 200 <= response.status_code < 300:
-                    return response.content
-                utils.logger.error(
-                    f"[BilibiliClient.get_video_media] Unexpected status {response.status_code} for {url}"
-                )
-                return None
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[BilibiliClient.get_video_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
-                return None
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", url, timeout=self.timeout, headers=self.headers, follow_redirects=True)
+            response.raise_for_status()
+            if 200 <= response.status_code < 300:
+                return response.content
+            utils.logger.error(
+                f"[BilibiliClient.get_video_media] Unexpected status {response.status_code} for {url}"
+            )
+            return None
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[BilibiliClient.get_video_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+            return None
 
     async def get_video_comments(
         self,
@@ -402,6 +408,7 @@ class BilibiliClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.get(uri, post_data)
 
+    @cache_response("bili")
     async def get_creator_info(self, creator_id: int) -> Dict:
         """
         get creator info
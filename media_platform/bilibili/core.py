@@ -43,8 +43,12 @@ import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import bilibili as bilibili_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
+from tools.async_pipeline import AsyncPipeline
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import concurrency_slot, get_crawl_interval
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
@@ -108,6 +112,7 @@ class BilibiliCrawler(AbstractCrawler):
                 await self.bili_client.update_cookies(browser_context=self.browser_context)
 
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("bilibili", bilibili_store.BiliStoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 await self.search()
             elif config.CRAWLER_TYPE == "detail":
@@ -127,6 +132,7 @@ class BilibiliCrawler(AbstractCrawler):
                     await self.get_all_creator_details(config.BILI_CREATOR_ID_LIST)
             else:
                 pass
+            await StoreManager.flush_all()
             utils.logger.info("[BilibiliCrawler.start] Bilibili Crawler finished ...")
 
     async def search(self):
@@ -179,9 +185,44 @@ class BilibiliCrawler(AbstractCrawler):
     async def search_by_keywords(self):
         """
         search bilibili video with keywords in normal mode
+        搜索 -> 详情 -> 存储 -> 媒体/评论 分阶段流水线执行，下一页搜索与上一页的评论爬取同时进行，
+        但所有调用平台 API 的阶段（含获取播放地址）共用一个 MAX_CONCURRENCY_NUM 并发名额
         :return:
         """
         utils.logger.info("[BilibiliCrawler.search_by_keywords] Begin search bilibli keywords")
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        pipeline = AsyncPipeline("bili.search", queue_size=config.PIPELINE_QUEUE_SIZE)
+
+        async def fetch_detail(item: Tuple[str, Dict]):
+            keyword, video_item = item
+            video_detail = await self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore)
+            if video_detail:
+                await pipeline.put("store", (keyword, video_detail))
+
+        async def store_video(item: Tuple[str, Dict]):
+            keyword, video_detail = item
+            source_keyword_var.set(keyword)
+            await bilibili_store.update_bilibili_video(video_detail)
+            await bilibili_store.update_up_info(video_detail)
+            if config.ENABLE_GET_MEIDAS:
+                await pipeline.put("media", video_detail)
+            if config.ENABLE_GET_COMMENTS:
+                await pipeline.put("comments", video_detail.get("View").get("aid"))
+
+        async def fetch_media(video_detail: Dict):
+            await self.get_bilibili_video(video_detail, semaphore)
+
+        async def fetch_comments(video_id: str):
+            await self.batch_get_video_comments([video_id], semaphore=semaphore)
+
+        pipeline.add_stage("detail", fetch_detail, workers=config.PIPELINE_DETAIL_WORKERS)
+        pipeline.add_stage("store", store_video, workers=config.PIPELINE_STORE_WORKERS)
+        pipeline.add_stage("media", fetch_media, workers=config.PIPELINE_MEDIA_WORKERS)
+        pipeline.add_stage("comments", fetch_comments, workers=config.PIPELINE_COMMENT_WORKERS)
+        await pipeline.run(self.search_videos_producer(pipeline, semaphore))
+
+    async def search_videos_producer(self, pipeline: AsyncPipeline, semaphore: asyncio.Semaphore):
+        """Search stage: page through keywords and feed unseen videos into the detail stage"""
         bili_limit_count = 20  # bilibili limit page fixed value
         if config.CRAWLER_MAX_NOTES_COUNT < bili_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = bili_limit_count
@@ -197,41 +238,29 @@ class BilibiliCrawler(AbstractCrawler):
                     continue
 
                 utils.logger.info(f"[BilibiliCrawler.search_by_keywords] search bilibili keyword: {keyword}, page: {page}")
-                video_id_list: List[str] = []
-                videos_res = await self.bili_client.search_video_by_keyword(
-                    keyword=keyword,
-                    page=page,
-                    page_size=bili_limit_count,
-                    order=SearchOrderType.DEFAULT,
-                    pubtime_begin_s=0,  # 作品发布日期起始时间戳
-                    pubtime_end_s=0,  # 作品发布日期结束日期时间戳
-                )
+                # 只在调用搜索接口时占用并发名额，往下游队列投递时不占用，避免队列满时卡住其它阶段
+                async with concurrency_slot(semaphore):
+                    videos_res = await self.bili_client.search_video_by_keyword(
+                        keyword=keyword,
+                        page=page,
+                        page_size=bili_limit_count,
+                        order=SearchOrderType.DEFAULT,
+                        pubtime_begin_s=0,  # 作品发布日期起始时间戳
+                        pubtime_end_s=0,  # 作品发布日期结束日期时间戳
+                    )
                 video_list: List[Dict] = videos_res.get("result")
 
                 if not video_list:
                     utils.logger.info(f"[BilibiliCrawler.search_by_keywords] No more videos for '{keyword}', moving to next keyword.")
                     break
 
-                semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                task_list = []
-                try:
-                    task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
-                except Exception as e:
-                    utils.logger.warning(f"[BilibiliCrawler.search_by_keywords] error in the task list. The video for this page will not be included. {e}")
-                video_items = await asyncio.gather(*task_list)
-                for video_item in video_items:
-                    if video_item:
-                        video_id_list.append(video_item.get("View").get("aid"))
-                        await bilibili_store.update_bilibili_video(video_item)
-                        await bilibili_store.update_up_info(video_item)
-                        await self.get_bilibili_video(video_item, semaphore)
+                for video_item in SeenIndex.get_instance("bili").filter_contents(video_list, lambda x: x.get("aid")):
+                    await pipeline.put("detail", (keyword, video_item))
                 page += 1
 
                 # Sleep after page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
-
-                await self.batch_get_video_comments(video_id_list)
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[BilibiliCrawler.search_by_keywords] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
 
     async def search_by_keywords_in_time_range(self, daily_limit: bool):
         """
@@ -288,6 +317,7 @@ class BilibiliCrawler(AbstractCrawler):
                             break
 
                         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                        video_list = SeenIndex.get_instance("bili").filter_contents(video_list, lambda x: x.get("aid"))
                         task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
                         video_items = await asyncio.gather(*task_list)
 
@@ -309,8 +339,8 @@ class BilibiliCrawler(AbstractCrawler):
                         page += 1
 
                         # Sleep after page navigation
-                        await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                        utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                        await asyncio.sleep(get_crawl_interval())
+                        utils.logger.info(f"[BilibiliCrawler.search_by_keywords_in_time_range] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
 
                         await self.batch_get_video_comments(video_id_list)
 
@@ -318,10 +348,11 @@ class BilibiliCrawler(AbstractCrawler):
                         utils.logger.error(f"[BilibiliCrawler.search] Error searching on {day.ctime()}: {e}")
                         break
 
-    async def batch_get_video_comments(self, video_id_list: List[str]):
+    async def batch_get_video_comments(self, video_id_list: List[str], semaphore: Optional[asyncio.Semaphore] = None):
         """
         batch get video comments
         :param video_id_list:
+        :param semaphore: 共用的并发名额，默认新建一个 MAX_CONCURRENCY_NUM 的
         :return:
         """
         if not config.ENABLE_GET_COMMENTS:
@@ -329,9 +360,9 @@ class BilibiliCrawler(AbstractCrawler):
             return
 
         utils.logger.info(f"[BilibiliCrawler.batch_get_video_comments] video ids:{video_id_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = semaphore or asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
-        for video_id in video_id_list:
+        for video_id in SeenIndex.get_instance("bili").filter_comments(video_id_list):
             task = asyncio.create_task(self.get_comments(video_id, semaphore), name=video_id)
             task_list.append(task)
         await asyncio.gather(*task_list)
@@ -343,18 +374,19 @@ class BilibiliCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 utils.logger.info(f"[BilibiliCrawler.get_comments] begin get video_id: {video_id} comments ...")
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[BilibiliCrawler.get_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching comments for video {video_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[BilibiliCrawler.get_comments] Sleeping for {get_crawl_interval()} seconds after fetching comments for video {video_id}")
                 await self.bili_client.get_video_all_comments(
                     video_id=video_id,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=get_crawl_interval(),
                     is_fetch_sub_comments=config.ENABLE_GET_SUB_COMMENTS,
                     callback=bilibili_store.batch_update_bilibili_video_comments,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
                 )
+                SeenIndex.get_instance("bili").mark_comments(video_id)
 
             except DataFetchError as ex:
                 utils.logger.error(f"[BilibiliCrawler.get_comments] get video_id: {video_id} comment error: {ex}")
@@ -376,8 +408,8 @@ class BilibiliCrawler(AbstractCrawler):
             await self.get_specified_videos(video_bvids_list)
             if int(result["page"]["count"]) <= pn * ps:
                 break
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[BilibiliCrawler.get_creator_videos] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {pn}")
+            await asyncio.sleep(get_crawl_interval())
+            utils.logger.info(f"[BilibiliCrawler.get_creator_videos] Sleeping for {get_crawl_interval()} seconds after page {pn}")
             pn += 1
 
     async def get_specified_videos(self, video_url_list: List[str]):
@@ -420,13 +452,15 @@ class BilibiliCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 result = await self.bili_client.get_video_info(aid=aid, bvid=bvid)
+                if result:
+                    SeenIndex.get_instance("bili").mark_content(result.get("View", {}).get("aid"))
 
                 # Sleep after fetching video details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[BilibiliCrawler.get_video_info_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video details {bvid or aid}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[BilibiliCrawler.get_video_info_task] Sleeping for {get_crawl_interval()} seconds after fetching video details {bvid or aid}")
 
                 return result
             except DataFetchError as ex:
@@ -444,7 +478,7 @@ class BilibiliCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 result = await self.bili_client.get_video_play_url(aid=aid, cid=cid)
                 return result
@@ -550,6 +584,7 @@ class BilibiliCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        await StoreManager.close_all()
         try:
             # 如果使用CDP模式，需要特殊处理
             if self.cdp_manager:
@@ -592,13 +627,11 @@ class BilibiliCrawler(AbstractCrawler):
             utils.logger.info("[BilibiliCrawler.get_bilibili_video] get video url failed")
             return
 
-        content = await self.bili_client.get_video_media(video_url)
-        await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-        utils.logger.info(f"[BilibiliCrawler.get_bilibili_video] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video {aid}")
-        if content is None:
-            return
+        # 视频体积较大，交给 MediaDownloader 流式下载并支持断点续传，不阻塞爬取流程
         extension_file_name = f"video.mp4"
-        await bilibili_store.store_video(aid, content, extension_file_name)
+        await bilibili_store.download_video(
+            aid, video_url, extension_file_name, headers=self.bili_client.headers, proxy=self.bili_client.proxy
+        )
 
     async def get_all_creator_details(self, creator_url_list: List[str]):
         """
@@ -637,7 +670,7 @@ class BilibiliCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             creator_unhandled_info: Dict = await self.bili_client.get_creator_info(creator_id)
             creator_info: Dict = {
                 "id": creator_id,
@@ -657,12 +690,12 @@ class BilibiliCrawler(AbstractCrawler):
         :return:
         """
         creator_id = creator_info["id"]
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 utils.logger.info(f"[BilibiliCrawler.get_fans] begin get creator_id: {creator_id} fans ...")
                 await self.bili_client.get_creator_all_fans(
                     creator_info=creator_info,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=get_crawl_interval(),
                     callback=bilibili_store.batch_update_bilibili_creator_fans,
                     max_count=config.CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES,
                 )
@@ -680,12 +713,12 @@ class BilibiliCrawler(AbstractCrawler):
         :return:
         """
         creator_id = creator_info["id"]
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 utils.logger.info(f"[BilibiliCrawler.get_followings] begin get creator_id: {creator_id} followings ...")
                 await self.bili_client.get_creator_all_followings(
                     creator_info=creator_info,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=get_crawl_interval(),
                     callback=bilibili_store.batch_update_bilibili_creator_followings,
                     max_count=config.CRAWLER_MAX_CONTACTS_COUNT_SINGLENOTES,
                 )
@@ -703,12 +736,12 @@ class BilibiliCrawler(AbstractCrawler):
         :return:
         """
         creator_id = creator_info["id"]
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 utils.logger.info(f"[BilibiliCrawler.get_dynamics] begin get creator_id: {creator_id} dynamics ...")
                 await self.bili_client.get_creator_all_dynamics(
                     creator_info=creator_info,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=get_crawl_interval(),
                     callback=bilibili_store.batch_update_bilibili_creator_dynamics,
                     max_count=config.CRAWLER_MAX_DYNAMICS_COUNT_SINGLENOTES,
                 )
@@ -29,6 +29,8 @@ from playwright.async_api import BrowserContext
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.response_cache import cache_response
 from var import request_keyword_var
 
 if TYPE_CHECKING:
@@ -59,6 +61,8 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         self.cookie_dict = cookie_dict
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
+        # 平台级令牌桶限速，取令牌时不占用并发名额
+        self.rate_limiter = RateLimiter.get_instance("dy")
 
     async def __process_req_params(
         self,
@@ -116,8 +120,9 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
+        self.rate_limiter.observe(response.status_code)
         try:
             if response.text == "" or response.text == "blocked":
                 utils.logger.error(f"request params incrr, response.text: {response.text}")
@@ -194,6 +199,7 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         headers["Referer"] = urllib.parse.quote(referer_url, safe=':/')
         return await self.get("/aweme/v1/web/general/search/single/", query_params, headers=headers)
 
+    @cache_response("dy")
     async def get_video_by_id(self, aweme_id: str) -> Any:
         """
         DouYin Video Detail API
@@ -295,6 +301,7 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
                         await asyncio.sleep(crawl_interval)
         return result
 
+    @cache_response("dy")
     async def get_user_info(self, sec_user_id: str):
         uri = "/aweme/v1/web/user/profile/other/"
         params = {
@@ -333,18 +340,18 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         return result
 
     async def get_aweme_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout, follow_redirects=True)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(f"[DouYinClient.get_aweme_media] request {url} err, res:{response.text}")
-                    return None
-                else:
-                    return response.content
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", url, timeout=self.timeout, follow_redirects=True)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
+                utils.logger.error(f"[DouYinClient.get_aweme_media] request {url} err, res:{response.text}")
                 return None
+            else:
+                return response.content
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")  # 保留原始异常类型名称，以便开发者调试
+            return None
 
     async def resolve_short_url(self, short_url: str) -> str:
         """
@@ -354,19 +361,19 @@ class DouYinClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
             重定向后的完整URL
         """
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=False) as client:
-            try:
-                utils.logger.info(f"[DouYinClient.resolve_short_url] Resolving short URL: {short_url}")
-                response = await client.get(short_url, timeout=10)
-
-                # 短链接通常返回302重定向
-                if response.status_code in [301, 302, 303, 307, 308]:
-                    redirect_url = response.headers.get("Location", "")
-                    utils.logger.info(f"[DouYinClient.resolve_short_url] Resolved to: {redirect_url}")
-                    return redirect_url
-                else:
-                    utils.logger.warning(f"[DouYinClient.resolve_short_url] Unexpected status code: {response.status_code}")
-                    return ""
-            except Exception as e:
-                utils.logger.error(f"[DouYinClient.resolve_short_url] Failed to resolve short URL: {e}")
+        client = self.get_http_client()
+        try:
+            utils.logger.info(f"[DouYinClient.resolve_short_url] Resolving short URL: {short_url}")
+            response = await client.get(short_url, timeout=10, follow_redirects=False)
+
+            # 短链接通常返回302重定向
+            if response.status_code in [301, 302, 303, 307, 308]:
+                redirect_url = response.headers.get("Location", "")
+                utils.logger.info(f"[DouYinClient.resolve_short_url] Resolved to: {redirect_url}")
+                return redirect_url
+            else:
+                utils.logger.warning(f"[DouYinClient.resolve_short_url] Unexpected status code: {response.status_code}")
                 return ""
+        except Exception as e:
+            utils.logger.error(f"[DouYinClient.resolve_short_url] Failed to resolve short URL: {e}")
+            return ""
@@ -19,7 +19,6 @@
 
 import asyncio
 import os
-import random
 from asyncio import Task
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -35,8 +34,12 @@ import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import douyin as douyin_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
+from tools.async_pipeline import AsyncPipeline
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import concurrency_slot, get_crawl_interval
 from var import crawler_type_var, source_keyword_var
 
 from .client import DouYinClient
@@ -102,6 +105,7 @@ class DouYinCrawler(AbstractCrawler):
                 await login_obj.begin()
                 await self.dy_client.update_cookies(browser_context=self.browser_context)
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("douyin", douyin_store.DouyinStoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
                 await self.search()
@@ -112,10 +116,37 @@ class DouYinCrawler(AbstractCrawler):
                 # Get the information and comments of the specified creator
                 await self.get_creators_and_videos()
 
+            await StoreManager.flush_all()
             utils.logger.info("[DouYinCrawler.start] Douyin Crawler finished ...")
 
     async def search(self) -> None:
+        """
+        搜索 -> 存储 -> 媒体/评论 分阶段流水线执行，下一页搜索与上一页的评论爬取同时进行，
+        但所有调用平台 API 的阶段共用一个 MAX_CONCURRENCY_NUM 并发名额
+        """
         utils.logger.info("[DouYinCrawler.search] Begin search douyin keywords")
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        pipeline = AsyncPipeline("dy.search", queue_size=config.PIPELINE_QUEUE_SIZE)
+
+        async def store_aweme(item: Tuple[str, Dict]):
+            keyword, aweme_info = item
+            source_keyword_var.set(keyword)
+            await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
+            if config.ENABLE_GET_MEIDAS:
+                await pipeline.put("media", aweme_info)
+            if config.ENABLE_GET_COMMENTS:
+                await pipeline.put("comments", aweme_info.get("aweme_id", ""))
+
+        async def fetch_comments(aweme_id: str):
+            await self.batch_get_note_comments([aweme_id], semaphore=semaphore)
+
+        pipeline.add_stage("store", store_aweme, workers=config.PIPELINE_STORE_WORKERS)
+        pipeline.add_stage("media", self.get_aweme_media, workers=config.PIPELINE_MEDIA_WORKERS)
+        pipeline.add_stage("comments", fetch_comments, workers=config.PIPELINE_COMMENT_WORKERS)
+        await pipeline.run(self.search_awemes_producer(pipeline, semaphore))
+
+    async def search_awemes_producer(self, pipeline: AsyncPipeline, semaphore: asyncio.Semaphore) -> None:
+        """Search stage: page through keywords and feed awemes into the store stage"""
         dy_limit_count = 10  # douyin limit page fixed value
         if config.CRAWLER_MAX_NOTES_COUNT < dy_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = dy_limit_count
@@ -123,7 +154,6 @@ class DouYinCrawler(AbstractCrawler):
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
             utils.logger.info(f"[DouYinCrawler.search] Current keyword: {keyword}")
-            aweme_list: List[str] = []
             page = 0
             dy_search_id = ""
             while (page - start_page + 1) * dy_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
@@ -133,12 +163,14 @@ class DouYinCrawler(AbstractCrawler):
                     continue
                 try:
                     utils.logger.info(f"[DouYinCrawler.search] search douyin keyword: {keyword}, page: {page}")
-                    posts_res = await self.dy_client.search_info_by_keyword(
-                        keyword=keyword,
-                        offset=page * dy_limit_count - dy_limit_count,
-                        publish_time=PublishTimeType(config.PUBLISH_TIME_TYPE),
-                        search_id=dy_search_id,
-                    )
+                    # 只在调用搜索接口时占用并发名额，往下游队列投递时不占用，避免队列满时卡住其它阶段
+                    async with concurrency_slot(semaphore):
+                        posts_res = await self.dy_client.search_info_by_keyword(
+                            keyword=keyword,
+                            offset=page * dy_limit_count - dy_limit_count,
+                            publish_time=PublishTimeType(config.PUBLISH_TIME_TYPE),
+                            search_id=dy_search_id,
+                        )
                     if posts_res.get("data") is None or posts_res.get("data") == []:
                         utils.logger.info(f"[DouYinCrawler.search] search douyin keyword: {keyword}, page: {page} is empty,{posts_res.get('data')}`")
                         break
@@ -156,14 +188,10 @@ class DouYinCrawler(AbstractCrawler):
                         aweme_info: Dict = (post_item.get("aweme_info") or post_item.get("aweme_mix_info", {}).get("mix_items")[0])
                     except TypeError:
                         continue
-                    aweme_list.append(aweme_info.get("aweme_id", ""))
-                    await douyin_store.update_douyin_aweme(aweme_item=aweme_info)
-                    await self.get_aweme_media(aweme_item=aweme_info)
+                    await pipeline.put("store", (keyword, aweme_info))
                 # Sleep after each page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[DouYinCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
-            utils.logger.info(f"[DouYinCrawler.search] keyword:{keyword}, aweme_list:{aweme_list}")
-            await self.batch_get_note_comments(aweme_list)
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[DouYinCrawler.search] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
 
     async def get_specified_awemes(self):
         """Get the information and comments of the specified post from URLs or IDs"""
@@ -202,12 +230,13 @@ class DouYinCrawler(AbstractCrawler):
 
     async def get_aweme_detail(self, aweme_id: str, semaphore: asyncio.Semaphore) -> Any:
         """Get note detail"""
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 result = await self.dy_client.get_video_by_id(aweme_id)
+                SeenIndex.get_instance("dy").mark_content(aweme_id)
                 # Sleep after fetching aweme detail
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[DouYinCrawler.get_aweme_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching aweme {aweme_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[DouYinCrawler.get_aweme_detail] Sleeping for {get_crawl_interval()} seconds after fetching aweme {aweme_id}")
                 return result
             except DataFetchError as ex:
                 utils.logger.error(f"[DouYinCrawler.get_aweme_detail] Get aweme detail error: {ex}")
@@ -216,28 +245,29 @@ class DouYinCrawler(AbstractCrawler):
                 utils.logger.error(f"[DouYinCrawler.get_aweme_detail] have not fund note detail aweme_id:{aweme_id}, err: {ex}")
                 return None
 
-    async def batch_get_note_comments(self, aweme_list: List[str]) -> None:
+    async def batch_get_note_comments(self, aweme_list: List[str], semaphore: Optional[asyncio.Semaphore] = None) -> None:
         """
         Batch get note comments
+        semaphore: 共用的并发名额，默认新建一个 MAX_CONCURRENCY_NUM 的
         """
         if not config.ENABLE_GET_COMMENTS:
             utils.logger.info(f"[DouYinCrawler.batch_get_note_comments] Crawling comment mode is not enabled")
             return
 
         task_list: List[Task] = []
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-        for aweme_id in aweme_list:
+        semaphore = semaphore or asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        for aweme_id in SeenIndex.get_instance("dy").filter_comments(aweme_list):
             task = asyncio.create_task(self.get_comments(aweme_id, semaphore), name=aweme_id)
             task_list.append(task)
         if len(task_list) > 0:
             await asyncio.wait(task_list)
 
     async def get_comments(self, aweme_id: str, semaphore: asyncio.Semaphore) -> None:
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 # 将关键词列表传递给 get_aweme_all_comments 方法
                 # Use fixed crawling interval
-                crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
+                crawl_interval = get_crawl_interval()
                 await self.dy_client.get_aweme_all_comments(
                     aweme_id=aweme_id,
                     crawl_interval=crawl_interval,
@@ -245,6 +275,7 @@ class DouYinCrawler(AbstractCrawler):
                     callback=douyin_store.batch_update_dy_aweme_comments,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
                 )
+                SeenIndex.get_instance("dy").mark_comments(aweme_id)
                 # Sleep after fetching comments
                 await asyncio.sleep(crawl_interval)
                 utils.logger.info(f"[DouYinCrawler.get_comments] Sleeping for {crawl_interval} seconds after fetching comments for aweme {aweme_id}")
@@ -283,6 +314,7 @@ class DouYinCrawler(AbstractCrawler):
         Concurrently obtain the specified post list and save the data
         """
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        video_list = SeenIndex.get_instance("dy").filter_contents(video_list, lambda x: x.get("aweme_id"))
         task_list = [self.get_aweme_detail(post_item.get("aweme_id"), semaphore) for post_item in video_list]
 
         note_details = await asyncio.gather(*task_list)
@@ -373,6 +405,7 @@ class DouYinCrawler(AbstractCrawler):
 
     async def close(self) -> None:
         """Close browser context"""
+        await StoreManager.close_all()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -420,13 +453,10 @@ class DouYinCrawler(AbstractCrawler):
         for url in note_download_url:
             if not url:
                 continue
-            content = await self.dy_client.get_aweme_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
             extension_file_name = f"{picNum:>03d}.jpeg"
             picNum += 1
-            await douyin_store.update_dy_aweme_image(aweme_id, content, extension_file_name)
+            # 只提交下载任务，图片由 MediaDownloader 在后台下载，不阻塞爬取流程
+            await douyin_store.download_dy_aweme_media(aweme_id, url, extension_file_name, proxy=self.dy_client.proxy)
 
     async def get_aweme_video(self, aweme_item: Dict):
         """
@@ -444,9 +474,5 @@ class DouYinCrawler(AbstractCrawler):
 
         if not video_download_url:
             return
-        content = await self.dy_client.get_aweme_media(video_download_url)
-        await asyncio.sleep(random.random())
-        if content is None:
-            return
         extension_file_name = f"video.mp4"
-        await douyin_store.update_dy_aweme_video(aweme_id, content, extension_file_name)
+        await douyin_store.download_dy_aweme_media(aweme_id, video_download_url, extension_file_name, proxy=self.dy_client.proxy)
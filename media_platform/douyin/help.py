@@ -33,6 +33,7 @@ from playwright.async_api import Page
 
 from model.m_douyin import VideoUrlInfo, CreatorUrlInfo
 from tools.crawler_util import extract_url_params_to_dict
+from tools.js_sign_engine import JsSignEngine
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 js_path = os.path.abspath(os.path.join(BASE_DIR, "..", "..", "libs", "douyin.js"))
@@ -65,12 +66,23 @@ def get_web_id():
 async def get_a_bogus(url: str, params: str, post_data: dict, user_agent: str, page: Page = None):
     """
     获取 a_bogus 参数, 目前不支持post请求类型的签名
+    签名在常驻的 JS 进程池中计算，不阻塞事件循环
     """
-    return get_a_bogus_from_js(url, params, user_agent)
+    return await JsSignEngine.get_instance(js_path).sign(get_sign_js_name(url), params, user_agent)
+
+
+def get_sign_js_name(url: str) -> str:
+    """
+    根据接口地址选择 douyin.js 中的签名函数
+    """
+    if "/reply" in url:
+        return "sign_reply"
+    return "sign_datail"
+
 
 def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     """
-    通过js获取 a_bogus 参数
+    通过js获取 a_bogus 参数（同步 execjs 调用，每次调用都会阻塞当前线程）
     Args:
         url:
         params:
@@ -79,10 +91,7 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     Returns:
 
     """
-    sign_js_name = "sign_datail"
-    if "/reply" in url:
-        sign_js_name = "sign_reply"
-    return douyin_sign_obj.call(sign_js_name, params, user_agent)
+    return douyin_sign_obj.call(get_sign_js_name(url), params, user_agent)
 
 
 
@@ -31,6 +31,8 @@ import config
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.response_cache import cache_response
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
@@ -59,13 +61,16 @@ class KuaiShouClient(AbstractApiClient, ProxyRefreshMixin):
         self.graphql = KuaiShouGraphQL()
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
+        # 平台级令牌桶限速，取令牌时不占用并发名额
+        self.rate_limiter = RateLimiter.get_instance("ks")
 
     async def request(self, method, url, **kwargs) -> Any:
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
+        self.rate_limiter.observe(response.status_code)
         data: Dict = response.json()
         if data.get("errors"):
             raise DataFetchError(data.get("errors", "unkonw error"))
@@ -135,6 +140,7 @@ class KuaiShouClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.post("", post_data)
 
+    @cache_response("ks")
     async def get_video_info(self, photo_id: str) -> Dict:
         """
         Kuaishou web video detail api
@@ -282,6 +288,7 @@ class KuaiShouClient(AbstractApiClient, ProxyRefreshMixin):
                 result.extend(comments)
         return result
 
+    @cache_response("ks")
     async def get_creator_info(self, user_id: str) -> Dict:
         """
         eg: https://www.kuaishou.com/profile/3x4jtnbfter525a
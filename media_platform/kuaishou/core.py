@@ -38,8 +38,12 @@ from base.base_crawler import AbstractCrawler
 from model.m_kuaishou import VideoUrlInfo, CreatorUrlInfo
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import kuaishou as kuaishou_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
+from tools.async_pipeline import AsyncPipeline
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import concurrency_slot, get_crawl_interval
 from var import comment_tasks_var, crawler_type_var, source_keyword_var
 
 from .client import KuaiShouClient
@@ -111,6 +115,7 @@ class KuaishouCrawler(AbstractCrawler):
                 )
 
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("kuaishou", kuaishou_store.KuaishouStoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 # Search for videos and retrieve their comment information.
                 await self.search()
@@ -123,10 +128,34 @@ class KuaishouCrawler(AbstractCrawler):
             else:
                 pass
 
+            await StoreManager.flush_all()
             utils.logger.info("[KuaishouCrawler.start] Kuaishou Crawler finished ...")
 
     async def search(self):
+        """
+        搜索 -> 存储 -> 评论 分阶段流水线执行，下一页搜索与上一页的评论爬取同时进行，
+        但所有调用平台 API 的阶段共用一个 MAX_CONCURRENCY_NUM 并发名额
+        """
         utils.logger.info("[KuaishouCrawler.search] Begin search kuaishou keywords")
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        pipeline = AsyncPipeline("ks.search", queue_size=config.PIPELINE_QUEUE_SIZE)
+
+        async def store_video(item: Tuple[str, Dict]):
+            keyword, video_detail = item
+            source_keyword_var.set(keyword)
+            await kuaishou_store.update_kuaishou_video(video_item=video_detail)
+            if config.ENABLE_GET_COMMENTS:
+                await pipeline.put("comments", video_detail.get("photo", {}).get("id"))
+
+        async def fetch_comments(video_id: str):
+            await self.batch_get_video_comments([video_id], semaphore=semaphore)
+
+        pipeline.add_stage("store", store_video, workers=config.PIPELINE_STORE_WORKERS)
+        pipeline.add_stage("comments", fetch_comments, workers=config.PIPELINE_COMMENT_WORKERS)
+        await pipeline.run(self.search_videos_producer(pipeline, semaphore))
+
+    async def search_videos_producer(self, pipeline: AsyncPipeline, semaphore: asyncio.Semaphore):
+        """Search stage: page through keywords and feed videos into the store stage"""
         ks_limit_count = 20  # kuaishou limit page fixed value
         if config.CRAWLER_MAX_NOTES_COUNT < ks_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = ks_limit_count
@@ -148,12 +177,13 @@ class KuaishouCrawler(AbstractCrawler):
                 utils.logger.info(
                     f"[KuaishouCrawler.search] search kuaishou keyword: {keyword}, page: {page}"
                 )
-                video_id_list: List[str] = []
-                videos_res = await self.ks_client.search_info_by_keyword(
-                    keyword=keyword,
-                    pcursor=str(page),
-                    search_session_id=search_session_id,
-                )
+                # 只在调用搜索接口时占用并发名额，往下游队列投递时不占用，避免队列满时卡住其它阶段
+                async with concurrency_slot(semaphore):
+                    videos_res = await self.ks_client.search_info_by_keyword(
+                        keyword=keyword,
+                        pcursor=str(page),
+                        search_session_id=search_session_id,
+                    )
                 if not videos_res:
                     utils.logger.error(
                         f"[KuaishouCrawler.search] search info by keyword:{keyword} not found data"
@@ -168,17 +198,13 @@ class KuaishouCrawler(AbstractCrawler):
                     continue
                 search_session_id = vision_search_photo.get("searchSessionId", "")
                 for video_detail in vision_search_photo.get("feeds"):
-                    video_id_list.append(video_detail.get("photo", {}).get("id"))
-                    await kuaishou_store.update_kuaishou_video(video_item=video_detail)
+                    await pipeline.put("store", (keyword, video_detail))
 
-                # batch fetch video comments
                 page += 1
 
                 # Sleep after page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[KuaishouCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
-
-                await self.batch_get_video_comments(video_id_list)
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[KuaishouCrawler.search] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
 
     async def get_specified_videos(self):
         """Get the information and comments of the specified post"""
@@ -208,13 +234,14 @@ class KuaishouCrawler(AbstractCrawler):
         self, video_id: str, semaphore: asyncio.Semaphore
     ) -> Optional[Dict]:
         """Get video detail task"""
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 result = await self.ks_client.get_video_info(video_id)
+                SeenIndex.get_instance("ks").mark_content(video_id)
 
                 # Sleep after fetching video details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[KuaishouCrawler.get_video_info_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video details {video_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[KuaishouCrawler.get_video_info_task] Sleeping for {get_crawl_interval()} seconds after fetching video details {video_id}")
 
                 utils.logger.info(
                     f"[KuaishouCrawler.get_video_info_task] Get video_id:{video_id} info result: {result} ..."
@@ -231,10 +258,11 @@ class KuaishouCrawler(AbstractCrawler):
                 )
                 return None
 
-    async def batch_get_video_comments(self, video_id_list: List[str]):
+    async def batch_get_video_comments(self, video_id_list: List[str], semaphore: Optional[asyncio.Semaphore] = None):
         """
         batch get video comments
         :param video_id_list:
+        :param semaphore: 共用的并发名额，默认新建一个 MAX_CONCURRENCY_NUM 的
         :return:
         """
         if not config.ENABLE_GET_COMMENTS:
@@ -246,9 +274,9 @@ class KuaishouCrawler(AbstractCrawler):
         utils.logger.info(
             f"[KuaishouCrawler.batch_get_video_comments] video ids:{video_id_list}"
         )
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = semaphore or asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
-        for video_id in video_id_list:
+        for video_id in SeenIndex.get_instance("ks").filter_comments(video_id_list):
             task = asyncio.create_task(
                 self.get_comments(video_id, semaphore), name=video_id
             )
@@ -264,22 +292,23 @@ class KuaishouCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 utils.logger.info(
                     f"[KuaishouCrawler.get_comments] begin get video_id: {video_id} comments ..."
                 )
 
                 # Sleep before fetching comments
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[KuaishouCrawler.get_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for video {video_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[KuaishouCrawler.get_comments] Sleeping for {get_crawl_interval()} seconds before fetching comments for video {video_id}")
 
                 await self.ks_client.get_video_all_comments(
                     photo_id=video_id,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                    crawl_interval=get_crawl_interval(),
                     callback=kuaishou_store.batch_update_ks_video_comments,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
                 )
+                SeenIndex.get_instance("ks").mark_comments(video_id)
             except DataFetchError as ex:
                 utils.logger.error(
                     f"[KuaishouCrawler.get_comments] get video_id: {video_id} comment error: {ex}"
@@ -412,7 +441,7 @@ class KuaishouCrawler(AbstractCrawler):
             # Get all video information of the creator
             all_video_list = await self.ks_client.get_all_videos_by_creator(
                 user_id=user_id,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                crawl_interval=get_crawl_interval(),
                 callback=self.fetch_creator_video_detail,
             )
 
@@ -428,7 +457,9 @@ class KuaishouCrawler(AbstractCrawler):
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list = [
             self.get_video_info_task(post_item.get("photo", {}).get("id"), semaphore)
-            for post_item in video_list
+            for post_item in SeenIndex.get_instance("ks").filter_contents(
+                video_list, lambda x: x.get("photo", {}).get("id")
+            )
         ]
 
         video_details = await asyncio.gather(*task_list)
@@ -438,6 +469,7 @@ class KuaishouCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        await StoreManager.close_all()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -169,6 +169,8 @@ class BaiduTieBaClient(AbstractApiClient):
             return res
         except RetryError as e:
             if self.ip_pool:
+                # 当前代理多次请求失败，降权后换一个评分最高的代理
+                self.ip_pool.mark_blocked()
                 proxie_model = await self.ip_pool.get_proxy()
                 _, proxy = utils.format_proxy_info(proxie_model)
                 res = await self.request(method="GET", url=f"{self._host}{final_uri}", return_ori_content=return_ori_content, proxy=proxy, **kwargs)
@@ -36,6 +36,8 @@ from base.base_crawler import AbstractCrawler
 from model.m_baidu_tieba import TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import IpInfoModel, ProxyIpPool, create_ip_pool
 from store import tieba as tieba_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
 from var import crawler_type_var, source_keyword_var
@@ -126,6 +128,7 @@ class TieBaCrawler(AbstractCrawler):
                 await self.tieba_client.update_cookies(browser_context=self.browser_context)
 
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("tieba", tieba_store.TieBaStoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
                 await self.search()
@@ -139,6 +142,7 @@ class TieBaCrawler(AbstractCrawler):
             else:
                 pass
 
+            await StoreManager.flush_all()
             utils.logger.info("[BaiduTieBaCrawler.start] Tieba Crawler finished ...")
 
     async def search(self) -> None:
@@ -318,7 +322,7 @@ class TieBaCrawler(AbstractCrawler):
 
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
-        for note_detail in note_detail_list:
+        for note_detail in SeenIndex.get_instance("tieba").filter_comments(note_detail_list, lambda x: x.note_id):
             task = asyncio.create_task(
                 self.get_comments_async_task(note_detail, semaphore),
                 name=note_detail.note_id,
@@ -353,6 +357,7 @@ class TieBaCrawler(AbstractCrawler):
                 callback=tieba_store.batch_update_tieba_note_comments,
                 max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
             )
+            SeenIndex.get_instance("tieba").mark_comments(note_detail.note_id)
 
     async def get_creators_and_notes(self) -> None:
         """
@@ -672,6 +677,7 @@ class TieBaCrawler(AbstractCrawler):
         Returns:
 
         """
+        await StoreManager.close_all()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
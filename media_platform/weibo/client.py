@@ -37,6 +37,8 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 import config
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.response_cache import cache_response
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
@@ -66,6 +68,8 @@ class WeiboClient(ProxyRefreshMixin):
         self._image_agent_host = "https://i1.wp.com/"
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
+        # 平台级令牌桶限速，取令牌时不占用并发名额
+        self.rate_limiter = RateLimiter.get_instance("weibo")
 
     @retry(stop=stop_after_attempt(5), wait=wait_fixed(3))
     async def request(self, method, url, **kwargs) -> Union[Response, Dict]:
@@ -73,8 +77,9 @@ class WeiboClient(ProxyRefreshMixin):
         await self._refresh_proxy_if_expired()
 
         enable_return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
+        self.rate_limiter.observe(response.status_code)
 
         if enable_return_response:
             return response
@@ -254,6 +259,7 @@ class WeiboClient(ProxyRefreshMixin):
                 res_sub_comments.extend(sub_comments)
         return res_sub_comments
 
+    @cache_response("weibo")
     async def get_note_info_by_id(self, note_id: str) -> Dict:
         """
         根据帖子ID获取详情
@@ -261,22 +267,26 @@ class WeiboClient(ProxyRefreshMixin):
         :return:
         """
         url = f"{self._host}/detail/{note_id}"
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-            if response.status_code != 200:
-                raise DataFetchError(f"get weibo detail err: {response.text}")
-            match = re.search(r'var \$render_data = (\[.*?\])\[0\]', response.text, re.DOTALL)
-            if match:
-                render_data_json = match.group(1)
-                render_data_dict = json.loads(render_data_json)
-                note_detail = render_data_dict[0].get("status")
-                note_item = {"mblog": note_detail}
-                return note_item
-            else:
-                utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
-                return dict()
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request("GET", url, timeout=self.timeout, headers=self.headers)
+        self.rate_limiter.observe(response.status_code)
+        if response.status_code != 200:
+            raise DataFetchError(f"get weibo detail err: {response.text}")
+        match = re.search(r'var \$render_data = (\[.*?\])\[0\]', response.text, re.DOTALL)
+        if match:
+            render_data_json = match.group(1)
+            render_data_dict = json.loads(render_data_json)
+            note_detail = render_data_dict[0].get("status")
+            note_item = {"mblog": note_detail}
+            return note_item
+        else:
+            utils.logger.info(f"[WeiboClient.get_note_info_by_id] 未找到$render_data的值")
+            return dict()
 
-    async def get_note_image(self, image_url: str) -> bytes:
+    def get_note_image_url(self, image_url: str) -> str:
+        """
+        把微博图片地址改写为经图床代理访问的高清大图地址
+        """
         image_url = image_url[8:]  # 去掉 https://
         sub_url = image_url.split("/")
         image_url = ""
@@ -289,20 +299,23 @@ class WeiboClient(ProxyRefreshMixin):
                 image_url += sub_url[i] + "/"
         # 微博图床对外存在防盗链，所以需要代理访问
         # 由于微博图片是通过 i1.wp.com 来访问的，所以需要拼接一下
-        final_uri = (f"{self._image_agent_host}"
-                     f"{image_url}")
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", final_uri, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
-                    return None
-                else:
-                    return response.content
-            except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
-                utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")    # 保留原始异常类型名称，以便开发者调试
+        return (f"{self._image_agent_host}"
+                f"{image_url}")
+
+    async def get_note_image(self, image_url: str) -> bytes:
+        final_uri = self.get_note_image_url(image_url)
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", final_uri, timeout=self.timeout)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
+                utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
                 return None
+            else:
+                return response.content
+        except httpx.HTTPError as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(f"[DouYinClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}")    # 保留原始异常类型名称，以便开发者调试
+            return None
 
     async def get_creator_container_info(self, creator_id: str) -> Dict:
         """
@@ -322,6 +335,7 @@ class WeiboClient(ProxyRefreshMixin):
         m_weibocn_params_dict = parse_qs(unquote(m_weibocn_params))
         return {"fid_container_id": m_weibocn_params_dict.get("fid", [""])[0], "lfid_container_id": m_weibocn_params_dict.get("lfid", [""])[0]}
 
+    @cache_response("weibo")
     async def get_creator_info_by_id(self, creator_id: str) -> Dict:
         """
         根据用户ID获取用户详情
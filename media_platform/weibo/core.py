@@ -40,8 +40,12 @@ import config
 from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import weibo as weibo_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
+from tools.async_pipeline import AsyncPipeline
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import concurrency_slot, get_crawl_interval
 from var import crawler_type_var, source_keyword_var
 
 from .client import WeiboClient
@@ -120,6 +124,7 @@ class WeiboCrawler(AbstractCrawler):
                 )
 
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("weibo", weibo_store.WeibostoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 # Search for video and retrieve their comment information.
                 await self.search()
@@ -131,18 +136,17 @@ class WeiboCrawler(AbstractCrawler):
                 await self.get_creators_and_notes()
             else:
                 pass
+            await StoreManager.flush_all()
             utils.logger.info("[WeiboCrawler.start] Weibo Crawler finished ...")
 
     async def search(self):
         """
         search weibo note with keywords
+        搜索 -> 存储 -> 图片/评论 分阶段流水线执行，下一页搜索与上一页的评论爬取同时进行，
+        但所有调用平台 API 的阶段共用一个 MAX_CONCURRENCY_NUM 并发名额
         :return:
         """
         utils.logger.info("[WeiboCrawler.search] Begin search weibo keywords")
-        weibo_limit_count = 10  # weibo limit page fixed value
-        if config.CRAWLER_MAX_NOTES_COUNT < weibo_limit_count:
-            config.CRAWLER_MAX_NOTES_COUNT = weibo_limit_count
-        start_page = config.START_PAGE
 
         # Set the search type based on the configuration for weibo
         if config.WEIBO_SEARCH_TYPE == "default":
@@ -157,6 +161,33 @@ class WeiboCrawler(AbstractCrawler):
             utils.logger.error(f"[WeiboCrawler.search] Invalid WEIBO_SEARCH_TYPE: {config.WEIBO_SEARCH_TYPE}")
             return
 
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        pipeline = AsyncPipeline("wb.search", queue_size=config.PIPELINE_QUEUE_SIZE)
+
+        async def store_note(item: Tuple[str, Dict]):
+            keyword, note_item = item
+            source_keyword_var.set(keyword)
+            mblog: Dict = note_item.get("mblog")
+            await weibo_store.update_weibo_note(note_item)
+            if config.ENABLE_GET_MEIDAS:
+                await pipeline.put("media", mblog)
+            if config.ENABLE_GET_COMMENTS:
+                await pipeline.put("comments", mblog.get("id"))
+
+        async def fetch_comments(note_id: str):
+            await self.batch_get_notes_comments([note_id], semaphore=semaphore)
+
+        pipeline.add_stage("store", store_note, workers=config.PIPELINE_STORE_WORKERS)
+        pipeline.add_stage("media", self.get_note_images, workers=config.PIPELINE_MEDIA_WORKERS)
+        pipeline.add_stage("comments", fetch_comments, workers=config.PIPELINE_COMMENT_WORKERS)
+        await pipeline.run(self.search_notes_producer(pipeline, search_type, semaphore))
+
+    async def search_notes_producer(self, pipeline: AsyncPipeline, search_type: SearchType, semaphore: asyncio.Semaphore):
+        """Search stage: page through keywords and feed notes into the store stage"""
+        weibo_limit_count = 10  # weibo limit page fixed value
+        if config.CRAWLER_MAX_NOTES_COUNT < weibo_limit_count:
+            config.CRAWLER_MAX_NOTES_COUNT = weibo_limit_count
+        start_page = config.START_PAGE
         for keyword in config.KEYWORDS.split(","):
             source_keyword_var.set(keyword)
             utils.logger.info(f"[WeiboCrawler.search] Current search keyword: {keyword}")
@@ -167,24 +198,19 @@ class WeiboCrawler(AbstractCrawler):
                     page += 1
                     continue
                 utils.logger.info(f"[WeiboCrawler.search] search weibo keyword: {keyword}, page: {page}")
-                search_res = await self.wb_client.get_note_by_keyword(keyword=keyword, page=page, search_type=search_type)
-                note_id_list: List[str] = []
+                # 只在调用搜索接口时占用并发名额，往下游队列投递时不占用，避免队列满时卡住其它阶段
+                async with concurrency_slot(semaphore):
+                    search_res = await self.wb_client.get_note_by_keyword(keyword=keyword, page=page, search_type=search_type)
                 note_list = filter_search_result_card(search_res.get("cards"))
                 for note_item in note_list:
-                    if note_item:
-                        mblog: Dict = note_item.get("mblog")
-                        if mblog:
-                            note_id_list.append(mblog.get("id"))
-                            await weibo_store.update_weibo_note(note_item)
-                            await self.get_note_images(mblog)
+                    if note_item and note_item.get("mblog"):
+                        await pipeline.put("store", (keyword, note_item))
 
                 page += 1
 
                 # Sleep after page navigation
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[WeiboCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
-
-                await self.batch_get_notes_comments(note_id_list)
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[WeiboCrawler.search] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
 
     async def get_specified_notes(self):
         """
@@ -206,13 +232,14 @@ class WeiboCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 result = await self.wb_client.get_note_info_by_id(note_id)
+                SeenIndex.get_instance("wb").mark_content(note_id)
 
                 # Sleep after fetching note details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[WeiboCrawler.get_note_info_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching note details {note_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[WeiboCrawler.get_note_info_task] Sleeping for {get_crawl_interval()} seconds after fetching note details {note_id}")
 
                 return result
             except DataFetchError as ex:
@@ -222,10 +249,11 @@ class WeiboCrawler(AbstractCrawler):
                 utils.logger.error(f"[WeiboCrawler.get_note_info_task] have not fund note detail note_id:{note_id}, err: {ex}")
                 return None
 
-    async def batch_get_notes_comments(self, note_id_list: List[str]):
+    async def batch_get_notes_comments(self, note_id_list: List[str], semaphore: Optional[asyncio.Semaphore] = None):
         """
         batch get notes comments
         :param note_id_list:
+        :param semaphore: 共用的并发名额，默认新建一个 MAX_CONCURRENCY_NUM 的
         :return:
         """
         if not config.ENABLE_GET_COMMENTS:
@@ -233,9 +261,9 @@ class WeiboCrawler(AbstractCrawler):
             return
 
         utils.logger.info(f"[WeiboCrawler.batch_get_notes_comments] note ids:{note_id_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = semaphore or asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
-        for note_id in note_id_list:
+        for note_id in SeenIndex.get_instance("wb").filter_comments(note_id_list):
             task = asyncio.create_task(self.get_note_comments(note_id, semaphore), name=note_id)
             task_list.append(task)
         await asyncio.gather(*task_list)
@@ -247,20 +275,21 @@ class WeiboCrawler(AbstractCrawler):
         :param semaphore:
         :return:
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 utils.logger.info(f"[WeiboCrawler.get_note_comments] begin get note_id: {note_id} comments ...")
 
                 # Sleep before fetching comments
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[WeiboCrawler.get_note_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for note {note_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[WeiboCrawler.get_note_comments] Sleeping for {get_crawl_interval()} seconds before fetching comments for note {note_id}")
 
                 await self.wb_client.get_note_all_comments(
                     note_id=note_id,
-                    crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,  # Use fixed interval instead of random
+                    crawl_interval=get_crawl_interval(),  # Use fixed interval instead of random
                     callback=weibo_store.batch_update_weibo_note_comments,
                     max_count=config.CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
                 )
+                SeenIndex.get_instance("wb").mark_comments(note_id)
             except DataFetchError as ex:
                 utils.logger.error(f"[WeiboCrawler.get_note_comments] get note_id: {note_id} comment error: {ex}")
             except Exception as e:
@@ -283,12 +312,12 @@ class WeiboCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.wb_client.get_note_image(url)
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[WeiboCrawler.get_note_images] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching image")
-            if content != None:
-                extension_file_name = url.split(".")[-1]
-                await weibo_store.update_weibo_note_image(pic["pid"], content, extension_file_name)
+            extension_file_name = url.split(".")[-1]
+            # 只提交下载任务，图片由 MediaDownloader 在后台下载，不阻塞爬取流程
+            await weibo_store.download_weibo_note_image(
+                pic["pid"], self.wb_client.get_note_image_url(url), extension_file_name,
+                proxy=self.wb_client.proxy, note_id=mblog.get("id"),
+            )
 
     async def get_creators_and_notes(self) -> None:
         """
@@ -401,6 +430,7 @@ class WeiboCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        await StoreManager.close_all()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -30,6 +30,8 @@ import config
 from base.base_crawler import AbstractApiClient
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.response_cache import cache_response
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
@@ -38,7 +40,7 @@ from .exception import DataFetchError, IPBlockError
 from .field import SearchNoteType, SearchSortType
 from .help import get_search_id
 from .extractor import XiaoHongShuExtractor
-from .playwright_sign import sign_with_playwright
+from .playwright_sign import XhsSignContext
 
 
 class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
@@ -65,8 +67,12 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
         self._extractor = XiaoHongShuExtractor()
+        # 签名上下文：缓存 b1 并把并发请求的签名合并到一次 evaluate 中
+        self.sign_context = XhsSignContext(playwright_page)
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
+        # 平台级令牌桶限速，取令牌时不占用并发名额
+        self.rate_limiter = RateLimiter.get_instance("xhs")
 
     async def _pre_headers(self, url: str, params: Optional[Dict] = None, payload: Optional[Dict] = None) -> Dict:
         """请求头参数签名（使用 playwright 注入方式）
@@ -92,8 +98,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             raise ValueError("params or payload is required")
 
         # 使用 playwright 注入方式生成签名
-        signs = await sign_with_playwright(
-            page=self.playwright_page,
+        signs = await self.sign_context.sign(
             uri=url,
             data=data,
             a1=a1_value,
@@ -126,8 +131,9 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
 
         # return response.text
         return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
+        self.rate_limiter.observe(response.status_code)
 
         if response.status_code == 471 or response.status_code == 461:
             # someday someone maybe will bypass captcha
@@ -143,6 +149,8 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         if data["success"]:
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
+            self.rate_limiter.on_blocked()
+            self._mark_proxy_blocked()
             raise IPBlockError(self.IP_ERROR_STR)
         else:
             err_msg = data.get("msg", None) or f"{response.text}"
@@ -189,24 +197,24 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         # 请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(
-                        f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
-                    )
-                    return None
-                else:
-                    return response.content
-            except (
-                httpx.HTTPError
-            ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+        client = self.get_http_client()
+        try:
+            response = await client.request("GET", url, timeout=self.timeout)
+            response.raise_for_status()
+            if not response.reason_phrase == "OK":
                 utils.logger.error(
-                    f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
-                )  # 保留原始异常类型名称，以便开发者调试
+                    f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
+                )
                 return None
+            else:
+                return response.content
+        except (
+            httpx.HTTPError
+        ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(
+                f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
+            )  # 保留原始异常类型名称，以便开发者调试
+            return None
 
     async def pong(self) -> bool:
         """
@@ -240,6 +248,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         cookie_str, cookie_dict = utils.convert_cookies(await browser_context.cookies())
         self.headers["Cookie"] = cookie_str
         self.cookie_dict = cookie_dict
+        self.sign_context.invalidate_b1()
 
     async def get_note_by_keyword(
         self,
@@ -273,6 +282,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         }
         return await self.post(uri, data)
 
+    @cache_response("xhs", key_params=("note_id",))
     async def get_note_by_id(
         self,
         note_id: str,
@@ -483,6 +493,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
                 result.extend(comments)
         return result
 
+    @cache_response("xhs", key_params=("user_id",))
     async def get_creator_info(
         self, user_id: str, xsec_token: str = "", xsec_source: str = ""
     ) -> Dict:
@@ -19,9 +19,8 @@
 
 import asyncio
 import os
-import random
 from asyncio import Task
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from playwright.async_api import (
     BrowserContext,
@@ -38,8 +37,12 @@ from config import CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES
 from model.m_xiaohongshu import NoteUrlInfo, CreatorUrlInfo
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import xhs as xhs_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
+from tools.async_pipeline import AsyncPipeline
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import concurrency_slot, get_crawl_interval
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
@@ -109,6 +112,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 await self.xhs_client.update_cookies(browser_context=self.browser_context)
 
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("xhs", xhs_store.XhsStoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
                 await self.search()
@@ -121,11 +125,55 @@ class XiaoHongShuCrawler(AbstractCrawler):
             else:
                 pass
 
+            await StoreManager.flush_all()
+            utils.logger.info(f"[XiaoHongShuCrawler.start] Sign metrics: {self.xhs_client.sign_context.get_metrics()}")
+            utils.logger.info(f"[XiaoHongShuCrawler.start] Seen index metrics: {SeenIndex.get_instance('xhs').get_metrics()}")
+            utils.logger.info(f"[XiaoHongShuCrawler.start] Rate limiter metrics: {self.xhs_client.rate_limiter.get_metrics()}")
             utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
 
     async def search(self) -> None:
-        """Search for notes and retrieve their comment information."""
+        """Search for notes and retrieve their comment information.
+
+        搜索 -> 详情 -> 存储 -> 媒体/评论 分阶段流水线执行，下一页的搜索、详情与上一页的评论爬取同时进行，
+        但所有调用平台 API 的阶段共用一个 MAX_CONCURRENCY_NUM 并发名额
+        """
         utils.logger.info("[XiaoHongShuCrawler.search] Begin search xiaohongshu keywords")
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        pipeline = AsyncPipeline("xhs.search", queue_size=config.PIPELINE_QUEUE_SIZE)
+
+        async def fetch_detail(item: Tuple[str, Dict]):
+            keyword, post_item = item
+            note_detail = await self.get_note_detail_async_task(
+                note_id=post_item.get("id"),
+                xsec_source=post_item.get("xsec_source"),
+                xsec_token=post_item.get("xsec_token"),
+                semaphore=semaphore,
+            )
+            if note_detail:
+                await pipeline.put("store", (keyword, note_detail))
+
+        async def store_note(item: Tuple[str, Dict]):
+            keyword, note_detail = item
+            source_keyword_var.set(keyword)
+            await xhs_store.update_xhs_note(note_detail)
+            if config.ENABLE_GET_MEIDAS:
+                await pipeline.put("media", note_detail)
+            if config.ENABLE_GET_COMMENTS:
+                await pipeline.put("comments", note_detail)
+
+        async def fetch_comments(note_detail: Dict):
+            await self.batch_get_note_comments(
+                [note_detail.get("note_id")], [note_detail.get("xsec_token")], semaphore=semaphore
+            )
+
+        pipeline.add_stage("detail", fetch_detail, workers=config.PIPELINE_DETAIL_WORKERS)
+        pipeline.add_stage("store", store_note, workers=config.PIPELINE_STORE_WORKERS)
+        pipeline.add_stage("media", self.get_notice_media, workers=config.PIPELINE_MEDIA_WORKERS)
+        pipeline.add_stage("comments", fetch_comments, workers=config.PIPELINE_COMMENT_WORKERS)
+        await pipeline.run(self.search_notes_producer(pipeline, semaphore))
+
+    async def search_notes_producer(self, pipeline: AsyncPipeline, semaphore: asyncio.Semaphore) -> None:
+        """Search stage: page through keywords and feed unseen notes into the detail stage"""
         xhs_limit_count = 20  # xhs limit page fixed value
         if config.CRAWLER_MAX_NOTES_COUNT < xhs_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = xhs_limit_count
@@ -143,43 +191,31 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
                 try:
                     utils.logger.info(f"[XiaoHongShuCrawler.search] search xhs keyword: {keyword}, page: {page}")
-                    note_ids: List[str] = []
-                    xsec_tokens: List[str] = []
-                    notes_res = await self.xhs_client.get_note_by_keyword(
-                        keyword=keyword,
-                        search_id=search_id,
-                        page=page,
-                        sort=(SearchSortType(config.SORT_TYPE) if config.SORT_TYPE != "" else SearchSortType.GENERAL),
-                    )
+                    # 只在调用搜索接口时占用并发名额，往下游队列投递时不占用，避免队列满时卡住其它阶段
+                    async with concurrency_slot(semaphore):
+                        notes_res = await self.xhs_client.get_note_by_keyword(
+                            keyword=keyword,
+                            search_id=search_id,
+                            page=page,
+                            sort=(SearchSortType(config.SORT_TYPE) if config.SORT_TYPE != "" else SearchSortType.GENERAL),
+                        )
                     utils.logger.info(f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}")
                     if not notes_res or not notes_res.get("has_more", False):
                         utils.logger.info("No more content!")
                         break
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                    task_list = [
-                        self.get_note_detail_async_task(
-                            note_id=post_item.get("id"),
-                            xsec_source=post_item.get("xsec_source"),
-                            xsec_token=post_item.get("xsec_token"),
-                            semaphore=semaphore,
-                        ) for post_item in notes_res.get("items", {}) if post_item.get("model_type") not in ("rec_query", "hot_query")
+                    post_items = [
+                        post_item for post_item in notes_res.get("items", {})
+                        if post_item.get("model_type") not in ("rec_query", "hot_query")
                     ]
-                    note_details = await asyncio.gather(*task_list)
-                    for note_detail in note_details:
-                        if note_detail:
-                            await xhs_store.update_xhs_note(note_detail)
-                            await self.get_notice_media(note_detail)
-                            note_ids.append(note_detail.get("note_id"))
-                            xsec_tokens.append(note_detail.get("xsec_token"))
+                    for post_item in SeenIndex.get_instance("xhs").filter_contents(post_items, lambda x: x.get("id")):
+                        await pipeline.put("detail", (keyword, post_item))
                     page += 1
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Note details: {note_details}")
-                    await self.batch_get_note_comments(note_ids, xsec_tokens)
 
                     # Sleep after each page navigation
-                    await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                    await asyncio.sleep(get_crawl_interval())
+                    utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
                 except DataFetchError:
-                    utils.logger.error("[XiaoHongShuCrawler.search] Get note detail error")
+                    utils.logger.error("[XiaoHongShuCrawler.search] Search notes error")
                     break
 
     async def get_creators_and_notes(self) -> None:
@@ -205,7 +241,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 continue
 
             # Use fixed crawling interval
-            crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
+            crawl_interval = get_crawl_interval()
             # Get all note information of the creator
             all_notes_list = await self.xhs_client.get_all_notes_by_creator(
                 user_id=user_id,
@@ -233,7 +269,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 xsec_source=post_item.get("xsec_source"),
                 xsec_token=post_item.get("xsec_token"),
                 semaphore=semaphore,
-            ) for post_item in note_list
+            ) for post_item in SeenIndex.get_instance("xhs").filter_contents(note_list, lambda x: x.get("note_id"))
         ]
 
         note_details = await asyncio.gather(*task_list)
@@ -292,7 +328,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         """
         note_detail = None
         utils.logger.info(f"[get_note_detail_async_task] Begin get note detail, note_id: {note_id}")
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             try:
                 try:
                     note_detail = await self.xhs_client.get_note_by_id(note_id, xsec_source, xsec_token)
@@ -306,10 +342,11 @@ class XiaoHongShuCrawler(AbstractCrawler):
                         raise Exception(f"[get_note_detail_async_task] Failed to get note detail, Id: {note_id}")
 
                 note_detail.update({"xsec_token": xsec_token, "xsec_source": xsec_source})
+                SeenIndex.get_instance("xhs").mark_content(note_id)
 
                 # Sleep after fetching note detail
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[get_note_detail_async_task] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching note {note_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[get_note_detail_async_task] Sleeping for {get_crawl_interval()} seconds after fetching note {note_id}")
 
                 return note_detail
 
@@ -320,18 +357,21 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 utils.logger.error(f"[XiaoHongShuCrawler.get_note_detail_async_task] have not fund note detail note_id:{note_id}, err: {ex}")
                 return None
 
-    async def batch_get_note_comments(self, note_list: List[str], xsec_tokens: List[str]):
-        """Batch get note comments"""
+    async def batch_get_note_comments(
+        self, note_list: List[str], xsec_tokens: List[str], semaphore: Optional[asyncio.Semaphore] = None
+    ):
+        """Batch get note comments, semaphore: 共用的并发名额，默认新建一个 MAX_CONCURRENCY_NUM 的"""
         if not config.ENABLE_GET_COMMENTS:
             utils.logger.info(f"[XiaoHongShuCrawler.batch_get_note_comments] Crawling comment mode is not enabled")
             return
 
         utils.logger.info(f"[XiaoHongShuCrawler.batch_get_note_comments] Begin batch get note comments, note list: {note_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = semaphore or asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
-        for index, note_id in enumerate(note_list):
+        note_tokens = SeenIndex.get_instance("xhs").filter_comments(zip(note_list, xsec_tokens), lambda x: x[0])
+        for note_id, xsec_token in note_tokens:
             task = asyncio.create_task(
-                self.get_comments(note_id=note_id, xsec_token=xsec_tokens[index], semaphore=semaphore),
+                self.get_comments(note_id=note_id, xsec_token=xsec_token, semaphore=semaphore),
                 name=note_id,
             )
             task_list.append(task)
@@ -339,10 +379,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
     async def get_comments(self, note_id: str, xsec_token: str, semaphore: asyncio.Semaphore):
         """Get note comments with keyword filtering and quantity limitation"""
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             utils.logger.info(f"[XiaoHongShuCrawler.get_comments] Begin get note id comments {note_id}")
             # Use fixed crawling interval
-            crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
+            crawl_interval = get_crawl_interval()
             await self.xhs_client.get_note_all_comments(
                 note_id=note_id,
                 xsec_token=xsec_token,
@@ -350,6 +390,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 callback=xhs_store.batch_update_xhs_note_comments,
                 max_count=CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES,
             )
+            SeenIndex.get_instance("xhs").mark_comments(note_id)
 
             # Sleep after fetching comments
             await asyncio.sleep(crawl_interval)
@@ -448,6 +489,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        await StoreManager.close_all()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -485,13 +527,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
             extension_file_name = f"{picNum}.jpg"
             picNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+            # 只提交下载任务，图片由 MediaDownloader 在后台下载，不阻塞爬取流程
+            await xhs_store.download_xhs_note_media(note_id, url, extension_file_name, proxy=self.xhs_client.proxy)
 
     async def get_notice_video(self, note_item: Dict):
         """
@@ -507,12 +546,6 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
         if not videos:
             return
-        videoNum = 0
-        for url in videos:
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
+        for videoNum, url in enumerate(videos):
             extension_file_name = f"{videoNum}.mp4"
-            videoNum += 1
-            await xhs_store.update_xhs_note_video(note_id, content, extension_file_name)
+            await xhs_store.download_xhs_note_media(note_id, url, extension_file_name, proxy=self.xhs_client.proxy)
@@ -18,15 +18,19 @@
 
 # 通过 Playwright 注入调用 window.mnsv2 生成小红书签名
 
+import asyncio
 import hashlib
 import json
 import time
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse, quote
 
 from playwright.async_api import Page
 
-from .xhs_sign import b64_encode, encode_utf8, get_trace_id, mrc
+import config
+from tools import utils
+
+from .xhs_sign_fast import b64_encode, encode_utf8, get_trace_id, mrc
 
 
 def _build_sign_string(uri: str, data: Optional[Union[Dict, str]] = None, method: str = "POST") -> str:
@@ -242,3 +246,168 @@ async def pre_headers_with_playwright(
         "x-S-Common": signs["x-s-common"],
         "X-B3-Traceid": signs["x-b3-traceid"],
     }
+
+
+# 一次 evaluate 完成一批签名，按需顺带读取 b1（只读取单个 key，不序列化整个 localStorage）
+_BATCH_SIGN_JS = """
+([items, needB1]) => {
+    const signs = items.map(([signStr, md5Str]) => {
+        try {
+            return window.mnsv2(signStr, md5Str) || "";
+        } catch (e) {
+            return "";
+        }
+    });
+    let b1 = null;
+    if (needB1) {
+        try {
+            b1 = window.localStorage.getItem("b1") || "";
+        } catch (e) {
+            b1 = "";
+        }
+    }
+    return {signs: signs, b1: b1};
+}
+"""
+
+
+class XhsSignContext:
+    """
+    每个 XiaoHongShuClient 持有的签名上下文
+
+    - 缓存 localStorage 中的 b1，cookie 更新或超过 XHS_SIGN_B1_TTL_SEC 后失效
+    - 并发的签名请求合并为一次 page.evaluate，避免每个请求两次 CDP 往返且相互排队
+    - 记录 evaluate 次数、批大小和耗时，便于观察签名开销
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self._b1: Optional[str] = None
+        self._b1_expire_at = 0.0
+        self._b1_a1: Optional[str] = None
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._evaluate_lock = asyncio.Lock()
+        self._metrics = {
+            "sign_count": 0,
+            "evaluate_count": 0,
+            "evaluate_error_count": 0,
+            "b1_refresh_count": 0,
+            "evaluate_total_ms": 0.0,
+            "evaluate_max_ms": 0.0,
+        }
+
+    def invalidate_b1(self):
+        """
+        cookie 或 localStorage 变化后调用，下一批签名时重新读取 b1
+        """
+        self._b1 = None
+        self._b1_expire_at = 0.0
+
+    def _b1_is_valid(self) -> bool:
+        return self._b1 is not None and time.monotonic() < self._b1_expire_at
+
+    async def sign(
+        self,
+        uri: str,
+        data: Optional[Union[Dict, str]] = None,
+        a1: str = "",
+        method: str = "POST",
+    ) -> Dict[str, Any]:
+        """
+        生成完整的签名请求头，返回值与 sign_with_playwright 相同
+
+        Args:
+            uri: API 路径
+            data: 请求数据
+            a1: cookie 中的 a1 值
+            method: 请求方法 (GET 或 POST)
+
+        Returns:
+            包含 x-s, x-t, x-s-common, x-b3-traceid 的字典
+        """
+        if a1 != self._b1_a1:
+            # a1 变化说明 cookie 已更新，b1 需要重新读取
+            self.invalidate_b1()
+            self._b1_a1 = a1
+
+        sign_str = _build_sign_string(uri, data, method)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((sign_str, _md5_hex(sign_str), future))
+        if len(self._pending) >= config.XHS_SIGN_BATCH_MAX_SIZE:
+            self._schedule_flush(delay=0)
+        else:
+            self._schedule_flush(delay=config.XHS_SIGN_BATCH_WINDOW_MS / 1000)
+
+        x3_value = await future
+        data_type = "object" if isinstance(data, (dict, list)) else "string"
+        x_s = _build_xs_payload(x3_value, data_type)
+        x_t = str(int(time.time() * 1000))
+        b1 = self._b1 or ""
+
+        return {
+            "x-s": x_s,
+            "x-t": x_t,
+            "x-s-common": _build_xs_common(a1, b1, x_s, x_t),
+            "x-b3-traceid": get_trace_id(),
+        }
+
+    def _schedule_flush(self, delay: float):
+        if delay > 0 and self._flush_task is not None and not self._flush_task.done():
+            # 已有等待中或执行中的批次，本请求会被合并进去
+            return
+        self._flush_task = asyncio.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self._flush()
+
+    async def _flush(self):
+        # 上一批 evaluate 执行期间进入的请求会在这里合并成下一批
+        async with self._evaluate_lock:
+            while self._pending:
+                batch = self._pending[:config.XHS_SIGN_BATCH_MAX_SIZE]
+                self._pending = self._pending[config.XHS_SIGN_BATCH_MAX_SIZE:]
+                await self._evaluate_batch(batch)
+
+    async def _evaluate_batch(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        need_b1 = not self._b1_is_valid()
+        items = [[sign_str, md5_str] for sign_str, md5_str, _ in batch]
+        signs: List[str] = []
+        start = time.perf_counter()
+        try:
+            result = await self.page.evaluate(_BATCH_SIGN_JS, [items, need_b1])
+            signs = result.get("signs") or []
+            if need_b1:
+                self._b1 = result.get("b1") or ""
+                self._b1_expire_at = time.monotonic() + config.XHS_SIGN_B1_TTL_SEC
+                self._metrics["b1_refresh_count"] += 1
+        except Exception as e:
+            utils.logger.error(f"[XhsSignContext._evaluate_batch] Batch sign error: {e}")
+            self._metrics["evaluate_error_count"] += 1
+            self.invalidate_b1()
+        finally:
+            # 与 call_mnsv2 一致，签名失败时返回空字符串，由接口返回结果决定是否重试
+            for i, (_, _, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(signs[i] if i < len(signs) else "")
+
+        cost_ms = (time.perf_counter() - start) * 1000
+        self._metrics["evaluate_count"] += 1
+        self._metrics["sign_count"] += len(batch)
+        self._metrics["evaluate_total_ms"] += cost_ms
+        self._metrics["evaluate_max_ms"] = max(self._metrics["evaluate_max_ms"], cost_ms)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        签名耗时统计
+
+        Returns:
+            sign_count / evaluate_count / avg_batch_size / avg_evaluate_ms / max_evaluate_ms 等指标
+        """
+        metrics = dict(self._metrics)
+        evaluate_count = metrics["evaluate_count"] or 1
+        metrics["avg_batch_size"] = metrics["sign_count"] / evaluate_count
+        metrics["avg_evaluate_ms"] = metrics["evaluate_total_ms"] / evaluate_count
+        return metrics
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/xhs_sign_fast.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 小红书 x-s / x-s-common 编码的快速实现
+# 输出与 xhs_sign.py 中的逐字符实现逐位一致（见 tests/test_xhs_sign_fast.py 的黄金向量），
+# xhs_sign.py 保留作为算法参考实现
+
+import base64
+from typing import Iterable, Union
+
+from .xhs_sign import BASE64_CHARS, CRC32_TABLE, get_trace_id  # noqa: F401
+
+_STD_BASE64_CHARS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+# 标准 Base64 字符 -> 小红书打乱后的字符，'=' 填充不在表内，保持不变
+_BASE64_TRANSLATE = bytes.maketrans(_STD_BASE64_CHARS, "".join(BASE64_CHARS).encode("ascii"))
+
+# CRC 只处理前 57 个字符
+_MRC_MAX_LEN = 57
+_MRC_XOR_OUT = 3988292384
+
+
+def mrc(e: str) -> int:
+    """CRC32 变体，用于 x-s-common 的 x9 字段"""
+    table = CRC32_TABLE
+    o = -1
+    for c in map(ord, e[:_MRC_MAX_LEN]):
+        # (o & 0xFFFFFFFF) >> 8 等价于 JS 的 o >>> 8
+        o = table[(o & 255) ^ c] ^ ((o & 0xFFFFFFFF) >> 8)
+    return o ^ -1 ^ _MRC_XOR_OUT
+
+
+def encode_utf8(s: str) -> bytes:
+    """将字符串编码为 UTF-8 字节"""
+    return s.encode("utf-8")
+
+
+def b64_encode(data: Union[bytes, bytearray, Iterable[int]]) -> str:
+    """自定义 Base64 编码"""
+    return base64.b64encode(bytes(data)).translate(_BASE64_TRANSLATE).decode("ascii")
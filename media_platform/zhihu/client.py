@@ -34,13 +34,15 @@ from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from proxy.proxy_mixin import ProxyRefreshMixin
 from tools import utils
+from tools.rate_limiter import RateLimiter
+from tools.response_cache import cache_response
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
 
 from .exception import DataFetchError, ForbiddenError
 from .field import SearchSort, SearchTime, SearchType
-from .help import ZhihuExtractor, sign
+from .help import ZhihuExtractor, sign_async
 
 
 class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
@@ -62,6 +64,8 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         self._extractor = ZhihuExtractor()
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
+        # 平台级令牌桶限速，取令牌时不占用并发名额
+        self.rate_limiter = RateLimiter.get_instance("zhihu")
 
     async def _pre_headers(self, url: str) -> Dict:
         """
@@ -74,7 +78,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         d_c0 = self.cookie_dict.get("d_c0")
         if not d_c0:
             raise Exception("d_c0 not found in cookies")
-        sign_res = sign(url, self.default_headers["cookie"])
+        sign_res = await sign_async(url, self.default_headers["cookie"])
         headers = self.default_headers.copy()
         headers['x-zst-81'] = sign_res["x-zst-81"]
         headers['x-zse-96'] = sign_res["x-zse-96"]
@@ -98,8 +102,9 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
         # return response.text
         return_response = kwargs.pop('return_response', False)
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        await self.rate_limiter.acquire(url)
+        response = await self.get_http_client().request(method, url, timeout=self.timeout, **kwargs)
+        self.rate_limiter.observe(response.status_code)
 
         if response.status_code != 200:
             utils.logger.error(f"[ZhiHuClient.request] Requset Url: {url}, Request error: {response.text}")
@@ -368,6 +373,7 @@ class ZhiHuClient(AbstractApiClient, ProxyRefreshMixin):
                 await asyncio.sleep(crawl_interval)
         return all_sub_comments
 
+    @cache_response("zhihu")
     async def get_creator_info(self, url_token: str) -> Optional[ZhihuCreator]:
         """
         获取创作者信息
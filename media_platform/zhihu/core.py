@@ -39,8 +39,11 @@ from base.base_crawler import AbstractCrawler
 from model.m_zhihu import ZhihuContent, ZhihuCreator
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import zhihu as zhihu_store
+from store.seen_index import SeenIndex
+from store.store_manager import StoreManager
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.rate_limiter import concurrency_slot, get_crawl_interval
 from var import crawler_type_var, source_keyword_var
 
 from .client import ZhiHuClient
@@ -128,6 +131,7 @@ class ZhihuCrawler(AbstractCrawler):
             await self.zhihu_client.update_cookies(browser_context=self.browser_context)
 
             crawler_type_var.set(config.CRAWLER_TYPE)
+            await StoreManager.open("zhihu", zhihu_store.ZhihuStoreFactory.create_store())
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
                 await self.search()
@@ -140,6 +144,7 @@ class ZhihuCrawler(AbstractCrawler):
             else:
                 pass
 
+            await StoreManager.flush_all()
             utils.logger.info("[ZhihuCrawler.start] Zhihu Crawler finished ...")
 
     async def search(self) -> None:
@@ -181,8 +186,8 @@ class ZhihuCrawler(AbstractCrawler):
                         break
 
                     # Sleep after page navigation
-                    await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                    utils.logger.info(f"[ZhihuCrawler.search] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after page {page-1}")
+                    await asyncio.sleep(get_crawl_interval())
+                    utils.logger.info(f"[ZhihuCrawler.search] Sleeping for {get_crawl_interval()} seconds after page {page-1}")
 
                     page += 1
                     for content in content_list:
@@ -210,7 +215,7 @@ class ZhihuCrawler(AbstractCrawler):
 
         semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
-        for content_item in content_list:
+        for content_item in SeenIndex.get_instance("zhihu").filter_comments(content_list, lambda x: x.content_id):
             task = asyncio.create_task(
                 self.get_comments(content_item, semaphore), name=content_item.content_id
             )
@@ -229,20 +234,21 @@ class ZhihuCrawler(AbstractCrawler):
         Returns:
 
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             utils.logger.info(
                 f"[ZhihuCrawler.get_comments] Begin get note id comments {content_item.content_id}"
             )
 
             # Sleep before fetching comments
-            await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-            utils.logger.info(f"[ZhihuCrawler.get_comments] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds before fetching comments for content {content_item.content_id}")
+            await asyncio.sleep(get_crawl_interval())
+            utils.logger.info(f"[ZhihuCrawler.get_comments] Sleeping for {get_crawl_interval()} seconds before fetching comments for content {content_item.content_id}")
 
             await self.zhihu_client.get_note_all_comments(
                 content=content_item,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                crawl_interval=get_crawl_interval(),
                 callback=zhihu_store.batch_update_zhihu_note_comments,
             )
+            SeenIndex.get_instance("zhihu").mark_comments(content_item.content_id)
 
     async def get_creators_and_notes(self) -> None:
         """
@@ -278,7 +284,7 @@ class ZhihuCrawler(AbstractCrawler):
             # Get all anwser information of the creator
             all_content_list = await self.zhihu_client.get_all_anwser_by_creator(
                 creator=createor_info,
-                crawl_interval=config.CRAWLER_MAX_SLEEP_SEC,
+                crawl_interval=get_crawl_interval(),
                 callback=zhihu_store.batch_update_zhihu_contents,
             )
 
@@ -311,7 +317,7 @@ class ZhihuCrawler(AbstractCrawler):
         Returns:
 
         """
-        async with semaphore:
+        async with concurrency_slot(semaphore):
             utils.logger.info(
                 f"[ZhihuCrawler.get_specified_notes] Begin get specified note {full_note_url}"
             )
@@ -326,8 +332,8 @@ class ZhihuCrawler(AbstractCrawler):
                 result = await self.zhihu_client.get_answer_info(question_id, answer_id)
 
                 # Sleep after fetching answer details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching answer details {answer_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {get_crawl_interval()} seconds after fetching answer details {answer_id}")
 
                 return result
 
@@ -339,8 +345,8 @@ class ZhihuCrawler(AbstractCrawler):
                 result = await self.zhihu_client.get_article_info(article_id)
 
                 # Sleep after fetching article details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching article details {article_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {get_crawl_interval()} seconds after fetching article details {article_id}")
 
                 return result
 
@@ -352,8 +358,8 @@ class ZhihuCrawler(AbstractCrawler):
                 result = await self.zhihu_client.get_video_info(video_id)
 
                 # Sleep after fetching video details
-                await asyncio.sleep(config.CRAWLER_MAX_SLEEP_SEC)
-                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {config.CRAWLER_MAX_SLEEP_SEC} seconds after fetching video details {video_id}")
+                await asyncio.sleep(get_crawl_interval())
+                utils.logger.info(f"[ZhihuCrawler.get_note_detail] Sleeping for {get_crawl_interval()} seconds after fetching video details {video_id}")
 
                 return result
 
@@ -485,6 +491,7 @@ class ZhihuCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        await StoreManager.close_all()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
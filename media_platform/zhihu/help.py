@@ -30,8 +30,10 @@ from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools import utils
 from tools.crawler_util import extract_text_from_html
+from tools.js_sign_engine import JsSignEngine
 
 ZHIHU_SGIN_JS = None
+ZHIHU_SIGN_JS_PATH = "libs/zhihu.js"
 
 
 def sign(url: str, cookies: str) -> Dict:
@@ -46,12 +48,25 @@ def sign(url: str, cookies: str) -> Dict:
     """
     global ZHIHU_SGIN_JS
     if not ZHIHU_SGIN_JS:
-        with open("libs/zhihu.js", mode="r", encoding="utf-8-sig") as f:
+        with open(ZHIHU_SIGN_JS_PATH, mode="r", encoding="utf-8-sig") as f:
             ZHIHU_SGIN_JS = execjs.compile(f.read())
 
     return ZHIHU_SGIN_JS.call("get_sign", url, cookies)
 
 
+async def sign_async(url: str, cookies: str) -> Dict:
+    """
+    zhihu sign algorithm, 在常驻的 JS 进程池中计算，不阻塞事件循环
+    Args:
+        url: request url with query string
+        cookies: request cookies with d_c0 key
+
+    Returns:
+
+    """
+    return await JsSignEngine.get_instance(ZHIHU_SIGN_JS_PATH).sign("get_sign", url, cookies)
+
+
 class ZhihuExtractor:
     def __init__(self):
         pass
@@ -23,15 +23,12 @@
 # @Time    : 2023/12/2 11:18
 # @Desc    : 爬虫 IP 获取实现
 # @Url     : 快代理HTTP实现，官方文档：https://www.kuaidaili.com/?ref=ldwkjqipvz6c
-import json
 from abc import ABC, abstractmethod
 from typing import List
 
-import config
-from cache.abs_cache import AbstractCache
-from cache.cache_factory import CacheFactory
 from tools.utils import utils
 
+from .proxy_registry import ProxyRegistry
 from .types import IpInfoModel
 
 
@@ -52,33 +49,28 @@ class ProxyProvider(ABC):
 
 
 class IpCache:
-    def __init__(self):
-        self.cache_client: AbstractCache = CacheFactory.create_cache(cache_type=config.CACHE_TYPE_REDIS)
+    """
+    代理商提取的 IP 缓存，存放在 redis 代理注册表中，多个爬虫进程共享，详见 ProxyRegistry
+    """
 
-    def set_ip(self, ip_key: str, ip_value_info: str, ex: int):
+    async def set_ip(self, proxy_brand_name: str, ip_info: IpInfoModel, ex: int):
         """
-        设置IP并带有过期时间，到期之后由 redis 负责删除
-        :param ip_key:
-        :param ip_value_info:
-        :param ex:
+        缓存IP并带有过期时间，过期之后在下一次读取时清理
+        :param proxy_brand_name: 代理商名称
+        :param ip_info:
+        :param ex: 有效期（秒）
         :return:
         """
-        self.cache_client.set(key=ip_key, value=ip_value_info, expire_time=ex)
+        await ProxyRegistry.get_instance(proxy_brand_name).add([ip_info], ex=ex)
 
-    def load_all_ip(self, proxy_brand_name: str) -> List[IpInfoModel]:
+    async def load_all_ip(self, proxy_brand_name: str) -> List[IpInfoModel]:
         """
-        从 redis 中加载所有还未过期的 IP 信息
+        从 redis 中加载所有还未过期、且没有被任何爬虫进程持有租约的 IP 信息
         :param proxy_brand_name: 代理商名称
         :return:
         """
-        all_ip_list: List[IpInfoModel] = []
-        all_ip_keys: List[str] = self.cache_client.keys(pattern=f"{proxy_brand_name}_*")
         try:
-            for ip_key in all_ip_keys:
-                ip_value = self.cache_client.get(ip_key)
-                if not ip_value:
-                    continue
-                all_ip_list.append(IpInfoModel(**json.loads(ip_value)))
+            return await ProxyRegistry.get_instance(proxy_brand_name).load_all(exclude_leased=True)
         except Exception as e:
-            utils.logger.error("[IpCache.load_all_ip] get ip err from redis db", e)
-        return all_ip_list
+            utils.logger.error(f"[IpCache.load_all_ip] get ip err from redis db: {e}")
+            return []
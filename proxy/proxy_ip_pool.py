@@ -21,8 +21,11 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 13:45
 # @Desc    : ip代理池实现
-import random
-from typing import Dict, List
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Set, Tuple
 
 import httpx
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -35,35 +38,157 @@ from proxy.providers import (
 from tools import utils
 
 from .base_proxy import ProxyProvider
+from .proxy_registry import ProxyRegistry
 from .types import IpInfoModel, ProviderNameEnum
 
+ProxyKey = Tuple[str, int]
+
+
+@dataclass
+class ProxyHealth:
+    """单个代理的健康状态"""
+    proxy: IpInfoModel
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    # 验证延迟的指数移动平均（秒）
+    latency: Optional[float] = None
+    blocked_until: float = 0.0
+
+    @property
+    def score(self) -> float:
+        """成功率（拉普拉斯平滑）除以 (1 + 延迟秒数)，越大越好"""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        latency = self.latency if self.latency is not None else config.IP_PROXY_VALIDATE_TIMEOUT_SEC
+        return success_rate / (1.0 + latency)
+
+    def is_healthy(self, now: float, buffer_seconds: int = 30) -> bool:
+        return self.blocked_until <= now and not self.proxy.is_expired(buffer_seconds)
+
+    def record(self, ok: bool, latency: Optional[float] = None):
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if latency is not None:
+                self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+
+def _proxy_key(proxy: IpInfoModel) -> ProxyKey:
+    return proxy.ip, proxy.port
+
 
 class ProxyIpPool:
+    """
+    后台维护的代理池
+
+    - 从代理商提取的候选代理并发验证，通过验证的代理记录延迟和成功/失败次数，按评分分配最优的可用代理
+    - 后台任务每隔 IP_PROXY_POOL_CHECK_INTERVAL_SEC 剔除过期代理、重新验证，
+      可用代理（在下次巡检前不会过期的）少于 IP_PROXY_POOL_MIN_HEALTHY 时提前补充，爬取流程不必等待提取和验证
+    - 触发 IPBlockError 的代理通过 mark_blocked() 降权并冷却 IP_PROXY_BLOCK_COOLDOWN_SEC，期间不再分配
+    - acquire(key) / release(key) 按租约分配代理：同一 key 在代理可用期间固定使用同一个代理，
+      不同 key 优先分到租约最少的代理，并发任务因此使用不同的出口 IP
+    - 传入 registry 时，正在使用的代理还会在 redis 中持有租约（巡检时续期），
+      多个爬虫进程不会分到同一个代理
+    """
+
+    _pools: List["ProxyIpPool"] = []
+
+    @classmethod
+    async def close_all(cls):
+        """
+        停止所有代理池的后台任务，在爬虫退出时调用
+        """
+        pools = list(cls._pools)
+        cls._pools.clear()
+        for pool in pools:
+            await pool.close()
 
     def __init__(
-        self, ip_pool_count: int, enable_validate_ip: bool, ip_provider: ProxyProvider
+        self,
+        ip_pool_count: int,
+        enable_validate_ip: bool,
+        ip_provider: ProxyProvider,
+        registry: Optional[ProxyRegistry] = None,
     ) -> None:
         """
 
         Args:
-            ip_pool_count:
-            enable_validate_ip:
-            ip_provider:
+            ip_pool_count: 每次从代理商提取的代理数量
+            enable_validate_ip: 是否验证代理
+            ip_provider: 代理商
+            registry: 多进程共享的代理注册表，为 None 时不做跨进程协调
         """
-        self.valid_ip_url = "https://echo.apifox.cn/"  # 验证 IP 是否有效的地址
+        self.valid_ip_url = config.IP_PROXY_VALIDATE_URL  # 验证 IP 是否有效的地址
         self.ip_pool_count = ip_pool_count
         self.enable_validate_ip = enable_validate_ip
-        self.proxy_list: List[IpInfoModel] = []
         self.ip_provider: ProxyProvider = ip_provider
         self.current_proxy: IpInfoModel | None = None  # 当前正在使用的代理
+        self._health: Dict[ProxyKey, ProxyHealth] = {}
+        # 租约 key（任务/账号/会话）-> 代理
+        self._leases: Dict[Hashable, ProxyKey] = {}
+        self.registry = registry
+        # 本进程在注册表中持有租约的代理
+        self._claimed: Dict[ProxyKey, IpInfoModel] = {}
+        self._registry_tasks: Set[asyncio.Task] = set()
+        self._refill_lock = asyncio.Lock()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._maintain_task: Optional[asyncio.Task] = None
+
+    @property
+    def proxy_list(self) -> List[IpInfoModel]:
+        """当前可分配的代理，按评分从高到低排列"""
+        return [h.proxy for h in self._ranked()]
+
+    def _ranked(self, buffer_seconds: int = 30) -> List[ProxyHealth]:
+        now = time.time()
+        healthy = [h for h in self._health.values() if h.is_healthy(now, buffer_seconds)]
+        return sorted(healthy, key=lambda h: h.score, reverse=True)
+
+    def get_health(self, proxy: IpInfoModel) -> Optional[ProxyHealth]:
+        return self._health.get(_proxy_key(proxy))
+
+    def is_available(self, proxy: IpInfoModel) -> bool:
+        """代理是否仍可分配（未过期、未冷却）"""
+        health = self._health.get(_proxy_key(proxy))
+        return health is not None and health.is_healthy(time.time())
 
     async def load_proxies(self) -> None:
         """
-        加载IP代理
+        从代理商提取一批代理，并发验证后加入代理池
         Returns:
 
         """
-        self.proxy_list = await self.ip_provider.get_proxy(self.ip_pool_count)
+        candidates = await self.ip_provider.get_proxy(self.ip_pool_count)
+        candidates = [p for p in candidates if _proxy_key(p) not in self._health]
+        if not candidates:
+            return
+        if not self.enable_validate_ip:
+            for proxy in candidates:
+                self._health[_proxy_key(proxy)] = ProxyHealth(proxy)
+            return
+
+        semaphore = asyncio.Semaphore(config.IP_PROXY_VALIDATE_CONCURRENCY)
+
+        async def validate(proxy: IpInfoModel) -> Tuple[IpInfoModel, bool, float]:
+            async with semaphore:
+                start = time.monotonic()
+                ok = await self._is_valid_proxy(proxy)
+                return proxy, ok, time.monotonic() - start
+
+        results = await asyncio.gather(*[validate(p) for p in candidates])
+        added = 0
+        for proxy, ok, latency in results:
+            if ok:
+                health = ProxyHealth(proxy)
+                health.record(True, latency)
+                self._health[_proxy_key(proxy)] = health
+                added += 1
+        utils.logger.info(
+            f"[ProxyIpPool.load_proxies] {added}/{len(candidates)} proxies passed validation, pool size: {len(self._health)}"
+        )
 
     async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
         """
@@ -81,36 +206,157 @@ class ProxyIpPool:
             else:
                 proxy_url = f"http://{proxy.ip}:{proxy.port}"
 
-            async with httpx.AsyncClient(proxy=proxy_url) as client:
+            async with httpx.AsyncClient(proxy=proxy_url, timeout=config.IP_PROXY_VALIDATE_TIMEOUT_SEC) as client:
                 response = await client.get(self.valid_ip_url)
-            if response.status_code == 200:
-                return True
-            else:
-                return False
+            return response.status_code == 200
         except Exception as e:
             utils.logger.info(
                 f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} err: {e}"
             )
-            raise e
+            return False
 
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def get_proxy(self) -> IpInfoModel:
         """
-        从代理池中随机提取一个代理IP
+        分配评分最高的可用代理，优先换一个与当前代理不同的
         :return:
         """
-        if len(self.proxy_list) == 0:
-            await self._reload_proxies()
+        self._start_maintenance()
+        ranked = await self._unleased(self._ranked())
+        if not ranked:
+            # 池子已经用完，只能等待本次补充
+            await self._refill()
+            ranked = await self._unleased(self._ranked())
 
-        proxy = random.choice(self.proxy_list)
-        self.proxy_list.remove(proxy)  # 取出来一个IP就应该移出掉
-        if self.enable_validate_ip:
-            if not await self._is_valid_proxy(proxy):
-                raise Exception(
-                    "[ProxyIpPool.get_proxy] current ip invalid and again get it"
-                )
-        self.current_proxy = proxy  # 保存当前使用的代理
-        return proxy
+        current_key = _proxy_key(self.current_proxy) if self.current_proxy else None
+        # 排序是稳定的：与当前代理不同的排在前面，其余保持评分顺序
+        health = await self._claim_first(sorted(ranked, key=lambda h: _proxy_key(h.proxy) == current_key))
+        if health is None:
+            raise Exception("[ProxyIpPool.get_proxy] no valid proxy available and again get it")
+        self.current_proxy = health.proxy  # 保存当前使用的代理
+        self._release_unused_claims()
+        self._refill_in_background()
+        return health.proxy
+
+    async def acquire(self, lease_key: Hashable) -> IpInfoModel:
+        """
+        为租约分配代理：已持有的代理仍可用时继续使用，否则在可用代理中选租约最少、评分最高的
+        Args:
+            lease_key: 租约 key，如任务、账号或会话标识
+
+        Returns:
+            IpInfoModel
+        """
+        self._start_maintenance()
+        held = self._leases.get(lease_key)
+        if held is not None and (self.registry is None or held in self._claimed):
+            health = next((h for h in self._ranked() if _proxy_key(h.proxy) == held), None)
+            if health is not None:
+                return health.proxy
+
+        ranked = await self._unleased(self._ranked())
+        if not ranked:
+            await self._refill()
+            ranked = await self._unleased(self._ranked())
+
+        lease_counts = Counter(self._leases.values())
+        # ranked 已按评分倒序，稳定排序后租约数相同的仍按评分从高到低
+        health = await self._claim_first(sorted(ranked, key=lambda h: lease_counts[_proxy_key(h.proxy)]))
+        if health is None:
+            raise Exception("[ProxyIpPool.acquire] no valid proxy available")
+        self._leases[lease_key] = _proxy_key(health.proxy)
+        self._release_unused_claims()
+        self._refill_in_background()
+        return health.proxy
+
+    def release(self, lease_key: Hashable):
+        """
+        归还租约，任务或会话结束时调用
+        """
+        self._leases.pop(lease_key, None)
+        self._release_unused_claims()
+
+    async def _unleased(self, ranked: List[ProxyHealth]) -> List[ProxyHealth]:
+        """
+        排除在注册表中被其它进程持有租约的代理
+        """
+        if self.registry is None or not ranked:
+            return ranked
+        try:
+            owners = await self.registry.lease_owners([h.proxy for h in ranked])
+        except Exception as e:
+            utils.logger.error(f"[ProxyIpPool._unleased] query proxy leases error, skip coordination: {e}")
+            return ranked
+        return [h for h, owner in zip(ranked, owners) if owner in (None, self.registry.node_id)]
+
+    async def _claim_first(self, candidates: List[ProxyHealth]) -> Optional[ProxyHealth]:
+        """
+        按顺序尝试在注册表中持有租约，返回第一个成功的代理；并发抢占失败的跳过
+        """
+        for health in candidates:
+            key = _proxy_key(health.proxy)
+            if self.registry is None or key in self._claimed:
+                return health
+            try:
+                ok = await self.registry.lease(health.proxy, config.IP_PROXY_LEASE_TTL_SEC)
+            except Exception as e:
+                utils.logger.error(f"[ProxyIpPool._claim_first] lease proxy error, skip coordination: {e}")
+                return health
+            if ok:
+                self._claimed[key] = health.proxy
+                return health
+        return None
+
+    def _release_unused_claims(self):
+        """
+        没有任务再使用的代理在后台释放注册表租约，让其它进程可以使用
+        """
+        if self.registry is None:
+            return
+        in_use = set(self._leases.values())
+        if self.current_proxy is not None:
+            in_use.add(_proxy_key(self.current_proxy))
+        for key in [k for k in self._claimed if k not in in_use]:
+            task = asyncio.create_task(self._safe_release(self._claimed.pop(key)), name="ProxyIpPool.release")
+            self._registry_tasks.add(task)
+            task.add_done_callback(self._registry_tasks.discard)
+
+    async def _safe_release(self, proxy: IpInfoModel):
+        try:
+            await self.registry.release(proxy)
+        except Exception as e:
+            utils.logger.error(f"[ProxyIpPool._safe_release] release proxy lease error: {e}")
+
+    async def _renew_claims(self):
+        """
+        续期本进程持有的注册表租约，续期失败（租约已过期并被其它进程持有）的不再视为本进程持有
+        """
+        if self.registry is None or not self._claimed:
+            return
+        keys = list(self._claimed)
+        results = await self.registry.renew([self._claimed[k] for k in keys], config.IP_PROXY_LEASE_TTL_SEC)
+        for key, ok in zip(keys, results):
+            if not ok:
+                proxy = self._claimed.pop(key)
+                utils.logger.warning(f"[ProxyIpPool._renew_claims] lost lease of proxy {proxy.ip}:{proxy.port}")
+
+    def mark_blocked(self, proxy: Optional[IpInfoModel] = None):
+        """
+        代理被平台封禁（IPBlockError）时调用：记一次失败并冷却，当前代理会在下一次请求前被更换
+        Args:
+            proxy: 被封禁的代理，默认为当前代理
+        """
+        proxy = proxy or self.current_proxy
+        if proxy is None:
+            return
+        health = self._health.get(_proxy_key(proxy))
+        if health is not None:
+            health.record(False)
+            health.blocked_until = time.time() + config.IP_PROXY_BLOCK_COOLDOWN_SEC
+        if self.current_proxy is not None and _proxy_key(self.current_proxy) == _proxy_key(proxy):
+            self.current_proxy = None
+        utils.logger.warning(f"[ProxyIpPool.mark_blocked] proxy {proxy.ip}:{proxy.port} blocked, cooling down")
+        self._refill_in_background()
 
     def is_current_proxy_expired(self, buffer_seconds: int = 30) -> bool:
         """
@@ -140,13 +386,96 @@ class ProxyIpPool:
             return await self.get_proxy()
         return self.current_proxy
 
-    async def _reload_proxies(self):
+    def _needs_refill(self) -> bool:
+        # 下次巡检前就会过期的代理不计入可用数量
+        return len(self._ranked(config.IP_PROXY_POOL_CHECK_INTERVAL_SEC)) < config.IP_PROXY_POOL_MIN_HEALTHY
+
+    async def _refill(self):
         """
-        # 重新加载代理池
-        :return:
+        补充代理池，同一时间只有一个补充在进行
+        """
+        async with self._refill_lock:
+            if self._needs_refill() or not self._ranked():
+                await self.load_proxies()
+
+    def _refill_in_background(self):
+        if not self._needs_refill():
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._safe_refill(), name="ProxyIpPool.refill")
+
+    async def _safe_refill(self):
+        try:
+            await self._refill()
+        except Exception as e:
+            utils.logger.error(f"[ProxyIpPool._safe_refill] refill proxy pool error: {e}")
+
+    async def check_health(self):
+        """
+        巡检一次：剔除过期或连续失败的代理，并发重新验证其余代理并更新评分，然后按需补充
+        """
+        try:
+            await self._renew_claims()
+        except Exception as e:
+            utils.logger.error(f"[ProxyIpPool.check_health] renew proxy leases error: {e}")
+
+        now = time.time()
+        for key, health in list(self._health.items()):
+            if health.proxy.is_expired() or health.consecutive_failures >= config.IP_PROXY_MAX_CONSECUTIVE_FAILURES:
+                del self._health[key]
+
+        if self.enable_validate_ip:
+            semaphore = asyncio.Semaphore(config.IP_PROXY_VALIDATE_CONCURRENCY)
+
+            async def revalidate(health: ProxyHealth):
+                async with semaphore:
+                    start = time.monotonic()
+                    ok = await self._is_valid_proxy(health.proxy)
+                    health.record(ok, time.monotonic() - start)
+
+            await asyncio.gather(*[revalidate(h) for h in self._health.values() if h.blocked_until <= now])
+        await self._safe_refill()
+
+    def _start_maintenance(self):
+        if self._maintain_task is None or self._maintain_task.done():
+            self._maintain_task = asyncio.create_task(self._maintain_loop(), name="ProxyIpPool.maintain")
+            if self not in ProxyIpPool._pools:
+                ProxyIpPool._pools.append(self)
+
+    async def _maintain_loop(self):
+        while True:
+            await asyncio.sleep(config.IP_PROXY_POOL_CHECK_INTERVAL_SEC)
+            try:
+                await self.check_health()
+            except Exception as e:
+                utils.logger.error(f"[ProxyIpPool._maintain_loop] check proxy pool error: {e}")
+
+    async def close(self):
+        """
+        停止后台巡检和补充任务，并释放本进程持有的注册表租约
         """
-        self.proxy_list = []
-        await self.load_proxies()
+        tasks = [t for t in (self._maintain_task, self._refill_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._maintain_task = None
+        self._refill_task = None
+
+        claimed = list(self._claimed.values())
+        self._claimed.clear()
+        await asyncio.gather(*self._registry_tasks, *[self._safe_release(p) for p in claimed])
+
+    def get_metrics(self) -> Dict:
+        now = time.time()
+        return {
+            "size": len(self._health),
+            "healthy": sum(1 for h in self._health.values() if h.is_healthy(now)),
+            "leases": len(self._leases),
+            "registry_leases": len(self._claimed),
+            "scores": {
+                f"{h.proxy.ip}:{h.proxy.port}": round(h.score, 3) for h in self._health.values()
+            },
+        }
 
 
 IpProxyProvider: Dict[str, ProxyProvider] = {
@@ -157,17 +486,24 @@ IpProxyProvider: Dict[str, ProxyProvider] = {
 
 async def create_ip_pool(ip_pool_count: int, enable_validate_ip: bool) -> ProxyIpPool:
     """
-     创建 IP 代理池
+     创建 IP 代理池，创建时即完成一批代理的并发验证，并启动后台巡检
     :param ip_pool_count: ip池子的数量
     :param enable_validate_ip: 是否开启验证IP代理
     :return:
     """
+    ip_provider = IpProxyProvider.get(config.IP_PROXY_PROVIDER_NAME)
+    registry = None
+    if config.ENABLE_PROXY_REGISTRY:
+        # 与 IpCache 使用同一个代理商名称，缓存读取时才能排除已被持有的代理
+        registry = ProxyRegistry.get_instance(ip_provider.proxy_brand_name)
     pool = ProxyIpPool(
         ip_pool_count=ip_pool_count,
         enable_validate_ip=enable_validate_ip,
-        ip_provider=IpProxyProvider.get(config.IP_PROXY_PROVIDER_NAME),
+        ip_provider=ip_provider,
+        registry=registry,
     )
     await pool.load_proxies()
+    pool._start_maintenance()
     return pool
 
 
@@ -23,14 +23,53 @@
 # @Time    : 2025/11/25
 # @Desc    : 代理自动刷新 Mixin 类，供各平台 client 使用
 
-from typing import TYPE_CHECKING, Optional
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Hashable, Optional
 
+import httpx
+
+import config
+from proxy.types import IpInfoModel
 from tools import utils
+from tools.http_transport import SharedHttpTransport
+from var import proxy_lease_var
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
 
 
+def _format_proxy_url(proxy: IpInfoModel) -> str:
+    # httpx 代理URL
+    if proxy.user and proxy.password:
+        return f"http://{proxy.user}:{proxy.password}@{proxy.ip}:{proxy.port}"
+    return f"http://{proxy.ip}:{proxy.port}"
+
+
+@dataclass
+class ProxyLease:
+    """
+    代理租约，保存在 proxy_lease_var 中，同一上下文内的请求固定使用租约上的代理
+
+    - owner 为任务时是按任务自动创建的租约，任务结束时归还，子任务继承上下文后不会共用
+    - owner 为 None 时是通过 proxy_lease() 显式创建的账号/会话租约，上下文内派生的任务共用同一个代理
+    """
+
+    key: Hashable
+    pool: "ProxyIpPool"
+    owner: Optional[asyncio.Task] = None
+    proxy_info: Optional[IpInfoModel] = None
+
+    @property
+    def proxy(self) -> Optional[str]:
+        return _format_proxy_url(self.proxy_info) if self.proxy_info else None
+
+    def release(self) -> None:
+        self.pool.release(self.key)
+        self.proxy_info = None
+
+
 class ProxyRefreshMixin:
     """
     代理自动刷新 Mixin 类
@@ -39,6 +78,9 @@ class ProxyRefreshMixin:
     1. 让 client 类继承此 Mixin
     2. 在 client 的 __init__ 中调用 init_proxy_pool(proxy_ip_pool)
     3. 在每次 request 方法调用前调用 await _refresh_proxy_if_expired()
+    4. 通过 get_http_client() 获取与当前代理绑定的共享长连接客户端发起请求
+    5. 需要固定出口 IP 的账号/会话可以用 async with client.proxy_lease(key) 包裹，
+       开启 ENABLE_PROXY_AFFINITY 后每个任务自动持有自己的代理租约
 
     要求：
     - client 类必须有 self.proxy 属性来存储当前代理URL
@@ -54,6 +96,85 @@ class ProxyRefreshMixin:
         """
         self._proxy_ip_pool = proxy_ip_pool
 
+    def get_http_client(self) -> httpx.AsyncClient:
+        """
+        获取当前代理对应的共享 httpx 客户端（按 client 类名 + 代理复用长连接）
+        Returns:
+            httpx.AsyncClient
+        """
+        lease = self._active_lease()
+        proxy = lease.proxy if lease is not None and lease.proxy else self.proxy
+        return SharedHttpTransport.get_client(self.__class__.__name__, proxy)
+
+    @asynccontextmanager
+    async def proxy_lease(self, key: Hashable) -> AsyncIterator[Optional[ProxyLease]]:
+        """
+        在上下文内固定使用一个代理（按账号/会话粘滞），退出时归还租约
+        Args:
+            key: 租约 key，相同 key 在代理可用期间分到同一个代理
+
+        Returns:
+            ProxyLease，未配置代理池时为 None
+        """
+        if self._proxy_ip_pool is None:
+            yield None
+            return
+        lease = ProxyLease(key=key, pool=self._proxy_ip_pool)
+        token = proxy_lease_var.set(lease)
+        try:
+            await self._refresh_lease(lease)
+            yield lease
+        finally:
+            proxy_lease_var.reset(token)
+            lease.release()
+
+    def _active_lease(self) -> Optional[ProxyLease]:
+        lease = proxy_lease_var.get()
+        if lease is None or lease.pool is not self._proxy_ip_pool:
+            return None
+        if lease.owner is not None and lease.owner is not asyncio.current_task():
+            # 从父任务继承的任务租约，不共用
+            return None
+        return lease
+
+    def _start_task_lease(self) -> Optional[ProxyLease]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        lease = ProxyLease(key=task, pool=self._proxy_ip_pool, owner=task)
+        proxy_lease_var.set(lease)
+        task.add_done_callback(lambda _: lease.release())
+        return lease
+
+    async def _refresh_lease(self, lease: ProxyLease) -> None:
+        """
+        租约上的代理过期、被封禁或尚未分配时从代理池重新分配
+        """
+        old_info = lease.proxy_info
+        new_info = await lease.pool.acquire(lease.key)
+        if old_info is not None and (old_info.ip, old_info.port) == (new_info.ip, new_info.port):
+            return
+        old_proxy = lease.proxy
+        lease.proxy_info = new_info
+        # 旧代理已不再分配（过期或冷却中）时关闭其共享客户端，仍被其它租约使用的保留
+        if old_info is not None and not lease.pool.is_available(old_info):
+            SharedHttpTransport.retire(self.__class__.__name__, old_proxy)
+        utils.logger.info(
+            f"[{self.__class__.__name__}._refresh_lease] Lease {lease.key!r} uses proxy: {new_info.ip}:{new_info.port}"
+        )
+
+    def _mark_proxy_blocked(self) -> None:
+        """
+        当前代理被平台封禁（IPBlockError）时调用：代理池降权并冷却该代理，下一次请求前自动换用其它代理
+        """
+        if self._proxy_ip_pool is None:
+            return
+        lease = self._active_lease()
+        if lease is not None and lease.proxy_info is not None:
+            self._proxy_ip_pool.mark_blocked(lease.proxy_info)
+            return
+        self._proxy_ip_pool.mark_blocked()
+
     async def _refresh_proxy_if_expired(self) -> None:
         """
         检测代理是否过期，如果过期则自动刷新
@@ -62,16 +183,24 @@ class ProxyRefreshMixin:
         if self._proxy_ip_pool is None:
             return
 
+        lease = self._active_lease()
+        if lease is None and config.ENABLE_PROXY_AFFINITY:
+            lease = self._start_task_lease()
+        if lease is not None:
+            await self._refresh_lease(lease)
+            return
+
         if self._proxy_ip_pool.is_current_proxy_expired():
             utils.logger.info(
                 f"[{self.__class__.__name__}._refresh_proxy_if_expired] Proxy expired, refreshing..."
             )
             new_proxy = await self._proxy_ip_pool.get_or_refresh_proxy()
+            old_proxy = self.proxy
             # 更新 httpx 代理URL
-            if new_proxy.user and new_proxy.password:
-                self.proxy = f"http://{new_proxy.user}:{new_proxy.password}@{new_proxy.ip}:{new_proxy.port}"
-            else:
-                self.proxy = f"http://{new_proxy.ip}:{new_proxy.port}"
+            self.proxy = _format_proxy_url(new_proxy)
+            # 旧代理对应的共享客户端延迟关闭，下一次 get_http_client() 会基于新代理重建
+            if old_proxy != self.proxy:
+                SharedHttpTransport.retire(self.__class__.__name__, old_proxy)
             utils.logger.info(
                 f"[{self.__class__.__name__}._refresh_proxy_if_expired] New proxy: {new_proxy.ip}:{new_proxy.port}"
             )
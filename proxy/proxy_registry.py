@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/proxy/proxy_registry.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+
+"""
+基于 Redis 的代理注册表，供多个爬虫进程（可分布在不同节点）共享同一个代理商额度
+
+key 布局（{brand} 为代理商名称）：
+- {prefix}:{brand}:info    hash，ip:port -> IpInfoModel JSON
+- {prefix}:{brand}:expire  sorted set，ip:port -> 过期时间戳，用于按时间范围读取和清理，代替 KEYS 扫描
+- {prefix}:{brand}:lease:{ip}:{port}  租约，值为持有者节点 ID，带 PX 过期时间，持有者进程退出后自动释放
+"""
+import os
+import socket
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Union
+
+from redis.asyncio import Redis
+
+from config import db_config
+from tools import utils
+
+from .types import IpInfoModel
+
+REGISTRY_KEY_PREFIX = "mediacrawler:proxy"
+
+# 租约不存在时加锁，已由本节点持有时续期
+_LEASE_SCRIPT = """
+if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('pexpire', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# 只续期自己持有的租约
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 只释放自己持有的租约
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _member(proxy: IpInfoModel) -> str:
+    return f"{proxy.ip}:{proxy.port}"
+
+
+def _decode(value: Union[bytes, str, None]) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+class ProxyRegistry:
+    """
+    分布式代理注册表
+
+    - add() / load_all() 通过 pipeline 批量写入和读取代理，按过期时间的有序集合索引，过期代理在读取时顺带清理
+    - lease() / renew() / release() 用 Lua 脚本原子地加锁、续期和释放，同一个代理同一时间只被一个节点持有
+    - lease_owners() 用一次 MGET 批量查询租约持有者
+    """
+
+    _instances: Dict[str, "ProxyRegistry"] = {}
+
+    @classmethod
+    def get_instance(cls, proxy_brand_name: str) -> "ProxyRegistry":
+        """
+        获取代理商对应的注册表，同一进程内共用一个节点 ID
+        Args:
+            proxy_brand_name: 代理商名称
+
+        Returns:
+            ProxyRegistry
+        """
+        if proxy_brand_name not in cls._instances:
+            cls._instances[proxy_brand_name] = cls(proxy_brand_name)
+        return cls._instances[proxy_brand_name]
+
+    @classmethod
+    async def close_all(cls):
+        """
+        关闭所有注册表的 redis 连接，在爬虫退出时调用
+        """
+        registries = list(cls._instances.values())
+        cls._instances.clear()
+        for registry in registries:
+            await registry.close()
+
+    def __init__(self, proxy_brand_name: str, redis_client: Optional[Redis] = None, node_id: Optional[str] = None):
+        """
+
+        Args:
+            proxy_brand_name: 代理商名称
+            redis_client: redis 异步客户端，默认按 db_config 连接
+            node_id: 本节点（进程）的租约持有者 ID，默认由主机名、进程号和随机串组成
+        """
+        self.proxy_brand_name = proxy_brand_name
+        self.redis = redis_client or self._connect_redis()
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        prefix = f"{REGISTRY_KEY_PREFIX}:{proxy_brand_name}"
+        self._info_key = f"{prefix}:info"
+        self._expire_key = f"{prefix}:expire"
+        self._lease_prefix = f"{prefix}:lease"
+        self._lease_script = self.redis.register_script(_LEASE_SCRIPT)
+        self._renew_script = self.redis.register_script(_RENEW_SCRIPT)
+        self._release_script = self.redis.register_script(_RELEASE_SCRIPT)
+
+    @staticmethod
+    def _connect_redis() -> Redis:
+        return Redis(
+            host=db_config.REDIS_DB_HOST,
+            port=db_config.REDIS_DB_PORT,
+            db=db_config.REDIS_DB_NUM,
+            password=db_config.REDIS_DB_PWD,
+        )
+
+    def _lease_key(self, proxy: IpInfoModel) -> str:
+        return f"{self._lease_prefix}:{_member(proxy)}"
+
+    async def add(self, proxies: Iterable[IpInfoModel], ex: Optional[int] = None) -> None:
+        """
+        批量登记代理
+        Args:
+            proxies: 代理列表
+            ex: 有效期（秒），默认使用代理自身的 expired_time_ts
+        """
+        now = int(time.time())
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for proxy in proxies:
+                expire_at = now + ex if ex is not None else proxy.expired_time_ts
+                if not expire_at or expire_at <= now:
+                    continue
+                pipe.hset(self._info_key, _member(proxy), proxy.model_dump_json())
+                pipe.zadd(self._expire_key, {_member(proxy): expire_at})
+            await pipe.execute()
+
+    async def load_all(self, exclude_leased: bool = False) -> List[IpInfoModel]:
+        """
+        读取所有未过期的代理
+        Args:
+            exclude_leased: 是否排除已被任一节点持有租约的代理
+
+        Returns:
+            按过期时间从晚到早排列的代理列表
+        """
+        now = int(time.time())
+        expired = await self.redis.zrangebyscore(self._expire_key, "-inf", now)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if expired:
+                pipe.hdel(self._info_key, *expired)
+                pipe.zrem(self._expire_key, *expired)
+            pipe.zrevrangebyscore(self._expire_key, "+inf", f"({now}")
+            members = (await pipe.execute())[-1]
+        if not members:
+            return []
+
+        values = await self.redis.hmget(self._info_key, members)
+        proxies: List[IpInfoModel] = []
+        for value in values:
+            if not value:
+                continue
+            try:
+                proxies.append(IpInfoModel.model_validate_json(_decode(value)))
+            except ValueError as e:
+                utils.logger.error(f"[ProxyRegistry.load_all] invalid proxy info in redis: {e}")
+        if exclude_leased:
+            owners = await self.lease_owners(proxies)
+            proxies = [p for p, owner in zip(proxies, owners) if owner is None]
+        return proxies
+
+    async def lease(self, proxy: IpInfoModel, ttl_seconds: float) -> bool:
+        """
+        尝试持有代理的租约，已由本节点持有时续期
+        Returns:
+            是否持有成功
+        """
+        ok = await self._lease_script(keys=[self._lease_key(proxy)], args=[self.node_id, int(ttl_seconds * 1000)])
+        return bool(ok)
+
+    async def renew(self, proxies: List[IpInfoModel], ttl_seconds: float) -> List[bool]:
+        """
+        批量续期本节点持有的租约
+        Returns:
+            与 proxies 一一对应的续期结果，False 表示租约已过期或被其它节点持有
+        """
+        if not proxies:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for proxy in proxies:
+                await self._renew_script(keys=[self._lease_key(proxy)], args=[self.node_id, int(ttl_seconds * 1000)], client=pipe)
+            results = await pipe.execute()
+        return [bool(r) for r in results]
+
+    async def release(self, proxy: IpInfoModel) -> bool:
+        """
+        释放本节点持有的租约
+        Returns:
+            是否释放成功
+        """
+        ok = await self._release_script(keys=[self._lease_key(proxy)], args=[self.node_id])
+        return bool(ok)
+
+    async def lease_owners(self, proxies: List[IpInfoModel]) -> List[Optional[str]]:
+        """
+        批量查询租约持有者
+        Returns:
+            与 proxies 一一对应的持有者节点 ID，无人持有时为 None
+        """
+        if not proxies:
+            return []
+        owners = await self.redis.mget([self._lease_key(p) for p in proxies])
+        return [_decode(owner) for owner in owners]
+
+    async def close(self):
+        await self.redis.close()
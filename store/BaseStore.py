@@ -17,15 +17,18 @@ class BaseStore(ABC):
             source_keyword: Optional[str] = None,
             sort_by: str = "liked_count",
             page: int = 1,
-            page_size: int = 10
+            page_size: int = 10,
+            cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         一个统一的、支持分页/筛选/排序的查询方法。
+        传入上一页返回的 next_cursor 时按游标翻页，忽略 page。
 
         返回一个字典，包含:
         {
-            "total": <总记录数>,
-            "list": [<查询到的数据列表>]
+            "total": <总记录数，可能有缓存延迟>,
+            "list": [<查询到的数据列表>],
+            "next_cursor": <下一页游标，没有更多数据时为 None>
         }
         """
         pass
@@ -22,9 +22,12 @@
 # @Time    : 2024/1/14 19:34
 # @Desc    :
 
-from typing import List
+from typing import Dict, List, Optional
 
 import config
+from store.media_store import ContentAddressedMediaStore
+from store.store_manager import StoreManager
+from tools.media_downloader import MediaDownloader
 from var import source_keyword_var
 
 from ._store_impl import *
@@ -36,6 +39,7 @@ class BiliStoreFactory:
         "csv": BiliCsvStoreImplement,
         "db": BiliDbStoreImplement,
         "json": BiliJsonStoreImplement,
+        "jsonl": BiliJsonStoreImplement,
         "sqlite": BiliSqliteStoreImplement,
         "mongodb": BiliMongoStoreImplement,
         "excel": BiliExcelStoreImplement,
@@ -45,8 +49,8 @@ class BiliStoreFactory:
     def create_store() -> AbstractStore:
         store_class = BiliStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+            raise ValueError("[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("bilibili", store_class)
 
 
 async def update_bilibili_video(video_item: Dict):
@@ -102,11 +106,15 @@ async def update_up_info(video_item: Dict):
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_bilibili_video_comment(video_id, comment_item)
+    save_comment_items = [_build_bilibili_video_comment(video_id, comment_item) for comment_item in comments]
+    await BiliStoreFactory.create_store().store_comments(save_comment_items)
 
 
 async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
+    await BiliStoreFactory.create_store().store_comment(comment_item=_build_bilibili_video_comment(video_id, comment_item))
+
+
+def _build_bilibili_video_comment(video_id: str, comment_item: Dict) -> Dict:
     comment_id = str(comment_item.get("rpid"))
     parent_comment_id = str(comment_item.get("parent", 0))
     content: Dict = comment_item.get("content")
@@ -128,7 +136,7 @@ async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
         "last_modify_ts": utils.get_current_timestamp(),
     }
     utils.logger.info(f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def store_video(aid, video_content, extension_file_name):
@@ -146,6 +154,26 @@ async def store_video(aid, video_content, extension_file_name):
     })
 
 
+async def download_video(aid, url: str, extension_file_name: str, headers: Optional[Dict[str, str]] = None,
+                         proxy: Optional[str] = None):
+    """
+    提交 B 站视频下载任务，由 MediaDownloader 在后台流式写盘并支持断点续传
+    Args:
+        aid:
+        url: 视频地址
+        extension_file_name:
+        headers: 请求头，B 站 CDN 需要 Referer
+        proxy: httpx 代理URL
+    """
+    if config.ENABLE_MEDIA_DEDUP:
+        await ContentAddressedMediaStore.get_instance("bili").submit(
+            aid, extension_file_name, url, headers=headers, proxy=proxy
+        )
+        return
+    save_path = BilibiliVideo().make_save_file_name(str(aid), extension_file_name)
+    await MediaDownloader.get_instance().submit(url, save_path, headers=headers, proxy=proxy)
+
+
 async def batch_update_bilibili_creator_fans(creator_info: Dict, fans_list: List[Dict]):
     if not fans_list:
         return
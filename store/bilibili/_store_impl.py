@@ -27,7 +27,7 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
 import aiofiles
 from sqlalchemy import select, func, desc
@@ -35,14 +35,16 @@ from sqlalchemy.orm import sessionmaker
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import BulkUpsertWriter
 from database.data_registry import PLATFORM_MODELS
 from database.db_session import get_session
+from database.pagination import get_paginated_list as paginate_platform_list
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
 from store.BaseStore import BaseStore
 from tools.async_file_writer import AsyncFileWriter
 from tools import utils, words
 from var import crawler_type_var
-from database.mongodb_store_base import MongoDBStoreBase
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
 
 
 class BiliCsvStoreImplement(AbstractStore):
@@ -52,6 +54,9 @@ class BiliCsvStoreImplement(AbstractStore):
             platform="bili"
         )
 
+    async def flush(self):
+        await self.file_writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         content CSV storage implementation
@@ -80,6 +85,22 @@ class BiliCsvStoreImplement(AbstractStore):
             item_type="comments"
         )
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to csv file, one file open per batch
+        :param content_items:
+        :return:
+        """
+        await self.file_writer.write_rows_to_csv(item_type="videos", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to csv file, one file open per batch
+        :param comment_items:
+        :return:
+        """
+        await self.file_writer.write_rows_to_csv(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         creator CSV storage implementation
@@ -127,61 +148,15 @@ class BiliDbStoreImplement(AbstractStore,BaseStore):
     def __init__(self, **kwargs):
         _, self.normalized_columns = PLATFORM_MODELS["bili"]
     async def get_paginated_list(self, *, keyword: Optional[str] = None, source_keyword: Optional[str] = None,
-                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10) -> Dict[
-        str, Any]:
-        async with get_session() as session:
-            # 1. 定义要查询的表
-            table = BilibiliVideo.__table__
-
-            # 2. 构建基础查询语句
-            #    - data_query 用于获取数据列表
-            #    - count_query 用于获取总记录数
-            data_query = select(*self.normalized_columns)
-            count_query = select(func.count()).select_from(table)
-
-            # 3. 添加筛选条件 (where)
-            where_clauses = []
-            if keyword:
-                # `keyword` 用于模糊搜索标题
-                where_clauses.append(table.c.title.like(f"%{keyword}%"))
-            if source_keyword:
-                # `source_keyword` 用于精确匹配源关键词
-                where_clauses.append(table.c.source_keyword == source_keyword)
-
-            # 如果有筛选条件，应用到两个查询上
-            if where_clauses:
-                data_query = data_query.where(*where_clauses)
-                count_query = count_query.where(*where_clauses)
-
-            # 4. 执行总数查询 (在应用分页之前！)
-            total_count_result = await session.execute(count_query)
-            total_count = total_count_result.scalar_one_or_none() or 0
-
-            if total_count == 0:
-                # 如果总数为0，没必要继续查数据，直接返回空列表
-                return {"total": 0, "list": []}
-
-            # 5. 添加排序 (order_by)
-            sort_column = next((c for c in self.normalized_columns if c.name == sort_by), None)
-            if sort_column is not None:
-                data_query = data_query.order_by(desc(sort_column))
-
-            # 6. 添加分页 (limit / offset) - 这才是分页的关键！
-            #    - offset: 跳过多少条记录
-            #    - limit:  最多取多少条记录
-            offset = (page - 1) * page_size
-            data_query = data_query.offset(offset).limit(page_size)
-
-            # 7. 执行最终的数据查询
-            data_result = await session.execute(data_query)
-
-            # 8. 组装并返回最终结果
-            data_list = [dict(row._mapping) for row in data_result.all()]
-
-            return {
-                "total": total_count,
-                "list": data_list
-            }
+                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await paginate_platform_list(
+            "bili", keyword=keyword, source_keyword=source_keyword, sort_by=sort_by,
+            page=page, page_size=page_size, cursor=cursor,
+        )
+
+    async def flush(self):
+        await BulkUpsertWriter.get_instance().flush()
 
     async def store_content(self, content_item: Dict):
         """
@@ -189,19 +164,8 @@ class BiliDbStoreImplement(AbstractStore,BaseStore):
         Args:
             content_item: content item dict
         """
-        video_id = content_item.get("video_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = BilibiliVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
+        content_item["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(BilibiliVideo, content_item, key_columns=("video_id",))
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -209,19 +173,20 @@ class BiliDbStoreImplement(AbstractStore,BaseStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = BilibiliVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(BilibiliVideoComment, comment_item, key_columns=("comment_id",))
+
+    async def store_contents(self, content_items: List[Dict]):
+        now_ts = utils.get_current_timestamp()
+        for content_item in content_items:
+            content_item["add_ts"] = now_ts
+        await BulkUpsertWriter.get_instance().add_many(BilibiliVideo, content_items, key_columns=("video_id",))
+
+    async def store_comments(self, comment_items: List[Dict]):
+        now_ts = utils.get_current_timestamp()
+        for comment_item in comment_items:
+            comment_item["add_ts"] = now_ts
+        await BulkUpsertWriter.get_instance().add_many(BilibiliVideoComment, comment_items, key_columns=("comment_id",))
 
     async def store_creator(self, creator: Dict):
         """
@@ -229,19 +194,8 @@ class BiliDbStoreImplement(AbstractStore,BaseStore):
         Args:
             creator: creator item dict
         """
-        creator_id = creator.get("user_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpInfo).where(BilibiliUpInfo.user_id == creator_id))
-            creator_detail = result.scalar_one_or_none()
-
-            if not creator_detail:
-                creator["add_ts"] = utils.get_current_timestamp()
-                new_creator = BilibiliUpInfo(**creator)
-                session.add(new_creator)
-            else:
-                for key, value in creator.items():
-                    setattr(creator_detail, key, value)
-            await session.commit()
+        creator["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(BilibiliUpInfo, creator, key_columns=("user_id",))
 
     async def store_contact(self, contact_item: Dict):
         """
@@ -249,22 +203,8 @@ class BiliDbStoreImplement(AbstractStore,BaseStore):
         Args:
             contact_item: contact item dict
         """
-        up_id = contact_item.get("up_id")
-        fan_id = contact_item.get("fan_id")
-        async with get_session() as session:
-            result = await session.execute(
-                select(BilibiliContactInfo).where(BilibiliContactInfo.up_id == up_id, BilibiliContactInfo.fan_id == fan_id)
-            )
-            contact_detail = result.scalar_one_or_none()
-
-            if not contact_detail:
-                contact_item["add_ts"] = utils.get_current_timestamp()
-                new_contact = BilibiliContactInfo(**contact_item)
-                session.add(new_contact)
-            else:
-                for key, value in contact_item.items():
-                    setattr(contact_detail, key, value)
-            await session.commit()
+        contact_item["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(BilibiliContactInfo, contact_item, key_columns=("up_id", "fan_id"))
 
     async def store_dynamic(self, dynamic_item):
         """
@@ -272,19 +212,8 @@ class BiliDbStoreImplement(AbstractStore,BaseStore):
         Args:
             dynamic_item: dynamic item dict
         """
-        dynamic_id = dynamic_item.get("dynamic_id")
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliUpDynamic).where(BilibiliUpDynamic.dynamic_id == dynamic_id))
-            dynamic_detail = result.scalar_one_or_none()
-
-            if not dynamic_detail:
-                dynamic_item["add_ts"] = utils.get_current_timestamp()
-                new_dynamic = BilibiliUpDynamic(**dynamic_item)
-                session.add(new_dynamic)
-            else:
-                for key, value in dynamic_item.items():
-                    setattr(dynamic_detail, key, value)
-            await session.commit()
+        dynamic_item["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(BilibiliUpDynamic, dynamic_item, key_columns=("dynamic_id",))
 
 
 class BiliJsonStoreImplement(AbstractStore):
@@ -294,6 +223,9 @@ class BiliJsonStoreImplement(AbstractStore):
             platform="bili"
         )
 
+    async def flush(self):
+        await self.file_writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         content JSON storage implementation
@@ -322,6 +254,22 @@ class BiliJsonStoreImplement(AbstractStore):
             item_type="comments"
         )
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to json file, one read/write per batch
+        :param content_items:
+        :return:
+        """
+        await self.file_writer.write_items_to_json(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to json file, one read/write per batch
+        :param comment_items:
+        :return:
+        """
+        await self.file_writer.write_items_to_json(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         creator JSON storage implementation
@@ -376,6 +324,15 @@ class BiliMongoStoreImplement(AbstractStore):
     def __init__(self):
         self.mongo_store = MongoDBStoreBase(collection_prefix="bilibili")
 
+    async def open(self):
+        await self.mongo_store.ensure_indexes()
+
+    async def flush(self):
+        await MongoBulkWriter.get_instance().flush()
+
+    async def close(self):
+        await MongoBulkWriter.close_all()
+
     async def store_content(self, content_item: Dict):
         """
         存储视频内容到MongoDB
@@ -386,11 +343,7 @@ class BiliMongoStoreImplement(AbstractStore):
         if not video_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="contents",
-            query={"video_id": video_id},
-            data=content_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="video_id", items=[content_item])
         utils.logger.info(f"[BiliMongoStoreImplement.store_content] Saved video {video_id} to MongoDB")
 
     async def store_comment(self, comment_item: Dict):
@@ -403,13 +356,27 @@ class BiliMongoStoreImplement(AbstractStore):
         if not comment_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="comments",
-            query={"comment_id": comment_id},
-            data=comment_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=[comment_item])
         utils.logger.info(f"[BiliMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量存储内容到MongoDB，一次 bulk_write
+        Args:
+            content_items: 内容数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="video_id", items=content_items)
+        utils.logger.info(f"[BiliMongoStoreImplement.store_contents] Saved {len(content_items)} contents to MongoDB")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量存储评论到MongoDB，一次 bulk_write
+        Args:
+            comment_items: 评论数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=comment_items)
+        utils.logger.info(f"[BiliMongoStoreImplement.store_comments] Saved {len(comment_items)} comments to MongoDB")
+
     async def store_creator(self, creator_item: Dict):
         """
         存储UP主信息到MongoDB
@@ -420,11 +387,7 @@ class BiliMongoStoreImplement(AbstractStore):
         if not user_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="creators",
-            query={"user_id": user_id},
-            data=creator_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="creators", key_field="user_id", items=[creator_item])
         utils.logger.info(f"[BiliMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
 
 
@@ -21,9 +21,12 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 18:46
 # @Desc    :
-from typing import List
+from typing import List, Optional
 
 import config
+from store.media_store import ContentAddressedMediaStore
+from store.store_manager import StoreManager
+from tools.media_downloader import MediaDownloader
 from var import source_keyword_var
 
 from ._store_impl import *
@@ -35,6 +38,7 @@ class DouyinStoreFactory:
         "csv": DouyinCsvStoreImplement,
         "db": DouyinDbStoreImplement,
         "json": DouyinJsonStoreImplement,
+        "jsonl": DouyinJsonStoreImplement,
         "sqlite": DouyinSqliteStoreImplement,
         "mongodb": DouyinMongoStoreImplement,
         "excel": DouyinExcelStoreImplement,
@@ -44,8 +48,8 @@ class DouyinStoreFactory:
     def create_store() -> AbstractStore:
         store_class = DouyinStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[DouyinStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+            raise ValueError("[DouyinStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("douyin", store_class)
 
 
 def _extract_note_image_list(aweme_detail: Dict) -> List[str]:
@@ -189,15 +193,21 @@ async def update_douyin_aweme(aweme_item: Dict):
 async def batch_update_dy_aweme_comments(aweme_id: str, comments: List[Dict]):
     if not comments:
         return
-    for comment_item in comments:
-        await update_dy_aweme_comment(aweme_id, comment_item)
+    save_comment_items = [_build_dy_aweme_comment(aweme_id, comment_item) for comment_item in comments]
+    await DouyinStoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
 async def update_dy_aweme_comment(aweme_id: str, comment_item: Dict):
+    save_comment_item = _build_dy_aweme_comment(aweme_id, comment_item)
+    if save_comment_item:
+        await DouyinStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+
+
+def _build_dy_aweme_comment(aweme_id: str, comment_item: Dict) -> Optional[Dict]:
     comment_aweme_id = comment_item.get("aweme_id")
     if aweme_id != comment_aweme_id:
         utils.logger.error(f"[store.douyin.update_dy_aweme_comment] comment_aweme_id: {comment_aweme_id} != aweme_id: {aweme_id}")
-        return
+        return None
     user_info = comment_item.get("user", {})
     comment_id = comment_item.get("cid")
     parent_comment_id = comment_item.get("reply_id", "0")
@@ -222,8 +232,7 @@ async def update_dy_aweme_comment(aweme_id: str, comment_item: Dict):
         "pictures": ",".join(_extract_comment_image_list(comment_item)),
     }
     utils.logger.info(f"[store.douyin.update_dy_aweme_comment] douyin aweme comment: {comment_id}, content: {save_comment_item.get('content')}")
-
-    await DouyinStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -275,3 +284,25 @@ async def update_dy_aweme_video(aweme_id, video_content, extension_file_name):
     """
 
     await DouYinVideo().store_video({"aweme_id": aweme_id, "video_content": video_content, "extension_file_name": extension_file_name})
+
+
+async def download_dy_aweme_media(aweme_id: str, url: str, extension_file_name: str, proxy: Optional[str] = None):
+    """
+    提交抖音图片/视频下载任务，由 MediaDownloader 在后台流式写盘
+    Args:
+        aweme_id:
+        url: 媒体地址
+        extension_file_name: 如 000.jpeg / video.mp4，按后缀决定保存到图片还是视频目录
+        proxy: httpx 代理URL
+
+    Returns:
+
+    """
+    if config.ENABLE_MEDIA_DEDUP:
+        await ContentAddressedMediaStore.get_instance("douyin").submit(aweme_id, extension_file_name, url, proxy=proxy)
+        return
+    if extension_file_name.endswith(".mp4"):
+        save_path = DouYinVideo().make_save_file_name(aweme_id, extension_file_name)
+    else:
+        save_path = DouYinImage().make_save_file_name(aweme_id, extension_file_name)
+    await MediaDownloader.get_instance().submit(url, save_path, proxy=proxy)
@@ -44,9 +44,20 @@ try:
 except ImportError:
     EXCEL_AVAILABLE = False
 
+import config
 from base.base_crawler import AbstractStore
 from tools import utils
 
+if EXCEL_AVAILABLE:
+    # Style objects are immutable in openpyxl, share one instance across all cells
+    THIN_BORDER = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    BODY_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+
 
 class ExcelStoreBase(AbstractStore):
     """
@@ -74,7 +85,11 @@ class ExcelStoreBase(AbstractStore):
         key = f"{platform}_{crawler_type}"
         with cls._lock:
             if key not in cls._instances:
-                cls._instances[key] = cls(platform, crawler_type)
+                store_cls = cls
+                if cls is ExcelStoreBase and config.EXCEL_STREAMING_MODE:
+                    from store.excel_streaming_store import ExcelStreamingStore
+                    store_cls = ExcelStreamingStore
+                cls._instances[key] = store_cls(platform, crawler_type)
             return cls._instances[key]
 
     @classmethod
@@ -134,6 +149,9 @@ class ExcelStoreBase(AbstractStore):
         self.contacts_sheet = None
         self.dynamics_sheet = None
 
+        # Next data row per sheet title, avoids scanning sheet.max_row for every row
+        self._next_row: Dict[str, int] = {}
+
         # Generate filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.filename = self.data_dir / f"{platform}_{crawler_type}_{timestamp}.xlsx"
@@ -198,6 +216,7 @@ class ExcelStoreBase(AbstractStore):
             sheet.cell(row=1, column=col_num, value=header)
 
         self._apply_header_style(sheet)
+        self._next_row[sheet.title] = 2
 
     def _write_row(self, sheet, data: Dict[str, Any], headers: List[str]):
         """
@@ -208,7 +227,8 @@ class ExcelStoreBase(AbstractStore):
             data: Data dictionary
             headers: List of header names (defines column order)
         """
-        row_num = sheet.max_row + 1
+        row_num = self._next_row.get(sheet.title) or sheet.max_row + 1
+        self._next_row[sheet.title] = row_num + 1
 
         for col_num, header in enumerate(headers, 1):
             value = data.get(header, "")
@@ -222,13 +242,8 @@ class ExcelStoreBase(AbstractStore):
             cell = sheet.cell(row=row_num, column=col_num, value=value)
 
             # Apply basic formatting
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+            cell.alignment = BODY_ALIGNMENT
+            cell.border = THIN_BORDER
 
     async def store_content(self, content_item: Dict):
         """
@@ -272,6 +287,40 @@ class ExcelStoreBase(AbstractStore):
 
         utils.logger.info(f"[ExcelStoreBase] Stored comment to Excel: {comment_item.get('comment_id', 'N/A')}")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        Store a batch of content rows to Excel with a single log line
+
+        Args:
+            content_items: List of content data dictionaries
+        """
+        if not content_items:
+            return
+        headers = list(content_items[0].keys())
+        if not self.contents_headers_written:
+            self._write_headers(self.contents_sheet, headers)
+            self.contents_headers_written = True
+        for content_item in content_items:
+            self._write_row(self.contents_sheet, content_item, headers)
+        utils.logger.info(f"[ExcelStoreBase] Stored {len(content_items)} contents to Excel")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        Store a batch of comment rows to Excel with a single log line
+
+        Args:
+            comment_items: List of comment data dictionaries
+        """
+        if not comment_items:
+            return
+        headers = list(comment_items[0].keys())
+        if not self.comments_headers_written:
+            self._write_headers(self.comments_sheet, headers)
+            self.comments_headers_written = True
+        for comment_item in comment_items:
+            self._write_row(self.comments_sheet, comment_item, headers)
+        utils.logger.info(f"[ExcelStoreBase] Stored {len(comment_items)} comments to Excel")
+
     async def store_creator(self, creator: Dict):
         """
         Store creator data to Excel
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/store/excel_streaming_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Streaming Excel Store Implementation
+Writes rows through openpyxl write-only worksheets so memory stays flat on large crawls
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+    EXCEL_AVAILABLE = True
+except ImportError:
+    EXCEL_AVAILABLE = False
+
+import config
+from store.excel_store_base import ExcelStoreBase
+from tools import utils
+
+HEADER_STYLE_NAME = "mc_header"
+BODY_STYLE_NAME = "mc_body"
+MIN_COLUMN_WIDTH = 10
+MAX_COLUMN_WIDTH = 50
+
+
+def _build_named_styles() -> List["NamedStyle"]:
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    header = NamedStyle(
+        name=HEADER_STYLE_NAME,
+        font=Font(bold=True, color="FFFFFF", size=11),
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+        border=border,
+    )
+    body = NamedStyle(
+        name=BODY_STYLE_NAME,
+        alignment=Alignment(vertical="top", wrap_text=True),
+        border=border,
+    )
+    return [header, body]
+
+
+class _StreamingSheet:
+    """
+    Per-sheet state that survives checkpoints: headers, tracked column widths and
+    the rows buffered before the write-only worksheet of the current part is opened
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self.headers: List[str] = []
+        self.widths: List[int] = []
+        self.pending: List[List[Any]] = []
+        self.worksheet = None
+        self.rows_written = 0
+
+    def track_widths(self, values: List[Any]):
+        for index, value in enumerate(values):
+            length = len(str(value)) + 2
+            if index >= len(self.widths):
+                self.widths.append(MIN_COLUMN_WIDTH)
+            if length > self.widths[index]:
+                self.widths[index] = min(length, MAX_COLUMN_WIDTH)
+
+
+class ExcelStreamingStore(ExcelStoreBase):
+    """
+    Streaming variant of ExcelStoreBase, enabled with EXCEL_STREAMING_MODE
+
+    - Sheets are openpyxl write-only worksheets, rows go to temp files instead of staying in memory
+    - Cells use shared named styles registered once per workbook
+    - Column widths are tracked incrementally; the first EXCEL_COLUMN_WIDTH_SAMPLE_ROWS rows of a sheet
+      are buffered so the widths are known before the sheet header is written
+    - Every EXCEL_CHECKPOINT_ROWS rows the current workbook is saved as a finished part file
+      (xxx.xlsx, xxx_part2.xlsx, ...) so a crash only loses the rows since the last checkpoint
+    """
+
+    def __init__(self, platform: str, crawler_type: str = "search"):
+        if not EXCEL_AVAILABLE:
+            raise ImportError(
+                "openpyxl is required for Excel export. "
+                "Install it with: pip install openpyxl"
+            )
+
+        self.platform = platform
+        self.crawler_type = crawler_type
+
+        self.data_dir = Path("data") / platform
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        # Sheets are created lazily in each part, so empty sheets never reach the file
+        self.workbook = None
+        self.contents_sheet = _StreamingSheet("Contents")
+        self.comments_sheet = _StreamingSheet("Comments")
+        self.creators_sheet = _StreamingSheet("Creators")
+        self.contacts_sheet = _StreamingSheet("Contacts")
+        self.dynamics_sheet = _StreamingSheet("Dynamics")
+        self._sheets = [
+            self.contents_sheet, self.comments_sheet, self.creators_sheet, self.contacts_sheet, self.dynamics_sheet,
+        ]
+
+        self.contents_headers_written = False
+        self.comments_headers_written = False
+        self.creators_headers_written = False
+        self.contacts_headers_written = False
+        self.dynamics_headers_written = False
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.filename = self.data_dir / f"{platform}_{crawler_type}_{timestamp}.xlsx"
+        self.part_files: List[Path] = []
+        self._rows_in_part = 0
+
+        utils.logger.info(f"[ExcelStreamingStore] Initialized streaming Excel export to: {self.filename}")
+
+    def _write_headers(self, sheet: _StreamingSheet, headers: List[str]):
+        """
+        Remember the headers of a sheet, they are written when the sheet is opened in a part
+        """
+        sheet.headers = list(headers)
+        sheet.track_widths(sheet.headers)
+
+    def _write_row(self, sheet: _StreamingSheet, data: Dict[str, Any], headers: List[str]):
+        """
+        Buffer or append one data row and checkpoint when the part is full
+        """
+        values = []
+        for header in headers:
+            value = data.get(header, "")
+            if isinstance(value, (list, dict)):
+                value = str(value)
+            elif value is None:
+                value = ""
+            values.append(value)
+        sheet.track_widths(values)
+
+        if sheet.worksheet is None and sheet.rows_written == 0 \
+                and len(sheet.pending) < config.EXCEL_COLUMN_WIDTH_SAMPLE_ROWS:
+            sheet.pending.append(values)
+        else:
+            self._append(sheet, values)
+
+        self._rows_in_part += 1
+        if self._rows_in_part >= config.EXCEL_CHECKPOINT_ROWS:
+            self.checkpoint()
+
+    def _ensure_workbook(self):
+        if self.workbook is None:
+            self.workbook = openpyxl.Workbook(write_only=True)
+            for style in _build_named_styles():
+                self.workbook.add_named_style(style)
+
+    def _open_sheet(self, sheet: _StreamingSheet):
+        self._ensure_workbook()
+        worksheet = self.workbook.create_sheet(sheet.title)
+        # Column widths must be set before the first row of a write-only sheet
+        for index, width in enumerate(sheet.widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+        worksheet.append([self._make_cell(worksheet, header, HEADER_STYLE_NAME) for header in sheet.headers])
+        sheet.worksheet = worksheet
+        pending, sheet.pending = sheet.pending, []
+        for values in pending:
+            self._append(sheet, values)
+
+    def _append(self, sheet: _StreamingSheet, values: List[Any]):
+        if sheet.worksheet is None:
+            self._open_sheet(sheet)
+        worksheet = sheet.worksheet
+        worksheet.append([self._make_cell(worksheet, value, BODY_STYLE_NAME) for value in values])
+        sheet.rows_written += 1
+
+    @staticmethod
+    def _make_cell(worksheet, value: Any, style_name: str):
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.style = style_name
+        return cell
+
+    def _next_part_path(self) -> Path:
+        if not self.part_files:
+            return self.filename
+        return self.filename.with_name(f"{self.filename.stem}_part{len(self.part_files) + 1}{self.filename.suffix}")
+
+    def checkpoint(self) -> Optional[Path]:
+        """
+        Save the rows written since the last checkpoint as a finished part file
+
+        Returns:
+            Path of the saved part, None when there was nothing to save
+        """
+        for sheet in self._sheets:
+            if sheet.pending:
+                self._open_sheet(sheet)
+
+        if self.workbook is None:
+            return None
+
+        part_path = self._next_part_path()
+        self.workbook.save(part_path)
+        self.part_files.append(part_path)
+        utils.logger.info(f"[ExcelStreamingStore] Saved Excel part with {self._rows_in_part} rows: {part_path}")
+
+        # Write-only workbooks can only be saved once, later rows go to a new part
+        self.workbook = None
+        self._rows_in_part = 0
+        for sheet in self._sheets:
+            sheet.worksheet = None
+        return part_path
+
+    def flush(self):
+        """
+        Save the remaining rows as the last part file
+        """
+        try:
+            if self.checkpoint() is None and not self.part_files:
+                utils.logger.info(f"[ExcelStreamingStore] No data to save, skipping file creation: {self.filename}")
+        except Exception as e:
+            utils.logger.error(f"[ExcelStreamingStore] Error saving Excel file: {e}")
+            raise
@@ -25,6 +25,7 @@
 from typing import List
 
 import config
+from store.store_manager import StoreManager
 from var import source_keyword_var
 
 from ._store_impl import *
@@ -35,6 +36,7 @@ class KuaishouStoreFactory:
         "csv": KuaishouCsvStoreImplement,
         "db": KuaishouDbStoreImplement,
         "json": KuaishouJsonStoreImplement,
+        "jsonl": KuaishouJsonStoreImplement,
         "sqlite": KuaishouSqliteStoreImplement,
         "mongodb": KuaishouMongoStoreImplement,
         "excel": KuaishouExcelStoreImplement,
@@ -45,8 +47,8 @@ class KuaishouStoreFactory:
         store_class = KuaishouStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[KuaishouStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+                "[KuaishouStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("kuaishou", store_class)
 
 
 async def update_kuaishou_video(video_item: Dict):
@@ -81,11 +83,15 @@ async def batch_update_ks_video_comments(video_id: str, comments: List[Dict]):
     utils.logger.info(f"[store.kuaishou.batch_update_ks_video_comments] video_id:{video_id}, comments:{comments}")
     if not comments:
         return
-    for comment_item in comments:
-        await update_ks_video_comment(video_id, comment_item)
+    save_comment_items = [_build_ks_video_comment(video_id, comment_item) for comment_item in comments]
+    await KuaishouStoreFactory.create_store().store_comments(save_comment_items)
 
 
 async def update_ks_video_comment(video_id: str, comment_item: Dict):
+    await KuaishouStoreFactory.create_store().store_comment(comment_item=_build_ks_video_comment(video_id, comment_item))
+
+
+def _build_ks_video_comment(video_id: str, comment_item: Dict) -> Dict:
     comment_id = comment_item.get("commentId")
     save_comment_item = {
         "comment_id": comment_id,
@@ -100,7 +106,7 @@ async def update_ks_video_comment(video_id: str, comment_item: Dict):
     }
     utils.logger.info(
         f"[store.kuaishou.update_ks_video_comment] Kuaishou video comment: {comment_id}, content: {save_comment_item.get('content')}")
-    await KuaishouStoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 async def save_creator(user_id: str, creator: Dict):
     ownerCount = creator.get('ownerCount', {})
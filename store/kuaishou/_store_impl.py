@@ -27,8 +27,9 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
+from database.bulk_writer import BulkUpsertWriter
 from database.data_registry import PLATFORM_MODELS
 from store.BaseStore import BaseStore
 from tools.async_file_writer import AsyncFileWriter
@@ -39,10 +40,11 @@ from sqlalchemy import select, func, desc
 import config
 from base.base_crawler import AbstractStore
 from database.db_session import get_session
+from database.pagination import get_paginated_list as paginate_platform_list
 from database.models import KuaishouVideo, KuaishouVideoComment
 from tools import utils, words
 from var import crawler_type_var
-from database.mongodb_store_base import MongoDBStoreBase
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
 
 
 def calculate_number_of_files(file_store_path: str) -> int:
@@ -65,6 +67,9 @@ class KuaishouCsvStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="kuaishou", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         Kuaishou content CSV storage implementation
@@ -87,6 +92,22 @@ class KuaishouCsvStoreImplement(AbstractStore):
         """
         await self.writer.write_to_csv(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to csv file, one file open per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to csv file, one file open per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         pass
 
@@ -96,83 +117,39 @@ class KuaishouDbStoreImplement(AbstractStore,BaseStore):
         super().__init__(**kwargs)
         _, self.normalized_columns = PLATFORM_MODELS["ks"]
     async def get_paginated_list(self, *, keyword: Optional[str] = None, source_keyword: Optional[str] = None,
-                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10) -> Dict[str, Any]:
-        async with get_session() as session:
-            # 1. 定义要查询的表
-            table = KuaishouVideo.__table__
-
-            # 2. 构建基础查询语句
-            #    - data_query 用于获取数据列表
-            #    - count_query 用于获取总记录数
-            data_query = select(*self.normalized_columns)
-            count_query = select(func.count()).select_from(table)
-
-            # 3. 添加筛选条件 (where)
-            where_clauses = []
-            if keyword:
-                # `keyword` 用于模糊搜索标题
-                where_clauses.append(table.c.title.like(f"%{keyword}%"))
-            if source_keyword:
-                # `source_keyword` 用于精确匹配源关键词
-                where_clauses.append(table.c.source_keyword == source_keyword)
-
-            # 如果有筛选条件，应用到两个查询上
-            if where_clauses:
-                data_query = data_query.where(*where_clauses)
-                count_query = count_query.where(*where_clauses)
-
-            # 4. 执行总数查询 (在应用分页之前！)
-            total_count_result = await session.execute(count_query)
-            total_count = total_count_result.scalar_one_or_none() or 0
-
-            if total_count == 0:
-                # 如果总数为0，没必要继续查数据，直接返回空列表
-                return {"total": 0, "list": []}
-
-            # 5. 添加排序 (order_by)
-            sort_column = next((c for c in self.normalized_columns if c.name == sort_by), None)
-            if sort_column is not None:
-                data_query = data_query.order_by(desc(sort_column))
-
-            # 6. 添加分页 (limit / offset) - 这才是分页的关键！
-            #    - offset: 跳过多少条记录
-            #    - limit:  最多取多少条记录
-            offset = (page - 1) * page_size
-            data_query = data_query.offset(offset).limit(page_size)
-
-            # 7. 执行最终的数据查询
-            data_result = await session.execute(data_query)
-
-            # 8. 组装并返回最终结果
-            data_list = [dict(row._mapping) for row in data_result.all()]
-
-            return {
-                "total": total_count,
-                "list": data_list
-            }
+                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await paginate_platform_list(
+            "ks", keyword=keyword, source_keyword=source_keyword, sort_by=sort_by,
+            page=page, page_size=page_size, cursor=cursor,
+        )
+
+    async def store_contents(self, content_items: List[Dict]):
+        now_ts = utils.get_current_timestamp()
+        for content_item in content_items:
+            content_item["add_ts"] = now_ts
+        await BulkUpsertWriter.get_instance().add_many(KuaishouVideo, content_items, key_columns=("video_id",))
+
+    async def store_comments(self, comment_items: List[Dict]):
+        now_ts = utils.get_current_timestamp()
+        for comment_item in comment_items:
+            comment_item["add_ts"] = now_ts
+        await BulkUpsertWriter.get_instance().add_many(KuaishouVideoComment, comment_items, key_columns=("comment_id",))
 
     async def store_creator(self, creator: Dict):
         pass
 
+    async def flush(self):
+        await BulkUpsertWriter.get_instance().flush()
+
     async def store_content(self, content_item: Dict):
         """
         Kuaishou content DB storage implementation
         Args:
             content_item: content item dict
         """
-        video_id = content_item.get("video_id")
-        async with get_session() as session:
-            result = await session.execute(select(KuaishouVideo).where(KuaishouVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = KuaishouVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
+        content_item["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(KuaishouVideo, content_item, key_columns=("video_id",))
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -180,20 +157,8 @@ class KuaishouDbStoreImplement(AbstractStore,BaseStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(
-                select(KuaishouVideoComment).where(KuaishouVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = KuaishouVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(KuaishouVideoComment, comment_item, key_columns=("comment_id",))
 
 
 class KuaishouJsonStoreImplement(AbstractStore):
@@ -201,6 +166,9 @@ class KuaishouJsonStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="kuaishou", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         content JSON storage implementation
@@ -223,6 +191,22 @@ class KuaishouJsonStoreImplement(AbstractStore):
         """
         await self.writer.write_single_item_to_json(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to json file, one read/write per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to json file, one read/write per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         pass
 
@@ -238,6 +222,15 @@ class KuaishouMongoStoreImplement(AbstractStore):
     def __init__(self):
         self.mongo_store = MongoDBStoreBase(collection_prefix="kuaishou")
 
+    async def open(self):
+        await self.mongo_store.ensure_indexes()
+
+    async def flush(self):
+        await MongoBulkWriter.get_instance().flush()
+
+    async def close(self):
+        await MongoBulkWriter.close_all()
+
     async def store_content(self, content_item: Dict):
         """
         存储视频内容到MongoDB
@@ -248,11 +241,7 @@ class KuaishouMongoStoreImplement(AbstractStore):
         if not video_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="contents",
-            query={"video_id": video_id},
-            data=content_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="video_id", items=[content_item])
         utils.logger.info(f"[KuaishouMongoStoreImplement.store_content] Saved video {video_id} to MongoDB")
 
     async def store_comment(self, comment_item: Dict):
@@ -265,13 +254,27 @@ class KuaishouMongoStoreImplement(AbstractStore):
         if not comment_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="comments",
-            query={"comment_id": comment_id},
-            data=comment_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=[comment_item])
         utils.logger.info(f"[KuaishouMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量存储内容到MongoDB，一次 bulk_write
+        Args:
+            content_items: 内容数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="video_id", items=content_items)
+        utils.logger.info(f"[KuaishouMongoStoreImplement.store_contents] Saved {len(content_items)} contents to MongoDB")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量存储评论到MongoDB，一次 bulk_write
+        Args:
+            comment_items: 评论数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=comment_items)
+        utils.logger.info(f"[KuaishouMongoStoreImplement.store_comments] Saved {len(comment_items)} comments to MongoDB")
+
     async def store_creator(self, creator_item: Dict):
         """
         存储创作者信息到MongoDB
@@ -282,11 +285,7 @@ class KuaishouMongoStoreImplement(AbstractStore):
         if not user_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="creators",
-            query={"user_id": user_id},
-            data=creator_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="creators", key_field="user_id", items=[creator_item])
         utils.logger.info(f"[KuaishouMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
 
 
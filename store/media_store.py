@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/store/media_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""内容寻址的媒体存储：文件按 SHA-256 命名只保存一份，URL -> 哈希索引让已下载过的 URL 不再发起请求"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from tools import utils
+from tools.media_downloader import MediaDownloader, MediaDownloadTask
+
+# 计算哈希时每次读取的字节数
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ContentAddressedMediaStore:
+    """
+    内容寻址的媒体存储（按平台目录单例）
+
+    目录结构（以小红书为例）:
+        data/xhs/media/blobs/ab/ab12....jpg      以内容 SHA-256 命名，相同内容只保存一份
+        data/xhs/media/manifests/<note_id>.json  {文件名: {"url", "sha256", "path", "size"}}，path 相对于 media 目录
+        data/xhs/media/media_index.db            URL -> SHA-256 索引（SQLite）
+        data/xhs/media/tmp/                      下载中的临时文件
+
+    - 提交前先查 URL 索引，命中且文件仍在时只写清单，不发起任何网络请求
+    - 同一次运行中多条内容引用同一个 URL 时只下载一次
+    - 不同 URL 下载到相同内容时删除新文件，清单指向已有的文件
+    """
+
+    _instances: Dict[str, "ContentAddressedMediaStore"] = {}
+
+    @classmethod
+    def get_instance(cls, platform_dir: str) -> "ContentAddressedMediaStore":
+        """
+        获取平台对应的媒体存储
+        Args:
+            platform_dir: data 下的平台目录名，如 xhs / douyin / bili / weibo
+        """
+        if platform_dir not in cls._instances:
+            cls._instances[platform_dir] = cls(os.path.join("data", platform_dir, "media"))
+        return cls._instances[platform_dir]
+
+    @classmethod
+    def close_all(cls):
+        """
+        关闭所有索引连接，需在 MediaDownloader.close_all() 之后调用
+        """
+        stores = list(cls._instances.values())
+        cls._instances.clear()
+        for store in stores:
+            store.close()
+
+    def __init__(self, root: str):
+        self.root = root
+        self._conn: Optional[sqlite3.Connection] = None
+        # 索引在事件循环和 asyncio.to_thread 的工作线程中都会访问，读写通过锁串行化
+        self._lock = threading.Lock()
+        self._manifest_locks: Dict[str, asyncio.Lock] = {}
+        # URL -> 等待该 URL 下载完成的 (所属内容 ID, 文件名)
+        self._waiting: Dict[str, List[Tuple[str, str]]] = {}
+        self.hits = 0
+        self.stored = 0
+        self.deduplicated = 0
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(self.root, "media_index.db"), check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS media_urls ("
+                "url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, path TEXT NOT NULL, "
+                "size INTEGER NOT NULL, add_ts INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_media_urls_sha256 ON media_urls (sha256)")
+        return self._conn
+
+    def lookup(self, url: str) -> Optional[Tuple[str, str, int]]:
+        """
+        按 URL 查找已保存的文件
+        Returns:
+            (sha256, 相对路径, 大小)，未下载过或文件已被删除时返回 None
+        """
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT sha256, path, size FROM media_urls WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.root, row[1])):
+            return None
+        return row
+
+    async def submit(self, owner_id, name: str, url: str, headers: Optional[Dict[str, str]] = None,
+                     proxy: Optional[str] = None):
+        """
+        保存一个媒体文件到 owner_id 的清单中，需要下载时交给 MediaDownloader 在后台完成
+        Args:
+            owner_id: 所属内容 ID（笔记/视频 ID）
+            name: 清单中的文件名，如 0.jpg / video.mp4，后缀用于 blob 文件名
+            url: 媒体地址
+            headers: 下载请求头
+            proxy: httpx 代理URL
+        """
+        owner_id = str(owner_id)
+        entry = self.lookup(url)
+        if entry is not None:
+            self.hits += 1
+            await self._add_to_manifest(owner_id, name, url, *entry)
+            return
+
+        waiters = self._waiting.get(url)
+        if waiters is not None:
+            waiters.append((owner_id, name))
+            return
+        self._waiting[url] = [(owner_id, name)]
+        tmp_path = os.path.join(
+            self.root, "tmp", hashlib.sha1(url.encode("utf-8")).hexdigest() + os.path.splitext(name)[1]
+        )
+        await MediaDownloader.get_instance().submit(
+            url, tmp_path, headers=headers, proxy=proxy, callback=self._on_downloaded
+        )
+
+    async def _on_downloaded(self, task: MediaDownloadTask, ok: bool):
+        # 入库完成（URL 索引已写入）后才移出 _waiting，入库期间提交的同一 URL 会追加到等待列表
+        try:
+            if not ok:
+                return
+            sha256, path, size = await asyncio.to_thread(self._ingest, task.url, task.save_path)
+        finally:
+            waiters = self._waiting.pop(task.url, [])
+        for owner_id, name in waiters:
+            await self._add_to_manifest(owner_id, name, task.url, sha256, path, size)
+
+    def _ingest(self, url: str, tmp_path: str) -> Tuple[str, str, int]:
+        """
+        计算下载文件的哈希，移动为 blob（内容已存在时直接删除），并写入 URL 索引
+        """
+        digest = hashlib.sha256()
+        with open(tmp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        size = os.path.getsize(tmp_path)
+
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT path FROM media_urls WHERE sha256 = ? LIMIT 1", (sha256,)
+            ).fetchone()
+        if row is not None and os.path.exists(os.path.join(self.root, row[0])):
+            path = row[0]
+            os.remove(tmp_path)
+            self.deduplicated += 1
+        else:
+            path = f"blobs/{sha256[:2]}/{sha256}{os.path.splitext(tmp_path)[1]}"
+            blob_path = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+            self.stored += 1
+
+        with self._lock:
+            self._get_conn().execute(
+                "INSERT OR REPLACE INTO media_urls (url, sha256, path, size, add_ts) VALUES (?, ?, ?, ?, ?)",
+                (url, sha256, path, size, int(time.time())),
+            )
+        return sha256, path, size
+
+    async def _add_to_manifest(self, owner_id: str, name: str, url: str, sha256: str, path: str, size: int):
+        lock = self._manifest_locks.setdefault(owner_id, asyncio.Lock())
+        entry = {"url": url, "sha256": sha256, "path": path, "size": size}
+        async with lock:
+            await asyncio.to_thread(self._write_manifest, owner_id, name, entry)
+
+    def _write_manifest(self, owner_id: str, name: str, entry: Dict):
+        manifest_path = self.manifest_path(owner_id)
+        manifest = self.read_manifest(owner_id)
+        manifest[name] = entry
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    def manifest_path(self, owner_id) -> str:
+        return os.path.join(self.root, "manifests", f"{owner_id}.json")
+
+    def read_manifest(self, owner_id) -> Dict[str, Dict]:
+        """
+        读取内容的媒体清单，不存在时返回空字典
+        """
+        manifest_path = self.manifest_path(owner_id)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        utils.logger.info(
+            f"[ContentAddressedMediaStore.close] {self.root} index hits: {self.hits}, "
+            f"stored: {self.stored}, deduplicated: {self.deduplicated}"
+        )
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/store/seen_index.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""已入库 ID 索引：启动时从当前存储加载已保存的内容/评论 ID，爬取前跳过新鲜的已知内容"""
+import csv
+import glob
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func, select
+
+import config
+from database.db_session import get_session
+from database.models import (
+    BilibiliVideo,
+    BilibiliVideoComment,
+    DouyinAweme,
+    DouyinAwemeComment,
+    KuaishouVideo,
+    KuaishouVideoComment,
+    TiebaComment,
+    TiebaNote,
+    WeiboNote,
+    WeiboNoteComment,
+    XhsNote,
+    XhsNoteComment,
+    ZhihuComment,
+    ZhihuContent,
+)
+from tools import utils
+
+# 平台 -> (内容表 ID 列, 评论表所属内容 ID 列, 文件存储目录名, 文件记录中的内容 ID 字段)
+PLATFORM_ID_COLUMNS = {
+    "xhs": (XhsNote.note_id, XhsNoteComment.note_id, "xhs", "note_id"),
+    "dy": (DouyinAweme.aweme_id, DouyinAwemeComment.aweme_id, "douyin", "aweme_id"),
+    "ks": (KuaishouVideo.video_id, KuaishouVideoComment.video_id, "kuaishou", "video_id"),
+    "bili": (BilibiliVideo.video_id, BilibiliVideoComment.video_id, "bili", "video_id"),
+    "wb": (WeiboNote.note_id, WeiboNoteComment.note_id, "weibo", "note_id"),
+    "tieba": (TiebaNote.note_id, TiebaComment.note_id, "tieba", "note_id"),
+    "zhihu": (ZhihuContent.content_id, ZhihuComment.content_id, "zhihu", "content_id"),
+}
+
+
+class SeenIndex:
+    """
+    已入库内容 ID 索引（按平台单例）
+
+    - 内容 ID / 评论所属内容 ID -> 最近一次写入时间（秒），只保存 ID 和时间戳，百万级 ID 也只占几十 MB
+    - 最近写入时间在 SEEN_INDEX_FRESHNESS_HOURS 内的内容视为新鲜，跳过详情/评论请求；
+      超出窗口的内容仍会重新爬取，以刷新点赞、评论数等计数
+    - 本次运行中爬到的内容通过 mark_* 加入索引，多个关键词搜到同一内容时只爬一次
+    """
+
+    _instances: Dict[str, "SeenIndex"] = {}
+
+    @classmethod
+    def get_instance(cls, platform: Optional[str] = None) -> "SeenIndex":
+        """
+        获取平台对应的索引
+        Args:
+            platform: 平台，默认取 config.PLATFORM
+        """
+        if platform is None:
+            platform = config.PLATFORM
+        if platform not in cls._instances:
+            cls._instances[platform] = cls(platform)
+        return cls._instances[platform]
+
+    def __init__(self, platform: str):
+        self.platform = platform
+        self._contents: Dict[str, int] = {}
+        self._comments: Dict[str, int] = {}
+        self.skipped_contents = 0
+        self.skipped_comments = 0
+
+    @property
+    def enabled(self) -> bool:
+        return config.ENABLE_SEEN_INDEX and self.platform in PLATFORM_ID_COLUMNS
+
+    async def load(self):
+        """
+        从 SAVE_DATA_OPTION 对应的存储加载已保存的 ID
+        """
+        if not self.enabled:
+            return
+        save_option = config.SAVE_DATA_OPTION
+        try:
+            if save_option in ("db", "sqlite"):
+                await self._load_from_db()
+            elif save_option in ("json", "jsonl", "csv"):
+                self._load_from_files(save_option)
+            else:
+                utils.logger.warning(f"[SeenIndex.load] Save option {save_option} is not supported, index is empty")
+                return
+        except Exception as e:
+            utils.logger.error(f"[SeenIndex.load] Load seen index from {save_option} error: {e}")
+            return
+        utils.logger.info(
+            f"[SeenIndex.load] Loaded {len(self._contents)} contents and "
+            f"{len(self._comments)} commented contents for {self.platform}"
+        )
+
+    async def _load_from_db(self):
+        content_col, comment_col, _, _ = PLATFORM_ID_COLUMNS[self.platform]
+        content_ts = content_col.table.c.last_modify_ts
+        comment_ts = comment_col.table.c.last_modify_ts
+        async with get_session() as session:
+            if session is None:
+                return
+            result = await session.stream(select(content_col, content_ts))
+            async for content_id, ts in result:
+                self._merge(self._contents, content_id, ts)
+            result = await session.stream(select(comment_col, func.max(comment_ts)).group_by(comment_col))
+            async for content_id, ts in result:
+                self._merge(self._comments, content_id, ts)
+
+    def _load_from_files(self, file_type: str):
+        _, _, file_dir, id_field = PLATFORM_ID_COLUMNS[self.platform]
+        base_path = f"data/{file_dir}/{file_type}"
+        for item_type, target in (("contents", self._contents), ("comments", self._comments)):
+            for file_path in glob.glob(os.path.join(base_path, f"*_{item_type}_*.{file_type}")):
+                for record in self._iter_file_records(file_path, file_type):
+                    self._merge(target, record.get(id_field), record.get("last_modify_ts"))
+
+    @staticmethod
+    def _iter_file_records(file_path: str, file_type: str) -> Iterator[Dict]:
+        if file_type == "csv":
+            with open(file_path, encoding="utf-8-sig", newline="") as f:
+                yield from csv.DictReader(f)
+        elif file_type == "jsonl":
+            with open(file_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        else:
+            with open(file_path, encoding="utf-8") as f:
+                try:
+                    records = json.load(f)
+                except json.JSONDecodeError:
+                    return
+            yield from (r for r in records if isinstance(r, dict))
+
+    @staticmethod
+    def _merge(target: Dict[str, int], content_id, ts):
+        if content_id in (None, ""):
+            return
+        try:
+            # last_modify_ts 为毫秒时间戳，索引中按秒保存
+            ts = int(ts) // 1000
+        except (TypeError, ValueError):
+            ts = 0
+        key = str(content_id)
+        if ts > target.get(key, -1):
+            target[key] = ts
+
+    @staticmethod
+    def _is_fresh(target: Dict[str, int], content_id) -> bool:
+        ts = target.get(str(content_id))
+        if ts is None:
+            return False
+        window = config.SEEN_INDEX_FRESHNESS_HOURS * 3600
+        return window <= 0 or time.time() - ts < window
+
+    def content_is_fresh(self, content_id) -> bool:
+        """内容在新鲜窗口内已入库，可跳过详情请求"""
+        return self.enabled and self._is_fresh(self._contents, content_id)
+
+    def comments_are_fresh(self, content_id) -> bool:
+        """内容的评论在新鲜窗口内已入库，可跳过评论请求"""
+        return self.enabled and self._is_fresh(self._comments, content_id)
+
+    def filter_contents(self, items: Iterable, id_getter=lambda x: x) -> List:
+        """
+        过滤掉新鲜的已知内容，返回需要请求详情的条目
+        Args:
+            items: 内容 ID 或包含内容 ID 的对象列表
+            id_getter: 从条目中取内容 ID 的函数
+        """
+        return self._filter(items, id_getter, comments=False)
+
+    def filter_comments(self, items: Iterable, id_getter=lambda x: x) -> List:
+        """
+        过滤掉评论新鲜的已知内容，返回需要请求评论的条目
+        """
+        return self._filter(items, id_getter, comments=True)
+
+    def _filter(self, items: Iterable, id_getter, comments: bool) -> List:
+        items = list(items)
+        if not self.enabled:
+            return items
+        check = self.comments_are_fresh if comments else self.content_is_fresh
+        kept = [item for item in items if not check(id_getter(item))]
+        skipped = len(items) - len(kept)
+        if skipped:
+            if comments:
+                self.skipped_comments += skipped
+            else:
+                self.skipped_contents += skipped
+            utils.logger.info(
+                f"[SeenIndex] Skip {skipped} already stored {'comments' if comments else 'contents'} for {self.platform}"
+            )
+        return kept
+
+    def mark_content(self, content_id):
+        """本次运行已爬取内容详情"""
+        if self.enabled:
+            self._merge(self._contents, content_id, utils.get_current_timestamp())
+
+    def mark_comments(self, content_id):
+        """本次运行已爬取内容评论"""
+        if self.enabled:
+            self._merge(self._comments, content_id, utils.get_current_timestamp())
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "contents": len(self._contents),
+            "commented_contents": len(self._comments),
+            "skipped_contents": self.skipped_contents,
+            "skipped_comments": self.skipped_comments,
+        }
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/store/store_manager.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""存储生命周期管理：每次运行按 (平台, 保存方式, 爬虫类型) 只创建一个存储实例，并提供 open/flush/close 钩子"""
+import inspect
+from typing import Dict, List, Tuple, Type
+
+import config
+from base.base_crawler import AbstractStore
+from tools import utils
+from var import crawler_type_var
+
+
+class StoreManager:
+    """
+    存储实例注册表
+
+    - 各平台 StoreFactory.create_store() 通过 get_store() 取实例，同一 key 下所有记录共用一个存储，
+      CSV/JSON 存储内的 AsyncFileWriter 锁、词云生成器等也因此只创建一次
+    - 爬虫在 start() 中调用 open()，结束时调用 flush_all()，在 close() 中调用 close_all()
+    """
+
+    _stores: Dict[Tuple[str, str, str], AbstractStore] = {}
+    _opened: List[Tuple[str, str, str]] = []
+
+    @staticmethod
+    def _make_key(platform: str) -> Tuple[str, str, str]:
+        return platform, config.SAVE_DATA_OPTION, crawler_type_var.get()
+
+    @classmethod
+    def get_store(cls, platform: str, store_class: Type[AbstractStore]) -> AbstractStore:
+        """
+        获取当前运行中平台对应的存储实例，不存在时创建
+        Args:
+            platform: 平台
+            store_class: SAVE_DATA_OPTION 对应的存储实现类
+
+        Returns:
+            AbstractStore
+        """
+        key = cls._make_key(platform)
+        store = cls._stores.get(key)
+        if store is None:
+            store = store_class()
+            cls._stores[key] = store
+            utils.logger.info(f"[StoreManager.get_store] Created {type(store).__name__} for {key}")
+        return store
+
+    @classmethod
+    async def open(cls, platform: str, store: AbstractStore):
+        """
+        打开存储，同一 key 只打开一次，爬虫在设置 crawler_type 之后调用
+        Args:
+            platform: 平台
+            store: create_store() 返回的存储实例
+        """
+        key = cls._make_key(platform)
+        if key in cls._opened:
+            return
+        await cls._call_hook(store, "open")
+        cls._opened.append(key)
+
+    @classmethod
+    async def flush_all(cls):
+        """
+        把所有存储中缓冲的数据写出，存储保持可用
+        """
+        for key, store in list(cls._stores.items()):
+            try:
+                await cls._call_hook(store, "flush")
+            except Exception as e:
+                utils.logger.error(f"[StoreManager.flush_all] Flush store {key} error: {e}")
+
+    @classmethod
+    async def close_all(cls):
+        """
+        写出缓冲后关闭所有存储并清空注册表，在爬虫退出时调用，可重复调用
+        """
+        stores = list(cls._stores.items())
+        cls._stores.clear()
+        cls._opened.clear()
+        for key, store in stores:
+            try:
+                await cls._call_hook(store, "flush")
+                await cls._call_hook(store, "close")
+            except Exception as e:
+                utils.logger.error(f"[StoreManager.close_all] Close store {key} error: {e}")
+
+    @staticmethod
+    async def _call_hook(store, name: str):
+        # Excel 存储的 flush() 是同步保存整本工作簿，只能在结束时由 ExcelStoreBase.flush_all() 调用一次，这里跳过
+        hook = getattr(store, name, None)
+        if hook is None or not inspect.iscoroutinefunction(hook):
+            return
+        await hook()
@@ -19,9 +19,10 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
+from store.store_manager import StoreManager
 from var import source_keyword_var
 
 from ._store_impl import *
@@ -32,6 +33,7 @@ class TieBaStoreFactory:
         "csv": TieBaCsvStoreImplement,
         "db": TieBaDbStoreImplement,
         "json": TieBaJsonStoreImplement,
+        "jsonl": TieBaJsonStoreImplement,
         "sqlite": TieBaSqliteStoreImplement,
         "mongodb": TieBaMongoStoreImplement,
         "excel": TieBaExcelStoreImplement,
@@ -42,8 +44,8 @@ class TieBaStoreFactory:
         store_class = TieBaStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError(
-                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+                "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("tieba", store_class)
 
 
 async def batch_update_tieba_notes(note_list: List[TiebaNote]):
@@ -57,8 +59,8 @@ async def batch_update_tieba_notes(note_list: List[TiebaNote]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_tieba_note(note_item)
+    save_note_items = [_build_tieba_note(note_item) for note_item in note_list]
+    await TieBaStoreFactory.create_store().store_contents(save_note_items)
 
 
 async def update_tieba_note(note_item: TiebaNote):
@@ -69,13 +71,24 @@ async def update_tieba_note(note_item: TiebaNote):
 
     Returns:
 
+    """
+    await TieBaStoreFactory.create_store().store_content(_build_tieba_note(note_item))
+
+
+def _build_tieba_note(note_item: TiebaNote) -> Dict:
+    """
+    把帖子模型转换为存储格式
+    Args:
+        note_item:
+
+    Returns:
+
     """
     note_item.source_keyword = source_keyword_var.get()
     save_note_item = note_item.model_dump()
     save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
     utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
-
-    await TieBaStoreFactory.create_store().store_content(save_note_item)
+    return save_note_item
 
 
 async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaComment]):
@@ -90,8 +103,8 @@ async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaCom
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_tieba_note_comment(note_id, comment_item)
+    save_comment_items = [_build_tieba_note_comment(note_id, comment_item) for comment_item in comments]
+    await TieBaStoreFactory.create_store().store_comments(save_comment_items)
 
 
 async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
@@ -103,11 +116,24 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
 
     Returns:
 
+    """
+    await TieBaStoreFactory.create_store().store_comment(_build_tieba_note_comment(note_id, comment_item))
+
+
+def _build_tieba_note_comment(note_id: str, comment_item: TiebaComment) -> Dict:
+    """
+    把评论模型转换为存储格式
+    Args:
+        note_id:
+        comment_item:
+
+    Returns:
+
     """
     save_comment_item = comment_item.model_dump()
     save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
     utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
-    await TieBaStoreFactory.create_store().store_comment(save_comment_item)
+    return save_comment_item
 
 
 async def save_creator(user_info: TiebaCreator):
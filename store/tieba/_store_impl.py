@@ -27,20 +27,19 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict
+from typing import Dict, List
 
 import aiofiles
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
 from base.base_crawler import AbstractStore
 from database.models import TiebaNote, TiebaComment, TiebaCreator
 from tools import utils, words
-from database.db_session import get_session
+from database.bulk_writer import BulkUpsertWriter
 from var import crawler_type_var
 from tools.async_file_writer import AsyncFileWriter
-from database.mongodb_store_base import MongoDBStoreBase
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
 
 
 def calculate_number_of_files(file_store_path: str) -> int:
@@ -63,6 +62,9 @@ class TieBaCsvStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="tieba", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         tieba content CSV storage implementation
@@ -85,6 +87,22 @@ class TieBaCsvStoreImplement(AbstractStore):
         """
         await self.writer.write_to_csv(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to csv file, one file open per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to csv file, one file open per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         tieba content CSV storage implementation
@@ -98,24 +116,16 @@ class TieBaCsvStoreImplement(AbstractStore):
 
 
 class TieBaDbStoreImplement(AbstractStore):
+    async def flush(self):
+        await BulkUpsertWriter.get_instance().flush()
+
     async def store_content(self, content_item: Dict):
         """
         tieba content DB storage implementation
         Args:
             content_item: content item dict
         """
-        note_id = content_item.get("note_id")
-        async with get_session() as session:
-            stmt = select(TiebaNote).where(TiebaNote.note_id == note_id)
-            res = await session.execute(stmt)
-            db_note = res.scalar_one_or_none()
-            if db_note:
-                for key, value in content_item.items():
-                    setattr(db_note, key, value)
-            else:
-                db_note = TiebaNote(**content_item)
-                session.add(db_note)
-            await session.commit()
+        await BulkUpsertWriter.get_instance().add(TiebaNote, content_item, key_columns=("note_id",))
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -123,18 +133,13 @@ class TieBaDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(TiebaComment).where(TiebaComment.comment_id == comment_id)
-            res = await session.execute(stmt)
-            db_comment = res.scalar_one_or_none()
-            if db_comment:
-                for key, value in comment_item.items():
-                    setattr(db_comment, key, value)
-            else:
-                db_comment = TiebaComment(**comment_item)
-                session.add(db_comment)
-            await session.commit()
+        await BulkUpsertWriter.get_instance().add(TiebaComment, comment_item, key_columns=("comment_id",))
+
+    async def store_contents(self, content_items: List[Dict]):
+        await BulkUpsertWriter.get_instance().add_many(TiebaNote, content_items, key_columns=("note_id",))
+
+    async def store_comments(self, comment_items: List[Dict]):
+        await BulkUpsertWriter.get_instance().add_many(TiebaComment, comment_items, key_columns=("comment_id",))
 
     async def store_creator(self, creator: Dict):
         """
@@ -142,18 +147,7 @@ class TieBaDbStoreImplement(AbstractStore):
         Args:
             creator: creator dict
         """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            stmt = select(TiebaCreator).where(TiebaCreator.user_id == user_id)
-            res = await session.execute(stmt)
-            db_creator = res.scalar_one_or_none()
-            if db_creator:
-                for key, value in creator.items():
-                    setattr(db_creator, key, value)
-            else:
-                db_creator = TiebaCreator(**creator)
-                session.add(db_creator)
-            await session.commit()
+        await BulkUpsertWriter.get_instance().add(TiebaCreator, creator, key_columns=("user_id",))
 
 
 class TieBaJsonStoreImplement(AbstractStore):
@@ -161,6 +155,9 @@ class TieBaJsonStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="tieba", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         tieba content JSON storage implementation
@@ -183,6 +180,22 @@ class TieBaJsonStoreImplement(AbstractStore):
         """
         await self.writer.write_single_item_to_json(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to json file, one read/write per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to json file, one read/write per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         tieba content JSON storage implementation
@@ -208,6 +221,15 @@ class TieBaMongoStoreImplement(AbstractStore):
     def __init__(self):
         self.mongo_store = MongoDBStoreBase(collection_prefix="tieba")
 
+    async def open(self):
+        await self.mongo_store.ensure_indexes()
+
+    async def flush(self):
+        await MongoBulkWriter.get_instance().flush()
+
+    async def close(self):
+        await MongoBulkWriter.close_all()
+
     async def store_content(self, content_item: Dict):
         """
         存储帖子内容到MongoDB
@@ -218,11 +240,7 @@ class TieBaMongoStoreImplement(AbstractStore):
         if not note_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="contents",
-            query={"note_id": note_id},
-            data=content_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=[content_item])
         utils.logger.info(f"[TieBaMongoStoreImplement.store_content] Saved note {note_id} to MongoDB")
 
     async def store_comment(self, comment_item: Dict):
@@ -235,13 +253,27 @@ class TieBaMongoStoreImplement(AbstractStore):
         if not comment_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="comments",
-            query={"comment_id": comment_id},
-            data=comment_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=[comment_item])
         utils.logger.info(f"[TieBaMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量存储内容到MongoDB，一次 bulk_write
+        Args:
+            content_items: 内容数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=content_items)
+        utils.logger.info(f"[TieBaMongoStoreImplement.store_contents] Saved {len(content_items)} contents to MongoDB")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量存储评论到MongoDB，一次 bulk_write
+        Args:
+            comment_items: 评论数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=comment_items)
+        utils.logger.info(f"[TieBaMongoStoreImplement.store_comments] Saved {len(comment_items)} comments to MongoDB")
+
     async def store_creator(self, creator_item: Dict):
         """
         存储创作者信息到MongoDB
@@ -252,11 +284,7 @@ class TieBaMongoStoreImplement(AbstractStore):
         if not user_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="creators",
-            query={"user_id": user_id},
-            data=creator_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="creators", key_field="user_id", items=[creator_item])
         utils.logger.info(f"[TieBaMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
 
 
@@ -23,8 +23,12 @@
 # @Desc    :
 
 import re
-from typing import List
+from typing import List, Optional
 
+import config
+from store.media_store import ContentAddressedMediaStore
+from store.store_manager import StoreManager
+from tools.media_downloader import MediaDownloader
 from var import source_keyword_var
 
 from .weibo_store_media import *
@@ -36,6 +40,7 @@ class WeibostoreFactory:
         "csv": WeiboCsvStoreImplement,
         "db": WeiboDbStoreImplement,
         "json": WeiboJsonStoreImplement,
+        "jsonl": WeiboJsonStoreImplement,
         "sqlite": WeiboSqliteStoreImplement,
         "mongodb": WeiboMongoStoreImplement,
         "excel": WeiboExcelStoreImplement,
@@ -45,8 +50,8 @@ class WeibostoreFactory:
     def create_store() -> AbstractStore:
         store_class = WeibostoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+            raise ValueError("[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("weibo", store_class)
 
 
 async def batch_update_weibo_notes(note_list: List[Dict]):
@@ -60,8 +65,8 @@ async def batch_update_weibo_notes(note_list: List[Dict]):
     """
     if not note_list:
         return
-    for note_item in note_list:
-        await update_weibo_note(note_item)
+    save_content_items = [_build_weibo_note(note_item) for note_item in note_list]
+    await WeibostoreFactory.create_store().store_contents([item for item in save_content_items if item])
 
 
 async def update_weibo_note(note_item: Dict):
@@ -72,9 +77,23 @@ async def update_weibo_note(note_item: Dict):
 
     Returns:
 
+    """
+    save_content_item = _build_weibo_note(note_item)
+    if save_content_item:
+        await WeibostoreFactory.create_store().store_content(content_item=save_content_item)
+
+
+def _build_weibo_note(note_item: Dict) -> Optional[Dict]:
+    """
+    把接口返回的微博转换为存储格式
+    Args:
+        note_item:
+
+    Returns:
+
     """
     if not note_item:
-        return
+        return None
 
     mblog: Dict = note_item.get("mblog")
     user_info: Dict = mblog.get("user")
@@ -103,7 +122,7 @@ async def update_weibo_note(note_item: Dict):
         "source_keyword": source_keyword_var.get(),
     }
     utils.logger.info(f"[store.weibo.update_weibo_note] weibo note id:{note_id}, title:{save_content_item.get('content')[:24]} ...")
-    await WeibostoreFactory.create_store().store_content(content_item=save_content_item)
+    return save_content_item
 
 
 async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
@@ -118,8 +137,8 @@ async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_weibo_note_comment(note_id, comment_item)
+    save_comment_items = [_build_weibo_note_comment(note_id, comment_item) for comment_item in comments]
+    await WeibostoreFactory.create_store().store_comments([item for item in save_comment_items if item])
 
 
 async def update_weibo_note_comment(note_id: str, comment_item: Dict):
@@ -131,9 +150,24 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
 
     Returns:
 
+    """
+    save_comment_item = _build_weibo_note_comment(note_id, comment_item)
+    if save_comment_item:
+        await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
+
+
+def _build_weibo_note_comment(note_id: str, comment_item: Dict) -> Optional[Dict]:
+    """
+    把接口返回的微博评论转换为存储格式
+    Args:
+        note_id: weibo note id
+        comment_item: weibo comment item
+
+    Returns:
+
     """
     if not comment_item or not note_id:
-        return
+        return None
     comment_id = str(comment_item.get("id"))
     user_info: Dict = comment_item.get("user")
     content_text = comment_item.get("text")
@@ -158,7 +192,7 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
         "avatar": user_info.get("profile_image_url", ""),
     }
     utils.logger.info(f"[store.weibo.update_weibo_note_comment] Weibo note comment: {comment_id}, content: {save_comment_item.get('content', '')[:24]} ...")
-    await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
+    return save_comment_item
 
 
 async def update_weibo_note_image(picid: str, pic_content, extension_file_name):
@@ -175,6 +209,29 @@ async def update_weibo_note_image(picid: str, pic_content, extension_file_name):
     await WeiboStoreImage().store_image({"pic_id": picid, "pic_content": pic_content, "extension_file_name": extension_file_name})
 
 
+async def download_weibo_note_image(picid: str, url: str, extension_file_name: str, proxy: Optional[str] = None,
+                                    note_id: Optional[str] = None):
+    """
+    提交微博图片下载任务，由 MediaDownloader 在后台流式写盘
+    Args:
+        picid:
+        url: 图片地址
+        extension_file_name:
+        proxy: httpx 代理URL
+        note_id: 所属微博 ID，内容寻址存储按微博写清单，未传时按图片 ID
+
+    Returns:
+
+    """
+    if config.ENABLE_MEDIA_DEDUP:
+        await ContentAddressedMediaStore.get_instance("weibo").submit(
+            note_id or picid, f"{picid}.{extension_file_name}", url, proxy=proxy
+        )
+        return
+    save_path = WeiboStoreImage().make_save_file_name(picid, extension_file_name)
+    await MediaDownloader.get_instance().submit(url, save_path, proxy=proxy)
+
+
 async def save_creator(user_id: str, user_info: Dict):
     """
     Save creator information to local
@@ -27,7 +27,7 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
 import aiofiles
 from sqlalchemy import select, func, desc
@@ -35,14 +35,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import BulkUpsertWriter
 from database.data_registry import PLATFORM_MODELS
 from database.models import WeiboCreator, WeiboNote, WeiboNoteComment
 from store.BaseStore import BaseStore
 from tools import utils, words
 from tools.async_file_writer import AsyncFileWriter
 from database.db_session import get_session
+from database.pagination import get_paginated_list as paginate_platform_list
 from var import crawler_type_var
-from database.mongodb_store_base import MongoDBStoreBase
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
 
 
 def calculate_number_of_files(file_store_path: str) -> int:
@@ -65,6 +67,9 @@ class WeiboCsvStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="weibo", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         Weibo content CSV storage implementation
@@ -87,6 +92,22 @@ class WeiboCsvStoreImplement(AbstractStore):
         """
         await self.writer.write_to_csv(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to csv file, one file open per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to csv file, one file open per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         Weibo creator CSV storage implementation
@@ -107,60 +128,15 @@ class WeiboDbStoreImplement(AbstractStore,BaseStore):
 
 
     async def get_paginated_list(self, *, keyword: Optional[str] = None, source_keyword: Optional[str] = None,
-                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10) -> Dict[str, Any]:
-        async with get_session() as session:
-            # 1. 定义要查询的表
-            table = WeiboNote.__table__
-
-            # 2. 构建基础查询语句
-            #    - data_query 用于获取数据列表
-            #    - count_query 用于获取总记录数
-            data_query = select(*self.normalized_columns)
-            count_query = select(func.count()).select_from(table)
-
-            # 3. 添加筛选条件 (where)
-            where_clauses = []
-            if keyword:
-                # `keyword` 用于模糊搜索标题
-                where_clauses.append(table.c.title.like(f"%{keyword}%"))
-            if source_keyword:
-                # `source_keyword` 用于精确匹配源关键词
-                where_clauses.append(table.c.source_keyword == source_keyword)
-
-            # 如果有筛选条件，应用到两个查询上
-            if where_clauses:
-                data_query = data_query.where(*where_clauses)
-                count_query = count_query.where(*where_clauses)
-
-            # 4. 执行总数查询 (在应用分页之前！)
-            total_count_result = await session.execute(count_query)
-            total_count = total_count_result.scalar_one_or_none() or 0
-
-            if total_count == 0:
-                # 如果总数为0，没必要继续查数据，直接返回空列表
-                return {"total": 0, "list": []}
-
-            # 5. 添加排序 (order_by)
-            sort_column = next((c for c in self.normalized_columns if c.name == sort_by), None)
-            if sort_column is not None:
-                data_query = data_query.order_by(desc(sort_column))
-
-            # 6. 添加分页 (limit / offset) - 这才是分页的关键！
-            #    - offset: 跳过多少条记录
-            #    - limit:  最多取多少条记录
-            offset = (page - 1) * page_size
-            data_query = data_query.offset(offset).limit(page_size)
-
-            # 7. 执行最终的数据查询
-            data_result = await session.execute(data_query)
-
-            # 8. 组装并返回最终结果
-            data_list = [dict(row._mapping) for row in data_result.all()]
-
-            return {
-                "total": total_count,
-                "list": data_list
-            }
+                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await paginate_platform_list(
+            "wb", keyword=keyword, source_keyword=source_keyword, sort_by=sort_by,
+            page=page, page_size=page_size, cursor=cursor,
+        )
+
+    async def flush(self):
+        await BulkUpsertWriter.get_instance().flush()
 
     async def store_content(self, content_item: Dict):
         """
@@ -171,22 +147,9 @@ class WeiboDbStoreImplement(AbstractStore,BaseStore):
         Returns:
 
         """
-        note_id = content_item.get("note_id")
-        async with get_session() as session:
-            stmt = select(WeiboNote).where(WeiboNote.note_id == note_id)
-            res = await session.execute(stmt)
-            db_note = res.scalar_one_or_none()
-            if db_note:
-                db_note.last_modify_ts = utils.get_current_timestamp()
-                for key, value in content_item.items():
-                    if hasattr(db_note, key):
-                        setattr(db_note, key, value)
-            else:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                content_item["last_modify_ts"] = utils.get_current_timestamp()
-                db_note = WeiboNote(**content_item)
-                session.add(db_note)
-            await session.commit()
+        content_item["add_ts"] = utils.get_current_timestamp()
+        content_item["last_modify_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(WeiboNote, content_item, key_columns=("note_id",))
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -197,22 +160,23 @@ class WeiboDbStoreImplement(AbstractStore,BaseStore):
         Returns:
 
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(WeiboNoteComment).where(WeiboNoteComment.comment_id == comment_id)
-            res = await session.execute(stmt)
-            db_comment = res.scalar_one_or_none()
-            if db_comment:
-                db_comment.last_modify_ts = utils.get_current_timestamp()
-                for key, value in comment_item.items():
-                    if hasattr(db_comment, key):
-                        setattr(db_comment, key, value)
-            else:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                comment_item["last_modify_ts"] = utils.get_current_timestamp()
-                db_comment = WeiboNoteComment(**comment_item)
-                session.add(db_comment)
-            await session.commit()
+        comment_item["add_ts"] = utils.get_current_timestamp()
+        comment_item["last_modify_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(WeiboNoteComment, comment_item, key_columns=("comment_id",))
+
+    async def store_contents(self, content_items: List[Dict]):
+        now_ts = utils.get_current_timestamp()
+        for content_item in content_items:
+            content_item["add_ts"] = now_ts
+            content_item["last_modify_ts"] = now_ts
+        await BulkUpsertWriter.get_instance().add_many(WeiboNote, content_items, key_columns=("note_id",))
+
+    async def store_comments(self, comment_items: List[Dict]):
+        now_ts = utils.get_current_timestamp()
+        for comment_item in comment_items:
+            comment_item["add_ts"] = now_ts
+            comment_item["last_modify_ts"] = now_ts
+        await BulkUpsertWriter.get_instance().add_many(WeiboNoteComment, comment_items, key_columns=("comment_id",))
 
     async def store_creator(self, creator: Dict):
         """
@@ -223,22 +187,9 @@ class WeiboDbStoreImplement(AbstractStore,BaseStore):
         Returns:
 
         """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            stmt = select(WeiboCreator).where(WeiboCreator.user_id == user_id)
-            res = await session.execute(stmt)
-            db_creator = res.scalar_one_or_none()
-            if db_creator:
-                db_creator.last_modify_ts = utils.get_current_timestamp()
-                for key, value in creator.items():
-                    if hasattr(db_creator, key):
-                        setattr(db_creator, key, value)
-            else:
-                creator["add_ts"] = utils.get_current_timestamp()
-                creator["last_modify_ts"] = utils.get_current_timestamp()
-                db_creator = WeiboCreator(**creator)
-                session.add(db_creator)
-            await session.commit()
+        creator["add_ts"] = utils.get_current_timestamp()
+        creator["last_modify_ts"] = utils.get_current_timestamp()
+        await BulkUpsertWriter.get_instance().add(WeiboCreator, creator, key_columns=("user_id",))
 
 
 class WeiboJsonStoreImplement(AbstractStore):
@@ -246,6 +197,9 @@ class WeiboJsonStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="weibo", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         content JSON storage implementation
@@ -268,6 +222,22 @@ class WeiboJsonStoreImplement(AbstractStore):
         """
         await self.writer.write_single_item_to_json(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to json file, one read/write per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to json file, one read/write per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         creator JSON storage implementation
@@ -293,6 +263,15 @@ class WeiboMongoStoreImplement(AbstractStore):
     def __init__(self):
         self.mongo_store = MongoDBStoreBase(collection_prefix="weibo")
 
+    async def open(self):
+        await self.mongo_store.ensure_indexes()
+
+    async def flush(self):
+        await MongoBulkWriter.get_instance().flush()
+
+    async def close(self):
+        await MongoBulkWriter.close_all()
+
     async def store_content(self, content_item: Dict):
         """
         存储微博内容到MongoDB
@@ -303,11 +282,7 @@ class WeiboMongoStoreImplement(AbstractStore):
         if not note_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="contents",
-            query={"note_id": note_id},
-            data=content_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=[content_item])
         utils.logger.info(f"[WeiboMongoStoreImplement.store_content] Saved note {note_id} to MongoDB")
 
     async def store_comment(self, comment_item: Dict):
@@ -320,13 +295,27 @@ class WeiboMongoStoreImplement(AbstractStore):
         if not comment_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="comments",
-            query={"comment_id": comment_id},
-            data=comment_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=[comment_item])
         utils.logger.info(f"[WeiboMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量存储内容到MongoDB，一次 bulk_write
+        Args:
+            content_items: 内容数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=content_items)
+        utils.logger.info(f"[WeiboMongoStoreImplement.store_contents] Saved {len(content_items)} contents to MongoDB")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量存储评论到MongoDB，一次 bulk_write
+        Args:
+            comment_items: 评论数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=comment_items)
+        utils.logger.info(f"[WeiboMongoStoreImplement.store_comments] Saved {len(comment_items)} comments to MongoDB")
+
     async def store_creator(self, creator_item: Dict):
         """
         存储创作者信息到MongoDB
@@ -337,11 +326,7 @@ class WeiboMongoStoreImplement(AbstractStore):
         if not user_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="creators",
-            query={"user_id": user_id},
-            data=creator_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="creators", key_field="user_id", items=[creator_item])
         utils.logger.info(f"[WeiboMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
 
 
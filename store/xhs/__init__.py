@@ -21,9 +21,12 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 17:34
 # @Desc    :
-from typing import List
+from typing import List, Optional
 
 import config
+from store.media_store import ContentAddressedMediaStore
+from store.store_manager import StoreManager
+from tools.media_downloader import MediaDownloader
 from var import source_keyword_var
 
 from .xhs_store_media import *
@@ -35,6 +38,7 @@ class XhsStoreFactory:
         "csv": XhsCsvStoreImplement,
         "db": XhsDbStoreImplement,
         "json": XhsJsonStoreImplement,
+        "jsonl": XhsJsonStoreImplement,
         "sqlite": XhsSqliteStoreImplement,
         "mongodb": XhsMongoStoreImplement,
         "excel": XhsExcelStoreImplement,
@@ -44,8 +48,8 @@ class XhsStoreFactory:
     def create_store() -> AbstractStore:
         store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+            raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("xhs", store_class)
 
 
 def get_video_url_arr(note_item: Dict) -> List:
@@ -135,8 +139,8 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
-    for comment_item in comments:
-        await update_xhs_note_comment(note_id, comment_item)
+    save_comment_items = [_build_xhs_note_comment(note_id, comment_item) for comment_item in comments]
+    await XhsStoreFactory.create_store().store_comments(save_comment_items)
 
 
 async def update_xhs_note_comment(note_id: str, comment_item: Dict):
@@ -148,6 +152,19 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
 
     Returns:
 
+    """
+    await XhsStoreFactory.create_store().store_comment(_build_xhs_note_comment(note_id, comment_item))
+
+
+def _build_xhs_note_comment(note_id: str, comment_item: Dict) -> Dict:
+    """
+    把接口返回的评论转换为存储格式
+    Args:
+        note_id:
+        comment_item:
+
+    Returns:
+
     """
     user_info = comment_item.get("user_info", {})
     comment_id = comment_item.get("id")
@@ -169,7 +186,7 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
         "like_count": comment_item.get("like_count", 0),
     }
     utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
-    await XhsStoreFactory.create_store().store_comment(local_db_item)
+    return local_db_item
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -249,3 +266,25 @@ async def update_xhs_note_video(note_id, video_content, extension_file_name):
     """
 
     await XiaoHongShuVideo().store_video({"notice_id": note_id, "video_content": video_content, "extension_file_name": extension_file_name})
+
+
+async def download_xhs_note_media(note_id: str, url: str, extension_file_name: str, proxy: Optional[str] = None):
+    """
+    提交小红书笔记图片/视频下载任务，由 MediaDownloader 在后台流式写盘
+    Args:
+        note_id:
+        url: 媒体地址
+        extension_file_name: 如 0.jpg / 0.mp4，按后缀决定保存到图片还是视频目录
+        proxy: httpx 代理URL
+
+    Returns:
+
+    """
+    if config.ENABLE_MEDIA_DEDUP:
+        await ContentAddressedMediaStore.get_instance("xhs").submit(note_id, extension_file_name, url, proxy=proxy)
+        return
+    if extension_file_name.endswith(".mp4"):
+        save_path = XiaoHongShuVideo().make_save_file_name(note_id, extension_file_name)
+    else:
+        save_path = XiaoHongShuImage().make_save_file_name(note_id, extension_file_name)
+    await MediaDownloader.get_instance().submit(url, save_path, proxy=proxy)
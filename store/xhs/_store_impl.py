@@ -24,20 +24,22 @@ import os
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from sqlalchemy import select, update, delete, func, desc
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, desc
 from sqlalchemy.orm import Session
 
 from base.base_crawler import AbstractStore
+from database.bulk_writer import BulkUpsertWriter
 from database.data_registry import PLATFORM_MODELS
 from database.db_session import get_session
+from database.json_codec import normalize_str_list
+from database.pagination import get_paginated_list as paginate_platform_list
 from database.models import XhsNote, XhsNoteComment, XhsCreator
 from store.BaseStore import BaseStore
 
 from tools.async_file_writer import AsyncFileWriter
 from tools.time_util import get_current_timestamp
 from var import crawler_type_var
-from database.mongodb_store_base import MongoDBStoreBase
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
 from tools import utils
 from store.excel_store_base import ExcelStoreBase
 
@@ -48,6 +50,9 @@ class XhsCsvStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="xhs", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         store content data to csv file
@@ -65,10 +70,23 @@ class XhsCsvStoreImplement(AbstractStore):
         await self.writer.write_to_csv(item_type="comments", item=comment_item)
 
 
-    async def store_creator(self, creator_item: Dict):
-        pass
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to csv file, one file open per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="contents", items=content_items)
 
-    def flush(self):
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to csv file, one file open per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="comments", items=comment_items)
+
+    async def store_creator(self, creator_item: Dict):
         pass
 
 
@@ -78,6 +96,9 @@ class XhsJsonStoreImplement(AbstractStore):
         self.writer = AsyncFileWriter(platform="xhs", crawler_type=crawler_type_var.get())
 
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         store content data to json file
@@ -94,14 +115,23 @@ class XhsJsonStoreImplement(AbstractStore):
         """
         await self.writer.write_single_item_to_json(item_type="comments", item=comment_item)
 
-    async def store_creator(self, creator_item: Dict):
-        pass
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to json file, one read/write per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="contents", items=content_items)
 
-    def flush(self):
+    async def store_comments(self, comment_items: List[Dict]):
         """
-        flush data to json file
+        batch store comment data to json file, one read/write per batch
+        :param comment_items:
         :return:
         """
+        await self.writer.write_items_to_json(item_type="comments", items=comment_items)
+
+    async def store_creator(self, creator_item: Dict):
         pass
 
 
@@ -111,82 +141,45 @@ class XhsDbStoreImplement(AbstractStore,BaseStore):
         super().__init__(**kwargs)
         _, self.normalized_columns = PLATFORM_MODELS["xhs"]
 
+    # 记录已存在时只刷新互动数据，与之前的 update_* 行为一致
+    CONTENT_UPDATE_COLUMNS = (
+        "last_modify_ts", "liked_count", "collected_count", "comment_count", "share_count", "last_update_time",
+    )
+    COMMENT_UPDATE_COLUMNS = ("last_modify_ts", "like_count", "sub_comment_count")
+    CREATOR_UPDATE_COLUMNS = (
+        "last_modify_ts", "nickname", "avatar", "desc", "follows", "fans", "interaction", "tag_list",
+    )
+
+    async def flush(self):
+        await BulkUpsertWriter.get_instance().flush()
+
     async def store_content(self, content_item: Dict):
         note_id = content_item.get("note_id")
         if not note_id:
             return
-        async with get_session() as session:
-            if await self.content_is_exist(session, note_id):
-                await self.update_content(session, content_item)
-            else:
-                await self.add_content(session, content_item)
+        await BulkUpsertWriter.get_instance().add(
+            XhsNote, self._content_row(content_item), key_columns=("note_id",),
+            update_columns=self.CONTENT_UPDATE_COLUMNS,
+        )
 
     async def get_paginated_list(self, *, keyword: Optional[str] = None, source_keyword: Optional[str] = None,
-                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10) -> Dict[str, Any]:
-        async with get_session() as session:
-            # 1. 定义要查询的表
-            table = XhsNote.__table__
-
-            # 2. 构建基础查询语句
-            #    - data_query 用于获取数据列表
-            #    - count_query 用于获取总记录数
-            data_query = select(*self.normalized_columns)
-            count_query = select(func.count()).select_from(table)
-
-            # 3. 添加筛选条件 (where)
-            where_clauses = []
-            if keyword:
-                # `keyword` 用于模糊搜索标题
-                where_clauses.append(table.c.title.like(f"%{keyword}%"))
-            if source_keyword:
-                # `source_keyword` 用于精确匹配源关键词
-                where_clauses.append(table.c.source_keyword == source_keyword)
-
-            # 如果有筛选条件，应用到两个查询上
-            if where_clauses:
-                data_query = data_query.where(*where_clauses)
-                count_query = count_query.where(*where_clauses)
-
-            # 4. 执行总数查询 (在应用分页之前！)
-            total_count_result = await session.execute(count_query)
-            total_count = total_count_result.scalar_one_or_none() or 0
-
-            if total_count == 0:
-                # 如果总数为0，没必要继续查数据，直接返回空列表
-                return {"total": 0, "list": []}
-
-            # 5. 添加排序 (order_by)
-            sort_column = next((c for c in self.normalized_columns if c.name == sort_by), None)
-            if sort_column is not None:
-                data_query = data_query.order_by(desc(sort_column))
-
-            # 6. 添加分页 (limit / offset) - 这才是分页的关键！
-            #    - offset: 跳过多少条记录
-            #    - limit:  最多取多少条记录
-            offset = (page - 1) * page_size
-            data_query = data_query.offset(offset).limit(page_size)
-
-            # 7. 执行最终的数据查询
-            data_result = await session.execute(data_query)
-
-            # 8. 组装并返回最终结果
-            data_list = [dict(row._mapping) for row in data_result.all()]
-
-            return {
-                "total": total_count,
-                "list": data_list
-            }
-
-    async def add_content(self, session: AsyncSession, content_item: Dict):
-        add_ts = int(get_current_timestamp())
-        last_modify_ts = int(get_current_timestamp())
-        note = XhsNote(
+                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await paginate_platform_list(
+            "xhs", keyword=keyword, source_keyword=source_keyword, sort_by=sort_by,
+            page=page, page_size=page_size, cursor=cursor,
+        )
+
+    @staticmethod
+    def _content_row(content_item: Dict) -> Dict:
+        now_ts = int(get_current_timestamp())
+        return dict(
             user_id=content_item.get("user_id"),
             nickname=content_item.get("nickname"),
             avatar=content_item.get("avatar"),
             ip_location=content_item.get("ip_location"),
-            add_ts=add_ts,
-            last_modify_ts=last_modify_ts,
+            add_ts=now_ts,
+            last_modify_ts=now_ts,
             note_id=content_item.get("note_id"),
             type=content_item.get("type"),
             title=content_item.get("title"),
@@ -194,59 +187,50 @@ class XhsDbStoreImplement(AbstractStore,BaseStore):
             video_url=content_item.get("video_url"),
             time=content_item.get("time"),
             last_update_time=content_item.get("last_update_time"),
-            liked_count=str(content_item.get("liked_count")),
-            collected_count=str(content_item.get("collected_count")),
-            comment_count=str(content_item.get("comment_count")),
-            share_count=str(content_item.get("share_count")),
-            image_list=json.dumps(content_item.get("image_list")),
-            tag_list=json.dumps(content_item.get("tag_list")),
+            liked_count=content_item.get("liked_count"),
+            collected_count=content_item.get("collected_count"),
+            comment_count=content_item.get("comment_count"),
+            share_count=content_item.get("share_count"),
+            image_list=normalize_str_list(content_item.get("image_list")),
+            tag_list=normalize_str_list(content_item.get("tag_list")),
             note_url=content_item.get("note_url"),
             source_keyword=content_item.get("source_keyword", ""),
             xsec_token=content_item.get("xsec_token", "")
         )
-        session.add(note)
-
-    async def update_content(self, session: AsyncSession, content_item: Dict):
-        note_id = content_item.get("note_id")
-        last_modify_ts = int(get_current_timestamp())
-        update_data = {
-            "last_modify_ts": last_modify_ts,
-            "liked_count": str(content_item.get("liked_count")),
-            "collected_count": str(content_item.get("collected_count")),
-            "comment_count": str(content_item.get("comment_count")),
-            "share_count": str(content_item.get("share_count")),
-            "last_update_time": content_item.get("last_update_time"),
-        }
-        stmt = update(XhsNote).where(XhsNote.note_id == note_id).values(**update_data)
-        await session.execute(stmt)
-
-    async def content_is_exist(self, session: AsyncSession, note_id: str) -> bool:
-        stmt = select(XhsNote).where(XhsNote.note_id == note_id)
-        result = await session.execute(stmt)
-        return result.first() is not None
 
     async def store_comment(self, comment_item: Dict):
         if not comment_item:
             return
-        async with get_session() as session:
-            comment_id = comment_item.get("comment_id")
-            if not comment_id:
-                return
-            if await self.comment_is_exist(session, comment_id):
-                await self.update_comment(session, comment_item)
-            else:
-                await self.add_comment(session, comment_item)
-
-    async def add_comment(self, session: AsyncSession, comment_item: Dict):
-        add_ts = int(get_current_timestamp())
-        last_modify_ts = int(get_current_timestamp())
-        comment = XhsNoteComment(
+        comment_id = comment_item.get("comment_id")
+        if not comment_id:
+            return
+        await BulkUpsertWriter.get_instance().add(
+            XhsNoteComment, self._comment_row(comment_item), key_columns=("comment_id",),
+            update_columns=self.COMMENT_UPDATE_COLUMNS,
+        )
+
+    async def store_contents(self, content_items: List[Dict]):
+        await BulkUpsertWriter.get_instance().add_many(
+            XhsNote, [self._content_row(item) for item in content_items if item.get("note_id")],
+            key_columns=("note_id",), update_columns=self.CONTENT_UPDATE_COLUMNS,
+        )
+
+    async def store_comments(self, comment_items: List[Dict]):
+        await BulkUpsertWriter.get_instance().add_many(
+            XhsNoteComment, [self._comment_row(item) for item in comment_items if item and item.get("comment_id")],
+            key_columns=("comment_id",), update_columns=self.COMMENT_UPDATE_COLUMNS,
+        )
+
+    @staticmethod
+    def _comment_row(comment_item: Dict) -> Dict:
+        now_ts = int(get_current_timestamp())
+        return dict(
             user_id=comment_item.get("user_id"),
             nickname=comment_item.get("nickname"),
             avatar=comment_item.get("avatar"),
             ip_location=comment_item.get("ip_location"),
-            add_ts=add_ts,
-            last_modify_ts=last_modify_ts,
+            add_ts=now_ts,
+            last_modify_ts=now_ts,
             comment_id=comment_item.get("comment_id"),
             create_time=comment_item.get("create_time"),
             note_id=comment_item.get("note_id"),
@@ -254,46 +238,28 @@ class XhsDbStoreImplement(AbstractStore,BaseStore):
             sub_comment_count=comment_item.get("sub_comment_count"),
             pictures=json.dumps(comment_item.get("pictures")),
             parent_comment_id=comment_item.get("parent_comment_id"),
-            like_count=str(comment_item.get("like_count"))
+            like_count=comment_item.get("like_count")
         )
-        session.add(comment)
-
-    async def update_comment(self, session: AsyncSession, comment_item: Dict):
-        comment_id = comment_item.get("comment_id")
-        last_modify_ts = int(get_current_timestamp())
-        update_data = {
-            "last_modify_ts": last_modify_ts,
-            "like_count": str(comment_item.get("like_count")),
-            "sub_comment_count": comment_item.get("sub_comment_count"),
-        }
-        stmt = update(XhsNoteComment).where(XhsNoteComment.comment_id == comment_id).values(**update_data)
-        await session.execute(stmt)
-
-    async def comment_is_exist(self, session: AsyncSession, comment_id: str) -> bool:
-        stmt = select(XhsNoteComment).where(XhsNoteComment.comment_id == comment_id)
-        result = await session.execute(stmt)
-        return result.first() is not None
 
     async def store_creator(self, creator_item: Dict):
         user_id = creator_item.get("user_id")
         if not user_id:
             return
-        async with get_session() as session:
-            if await self.creator_is_exist(session, user_id):
-                await self.update_creator(session, creator_item)
-            else:
-                await self.add_creator(session, creator_item)
-
-    async def add_creator(self, session: AsyncSession, creator_item: Dict):
-        add_ts = int(get_current_timestamp())
-        last_modify_ts = int(get_current_timestamp())
-        creator = XhsCreator(
+        await BulkUpsertWriter.get_instance().add(
+            XhsCreator, self._creator_row(creator_item), key_columns=("user_id",),
+            update_columns=self.CREATOR_UPDATE_COLUMNS,
+        )
+
+    @staticmethod
+    def _creator_row(creator_item: Dict) -> Dict:
+        now_ts = int(get_current_timestamp())
+        return dict(
             user_id=creator_item.get("user_id"),
             nickname=creator_item.get("nickname"),
             avatar=creator_item.get("avatar"),
             ip_location=creator_item.get("ip_location"),
-            add_ts=add_ts,
-            last_modify_ts=last_modify_ts,
+            add_ts=now_ts,
+            last_modify_ts=now_ts,
             desc=creator_item.get("desc"),
             gender=creator_item.get("gender"),
             follows=str(creator_item.get("follows")),
@@ -301,28 +267,6 @@ class XhsDbStoreImplement(AbstractStore,BaseStore):
             interaction=str(creator_item.get("interaction")),
             tag_list=json.dumps(creator_item.get("tag_list"))
         )
-        session.add(creator)
-
-    async def update_creator(self, session: AsyncSession, creator_item: Dict):
-        user_id = creator_item.get("user_id")
-        last_modify_ts = int(get_current_timestamp())
-        update_data = {
-            "last_modify_ts": last_modify_ts,
-            "nickname": creator_item.get("nickname"),
-            "avatar": creator_item.get("avatar"),
-            "desc": creator_item.get("desc"),
-            "follows": str(creator_item.get("follows")),
-            "fans": str(creator_item.get("fans")),
-            "interaction": str(creator_item.get("interaction")),
-            "tag_list": json.dumps(creator_item.get("tag_list"))
-        }
-        stmt = update(XhsCreator).where(XhsCreator.user_id == user_id).values(**update_data)
-        await session.execute(stmt)
-
-    async def creator_is_exist(self, session: AsyncSession, user_id: str) -> bool:
-        stmt = select(XhsCreator).where(XhsCreator.user_id == user_id)
-        result = await session.execute(stmt)
-        return result.first() is not None
 
     async def get_all_content(self) -> List[Dict]:
         async with get_session() as session:
@@ -349,6 +293,15 @@ class XhsMongoStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.mongo_store = MongoDBStoreBase(collection_prefix="xhs")
 
+    async def open(self):
+        await self.mongo_store.ensure_indexes()
+
+    async def flush(self):
+        await MongoBulkWriter.get_instance().flush()
+
+    async def close(self):
+        await MongoBulkWriter.close_all()
+
     async def store_content(self, content_item: Dict):
         """
         存储笔记内容到MongoDB
@@ -359,11 +312,7 @@ class XhsMongoStoreImplement(AbstractStore):
         if not note_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="contents",
-            query={"note_id": note_id},
-            data=content_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=[content_item])
         utils.logger.info(f"[XhsMongoStoreImplement.store_content] Saved note {note_id} to MongoDB")
 
     async def store_comment(self, comment_item: Dict):
@@ -376,13 +325,27 @@ class XhsMongoStoreImplement(AbstractStore):
         if not comment_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="comments",
-            query={"comment_id": comment_id},
-            data=comment_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=[comment_item])
         utils.logger.info(f"[XhsMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量存储内容到MongoDB，一次 bulk_write
+        Args:
+            content_items: 内容数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=content_items)
+        utils.logger.info(f"[XhsMongoStoreImplement.store_contents] Saved {len(content_items)} contents to MongoDB")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量存储评论到MongoDB，一次 bulk_write
+        Args:
+            comment_items: 评论数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=comment_items)
+        utils.logger.info(f"[XhsMongoStoreImplement.store_comments] Saved {len(comment_items)} comments to MongoDB")
+
     async def store_creator(self, creator_item: Dict):
         """
         存储创作者信息到MongoDB
@@ -393,11 +356,7 @@ class XhsMongoStoreImplement(AbstractStore):
         if not user_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="creators",
-            query={"user_id": user_id},
-            data=creator_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="creators", key_field="user_id", items=[creator_item])
         utils.logger.info(f"[XhsMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
 
 
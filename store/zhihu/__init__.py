@@ -19,7 +19,7 @@
 
 
 # -*- coding: utf-8 -*-
-from typing import List
+from typing import Dict, List
 
 import config
 from base.base_crawler import AbstractStore
@@ -31,6 +31,7 @@ from ._store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuMongoStoreImplement,
                                           ZhihuExcelStoreImplement)
 from tools import utils
+from store.store_manager import StoreManager
 from var import source_keyword_var
 
 
@@ -39,6 +40,7 @@ class ZhihuStoreFactory:
         "csv": ZhihuCsvStoreImplement,
         "db": ZhihuDbStoreImplement,
         "json": ZhihuJsonStoreImplement,
+        "jsonl": ZhihuJsonStoreImplement,
         "sqlite": ZhihuSqliteStoreImplement,
         "mongodb": ZhihuMongoStoreImplement,
         "excel": ZhihuExcelStoreImplement,
@@ -48,8 +50,8 @@ class ZhihuStoreFactory:
     def create_store() -> AbstractStore:
         store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
-            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
-        return store_class()
+            raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json or jsonl or sqlite or mongodb or excel ...")
+        return StoreManager.get_store("zhihu", store_class)
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
@@ -63,8 +65,8 @@ async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     if not contents:
         return
 
-    for content_item in contents:
-        await update_zhihu_content(content_item)
+    save_content_items = [_build_zhihu_content(content_item) for content_item in contents]
+    await ZhihuStoreFactory.create_store().store_contents(save_content_items)
 
 async def update_zhihu_content(content_item: ZhihuContent):
     """
@@ -74,12 +76,24 @@ async def update_zhihu_content(content_item: ZhihuContent):
 
     Returns:
 
+    """
+    await ZhihuStoreFactory.create_store().store_content(_build_zhihu_content(content_item))
+
+
+def _build_zhihu_content(content_item: ZhihuContent) -> Dict:
+    """
+    把知乎内容模型转换为存储格式
+    Args:
+        content_item:
+
+    Returns:
+
     """
     content_item.source_keyword = source_keyword_var.get()
     local_db_item = content_item.model_dump()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
     utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
-    await ZhihuStoreFactory.create_store().store_content(local_db_item)
+    return local_db_item
 
 
 
@@ -95,8 +109,8 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
     if not comments:
         return
 
-    for comment_item in comments:
-        await update_zhihu_content_comment(comment_item)
+    save_comment_items = [_build_zhihu_content_comment(comment_item) for comment_item in comments]
+    await ZhihuStoreFactory.create_store().store_comments(save_comment_items)
 
 
 async def update_zhihu_content_comment(comment_item: ZhihuComment):
@@ -107,11 +121,23 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
 
     Returns:
 
+    """
+    await ZhihuStoreFactory.create_store().store_comment(_build_zhihu_content_comment(comment_item))
+
+
+def _build_zhihu_content_comment(comment_item: ZhihuComment) -> Dict:
+    """
+    把知乎评论模型转换为存储格式
+    Args:
+        comment_item:
+
+    Returns:
+
     """
     local_db_item = comment_item.model_dump()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
     utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
-    await ZhihuStoreFactory.create_store().store_comment(local_db_item)
+    return local_db_item
 
 
 async def save_creator(creator: ZhihuCreator):
@@ -27,7 +27,7 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
 import aiofiles
 from sqlalchemy import select, func, desc
@@ -35,14 +35,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 import config
 from base.base_crawler import AbstractStore
+from database.bulk_writer import BulkUpsertWriter
 from database.data_registry import PLATFORM_MODELS
 from database.db_session import get_session
+from database.pagination import get_paginated_list as paginate_platform_list
 from database.models import ZhihuContent, ZhihuComment, ZhihuCreator
 from store.BaseStore import BaseStore
 from tools import utils, words
 from var import crawler_type_var
 from tools.async_file_writer import AsyncFileWriter
-from database.mongodb_store_base import MongoDBStoreBase
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
 
 def calculate_number_of_files(file_store_path: str) -> int:
     """计算数据保存文件的前部分排序数字，支持每次运行代码不写到同一个文件中
@@ -64,6 +66,9 @@ class ZhihuCsvStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="zhihu", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         Zhihu content CSV storage implementation
@@ -86,6 +91,22 @@ class ZhihuCsvStoreImplement(AbstractStore):
         """
         await self.writer.write_to_csv(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to csv file, one file open per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to csv file, one file open per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_rows_to_csv(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         Zhihu content CSV storage implementation
@@ -104,78 +125,23 @@ class ZhihuDbStoreImplement(AbstractStore,BaseStore):
         _, self.normalized_columns = PLATFORM_MODELS["zhihu"]
 
     async def get_paginated_list(self, *, keyword: Optional[str] = None, source_keyword: Optional[str] = None,
-                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10) -> Dict[str, Any]:
-        async with get_session() as session:
-            # 1. 定义要查询的表
-            table = ZhihuComment.__table__
-
-            # 2. 构建基础查询语句
-            #    - data_query 用于获取数据列表
-            #    - count_query 用于获取总记录数
-            data_query = select(*self.normalized_columns)
-            count_query = select(func.count()).select_from(table)
-
-            # 3. 添加筛选条件 (where)
-            where_clauses = []
-            if keyword:
-                # `keyword` 用于模糊搜索标题
-                where_clauses.append(table.c.title.like(f"%{keyword}%"))
-            if source_keyword:
-                # `source_keyword` 用于精确匹配源关键词
-                where_clauses.append(table.c.source_keyword == source_keyword)
-
-            # 如果有筛选条件，应用到两个查询上
-            if where_clauses:
-                data_query = data_query.where(*where_clauses)
-                count_query = count_query.where(*where_clauses)
-
-            # 4. 执行总数查询 (在应用分页之前！)
-            total_count_result = await session.execute(count_query)
-            total_count = total_count_result.scalar_one_or_none() or 0
-
-            if total_count == 0:
-                # 如果总数为0，没必要继续查数据，直接返回空列表
-                return {"total": 0, "list": []}
-
-            # 5. 添加排序 (order_by)
-            sort_column = next((c for c in self.normalized_columns if c.name == sort_by), None)
-            if sort_column is not None:
-                data_query = data_query.order_by(desc(sort_column))
-
-            # 6. 添加分页 (limit / offset) - 这才是分页的关键！
-            #    - offset: 跳过多少条记录
-            #    - limit:  最多取多少条记录
-            offset = (page - 1) * page_size
-            data_query = data_query.offset(offset).limit(page_size)
-
-            # 7. 执行最终的数据查询
-            data_result = await session.execute(data_query)
-
-            # 8. 组装并返回最终结果
-            data_list = [dict(row._mapping) for row in data_result.all()]
-
-            return {
-                "total": total_count,
-                "list": data_list
-            }
+                                 sort_by: str = "liked_count", page: int = 1, page_size: int = 10,
+                                 cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await paginate_platform_list(
+            "zhihu", keyword=keyword, source_keyword=source_keyword, sort_by=sort_by,
+            page=page, page_size=page_size, cursor=cursor,
+        )
+
+    async def flush(self):
+        await BulkUpsertWriter.get_instance().flush()
+
     async def store_content(self, content_item: Dict):
         """
         Zhihu content DB storage implementation
         Args:
             content_item: content item dict
         """
-        content_id = content_item.get("content_id")
-        async with get_session() as session:
-            stmt = select(ZhihuContent).where(ZhihuContent.content_id == content_id)
-            result = await session.execute(stmt)
-            existing_content = result.scalars().first()
-            if existing_content:
-                for key, value in content_item.items():
-                    setattr(existing_content, key, value)
-            else:
-                new_content = ZhihuContent(**content_item)
-                session.add(new_content)
-            await session.commit()
+        await BulkUpsertWriter.get_instance().add(ZhihuContent, content_item, key_columns=("content_id",))
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -183,18 +149,13 @@ class ZhihuDbStoreImplement(AbstractStore,BaseStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(ZhihuComment).where(ZhihuComment.comment_id == comment_id)
-            result = await session.execute(stmt)
-            existing_comment = result.scalars().first()
-            if existing_comment:
-                for key, value in comment_item.items():
-                    setattr(existing_comment, key, value)
-            else:
-                new_comment = ZhihuComment(**comment_item)
-                session.add(new_comment)
-            await session.commit()
+        await BulkUpsertWriter.get_instance().add(ZhihuComment, comment_item, key_columns=("comment_id",))
+
+    async def store_contents(self, content_items: List[Dict]):
+        await BulkUpsertWriter.get_instance().add_many(ZhihuContent, content_items, key_columns=("content_id",))
+
+    async def store_comments(self, comment_items: List[Dict]):
+        await BulkUpsertWriter.get_instance().add_many(ZhihuComment, comment_items, key_columns=("comment_id",))
 
     async def store_creator(self, creator: Dict):
         """
@@ -202,18 +163,7 @@ class ZhihuDbStoreImplement(AbstractStore,BaseStore):
         Args:
             creator: creator dict
         """
-        user_id = creator.get("user_id")
-        async with get_session() as session:
-            stmt = select(ZhihuCreator).where(ZhihuCreator.user_id == user_id)
-            result = await session.execute(stmt)
-            existing_creator = result.scalars().first()
-            if existing_creator:
-                for key, value in creator.items():
-                    setattr(existing_creator, key, value)
-            else:
-                new_creator = ZhihuCreator(**creator)
-                session.add(new_creator)
-            await session.commit()
+        await BulkUpsertWriter.get_instance().add(ZhihuCreator, creator, key_columns=("user_id",))
 
 
 class ZhihuJsonStoreImplement(AbstractStore):
@@ -221,6 +171,9 @@ class ZhihuJsonStoreImplement(AbstractStore):
         super().__init__(**kwargs)
         self.writer = AsyncFileWriter(platform="zhihu", crawler_type=crawler_type_var.get())
 
+    async def flush(self):
+        await self.writer.flush()
+
     async def store_content(self, content_item: Dict):
         """
         content JSON storage implementation
@@ -243,6 +196,22 @@ class ZhihuJsonStoreImplement(AbstractStore):
         """
         await self.writer.write_single_item_to_json(item_type="comments", item=comment_item)
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        batch store content data to json file, one read/write per batch
+        :param content_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="contents", items=content_items)
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        batch store comment data to json file, one read/write per batch
+        :param comment_items:
+        :return:
+        """
+        await self.writer.write_items_to_json(item_type="comments", items=comment_items)
+
     async def store_creator(self, creator: Dict):
         """
         Zhihu content JSON storage implementation
@@ -268,6 +237,15 @@ class ZhihuMongoStoreImplement(AbstractStore):
     def __init__(self):
         self.mongo_store = MongoDBStoreBase(collection_prefix="zhihu")
 
+    async def open(self):
+        await self.mongo_store.ensure_indexes()
+
+    async def flush(self):
+        await MongoBulkWriter.get_instance().flush()
+
+    async def close(self):
+        await MongoBulkWriter.close_all()
+
     async def store_content(self, content_item: Dict):
         """
         存储内容到MongoDB
@@ -278,11 +256,7 @@ class ZhihuMongoStoreImplement(AbstractStore):
         if not note_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="contents",
-            query={"note_id": note_id},
-            data=content_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=[content_item])
         utils.logger.info(f"[ZhihuMongoStoreImplement.store_content] Saved note {note_id} to MongoDB")
 
     async def store_comment(self, comment_item: Dict):
@@ -295,13 +269,27 @@ class ZhihuMongoStoreImplement(AbstractStore):
         if not comment_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="comments",
-            query={"comment_id": comment_id},
-            data=comment_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=[comment_item])
         utils.logger.info(f"[ZhihuMongoStoreImplement.store_comment] Saved comment {comment_id} to MongoDB")
 
+    async def store_contents(self, content_items: List[Dict]):
+        """
+        批量存储内容到MongoDB，一次 bulk_write
+        Args:
+            content_items: 内容数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="contents", key_field="note_id", items=content_items)
+        utils.logger.info(f"[ZhihuMongoStoreImplement.store_contents] Saved {len(content_items)} contents to MongoDB")
+
+    async def store_comments(self, comment_items: List[Dict]):
+        """
+        批量存储评论到MongoDB，一次 bulk_write
+        Args:
+            comment_items: 评论数据列表
+        """
+        await self.mongo_store.buffered_save_or_update(collection_suffix="comments", key_field="comment_id", items=comment_items)
+        utils.logger.info(f"[ZhihuMongoStoreImplement.store_comments] Saved {len(comment_items)} comments to MongoDB")
+
     async def store_creator(self, creator_item: Dict):
         """
         存储创作者信息到MongoDB
@@ -312,11 +300,7 @@ class ZhihuMongoStoreImplement(AbstractStore):
         if not user_id:
             return
 
-        await self.mongo_store.save_or_update(
-            collection_suffix="creators",
-            query={"user_id": user_id},
-            data=creator_item
-        )
+        await self.mongo_store.buffered_save_or_update(collection_suffix="creators", key_field="user_id", items=[creator_item])
         utils.logger.info(f"[ZhihuMongoStoreImplement.store_creator] Saved creator {user_id} to MongoDB")
 
 
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/benchmark_data_list.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# @Desc    : 数据列表接口性能：各平台每页 100 行的 get_paginated_data_list 耗时，以及旧的逐行字符串解析与按列类型转换的对比
+# @Tips    : 运行方式 `uv run python test/benchmark_data_list.py [每个平台的行数]`，使用临时 SQLite 库
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 将项目根目录添加到 sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import JSON, Column, Integer, insert
+
+import config
+from config.db_config import sqlite_db_config
+from database import crud, db_session
+from database.data_registry import PLATFORM_MODELS
+from database.json_codec import ORJSON_AVAILABLE
+
+PAGE_SIZE = 100
+IMAGE_URLS = [f"https://sns-img.example.com/{i:02d}/1040g008abcdef!nd_dft_wlteh_webp_3" for i in range(9)]
+
+
+def build_rows(platform: str, n: int):
+    """按 PLATFORM_MODELS 的标准化列生成测试数据"""
+    _, columns = PLATFORM_MODELS[platform]
+    rows = []
+    for i in range(n):
+        row = {"source_keyword": "bench"}
+        for label in columns:
+            if not isinstance(label.element, Column):
+                continue
+            column = label.element.key
+            if isinstance(label.element.type, JSON):
+                row[column] = IMAGE_URLS
+            elif isinstance(label.element.type, Integer):
+                row[column] = i
+            elif label.name == "image_list":
+                row[column] = IMAGE_URLS[0]
+            else:
+                row[column] = f"{platform}-{label.name}-{i}"
+        rows.append(row)
+    return rows
+
+
+def legacy_post_process(items):
+    """旧版 crud 中对 image_list 逗号分隔字符串的逐行解析"""
+    for item in items:
+        raw_val = item["image_list"]
+        if isinstance(raw_val, list):
+            continue
+        if isinstance(raw_val, str):
+            clean_str = raw_val.strip().strip('"').strip("'")
+            if clean_str.startswith("["):
+                try:
+                    item["image_list"] = [u.strip() for u in json.loads(clean_str) if isinstance(u, str)]
+                except ValueError:
+                    item["image_list"] = []
+            elif "," in clean_str:
+                item["image_list"] = [url.strip() for url in clean_str.split(",") if url.strip()]
+            elif clean_str.startswith("http"):
+                item["image_list"] = [clean_str]
+            else:
+                item["image_list"] = []
+        else:
+            item["image_list"] = []
+
+
+def bench_post_process(rounds: int):
+    """只比较列表字段的后处理，返回 (旧版, 新版) 每页耗时（微秒）"""
+    legacy_pages = [[{"image_list": ",".join(IMAGE_URLS)} for _ in range(PAGE_SIZE)] for _ in range(rounds)]
+    start = time.perf_counter()
+    for page in legacy_pages:
+        legacy_post_process(page)
+    legacy_us = (time.perf_counter() - start) / rounds * 1e6
+
+    convert = crud._image_list_converter("xhs")
+    pages = [[{"image_list": IMAGE_URLS} for _ in range(PAGE_SIZE)] for _ in range(rounds)]
+    start = time.perf_counter()
+    for page in pages:
+        for item in page:
+            item["image_list"] = convert(item.get("image_list"))
+    return legacy_us, (time.perf_counter() - start) / rounds * 1e6
+
+
+async def bench_data_list(n: int, rounds: int):
+    """每个平台写入 n 行后，循环读取前 rounds 页，返回 {平台: 每页耗时（毫秒）}"""
+    await db_session.create_tables("sqlite")
+    for platform in PLATFORM_MODELS:
+        model, _ = PLATFORM_MODELS[platform]
+        async with db_session.get_session() as session:
+            await session.execute(insert(model), build_rows(platform, n))
+
+    results = {}
+    for platform in PLATFORM_MODELS:
+        pages = max(1, min(rounds, n // PAGE_SIZE))
+        await crud.get_paginated_data_list(platform, page_size=PAGE_SIZE)
+        start = time.perf_counter()
+        for page in range(1, pages + 1):
+            result = await crud.get_paginated_data_list(platform, page=page, page_size=PAGE_SIZE)
+            assert len(result["list"]) == min(PAGE_SIZE, n)
+        results[platform] = (time.perf_counter() - start) / pages * 1e3
+    await db_session.dispose_engines()
+    return results
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"orjson available: {ORJSON_AVAILABLE}")
+
+    legacy_us, new_us = bench_post_process(200)
+    print(f"image_list post-process / {PAGE_SIZE} rows : legacy {legacy_us:8.1f} us   typed {new_us:8.1f} us  x{legacy_us / new_us:.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.SAVE_DATA_OPTION = "sqlite"
+        sqlite_db_config["db_path"] = os.path.join(tmp, "benchmark.db")
+        for platform, ms in asyncio.run(bench_data_list(n, 10)).items():
+            print(f"get_paginated_data_list({platform:<5}) : {ms:8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
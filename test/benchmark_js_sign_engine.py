@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/benchmark_js_sign_engine.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# @Desc    : JS 签名性能对比：execjs 同步调用（每次调用新起 Node 进程） vs JsSignEngine 常驻进程池
+# @Tips    : 运行方式 `uv run python test/benchmark_js_sign_engine.py [调用次数]`，需要安装 Node
+
+import asyncio
+import os
+import sys
+import time
+
+# 将项目根目录添加到 sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_platform.douyin.help import get_a_bogus, get_a_bogus_from_js
+from tools.js_sign_engine import JsSignEngine
+
+URI = "/aweme/v1/web/aweme/detail/"
+PARAMS = "device_platform=webapp&aid=6383&channel=channel_pc_web&aweme_id=7525082444551310602"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+
+
+def bench_execjs(n: int) -> float:
+    """execjs 同步调用，返回每秒调用次数"""
+    start = time.perf_counter()
+    for _ in range(n):
+        get_a_bogus_from_js(URI, PARAMS, USER_AGENT)
+    return n / (time.perf_counter() - start)
+
+
+async def bench_engine(n: int, concurrency: int) -> float:
+    """JsSignEngine 并发调用，返回每秒调用次数（不含进程启动耗时）"""
+    await get_a_bogus(URI, PARAMS, {}, USER_AGENT)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await get_a_bogus(URI, PARAMS, {}, USER_AGENT)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(n)])
+    cps = n / (time.perf_counter() - start)
+    await JsSignEngine.close_all()
+    return cps
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    execjs_cps = bench_execjs(min(n, 50))
+    print(f"execjs (sync)           : {execjs_cps:10.1f} calls/s")
+    for concurrency in (1, 8):
+        engine_cps = asyncio.run(bench_engine(n, concurrency))
+        print(f"JsSignEngine (conc={concurrency:<2}) : {engine_cps:10.1f} calls/s  x{engine_cps / execjs_cps:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/benchmark_xhs_sign.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# @Desc    : 小红书 x-s-common 编码性能对比：xhs_sign 参考实现 vs xhs_sign_fast
+# @Tips    : 运行方式 `uv run python test/benchmark_xhs_sign.py [循环次数]`
+
+import json
+import os
+import sys
+import timeit
+
+# 将项目根目录添加到 sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_platform.xhs import xhs_sign, xhs_sign_fast
+
+A1 = "18c0a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4e5f6a1"
+B1 = "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMFYnqthIhJeSBMDKutRI3KsYorWHPtGrbV0P9WfIi/eWc6eYqtyQApPI37ekmR6QL+5Ii6sdneeSfqYHqwl2qt5B0DBIx+PGDi/sVtkIxdsxuwr4qtiIhuaIE3e3LV0I3VTIC7e0utl2ADmsLveDSKsSPw5IEvsiVtJOqw8BuwfPpdeTFWOIx4TIiu6ZPwrPut5IvlaLbgs3qtxIxes1VwHIkumIkIyejgsY/WTge7eSqte/D7sDcpipedeYrDtIC6eDVw2IENsSqtlnlSuNjVtIvoekqt3cZ7sVo4gIESyIhE2HfquIxhnqz8gIkIfoqwkICZWG73sdlOeVPw3IvAe0fged0OpIi5sWVtHIk5e0SI7Bqt6IkNsfut0IvoedoOs3qtDIkNsdSEHIxoekzEq2BTNIk6sYVtAIvEIsd6eeuw8IkM4Ixcl2mvsilVZIk7ejbWVIkO8IkSj2zMTIx/eDqwGIv0edqwCIEvs1Sb4ICWSIkVhICP9zc4sXVwUqutzIxJsV95s6MR1Iv8BzqtYnPwEIiElIx3e0utMJqwr2qt7eqwPd9HaIiAeSPwkmBvsSuwy0VwwIiAeDVtl2qtfI3cTIibaIhFLIhDQIC7sxPtYIEPpIiJsjPtYcrlhIvoe"
+X_T = "1700000000000"
+X3 = "mns0101_" + "Q" * 160
+
+
+def build_headers(impl):
+    """与 playwright_sign 中 x-s / x-s-common 的拼装过程一致"""
+    xs_payload = {"x0": "4.2.1", "x1": "xhs-pc-web", "x2": "Mac OS", "x3": X3, "x4": "object"}
+    x_s = "XYS_" + impl.b64_encode(impl.encode_utf8(json.dumps(xs_payload, separators=(",", ":"))))
+    common = {
+        "s0": 3, "s1": "", "x0": "1", "x1": "4.2.2", "x2": "Mac OS", "x3": "xhs-pc-web", "x4": "4.74.0",
+        "x5": A1, "x6": X_T, "x7": x_s, "x8": B1, "x9": impl.mrc(X_T + x_s + B1), "x10": 154, "x11": "normal",
+    }
+    return x_s, impl.b64_encode(impl.encode_utf8(json.dumps(common, separators=(",", ":"))))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    assert build_headers(xhs_sign) == build_headers(xhs_sign_fast)
+
+    reference = timeit.timeit(lambda: build_headers(xhs_sign), number=n)
+    fast = timeit.timeit(lambda: build_headers(xhs_sign_fast), number=n)
+    print(f"xhs_sign      : {n / reference:10.1f} headers/s")
+    print(f"xhs_sign_fast : {n / fast:10.1f} headers/s  x{reference / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
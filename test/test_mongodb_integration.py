@@ -254,6 +254,8 @@ class TestMongoDBRealConnection(unittest.TestCase):
                 "follows": "100"
             }
             await store.store_creator(creator_data)
+            # store_* 写入批量缓冲，刷新后才会落库
+            await store.flush()
 
             mongo_store = store.mongo_store
 
@@ -301,6 +303,8 @@ class TestMongoDBRealConnection(unittest.TestCase):
                 "desc": "这是一个测试创作者"
             }
             await store.store_creator(creator_data)
+            # store_* 写入批量缓冲，刷新后才会落库
+            await store.flush()
 
             mongo_store = store.mongo_store
 
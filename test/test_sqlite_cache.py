@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_sqlite_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : SqliteCache 单元测试
+
+import os
+import tempfile
+import time
+import unittest
+
+from cache.sqlite_cache import SqliteCache
+
+
+class TestSqliteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "cache.db")
+        self.cache = SqliteCache(db_path=self.db_path)
+
+    def test_set_and_get(self):
+        self.cache.set('key', {'note_id': '1', 'tags': ['a', 'b']}, 10)
+        self.assertEqual(self.cache.get('key'), {'note_id': '1', 'tags': ['a', 'b']})
+
+    def test_expired_key(self):
+        self.cache.set('key', 'value', 1)
+        time.sleep(1.5)  # wait for the key to expire
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_keys(self):
+        self.cache.set('response:xhs:a', 1, 10)
+        self.cache.set('response:dy:b', 2, 10)
+        self.assertEqual(self.cache.keys('response:xhs:*'), ['response:xhs:a'])
+
+    def test_persist_across_instances(self):
+        self.cache.set('key', 'value', 10)
+        self.cache.close()
+        self.cache = SqliteCache(db_path=self.db_path)
+        self.assertEqual(self.cache.get('key'), 'value')
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
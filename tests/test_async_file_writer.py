@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_async_file_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""
+Unit tests for AsyncFileWriter streaming writers
+"""
+
+import csv
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from tools.async_file_writer import AsyncFileWriter
+
+
+class TestJsonLinesWriter:
+    """Test cases for the JSON Lines save mode"""
+
+    @pytest.fixture(autouse=True)
+    def work_dir(self, tmp_path, monkeypatch):
+        """Run each test in an isolated data directory"""
+        monkeypatch.chdir(tmp_path)
+        AsyncFileWriter._jsonl_sinks.clear()
+        AsyncFileWriter._csv_sinks.clear()
+        yield tmp_path
+        AsyncFileWriter._jsonl_sinks.clear()
+        AsyncFileWriter._csv_sinks.clear()
+
+    @staticmethod
+    def _read_jsonl(path: Path):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @pytest.mark.asyncio
+    @patch('config.SAVE_DATA_OPTION', 'jsonl')
+    async def test_json_store_writes_lines_in_jsonl_mode(self, sample_xhs_comment):
+        """write_single_item_to_json appends one line per item in jsonl mode"""
+        writer = AsyncFileWriter(platform="xhs", crawler_type="search")
+        for i in range(3):
+            await writer.write_single_item_to_json({**sample_xhs_comment, "comment_id": str(i)}, "comments")
+        await AsyncFileWriter.close_all(finalize_json=False)
+
+        files = list(Path("data/xhs/jsonl").glob("search_comments_*.jsonl"))
+        assert len(files) == 1
+        items = self._read_jsonl(files[0])
+        assert [item["comment_id"] for item in items] == ["0", "1", "2"]
+        assert items[0]["content"] == sample_xhs_comment["content"]
+
+    @pytest.mark.asyncio
+    @patch('config.JSONL_FLUSH_BATCH_SIZE', 1000)
+    @patch('config.JSONL_FLUSH_INTERVAL_SEC', 3600)
+    async def test_items_are_buffered_until_flush(self):
+        """Items stay in memory until the batch threshold or close"""
+        writer = AsyncFileWriter(platform="xhs", crawler_type="search")
+        await writer.write_to_jsonl({"note_id": "1"}, "contents")
+        file_path = Path(writer._get_file_path("jsonl", "contents"))
+        assert not file_path.exists() or file_path.stat().st_size == 0
+
+        await AsyncFileWriter.close_all(finalize_json=False)
+        assert self._read_jsonl(file_path) == [{"note_id": "1"}]
+
+    @pytest.mark.asyncio
+    async def test_sink_shared_across_writers(self):
+        """Different writer instances share one sink per file"""
+        writer_a = AsyncFileWriter(platform="xhs", crawler_type="search")
+        writer_b = AsyncFileWriter(platform="xhs", crawler_type="search")
+        await writer_a.write_to_jsonl({"note_id": "a"}, "contents")
+        await writer_b.write_to_jsonl({"note_id": "b"}, "contents")
+        assert len(AsyncFileWriter._jsonl_sinks) == 1
+        await AsyncFileWriter.close_all(finalize_json=False)
+
+    @pytest.mark.asyncio
+    async def test_finalize_to_json_array(self):
+        """close_all can produce a valid JSON array next to the jsonl file"""
+        writer = AsyncFileWriter(platform="dy", crawler_type="detail")
+        for i in range(5):
+            await writer.write_to_jsonl({"aweme_id": str(i), "title": f"标题{i}"}, "contents")
+        await AsyncFileWriter.close_all(finalize_json=True)
+
+        json_files = list(Path("data/dy/json").glob("detail_contents_*.json"))
+        assert len(json_files) == 1
+        with open(json_files[0], "r", encoding="utf-8") as f:
+            data = json.load(f)
+        assert [item["aweme_id"] for item in data] == ["0", "1", "2", "3", "4"]
+        assert data[0]["title"] == "标题0"
+
+
+class TestBatchWrites:
+    """Test cases for the batch write helpers used by store_contents/store_comments"""
+
+    @pytest.fixture(autouse=True)
+    def work_dir(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        AsyncFileWriter._jsonl_sinks.clear()
+        AsyncFileWriter._csv_sinks.clear()
+        yield tmp_path
+        AsyncFileWriter._jsonl_sinks.clear()
+        AsyncFileWriter._csv_sinks.clear()
+
+    @pytest.mark.asyncio
+    async def test_csv_batch_writes_header_once(self, sample_xhs_comment):
+        """A page of comments lands in one open with a single header row"""
+        writer = AsyncFileWriter(platform="xhs", crawler_type="search")
+        page = [{**sample_xhs_comment, "comment_id": str(i)} for i in range(20)]
+        await writer.write_rows_to_csv(page[:10], "comments")
+        await writer.write_rows_to_csv(page[10:], "comments")
+        await AsyncFileWriter.close_all(finalize_json=False)
+
+        with open(writer._get_file_path("csv", "comments"), encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["comment_id"] for row in rows] == [str(i) for i in range(20)]
+
+    @pytest.mark.asyncio
+    @patch('config.CSV_FLUSH_BATCH_SIZE', 1000)
+    @patch('config.CSV_FLUSH_INTERVAL_SEC', 3600)
+    async def test_csv_rows_buffered_until_flush(self):
+        """CSV rows stay in memory until the writer is flushed"""
+        writer = AsyncFileWriter(platform="xhs", crawler_type="search")
+        await writer.write_to_csv({"note_id": "1", "title": "a"}, "contents")
+        file_path = Path(writer._get_file_path("csv", "contents"))
+        assert not file_path.exists()
+
+        await writer.flush()
+        assert file_path.read_text(encoding="utf-8-sig").splitlines() == ["note_id,title", "1,a"]
+
+    @pytest.mark.asyncio
+    async def test_csv_schema_drift_rotates_file(self):
+        """New keys go to a numbered file instead of misaligning columns"""
+        writer = AsyncFileWriter(platform="xhs", crawler_type="search")
+        await writer.write_to_csv({"note_id": "1", "title": "a"}, "contents")
+        await writer.write_to_csv({"note_id": "2"}, "contents")
+        await writer.write_to_csv({"note_id": "3", "title": "c", "extra": "x"}, "contents")
+        await AsyncFileWriter.close_all(finalize_json=False)
+
+        file_path = Path(writer._get_file_path("csv", "contents"))
+        rotated = file_path.with_name(f"{file_path.stem}_1.csv")
+        assert file_path.read_text(encoding="utf-8-sig").splitlines() == ["note_id,title", "1,a", "2,"]
+        assert rotated.read_text(encoding="utf-8-sig").splitlines() == ["note_id,title,extra", "3,c,x"]
+
+    @pytest.mark.asyncio
+    @patch('config.SAVE_DATA_OPTION', 'json')
+    async def test_json_batch_appends_to_array(self):
+        """write_items_to_json extends the existing JSON array"""
+        writer = AsyncFileWriter(platform="xhs", crawler_type="search")
+        await writer.write_single_item_to_json({"note_id": "0"}, "contents")
+        await writer.write_items_to_json([{"note_id": "1"}, {"note_id": "2"}], "contents")
+
+        with open(writer._get_file_path("json", "contents"), encoding="utf-8") as f:
+            assert [item["note_id"] for item in json.load(f)] == ["0", "1", "2"]
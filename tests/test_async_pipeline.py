@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_async_pipeline.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the staged asyncio crawl pipeline
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from media_platform.xhs.core import XiaoHongShuCrawler
+from tools.async_pipeline import AsyncPipeline
+
+
+@pytest.mark.asyncio
+async def test_items_flow_through_all_stages():
+    """Every item produced reaches the last stage, failures are isolated"""
+    pipeline = AsyncPipeline("test", queue_size=2)
+    stored, commented = [], []
+
+    async def detail(item: int):
+        if item == 3:
+            raise ValueError("detail failed")
+        await pipeline.put("store", item * 10)
+
+    async def store(item: int):
+        stored.append(item)
+        await pipeline.put("comments", item)
+
+    async def comments(item: int):
+        await asyncio.sleep(0.01)
+        commented.append(item)
+
+    async def producer():
+        for i in range(6):
+            await pipeline.put("detail", i)
+
+    pipeline.add_stage("detail", detail, workers=2)
+    pipeline.add_stage("store", store, workers=1)
+    pipeline.add_stage("comments", comments, workers=3)
+    await pipeline.run(producer())
+
+    assert sorted(stored) == [0, 10, 20, 40, 50]
+    assert sorted(commented) == sorted(stored)
+    metrics = pipeline.get_metrics()
+    assert metrics["detail"] == {"processed": 5, "failed": 1, "pending": 0}
+
+
+@pytest.mark.asyncio
+async def test_next_page_overlaps_previous_comments():
+    """The producer keeps searching while comments of earlier pages are still being crawled"""
+    pipeline = AsyncPipeline("test", queue_size=10)
+    events = []
+
+    async def comments(item: str):
+        events.append(f"comments:{item}:start")
+        await asyncio.sleep(0.05)
+        events.append(f"comments:{item}:end")
+
+    async def producer():
+        for page in range(2):
+            events.append(f"search:{page}")
+            await pipeline.put("comments", str(page))
+            await asyncio.sleep(0.01)
+
+    pipeline.add_stage("comments", comments, workers=2)
+    await pipeline.run(producer())
+
+    assert events.index("search:1") < events.index("comments:0:end")
+    assert events.count("comments:1:end") == 1
+
+
+@pytest.mark.asyncio
+async def test_bounded_queue_applies_backpressure():
+    """A full queue blocks the producer instead of buffering everything"""
+    pipeline = AsyncPipeline("test", queue_size=1)
+    release = asyncio.Event()
+    produced = []
+
+    async def slow(item: int):
+        await release.wait()
+
+    async def producer():
+        for i in range(5):
+            await pipeline.put("slow", i)
+            produced.append(i)
+
+    pipeline.add_stage("slow", slow, workers=1)
+    run_task = asyncio.create_task(pipeline.run(producer()))
+    await asyncio.sleep(0.05)
+    # one item in the worker, one in the queue, the third put is waiting
+    assert produced == [0, 1]
+    release.set()
+    await run_task
+    assert produced == [0, 1, 2, 3, 4]
+
+
+class _ConcurrencyTrackingXhsClient:
+    """Stand-in xhs client that records how many API calls are in flight at once"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def _call(self, name: str):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.calls.append(name)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+
+    async def get_note_by_keyword(self, keyword, search_id, page, sort):
+        await self._call("search")
+        items = [{"id": f"{page}-{i}", "xsec_source": "", "xsec_token": ""} for i in range(3)]
+        return {"has_more": True, "items": items}
+
+    async def get_note_by_id(self, note_id, xsec_source, xsec_token):
+        await self._call("detail")
+        return {"note_id": note_id}
+
+    async def get_note_all_comments(self, note_id, xsec_token, crawl_interval, callback, max_count):
+        await self._call("comments")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_concurrency", [1, 2])
+async def test_search_pipeline_respects_max_concurrency(max_concurrency):
+    """All API-calling stages of the keyword pipeline share MAX_CONCURRENCY_NUM slots"""
+    crawler = XiaoHongShuCrawler()
+    crawler.xhs_client = _ConcurrencyTrackingXhsClient()
+    with patch("config.MAX_CONCURRENCY_NUM", max_concurrency), \
+            patch("config.KEYWORDS", "k"), \
+            patch("config.START_PAGE", 1), \
+            patch("config.CRAWLER_MAX_NOTES_COUNT", 40), \
+            patch("config.ENABLE_GET_COMMENTS", True), \
+            patch("config.ENABLE_GET_MEIDAS", False), \
+            patch("config.ENABLE_RATE_LIMITER", False), \
+            patch("config.CRAWLER_MAX_SLEEP_SEC", 0), \
+            patch("media_platform.xhs.core.xhs_store.update_xhs_note", AsyncMock()):
+        await crawler.search()
+
+    calls = crawler.xhs_client.calls
+    assert calls.count("search") == 2
+    assert calls.count("detail") == 6 and calls.count("comments") == 6
+    assert crawler.xhs_client.peak == max_concurrency
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_bulk_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the batched SQL upsert writer
+"""
+
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+
+import config
+from config.db_config import sqlite_db_config
+from database import db_session
+from database.bulk_writer import BulkUpsertWriter
+from database.models import XhsNote
+from store.xhs._store_impl import XhsSqliteStoreImplement
+
+
+class TestBulkUpsertWriter:
+    """Test cases for BulkUpsertWriter against a temporary SQLite database"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def sqlite_db(self, tmp_path, monkeypatch):
+        """Point the sqlite engine at an isolated database file"""
+        monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+        monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "test.db"))
+        monkeypatch.setattr(db_session, "_engines", {})
+        BulkUpsertWriter._instances.clear()
+        await db_session.create_tables("sqlite")
+        yield
+        await BulkUpsertWriter.close_all()
+        await db_session.get_async_engine("sqlite").dispose()
+
+    @staticmethod
+    async def _fetch_notes():
+        async with db_session.get_session() as session:
+            result = await session.execute(select(XhsNote).order_by(XhsNote.note_id))
+            return result.scalars().all()
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_BATCH_SIZE', 1000)
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_rows_are_buffered_until_flush(self, sample_xhs_note):
+        """Stored items stay in memory until flush"""
+        store = XhsSqliteStoreImplement()
+        await store.store_content(sample_xhs_note)
+        assert await self._fetch_notes() == []
+
+        await BulkUpsertWriter.get_instance().flush()
+        notes = await self._fetch_notes()
+        assert len(notes) == 1
+        assert notes[0].note_id == sample_xhs_note["note_id"]
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_BATCH_SIZE', 1000)
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_upsert_updates_counters_only(self, sample_xhs_note):
+        """Existing rows keep their content and only refresh the update columns"""
+        store = XhsSqliteStoreImplement()
+        await store.store_content(sample_xhs_note)
+        await BulkUpsertWriter.get_instance().flush()
+
+        await store.store_content({**sample_xhs_note, "title": "new title", "liked_count": 999})
+        await BulkUpsertWriter.get_instance().flush()
+
+        notes = await self._fetch_notes()
+        assert len(notes) == 1
+        assert notes[0].title == sample_xhs_note["title"]
+        assert notes[0].liked_count == 999
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_BATCH_SIZE', 1000)
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_unparseable_counters_stored_as_null(self, sample_xhs_note):
+        """Missing or unparseable counters become NULL instead of text in an integer column"""
+        store = XhsSqliteStoreImplement()
+        await store.store_content({
+            **sample_xhs_note, "liked_count": None, "collected_count": "赞", "comment_count": "1.2万",
+            # 其它平台的 str(None)
+            "share_count": "None",
+        })
+        await BulkUpsertWriter.get_instance().flush()
+
+        notes = await self._fetch_notes()
+        assert notes[0].liked_count is None
+        assert notes[0].collected_count is None
+        assert notes[0].comment_count == 12000
+        assert notes[0].share_count is None
+        async with db_session.get_session() as session:
+            types = (await session.execute(
+                text("SELECT typeof(liked_count), typeof(collected_count) FROM xhs_note")
+            )).one()
+        assert tuple(types) == ("null", "null")
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_BATCH_SIZE', 3)
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_batch_size_triggers_flush(self, sample_xhs_note):
+        """Reaching DB_BULK_BATCH_SIZE writes the batch, duplicate keys are merged"""
+        store = XhsSqliteStoreImplement()
+        for note_id in ["a", "b", "a", "c"]:
+            await store.store_content({**sample_xhs_note, "note_id": note_id})
+
+        notes = await self._fetch_notes()
+        assert [n.note_id for n in notes] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_BATCH_SIZE', 1000)
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_fallback_without_unique_index(self, sample_xhs_note):
+        """Tables created before the unique index fall back to select + insert/update"""
+        engine = db_session.get_async_engine("sqlite")
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_xhs_note_note_id"))
+            await conn.execute(text("CREATE INDEX ix_xhs_note_note_id ON xhs_note (note_id)"))
+
+        store = XhsSqliteStoreImplement()
+        await store.store_content(sample_xhs_note)
+        await BulkUpsertWriter.get_instance().flush()
+        await store.store_content({**sample_xhs_note, "liked_count": 1})
+        await BulkUpsertWriter.get_instance().flush()
+
+        notes = await self._fetch_notes()
+        assert len(notes) == 1
+        assert notes[0].liked_count == 1
+        assert BulkUpsertWriter.get_instance()._native_upsert_cache["xhs_note"] is False
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_BATCH_SIZE', 1000)
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_store_contents_batch(self, sample_xhs_note):
+        """store_contents buffers a whole batch, skipping items without a key"""
+        store = XhsSqliteStoreImplement()
+        batch = [{**sample_xhs_note, "note_id": f"n{i}"} for i in range(5)] + [{**sample_xhs_note, "note_id": None}]
+        await store.store_contents(batch)
+        await BulkUpsertWriter.get_instance().flush()
+
+        notes = await self._fetch_notes()
+        assert [note.note_id for note in notes] == [f"n{i}" for i in range(5)]
+
+
+class TestDbSession:
+    """Test cases for the cached session factory and SQLite connection tuning"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def sqlite_db(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+        monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "test.db"))
+        monkeypatch.setattr(db_session, "_engines", {})
+        monkeypatch.setattr(db_session, "_session_factories", {})
+        yield
+        await db_session.dispose_engines()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_pragmas(self):
+        """New SQLite connections use WAL and synchronous=NORMAL"""
+        async with db_session.get_session() as session:
+            journal_mode = (await session.execute(text("PRAGMA journal_mode"))).scalar()
+            synchronous = (await session.execute(text("PRAGMA synchronous"))).scalar()
+        assert journal_mode == "wal"
+        assert synchronous == 1
+
+    @pytest.mark.asyncio
+    async def test_session_factory_cached_until_dispose(self):
+        """The session factory is reused per engine and rebuilt after dispose"""
+        factory = db_session.get_session_factory("sqlite")
+        assert db_session.get_session_factory("sqlite") is factory
+
+        await db_session.dispose_engines()
+        assert db_session._engines == {}
+        assert db_session.get_session_factory("sqlite") is not factory
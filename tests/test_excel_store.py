@@ -33,7 +33,10 @@ try:
 except ImportError:
     EXCEL_AVAILABLE = False
 
+from unittest.mock import patch
+
 from store.excel_store_base import ExcelStoreBase
+from store.excel_streaming_store import ExcelStreamingStore
 
 
 @pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl not installed")
@@ -273,3 +276,50 @@ class TestSingletonPattern:
 
         # Verify instances are cleared
         assert len(ExcelStoreBase._instances) == 0
+
+
+@pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl not installed")
+class TestExcelStreamingStore:
+    """Test cases for the write-only streaming Excel store"""
+
+    @pytest.fixture(autouse=True)
+    def setup_and_teardown(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        ExcelStoreBase._instances.clear()
+        yield
+        ExcelStoreBase._instances.clear()
+
+    @patch('config.EXCEL_STREAMING_MODE', True)
+    def test_get_instance_returns_streaming_store(self):
+        """Test that streaming mode switches the store implementation"""
+        store = ExcelStoreBase.get_instance("xhs", "search")
+        assert isinstance(store, ExcelStreamingStore)
+
+    @pytest.mark.asyncio
+    @patch('config.EXCEL_CHECKPOINT_ROWS', 3)
+    @patch('config.EXCEL_COLUMN_WIDTH_SAMPLE_ROWS', 2)
+    async def test_checkpoint_parts(self):
+        """Test that rows are split into readable part files with tracked widths"""
+        store = ExcelStreamingStore(platform="test", crawler_type="search")
+        for i in range(5):
+            await store.store_content({"note_id": f"note{i}", "title": "x" * (i * 10)})
+        await store.store_comment({"comment_id": "c1", "content": "Comment"})
+        store.flush()
+
+        assert len(store.part_files) == 2
+        first = openpyxl.load_workbook(store.part_files[0])
+        assert first["Contents"].max_row == 4  # Header + 3 data rows
+        assert first["Contents"]["A1"].font.bold
+        assert first["Contents"].column_dimensions["B"].width == 22
+
+        second = openpyxl.load_workbook(store.part_files[1])
+        assert second["Contents"].max_row == 3
+        assert second["Contents"]["B3"].value == "x" * 40
+        assert second["Comments"].max_row == 2
+
+    def test_flush_without_data(self):
+        """Test that an empty streaming store creates no file"""
+        store = ExcelStreamingStore(platform="test", crawler_type="search")
+        store.flush()
+        assert not store.filename.exists()
+        assert store.part_files == []
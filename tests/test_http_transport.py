@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_http_transport.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the shared keep-alive httpx client manager
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from tools.http_transport import HTTP2_AVAILABLE, SharedHttpTransport
+
+
+class TestSharedHttpTransport:
+    """Test cases for client reuse, delayed retirement, shutdown and the no-persist cookie policy"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def clean_transport(self):
+        yield
+        await SharedHttpTransport.close_all()
+
+    @pytest_asyncio.fixture
+    async def cookie_server_url(self):
+        """Local HTTP server whose every response sets a cookie"""
+
+        async def handle(reader, writer):
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nSet-Cookie: session=abc; Path=/\r\n"
+                b"Content-Length: 2\r\nConnection: close\r\n\r\nok"
+            )
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        yield f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        server.close()
+        await server.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_client_reused_per_platform_and_proxy(self):
+        """The same (platform, proxy) shares one client; other keys and closed clients get a new one"""
+        client = SharedHttpTransport.get_client("XhsClient", None)
+        assert SharedHttpTransport.get_client("XhsClient", None) is client
+        assert SharedHttpTransport.get_client("XhsClient", "http://127.0.0.1:1") is not client
+        assert SharedHttpTransport.get_client("DouYinClient", None) is not client
+
+        await client.aclose()
+        rebuilt = SharedHttpTransport.get_client("XhsClient", None)
+        assert rebuilt is not client and not rebuilt.is_closed
+
+    @pytest.mark.asyncio
+    async def test_retire_closes_after_grace_period(self):
+        """A retired client is removed immediately but only closed after the grace period"""
+        client = SharedHttpTransport.get_client("XhsClient", "http://127.0.0.1:1")
+        SharedHttpTransport.retire("XhsClient", "http://127.0.0.1:1", grace_seconds=0.05)
+
+        assert ("XhsClient", "http://127.0.0.1:1") not in SharedHttpTransport._clients
+        assert not client.is_closed
+        await asyncio.sleep(0.1)
+        assert client.is_closed
+        assert SharedHttpTransport._retiring_tasks == []
+
+    @pytest.mark.asyncio
+    async def test_close_all_cancels_retiring_and_closes_clients(self):
+        """close_all closes retiring clients without waiting for their grace period, then the active ones"""
+        retiring = SharedHttpTransport.get_client("XhsClient", "http://127.0.0.1:1")
+        active = SharedHttpTransport.get_client("XhsClient", None)
+        SharedHttpTransport.retire("XhsClient", "http://127.0.0.1:1", grace_seconds=3600)
+
+        await asyncio.wait_for(SharedHttpTransport.close_all(), timeout=1)
+
+        assert retiring.is_closed and active.is_closed
+        assert SharedHttpTransport._clients == {}
+        assert SharedHttpTransport._retiring_tasks == []
+
+    @pytest.mark.asyncio
+    async def test_set_cookie_is_not_persisted(self, cookie_server_url):
+        """Set-Cookie from a response never leaks into later requests of the shared client"""
+        client = SharedHttpTransport.get_client("XhsClient", None)
+        response = await client.get(cookie_server_url)
+
+        assert response.headers["set-cookie"].startswith("session=abc")
+        assert len(client.cookies.jar) == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not HTTP2_AVAILABLE, reason="h2 not installed")
+    async def test_http2_enabled_when_available(self):
+        """ENABLE_HTTP2 turns on HTTP/2 negotiation for the shared client"""
+        with patch("config.ENABLE_HTTP2", True):
+            client = SharedHttpTransport.get_client("XhsClient", None)
+        assert client._transport._pool._http2 is True
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_js_sign_engine.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the persistent JS signing engine
+"""
+
+import asyncio
+import shutil
+
+import pytest
+import pytest_asyncio
+
+from tools.js_sign_engine import JsSignEngine, JsSignError
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="Node runtime is not installed")
+
+ZHIHU_JS = "libs/zhihu.js"
+DOUYIN_JS = "libs/douyin.js"
+
+
+class TestJsSignEngine:
+    """Test cases for JsSignEngine"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def cleanup(self):
+        """Stop all sign workers after each test"""
+        yield
+        await JsSignEngine.close_all()
+
+    @pytest.mark.asyncio
+    async def test_zhihu_sign(self):
+        """get_sign returns both zhihu sign headers"""
+        engine = JsSignEngine.get_instance(ZHIHU_JS)
+        result = await engine.sign("get_sign", "/api/v4/search_v3?q=python", "d_c0=abc|123;")
+        assert result["x-zse-96"].startswith("2.0_")
+        assert result["x-zst-81"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_workers(self):
+        """Concurrent calls are served by the fixed size worker pool"""
+        engine = JsSignEngine.get_instance(DOUYIN_JS)
+        results = await asyncio.gather(*[engine.sign("sign_datail", f"aid={i}", "UA") for i in range(20)])
+        assert all(isinstance(r, str) and r for r in results)
+        assert len(engine._workers) == engine.worker_count
+
+    @pytest.mark.asyncio
+    async def test_script_error_keeps_worker(self):
+        """Errors thrown by the script are raised without restarting the worker"""
+        engine = JsSignEngine(DOUYIN_JS, worker_count=1)
+        await engine.sign("sign_datail", "aid=1", "UA")
+        process = engine._workers[0]._process
+
+        with pytest.raises(JsSignError):
+            await engine.sign("not_exist_function")
+        assert engine._workers[0]._process is process
+        await engine.close()
+
+    @pytest.mark.asyncio
+    async def test_crashed_worker_is_restarted(self):
+        """A killed worker is replaced on the next call"""
+        engine = JsSignEngine(DOUYIN_JS, worker_count=1)
+        await engine.sign("sign_datail", "aid=1", "UA")
+        engine._workers[0]._process.kill()
+        await engine._workers[0]._process.wait()
+
+        assert await engine.sign("sign_datail", "aid=2", "UA")
+        await engine.close()
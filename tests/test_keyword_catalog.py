@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_keyword_catalog.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the write-maintained keyword catalog
+"""
+
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+import config
+from config.db_config import sqlite_db_config
+from database import db_session, keyword_catalog
+from database.bulk_writer import BulkUpsertWriter
+from database.models import KeywordCatalog
+from store.xhs._store_impl import XhsSqliteStoreImplement
+
+
+class TestKeywordCatalog:
+    """Test cases for keyword_catalog maintenance against a temporary SQLite database"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def sqlite_db(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+        monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "test.db"))
+        monkeypatch.setattr(db_session, "_engines", {})
+        monkeypatch.setattr(db_session, "_session_factories", {})
+        monkeypatch.setattr(keyword_catalog, "_keywords_cache", None)
+        BulkUpsertWriter._instances.clear()
+        await db_session.create_tables("sqlite")
+        yield
+        await BulkUpsertWriter.close_all()
+        await db_session.dispose_engines()
+
+    @staticmethod
+    async def _catalog():
+        async with db_session.get_session() as session:
+            result = await session.execute(
+                select(KeywordCatalog.keyword, KeywordCatalog.platform, KeywordCatalog.item_count)
+                .order_by(KeywordCatalog.keyword)
+            )
+            return [tuple(row) for row in result.all()]
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_counts_maintained_on_write(self, sample_xhs_note):
+        """Flushing content rows updates item counts without double counting upserts"""
+        store = XhsSqliteStoreImplement()
+        await store.store_contents([
+            {**sample_xhs_note, "note_id": "n1", "source_keyword": "a"},
+            {**sample_xhs_note, "note_id": "n2", "source_keyword": "a"},
+            {**sample_xhs_note, "note_id": "n3", "source_keyword": "b"},
+        ])
+        await store.flush()
+        assert await self._catalog() == [("a", "xhs", 2), ("b", "xhs", 1)]
+
+        await store.store_content({**sample_xhs_note, "note_id": "n1", "source_keyword": "a"})
+        await store.flush()
+        assert await self._catalog() == [("a", "xhs", 2), ("b", "xhs", 1)]
+
+    @pytest.mark.asyncio
+    @patch('config.DB_BULK_FLUSH_INTERVAL_SEC', 3600)
+    async def test_keywords_read_through_cache(self, sample_xhs_note):
+        """The keyword list is served from the in-process cache within the TTL"""
+        store = XhsSqliteStoreImplement()
+        await store.store_content({**sample_xhs_note, "source_keyword": "a"})
+        await store.flush()
+        assert await keyword_catalog.get_catalog_keywords() == [{"value": "a", "platforms": ["xhs"]}]
+
+        await store.store_content({**sample_xhs_note, "note_id": "other", "source_keyword": "b"})
+        await store.flush()
+        assert len(await keyword_catalog.get_catalog_keywords()) == 1
+
+        keyword_catalog._keywords_cache = None
+        assert {k["value"] for k in await keyword_catalog.get_catalog_keywords()} == {"a", "b"}
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_media_downloader.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the streaming media downloader, served by an in-process mock transport
+"""
+
+import asyncio
+import os
+from typing import Dict, List
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from tools.http_transport import SharedHttpTransport
+from tools.media_downloader import MediaDownloader
+
+BODY = bytes(range(256)) * 64
+
+
+class FakeCdn:
+    """Serves BODY with Range support and records request headers and peak concurrency per host"""
+
+    def __init__(self, support_range: bool = True, fail_after: int = 0, delay: float = 0, range_shift: int = 0):
+        self.support_range = support_range
+        # 返回的 206 区间比请求的起点提前 range_shift 个字节，模拟不按请求返回区间的 CDN
+        self.range_shift = range_shift
+        # 第一次请求只返回前 fail_after 个字节后断开
+        self.fail_after = fail_after
+        self.delay = delay
+        self.requests: List[httpx.Request] = []
+        self.active: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+
+    async def _stream(self, host: str, body: bytes, fail: bool):
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            await asyncio.sleep(self.delay)
+            for i in range(0, len(body), 1024):
+                if fail and i >= self.fail_after:
+                    raise httpx.ReadError("connection reset")
+                yield body[i:i + 1024]
+        finally:
+            self.active[host] -= 1
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        fail = self.fail_after > 0 and len(self.requests) == 1
+        range_header = request.headers.get("Range")
+        if range_header and self.support_range:
+            start = int(range_header[len("bytes="):].rstrip("-"))
+            if start >= len(BODY):
+                return httpx.Response(416, headers={"Content-Range": f"bytes */{len(BODY)}"})
+            start = max(0, start - self.range_shift)
+            body = BODY[start:]
+            headers = {"Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"}
+            return httpx.Response(206, headers=headers, content=self._stream(request.url.host, body, fail))
+        return httpx.Response(200, content=self._stream(request.url.host, BODY, fail))
+
+
+class TestMediaDownloader:
+    """Test cases for MediaDownloader streaming, resume and per-host limits"""
+
+    @pytest.fixture
+    def cdn(self):
+        cdn = FakeCdn()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(cdn.handler))
+        with patch.object(SharedHttpTransport, "get_client", return_value=client):
+            yield cdn
+
+    @pytest.mark.asyncio
+    async def test_download_streams_to_file(self, cdn, tmp_path):
+        """Submitted files are written under a temp name and renamed when complete"""
+        save_path = str(tmp_path / "note" / "0.jpg")
+        downloader = MediaDownloader(workers=2)
+        await downloader.submit("https://cdn.example.com/0.jpg", save_path, headers={"Referer": "https://example.com"})
+        await downloader.close()
+
+        with open(save_path, "rb") as f:
+            assert f.read() == BODY
+        assert not os.path.exists(save_path + ".part")
+        assert cdn.requests[0].headers["Referer"] == "https://example.com"
+        assert downloader.get_metrics()["downloaded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resume_partial_file(self, cdn, tmp_path):
+        """An existing .part file is resumed with a Range request"""
+        save_path = str(tmp_path / "video.mp4")
+        with open(save_path + ".part", "wb") as f:
+            f.write(BODY[:5000])
+
+        downloader = MediaDownloader()
+        await downloader.submit("https://cdn.example.com/video.mp4", save_path)
+        await downloader.close()
+
+        assert cdn.requests[0].headers["Range"] == "bytes=5000-"
+        with open(save_path, "rb") as f:
+            assert f.read() == BODY
+        assert downloader.get_metrics()["resumed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_after_disconnect(self, cdn, tmp_path):
+        """A dropped connection is retried from the bytes already written"""
+        cdn.fail_after = 4096
+        save_path = str(tmp_path / "video.mp4")
+        downloader = MediaDownloader()
+        with patch("config.MEDIA_DOWNLOAD_CHUNK_SIZE", 1024), patch("asyncio.sleep", return_value=None):
+            await downloader.submit("https://cdn.example.com/video.mp4", save_path)
+            await downloader.close()
+
+        assert len(cdn.requests) == 2
+        assert cdn.requests[1].headers["Range"] == "bytes=4096-"
+        with open(save_path, "rb") as f:
+            assert f.read() == BODY
+
+    @pytest.mark.asyncio
+    async def test_restart_when_content_range_mismatches(self, cdn, tmp_path):
+        """A 206 starting elsewhere than the resume offset is not appended; the file is downloaded again"""
+        cdn.range_shift = 1000
+        save_path = str(tmp_path / "video.mp4")
+        with open(save_path + ".part", "wb") as f:
+            f.write(BODY[:5000])
+
+        downloader = MediaDownloader()
+        with patch("asyncio.sleep", return_value=None):
+            await downloader.submit("https://cdn.example.com/video.mp4", save_path)
+            await downloader.close()
+
+        assert cdn.requests[0].headers["Range"] == "bytes=5000-"
+        assert "Range" not in cdn.requests[1].headers
+        with open(save_path, "rb") as f:
+            assert f.read() == BODY
+        assert downloader.get_metrics()["resumed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_restart_when_range_not_supported(self, cdn, tmp_path):
+        """A server ignoring Range returns the full body, which replaces the partial file"""
+        cdn.support_range = False
+        save_path = str(tmp_path / "video.mp4")
+        with open(save_path + ".part", "wb") as f:
+            f.write(b"stale")
+
+        downloader = MediaDownloader()
+        await downloader.submit("https://cdn.example.com/video.mp4", save_path)
+        await downloader.close()
+
+        with open(save_path, "rb") as f:
+            assert f.read() == BODY
+
+    @pytest.mark.asyncio
+    async def test_per_host_limit_and_skip_existing(self, cdn, tmp_path):
+        """Downloads per host stay under the limit, and existing or duplicate targets are skipped"""
+        cdn.delay = 0.01
+        existing = tmp_path / "done.jpg"
+        existing.write_bytes(b"done")
+
+        downloader = MediaDownloader(workers=6, per_host_limit=2)
+        for i in range(4):
+            await downloader.submit(f"https://a.example.com/{i}.jpg", str(tmp_path / f"a{i}.jpg"))
+            await downloader.submit(f"https://b.example.com/{i}.jpg", str(tmp_path / f"b{i}.jpg"))
+        await downloader.submit("https://a.example.com/0.jpg", str(tmp_path / "a0.jpg"))
+        await downloader.submit("https://a.example.com/done.jpg", str(existing))
+        await downloader.close()
+
+        assert cdn.peak == {"a.example.com": 2, "b.example.com": 2}
+        assert downloader.get_metrics()["downloaded"] == 8
+        assert downloader.get_metrics()["skipped"] == 2
+        assert existing.read_bytes() == b"done"
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_media_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the content-addressed media store
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Dict, List
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from store.media_store import ContentAddressedMediaStore
+from tools.http_transport import SharedHttpTransport
+from tools.media_downloader import MediaDownloader
+
+BODIES = {
+    "/a.jpg": b"image-a" * 100,
+    "/a-copy.jpg": b"image-a" * 100,
+    "/b.jpg": b"image-b" * 100,
+}
+
+
+class TestContentAddressedMediaStore:
+    """Test cases for URL index hits, content dedup and per-note manifests"""
+
+    @pytest.fixture
+    def requests(self):
+        requests: List[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request.url.path)
+            return httpx.Response(200, content=BODIES[request.url.path])
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        MediaDownloader._instance = None
+        with patch.object(SharedHttpTransport, "get_client", return_value=client):
+            yield requests
+        MediaDownloader._instance = None
+
+    @staticmethod
+    def _blob_files(root: str) -> Dict[str, bytes]:
+        blobs = {}
+        for dirpath, _, filenames in os.walk(os.path.join(root, "blobs")):
+            for filename in filenames:
+                with open(os.path.join(dirpath, filename), "rb") as f:
+                    blobs[filename] = f.read()
+        return blobs
+
+    @pytest.mark.asyncio
+    async def test_shared_url_downloaded_once(self, requests, tmp_path):
+        """Two notes referencing the same URL share one download and one blob"""
+        store = ContentAddressedMediaStore(str(tmp_path))
+        await store.submit("n1", "0.jpg", "https://cdn.example.com/a.jpg")
+        await store.submit("n2", "3.jpg", "https://cdn.example.com/a.jpg")
+        await store.submit("n1", "1.jpg", "https://cdn.example.com/b.jpg")
+        await MediaDownloader.close_all()
+
+        assert sorted(requests) == ["/a.jpg", "/b.jpg"]
+        sha_a = hashlib.sha256(BODIES["/a.jpg"]).hexdigest()
+        manifest = store.read_manifest("n1")
+        assert set(manifest) == {"0.jpg", "1.jpg"}
+        assert manifest["0.jpg"]["sha256"] == sha_a
+        assert manifest["0.jpg"]["path"] == f"blobs/{sha_a[:2]}/{sha_a}.jpg"
+        assert store.read_manifest("n2")["3.jpg"] == manifest["0.jpg"]
+        assert self._blob_files(str(tmp_path))[f"{sha_a}.jpg"] == BODIES["/a.jpg"]
+        assert os.listdir(tmp_path / "tmp") == []
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_known_url_skips_network(self, requests, tmp_path):
+        """A URL already in the index is added to the manifest without any request, across runs"""
+        store = ContentAddressedMediaStore(str(tmp_path))
+        await store.submit("n1", "0.jpg", "https://cdn.example.com/a.jpg")
+        await MediaDownloader.close_all()
+        store.close()
+
+        store = ContentAddressedMediaStore(str(tmp_path))
+        await store.submit("n9", "0.jpg", "https://cdn.example.com/a.jpg")
+        await MediaDownloader.close_all()
+
+        assert requests == ["/a.jpg"]
+        assert store.hits == 1
+        assert store.read_manifest("n9")["0.jpg"]["url"] == "https://cdn.example.com/a.jpg"
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_identical_bytes_stored_once(self, requests, tmp_path):
+        """Different URLs with identical content point at a single blob"""
+        store = ContentAddressedMediaStore(str(tmp_path))
+        await store.submit("n1", "0.jpg", "https://cdn.example.com/a.jpg")
+        await MediaDownloader.get_instance().join()
+        await store.submit("n2", "0.jpeg", "https://cdn.example.com/a-copy.jpg")
+        await MediaDownloader.close_all()
+
+        assert len(self._blob_files(str(tmp_path))) == 1
+        assert store.deduplicated == 1
+        assert store.read_manifest("n2")["0.jpeg"]["path"] == store.read_manifest("n1")["0.jpg"]["path"]
+        assert store.lookup("https://cdn.example.com/a-copy.jpg") is not None
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_same_url_submitted_during_callback(self, requests, tmp_path):
+        """A URL submitted again while the first download's callback is still ingesting is not lost"""
+        store = ContentAddressedMediaStore(str(tmp_path))
+        ingesting, release = threading.Event(), threading.Event()
+        original_ingest = store._ingest
+
+        def slow_ingest(url, tmp):
+            ingesting.set()
+            release.wait(5)
+            return original_ingest(url, tmp)
+
+        with patch.object(store, "_ingest", side_effect=slow_ingest):
+            await store.submit("n1", "0.jpg", "https://cdn.example.com/a.jpg")
+            while not ingesting.is_set():
+                await asyncio.sleep(0.01)
+            await store.submit("n2", "0.jpg", "https://cdn.example.com/a.jpg")
+            release.set()
+            await MediaDownloader.close_all()
+
+        assert requests == ["/a.jpg"]
+        assert store.read_manifest("n2")["0.jpg"] == store.read_manifest("n1")["0.jpg"]
+        store.close()
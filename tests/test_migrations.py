@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_migrations.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the schema migrations run by --init_db
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+import config
+from config.db_config import sqlite_db_config
+from database import db_session
+from database.bulk_writer import BulkUpsertWriter
+from database.migrations import run_migrations
+from database.models import XhsCreator, XhsNote, XhsNoteComment
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE xhs_note (id INTEGER PRIMARY KEY, note_id VARCHAR(255), title TEXT, liked_count TEXT, "
+    "comment_count TEXT, time BIGINT, add_ts BIGINT, image_list TEXT, tag_list TEXT, "
+    "source_keyword TEXT DEFAULT '')",
+    "CREATE UNIQUE INDEX ix_xhs_note_note_id ON xhs_note (note_id)",
+    "CREATE TABLE xhs_note_comment (id INTEGER PRIMARY KEY, comment_id VARCHAR(255), note_id VARCHAR(255), "
+    "like_count TEXT)",
+    "INSERT INTO xhs_note (note_id, title, liked_count, comment_count, time, image_list, tag_list, source_keyword) "
+    "VALUES ('n1', 'a', '1.2万', '10+', 1, 'http://a/1.jpg,http://a/2.jpg', '测试,编程', 'kw'), "
+    "('n2', 'b', '999', '', 2, '\"http://b/1.jpg\"', '[\"x\"]', 'kw'), "
+    "('n3', 'c', '20', NULL, 3, '', NULL, 'kw')",
+    "INSERT INTO xhs_note_comment (comment_id, note_id, like_count) VALUES ('c1', 'n1', '3')",
+]
+
+# 基线版本建出的表：内容/评论 ID 只有普通索引，创作者 user_id 没有索引
+BASELINE_SCHEMA = [
+    "CREATE TABLE xhs_note (id INTEGER PRIMARY KEY, note_id VARCHAR(255), title TEXT, liked_count TEXT, "
+    "add_ts BIGINT, source_keyword TEXT DEFAULT '')",
+    "CREATE INDEX ix_xhs_note_note_id ON xhs_note (note_id)",
+    "CREATE TABLE xhs_note_comment (id INTEGER PRIMARY KEY, comment_id VARCHAR(255), note_id VARCHAR(255), "
+    "content TEXT, like_count TEXT)",
+    "CREATE INDEX ix_xhs_note_comment_comment_id ON xhs_note_comment (comment_id)",
+    "CREATE TABLE xhs_creator (id INTEGER PRIMARY KEY, user_id VARCHAR(255), nickname TEXT)",
+    "INSERT INTO xhs_note (note_id, title, liked_count, add_ts, source_keyword) VALUES ('n1', 'a', '1', 1, 'kw')",
+    "INSERT INTO xhs_note_comment (comment_id, note_id, content) VALUES ('c1', 'n1', 'old'), ('c2', 'n1', 'x'), "
+    "('c1', 'n1', 'new'), (NULL, 'n1', 'y'), (NULL, 'n1', 'z')",
+    "INSERT INTO xhs_creator (user_id, nickname) VALUES ('u1', 'a'), ('u2', 'b')",
+]
+
+
+class TestMigrations:
+    """Test cases for upgrading a legacy SQLite schema"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def legacy_db(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+        monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "legacy.db"))
+        monkeypatch.setattr(db_session, "_engines", {})
+        monkeypatch.setattr(db_session, "_session_factories", {})
+        async with db_session.get_async_engine("sqlite").begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                await conn.execute(text(statement))
+        yield
+        await db_session.dispose_engines()
+
+    @staticmethod
+    async def _query(sql: str):
+        async with db_session.get_session() as session:
+            return (await session.execute(text(sql))).all()
+
+    @pytest.mark.asyncio
+    async def test_counters_backfilled_and_sorted_numerically(self):
+        """Text counters become integers and sort numerically"""
+        assert await run_migrations("sqlite") == [
+            "0001_numeric_counters", "0002_keyword_catalog", "0003_json_list_columns", "0004_unique_keys",
+        ]
+
+        rows = await self._query("SELECT note_id, liked_count, comment_count FROM xhs_note ORDER BY liked_count DESC")
+        assert [tuple(r) for r in rows] == [("n1", 12000, 10), ("n2", 999, None), ("n3", 20, None)]
+        types = {r[1]: r[2] for r in await self._query("PRAGMA table_info(xhs_note)")}
+        assert types["liked_count"] == "BIGINT"
+        assert types["source_keyword"] == "VARCHAR(255)"
+
+    @pytest.mark.asyncio
+    async def test_indexes_created_and_used(self):
+        """Composite and comment indexes exist and serve keyword-filtered sorting"""
+        await run_migrations("sqlite")
+
+        note_indexes = {r[1] for r in await self._query("PRAGMA index_list(xhs_note)")}
+        assert {"idx_xhs_note_kw_liked", "idx_xhs_note_kw_time", "ix_xhs_note_note_id"} <= note_indexes
+        comment_indexes = {r[1] for r in await self._query("PRAGMA index_list(xhs_note_comment)")}
+        assert "ix_xhs_note_comment_note_id" in comment_indexes
+
+        plan = await self._query(
+            "EXPLAIN QUERY PLAN SELECT note_id FROM xhs_note WHERE source_keyword = 'kw' "
+            "ORDER BY liked_count DESC LIMIT 10"
+        )
+        detail = " ".join(str(r[-1]) for r in plan)
+        assert "idx_xhs_note_kw_liked" in detail
+        assert "TEMP B-TREE" not in detail
+
+    @pytest.mark.asyncio
+    async def test_keyword_catalog_backfilled(self):
+        """keyword_catalog is created and filled from the existing content rows"""
+        await run_migrations("sqlite")
+
+        rows = await self._query("SELECT keyword, platform, item_count FROM keyword_catalog")
+        assert [tuple(r) for r in rows] == [("kw", "xhs", 3)]
+
+    @pytest.mark.asyncio
+    async def test_list_columns_normalized_to_json(self):
+        """Comma-separated, quoted and empty list values are rewritten as canonical JSON arrays"""
+        await run_migrations("sqlite")
+
+        rows = await self._query("SELECT note_id, image_list, tag_list FROM xhs_note ORDER BY note_id")
+        assert [tuple(r) for r in rows] == [
+            ("n1", '["http://a/1.jpg","http://a/2.jpg"]', '["测试","编程"]'),
+            ("n2", '["http://b/1.jpg"]', '["x"]'),
+            ("n3", "[]", "[]"),
+        ]
+        types = {r[1]: r[2] for r in await self._query("PRAGMA table_info(xhs_note)")}
+        assert types["image_list"] == "JSON"
+
+    @pytest.mark.asyncio
+    async def test_migrations_run_once(self):
+        """Applied revisions are recorded and skipped on the next run"""
+        await run_migrations("sqlite")
+        assert await run_migrations("sqlite") == []
+
+
+class TestUniqueKeyMigration:
+    """Test cases for upgrading the baseline schema's plain ID indexes to unique indexes"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def baseline_db(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+        monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "baseline.db"))
+        monkeypatch.setattr(db_session, "_engines", {})
+        monkeypatch.setattr(db_session, "_session_factories", {})
+        async with db_session.get_async_engine("sqlite").begin() as conn:
+            for statement in BASELINE_SCHEMA:
+                await conn.execute(text(statement))
+        yield
+        await db_session.dispose_engines()
+
+    @staticmethod
+    async def _query(sql: str):
+        async with db_session.get_session() as session:
+            return (await session.execute(text(sql))).all()
+
+    @pytest.mark.asyncio
+    async def test_plain_indexes_rebuilt_as_unique(self):
+        """Same-named plain indexes become unique, missing unique indexes are added"""
+        await run_migrations("sqlite")
+
+        for table, index in [
+            ("xhs_note", "ix_xhs_note_note_id"),
+            ("xhs_note_comment", "ix_xhs_note_comment_comment_id"),
+            ("xhs_creator", "ix_xhs_creator_user_id"),
+        ]:
+            unique = {r[1]: r[2] for r in await self._query(f"PRAGMA index_list({table})")}
+            assert unique[index] == 1
+
+        writer = BulkUpsertWriter("sqlite")
+        assert await writer._supports_native_upsert(XhsNote.__table__, ("note_id",))
+        assert await writer._supports_native_upsert(XhsNoteComment.__table__, ("comment_id",))
+        assert await writer._supports_native_upsert(XhsCreator.__table__, ("user_id",))
+
+    @pytest.mark.asyncio
+    async def test_duplicate_rows_removed_before_unique_index(self):
+        """Duplicate keys keep only the latest row, rows with a NULL key are left alone"""
+        await run_migrations("sqlite")
+
+        rows = await self._query("SELECT comment_id, content FROM xhs_note_comment ORDER BY id")
+        assert [tuple(r) for r in rows] == [("c2", "x"), ("c1", "new"), (None, "y"), (None, "z")]
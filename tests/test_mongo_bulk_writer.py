@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_mongo_bulk_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the buffered MongoDB bulk writer, using an in-memory collection
+"""
+
+from typing import Dict, List
+from unittest.mock import patch
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from database.mongodb_store_base import MongoBulkWriter, MongoDBStoreBase
+from store.xhs._store_impl import XhsMongoStoreImplement
+
+
+class FakeCollection:
+    """Minimal in-memory stand-in for a motor collection"""
+
+    def __init__(self):
+        self.docs: List[Dict] = []
+        self.bulk_calls: List[Dict] = []
+        self.indexes: List[Dict] = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_calls.append({"count": len(operations), "ordered": ordered})
+        for op in operations:
+            found = next(
+                (d for d in self.docs if all(d.get(k) == v for k, v in op._filter.items())), None
+            )
+            if found is not None:
+                found.update(op._doc["$set"])
+            elif op._upsert:
+                self.docs.append({**op._filter, **op._doc["$set"]})
+
+    async def create_index(self, keys, unique=False):
+        field = keys[0][0]
+        values = [d.get(field) for d in self.docs]
+        if unique and len(values) != len(set(values)):
+            raise DuplicateKeyError("duplicate key")
+        self.indexes.append({"keys": keys, "unique": unique})
+
+
+class TestMongoBulkWriter:
+    """Test cases for MongoBulkWriter and index bootstrap against FakeCollection"""
+
+    @pytest.fixture(autouse=True)
+    def fake_collections(self):
+        collections: Dict[str, FakeCollection] = {}
+
+        async def get_collection(store, collection_suffix):
+            return collections.setdefault(f"{store.collection_prefix}_{collection_suffix}", FakeCollection())
+
+        MongoBulkWriter._instance = None
+        MongoDBStoreBase._indexed_prefixes.clear()
+        with patch.object(MongoDBStoreBase, "get_collection", get_collection):
+            yield collections
+        MongoBulkWriter._instance = None
+        MongoDBStoreBase._indexed_prefixes.clear()
+
+    @pytest.mark.asyncio
+    async def test_store_buffers_until_flush(self, fake_collections, sample_xhs_note, sample_xhs_comment):
+        store = XhsMongoStoreImplement()
+        await store.store_content(sample_xhs_note)
+        await store.store_content({**sample_xhs_note, "title": "Updated"})
+        await store.store_comment(sample_xhs_comment)
+        assert fake_collections == {}
+
+        await store.flush()
+
+        contents = fake_collections["xhs_contents"]
+        assert contents.bulk_calls == [{"count": 1, "ordered": False}]
+        assert contents.docs[0]["title"] == "Updated"
+        assert len(fake_collections["xhs_comments"].docs) == 1
+        await store.close()
+
+    @pytest.mark.asyncio
+    @patch('config.MONGO_BULK_BATCH_SIZE', 2)
+    async def test_flush_on_batch_size(self, fake_collections):
+        store = XhsMongoStoreImplement()
+        await store.store_contents([{"note_id": "n1"}, {"note_id": "n2"}, {"note_id": ""}])
+
+        assert len(fake_collections["xhs_contents"].docs) == 2
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_ensure_indexes(self, fake_collections):
+        fake_collections["douyin_comments"] = FakeCollection()
+        fake_collections["douyin_comments"].docs = [{"comment_id": "c1"}, {"comment_id": "c1"}]
+
+        await MongoDBStoreBase("douyin").ensure_indexes()
+        await MongoDBStoreBase("douyin").ensure_indexes()
+
+        assert fake_collections["douyin_contents"].indexes == [{"keys": [("aweme_id", 1)], "unique": True}]
+        assert fake_collections["douyin_creators"].indexes == [{"keys": [("user_id", 1)], "unique": True}]
+        # 已有重复数据时退回普通索引
+        assert fake_collections["douyin_comments"].indexes == [{"keys": [("comment_id", 1)], "unique": False}]
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_pagination.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the unified data list pagination
+"""
+
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+
+import config
+from config.db_config import sqlite_db_config
+from database import db_session, pagination
+from database.models import XhsNote
+
+LIKES = [5, 9, None, 5, 7, 5, 1, None, 9, 3]
+
+
+class TestPagination:
+    """Test cases for offset and cursor pagination against a temporary SQLite database"""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def sqlite_db(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "SAVE_DATA_OPTION", "sqlite")
+        monkeypatch.setitem(sqlite_db_config, "db_path", str(tmp_path / "test.db"))
+        monkeypatch.setattr(db_session, "_engines", {})
+        monkeypatch.setattr(db_session, "_session_factories", {})
+        monkeypatch.setattr(pagination, "_count_cache", {})
+        await db_session.create_tables("sqlite")
+        rows = [
+            {"note_id": f"n{i}", "title": f"title {i}", "liked_count": liked, "source_keyword": "kw", "time": i}
+            for i, liked in enumerate(LIKES)
+        ]
+        async with db_session.get_session() as session:
+            await session.execute(insert(XhsNote), rows)
+        yield
+        await db_session.dispose_engines()
+
+    @pytest.mark.asyncio
+    async def test_cursor_walks_all_rows_in_order(self):
+        """Following next_cursor returns every row once, in the same order as offset pagination"""
+        expected = (await pagination.get_paginated_list("xhs", page_size=100))["list"]
+        assert [item["liked_count"] for item in expected][:3] == [9, 9, 7]
+
+        walked, cursor = [], None
+        while True:
+            result = await pagination.get_paginated_list("xhs", page_size=3, cursor=cursor)
+            walked.extend(result["list"])
+            cursor = result["next_cursor"]
+            if cursor is None:
+                break
+        assert [item["id"] for item in walked] == [item["id"] for item in expected]
+        assert result["total"] == len(LIKES)
+
+    @pytest.mark.asyncio
+    async def test_total_count_is_cached(self):
+        """The total is served from cache within DATA_LIST_COUNT_CACHE_TTL_SEC"""
+        first = await pagination.get_paginated_list("xhs", source_keyword="kw")
+        async with db_session.get_session() as session:
+            await session.execute(insert(XhsNote), [{"note_id": "extra", "source_keyword": "kw"}])
+
+        assert (await pagination.get_paginated_list("xhs", source_keyword="kw"))["total"] == first["total"]
+        with patch('config.DATA_LIST_COUNT_CACHE_TTL_SEC', 0):
+            pagination._count_cache.clear()
+            assert (await pagination.get_paginated_list("xhs", source_keyword="kw"))["total"] == first["total"] + 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self):
+        """A cursor from another sort column or garbage input is rejected"""
+        result = await pagination.get_paginated_list("xhs", page_size=2)
+        with pytest.raises(ValueError):
+            await pagination.get_paginated_list("xhs", sort_by="create_time", cursor=result["next_cursor"])
+        with pytest.raises(ValueError):
+            await pagination.get_paginated_list("xhs", cursor="not-a-cursor")
+        with pytest.raises(ValueError):
+            await pagination.get_paginated_list("unknown")
+
+    @pytest.mark.asyncio
+    async def test_data_list_image_list(self, sample_xhs_note):
+        """image_list comes back as a list from the JSON column, and as a one-item list for cover URLs"""
+        from database import crud
+        from database.models import DouyinAweme
+
+        await crud.get_store_by_platform("xhs").store_content({**sample_xhs_note, "note_id": "json", "liked_count": 100})
+        await crud.get_store_by_platform("xhs").flush()
+        async with db_session.get_session() as session:
+            await session.execute(insert(DouyinAweme), [
+                {"aweme_id": "a1", "cover_url": "https://example.com/c.jpg", "liked_count": 2},
+                {"aweme_id": "a2", "cover_url": "", "liked_count": 1},
+            ])
+
+        xhs = (await crud.get_paginated_data_list("xhs", page_size=2))["list"]
+        assert xhs[0]["image_list"] == ["https://example.com/img1.jpg", "https://example.com/img2.jpg"]
+        assert xhs[1]["image_list"] == []
+        dy = (await crud.get_paginated_data_list("dy"))["list"]
+        assert [item["image_list"] for item in dy] == [["https://example.com/c.jpg"], []]
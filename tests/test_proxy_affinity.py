@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_proxy_affinity.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for per-task and per-session proxy leases on ProxyRefreshMixin clients
+"""
+
+import asyncio
+from typing import List
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from proxy.base_proxy import ProxyProvider
+from proxy.proxy_ip_pool import ProxyIpPool
+from proxy.proxy_mixin import ProxyRefreshMixin
+from proxy.types import IpInfoModel
+from tools.http_transport import SharedHttpTransport
+from var import proxy_lease_var
+
+
+class StaticProvider(ProxyProvider):
+    """Hands out a fixed list of proxies once"""
+
+    def __init__(self, proxies: List[IpInfoModel]):
+        self.proxies = proxies
+
+    async def get_proxy(self, num: int) -> List[IpInfoModel]:
+        proxies, self.proxies = self.proxies, []
+        return proxies
+
+
+class DummyClient(ProxyRefreshMixin):
+    def __init__(self, pool: ProxyIpPool):
+        self.proxy = None
+        self.init_proxy_pool(pool)
+
+    async def request(self) -> str:
+        await self._refresh_proxy_if_expired()
+        lease = proxy_lease_var.get()
+        # 让出事件循环，模拟请求耗时
+        await asyncio.sleep(0.01)
+        return lease.proxy if lease else self.proxy
+
+
+def _proxies(count: int) -> List[IpInfoModel]:
+    return [IpInfoModel(ip="127.0.0.1", port=20000 + i, user="", password="") for i in range(count)]
+
+
+class TestProxyAffinity:
+    """Test cases for lease assignment, stickiness, release and reassignment after a block"""
+
+    @pytest_asyncio.fixture
+    async def pool(self):
+        pool = ProxyIpPool(ip_pool_count=4, enable_validate_ip=False, ip_provider=StaticProvider(_proxies(4)))
+        await pool.load_proxies()
+        yield pool
+        await ProxyIpPool.close_all()
+        await SharedHttpTransport.close_all()
+
+    @pytest.mark.asyncio
+    @patch("config.ENABLE_PROXY_AFFINITY", True)
+    async def test_concurrent_tasks_use_different_proxies(self, pool):
+        """Each concurrent task holds its own lease and gets a distinct exit proxy"""
+        client = DummyClient(pool)
+
+        async def worker() -> List[str]:
+            return [await client.request() for _ in range(3)]
+
+        results = await asyncio.gather(*[worker() for _ in range(4)])
+
+        # 同一任务内的请求固定使用一个代理，不同任务的代理互不相同
+        assert all(len(set(r)) == 1 for r in results)
+        assert len({r[0] for r in results}) == 4
+        # 任务结束后租约自动归还
+        await asyncio.sleep(0)
+        assert pool.get_metrics()["leases"] == 0
+
+    @pytest.mark.asyncio
+    @patch("config.ENABLE_PROXY_AFFINITY", True)
+    async def test_more_tasks_than_proxies_spread_evenly(self, pool):
+        """With more tasks than proxies every proxy is shared by the same number of tasks"""
+        client = DummyClient(pool)
+        results = await asyncio.gather(*[client.request() for _ in range(8)])
+        assert sorted(results.count(p) for p in set(results)) == [2, 2, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_session_lease_is_sticky_and_released(self, pool):
+        """A session lease keeps its proxy across requests and child tasks, and is released on exit"""
+        client = DummyClient(pool)
+
+        async with client.proxy_lease("account-1") as lease:
+            first = lease.proxy
+            assert await client.request() == first
+            assert set(await asyncio.gather(client.request(), client.request())) == {first}
+            assert pool.get_metrics()["leases"] == 1
+
+        assert proxy_lease_var.get() is None
+        assert pool.get_metrics()["leases"] == 0
+
+        async with client.proxy_lease("account-2") as other:
+            async with client.proxy_lease("account-3") as third:
+                assert other.proxy != third.proxy
+
+    @pytest.mark.asyncio
+    async def test_blocked_proxy_is_reassigned(self, pool):
+        """Marking the leased proxy blocked moves the lease to another proxy on the next request"""
+        client = DummyClient(pool)
+
+        async with client.proxy_lease("account-1") as lease:
+            blocked = lease.proxy
+            client._mark_proxy_blocked()
+            assert await client.request() != blocked
+            assert blocked not in {f"http://{p.ip}:{p.port}" for p in pool.proxy_list}
+
+    @pytest.mark.asyncio
+    async def test_without_affinity_requests_share_pool_proxy(self, pool):
+        """Affinity is off by default: all tasks keep using the client's single proxy"""
+        client = DummyClient(pool)
+        results = await asyncio.gather(*[client.request() for _ in range(4)])
+        assert len(set(results)) == 1
+        assert pool.get_metrics()["leases"] == 0
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_proxy_pool_health.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the health-scored proxy pool, using local stand-in proxies, provider and echo server
+"""
+
+import asyncio
+import socket
+import time
+from typing import Dict, List
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+import pytest
+import pytest_asyncio
+
+from proxy.base_proxy import ProxyProvider
+from proxy.proxy_ip_pool import ProxyIpPool
+from proxy.types import IpInfoModel
+
+
+async def _read_head(reader: asyncio.StreamReader) -> List[bytes]:
+    lines = []
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return lines
+        lines.append(line)
+
+
+class LocalProxy:
+    """Minimal forwarding HTTP proxy that adds a fixed delay before forwarding each request"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.requests = 0
+        self.server = None
+        self.port = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        head = await _read_head(reader)
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        method, target, _ = head[0].decode().split(" ", 2)
+        url = urlsplit(target)
+        upstream_reader, upstream_writer = await asyncio.open_connection(url.hostname, url.port)
+        upstream_writer.write(f"{method} {url.path or '/'} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n\r\n".encode())
+        await upstream_writer.drain()
+        writer.write(await upstream_reader.read())
+        await writer.drain()
+        upstream_writer.close()
+        writer.close()
+
+    def info(self, expired_time_ts=None) -> IpInfoModel:
+        return IpInfoModel(ip="127.0.0.1", port=self.port, user="", password="", expired_time_ts=expired_time_ts)
+
+
+class LocalProvider(ProxyProvider):
+    """Hands out the queued batches of proxies, one batch per get_proxy call"""
+
+    def __init__(self, batches: List[List[IpInfoModel]]):
+        self.batches = batches
+        self.calls = 0
+
+    async def get_proxy(self, num: int) -> List[IpInfoModel]:
+        self.calls += 1
+        return self.batches.pop(0) if self.batches else []
+
+
+def _dead_proxy() -> IpInfoModel:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return IpInfoModel(ip="127.0.0.1", port=port, user="", password="")
+
+
+class TestProxyPoolHealth:
+    """Test cases for concurrent validation, scoring, demotion and background refill"""
+
+    @pytest_asyncio.fixture
+    async def echo_url(self):
+        async def handle(reader, writer):
+            await _read_head(reader)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        with patch("config.IP_PROXY_VALIDATE_URL", url), patch("config.IP_PROXY_VALIDATE_TIMEOUT_SEC", 2):
+            yield url
+        server.close()
+
+    @staticmethod
+    async def _proxies(*delays: float) -> List[LocalProxy]:
+        return [await LocalProxy(delay).start() for delay in delays]
+
+    @pytest.mark.asyncio
+    async def test_candidates_validated_concurrently(self, echo_url):
+        """Candidates are validated in parallel and dead proxies never enter the pool"""
+        proxies = await self._proxies(0.3, 0.3, 0.3)
+        provider = LocalProvider([[p.info() for p in proxies] + [_dead_proxy()]])
+        pool = ProxyIpPool(ip_pool_count=4, enable_validate_ip=True, ip_provider=provider)
+
+        start = time.monotonic()
+        await pool.load_proxies()
+        assert time.monotonic() - start < 0.8
+        assert {p.port for p in pool.proxy_list} == {p.port for p in proxies}
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_best_proxy_and_block_demotion(self, echo_url):
+        """The lowest-latency proxy is handed out first, and a blocked proxy is skipped while cooling down"""
+        slow, fast = await self._proxies(0.2, 0)
+        provider = LocalProvider([[slow.info(), fast.info()]])
+        pool = ProxyIpPool(ip_pool_count=2, enable_validate_ip=True, ip_provider=provider)
+        await pool.load_proxies()
+
+        with patch("config.IP_PROXY_POOL_MIN_HEALTHY", 0):
+            assert (await pool.get_proxy()).port == fast.port
+            pool.mark_blocked()
+            assert pool.is_current_proxy_expired()
+            assert (await pool.get_or_refresh_proxy()).port == slow.port
+            assert pool.get_health(fast.info()).failures == 1
+            assert [p.port for p in pool.proxy_list] == [slow.port]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_refill_before_pool_runs_dry(self, echo_url):
+        """Dropping below IP_PROXY_POOL_MIN_HEALTHY refills in the background while a proxy is still served"""
+        first, second, spare = await self._proxies(0, 0, 0)
+        provider = LocalProvider([[first.info(), second.info()], [spare.info()]])
+        pool = ProxyIpPool(ip_pool_count=2, enable_validate_ip=True, ip_provider=provider)
+
+        with patch("config.IP_PROXY_POOL_MIN_HEALTHY", 2):
+            await pool.load_proxies()
+            await pool.get_proxy()
+            pool.mark_blocked()
+            assert pool._refill_task is not None
+            assert len(pool.proxy_list) == 1
+            await pool._refill_task
+
+        assert provider.calls == 2
+        assert spare.port in {p.port for p in pool.proxy_list}
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_check_health_evicts_expired_and_failing(self, echo_url):
+        """Expired proxies and proxies failing revalidation repeatedly are removed"""
+        alive, dying = await self._proxies(0, 0)
+        expired = await LocalProxy().start()
+        provider = LocalProvider([[alive.info(), dying.info(), expired.info(expired_time_ts=int(time.time()) + 3600)]])
+        pool = ProxyIpPool(ip_pool_count=3, enable_validate_ip=True, ip_provider=provider)
+        await pool.load_proxies()
+
+        pool.get_health(expired.info()).proxy.expired_time_ts = int(time.time()) - 1
+        dying.server.close()
+        await dying.server.wait_closed()
+        with patch("config.IP_PROXY_MAX_CONSECUTIVE_FAILURES", 2), patch("config.IP_PROXY_POOL_MIN_HEALTHY", 0):
+            await pool.check_health()
+            assert pool.get_health(dying.info()).consecutive_failures == 1
+            await pool.check_health()
+            await pool.check_health()
+
+        assert [p.port for p in pool.proxy_list] == [alive.port]
+        assert pool.get_health(alive.info()).successes == 4
+        await pool.close()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_proxy_registry.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the Redis-backed proxy registry, run against an in-process fakeredis server
+"""
+
+import asyncio
+import time
+from typing import List
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+try:
+    import fakeredis
+    import lupa  # noqa: F401  fakeredis 执行 Lua 脚本需要 lupa
+
+    FAKEREDIS_AVAILABLE = True
+except ImportError:
+    FAKEREDIS_AVAILABLE = False
+
+from proxy.base_proxy import IpCache, ProxyProvider
+from proxy.proxy_ip_pool import ProxyIpPool
+from proxy.proxy_registry import ProxyRegistry
+from proxy.types import IpInfoModel
+
+pytestmark = pytest.mark.skipif(not FAKEREDIS_AVAILABLE, reason="fakeredis[lua] not installed")
+
+
+def _proxies(count: int, ttl: int = 600) -> List[IpInfoModel]:
+    expired_time_ts = int(time.time()) + ttl
+    return [
+        IpInfoModel(ip="127.0.0.1", port=30000 + i, user="", password="", expired_time_ts=expired_time_ts)
+        for i in range(count)
+    ]
+
+
+class StaticProvider(ProxyProvider):
+    """Hands out the same proxies on every call, like several nodes sharing one provider cache"""
+
+    def __init__(self, proxies: List[IpInfoModel]):
+        self.proxies = proxies
+
+    async def get_proxy(self, num: int) -> List[IpInfoModel]:
+        return list(self.proxies)
+
+
+class TestProxyRegistry:
+    """Test cases for the sorted-set index, pipelined reads and atomic leases"""
+
+    @pytest.fixture
+    def server(self):
+        return fakeredis.FakeServer()
+
+    @pytest_asyncio.fixture
+    async def node_a(self, server):
+        registry = ProxyRegistry("test", fakeredis.aioredis.FakeRedis(server=server), node_id="node-a")
+        yield registry
+        await registry.close()
+
+    @pytest_asyncio.fixture
+    async def node_b(self, server):
+        registry = ProxyRegistry("test", fakeredis.aioredis.FakeRedis(server=server), node_id="node-b")
+        yield registry
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_add_and_load_without_keys(self, node_a, node_b):
+        """Proxies are indexed by expiry, expired ones are purged on read and KEYS is never used"""
+        alive = _proxies(3)
+        await node_a.add(alive)
+        # 模拟一条已经过期、尚未清理的记录
+        await node_a.redis.hset(node_a._info_key, "127.0.0.2:1", alive[0].model_dump_json())
+        await node_a.redis.zadd(node_a._expire_key, {"127.0.0.2:1": int(time.time()) - 1})
+
+        with patch.object(node_b.redis, "keys", side_effect=AssertionError("KEYS must not be used")):
+            loaded = await node_b.load_all()
+
+        assert sorted(p.port for p in loaded) == [p.port for p in alive]
+        assert await node_a.redis.hexists(node_a._info_key, "127.0.0.2:1") == 0
+        assert await node_a.redis.zcard(node_a._expire_key) == 3
+
+    @pytest.mark.asyncio
+    async def test_lease_is_exclusive_between_nodes(self, node_a, node_b):
+        """Only one node holds a proxy lease; renewing is idempotent for the holder"""
+        proxy = _proxies(1)[0]
+
+        assert await node_a.lease(proxy, 60)
+        assert not await node_b.lease(proxy, 60)
+        assert await node_a.lease(proxy, 60)
+        assert await node_b.lease_owners([proxy]) == ["node-a"]
+
+        # 只有持有者能续期和释放
+        assert await node_b.renew([proxy], 60) == [False]
+        assert not await node_b.release(proxy)
+        assert await node_a.renew([proxy], 60) == [True]
+        assert await node_a.release(proxy)
+
+        assert await node_b.lease(proxy, 60)
+        assert await node_a.lease_owners([proxy]) == ["node-b"]
+
+    @pytest.mark.asyncio
+    async def test_lease_expires_when_holder_stops_renewing(self, node_a, node_b):
+        """A lease that is not renewed expires and can be taken over by another node"""
+        proxy = _proxies(1)[0]
+        assert await node_a.lease(proxy, 60)
+        await node_a.redis.pexpire(node_a._lease_key(proxy), 1)
+        await asyncio.sleep(0.01)
+
+        assert await node_b.lease(proxy, 60)
+        assert await node_a.renew([proxy], 60) == [False]
+
+    @pytest.mark.asyncio
+    async def test_load_all_excludes_leased(self, node_a, node_b):
+        """Proxy cache reads skip proxies leased by any node"""
+        proxies = _proxies(3)
+        await node_a.add(proxies)
+        await node_a.lease(proxies[0], 60)
+        await node_b.lease(proxies[1], 60)
+
+        loaded = await node_a.load_all(exclude_leased=True)
+        assert [p.port for p in loaded] == [proxies[2].port]
+
+    @pytest.mark.asyncio
+    async def test_ip_cache_uses_registry(self, server):
+        """IpCache stores and reads provider proxies through the shared registry"""
+        registry = ProxyRegistry("brand", fakeredis.aioredis.FakeRedis(server=server), node_id="node-a")
+        with patch.dict(ProxyRegistry._instances, {"brand": registry}):
+            cache = IpCache()
+            for proxy in _proxies(2):
+                await cache.set_ip("brand", proxy, ex=600)
+            assert len(await cache.load_all_ip("brand")) == 2
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_pools_on_two_nodes_never_share_a_proxy(self, node_a, node_b):
+        """Two pools fed by the same provider hand out disjoint proxies and release them on close"""
+        proxies = _proxies(4)
+        pool_a = ProxyIpPool(4, False, StaticProvider(proxies), registry=node_a)
+        pool_b = ProxyIpPool(4, False, StaticProvider(proxies), registry=node_b)
+        await pool_a.load_proxies()
+        await pool_b.load_proxies()
+
+        try:
+            used_a = {(await pool_a.acquire(key)).port for key in ("t1", "t2")}
+            used_b = {(await pool_b.acquire(key)).port for key in ("t1", "t2")}
+            assert len(used_a) == 2 and len(used_b) == 2
+            assert not used_a & used_b
+
+            # 其余代理都被另一个节点持有时，只能在本节点已持有的代理上共用
+            assert (await pool_b.acquire("t3")).port in used_b
+
+            # 归还并关闭后租约被释放，其它节点可以使用
+            pool_a.release("t1")
+            pool_a.release("t2")
+            await pool_a.close()
+            assert (await pool_b.acquire("t4")).port in used_a
+            assert pool_a.get_metrics()["registry_leases"] == 0
+        finally:
+            await ProxyIpPool.close_all()
+            await pool_b.close()
+
+    @pytest.mark.asyncio
+    async def test_renew_drops_lost_leases(self, node_a, node_b):
+        """Maintenance renewal forgets leases that expired and were taken by another node"""
+        proxies = _proxies(2)
+        pool_a = ProxyIpPool(2, False, StaticProvider(proxies), registry=node_a)
+        await pool_a.load_proxies()
+        try:
+            proxy = await pool_a.acquire("t1")
+            await node_a.redis.delete(node_a._lease_key(proxy))
+            assert await node_b.lease(proxy, 60)
+
+            await pool_a._renew_claims()
+            assert pool_a.get_metrics()["registry_leases"] == 0
+            # 下一次分配换成未被持有的代理
+            assert (await pool_a.acquire("t1")).port != proxy.port
+        finally:
+            await ProxyIpPool.close_all()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_rate_limiter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the token-bucket rate limiter
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tools.rate_limiter import RateLimiter, TokenBucket, concurrency_slot
+
+
+@pytest.mark.asyncio
+async def test_bucket_burst_then_sustained_rate():
+    """Burst tokens are served immediately, the rest at the sustained rate"""
+    bucket = TokenBucket(rate=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.03
+
+    for _ in range(4):
+        await bucket.acquire()
+    # 4 extra tokens at 20/s take about 0.2s
+    assert time.monotonic() - start >= 0.18
+
+
+@patch('config.ENABLE_RATE_LIMITER', True)
+@patch('config.RATE_LIMIT_REQUESTS_PER_SEC', 10)
+@patch('config.RATE_LIMIT_BURST', 2)
+@patch('config.RATE_LIMIT_BACKOFF_FACTOR', 0.5)
+@patch('config.RATE_LIMIT_MIN_REQUESTS_PER_SEC', 1)
+@patch('config.RATE_LIMIT_BLOCK_STATUS_CODES', (461, 471))
+class TestRateLimiter:
+    """Test cases for RateLimiter"""
+
+    @pytest.mark.asyncio
+    async def test_endpoint_rules(self):
+        """Endpoints listed in <PLATFORM>_RATE_LIMITS get their own bucket"""
+        with patch('config.XHS_RATE_LIMITS', {"/api/sns/web/v2/comment": (5, 1)}, create=True):
+            limiter = RateLimiter("xhs")
+            await limiter.acquire("https://edith.xiaohongshu.com/api/sns/web/v1/feed")
+            await limiter.acquire("https://edith.xiaohongshu.com/api/sns/web/v2/comment/page?note_id=1")
+            await limiter.acquire("https://edith.xiaohongshu.com/api/sns/web/v2/comment/sub/page")
+
+        rates = limiter.get_metrics()["rates"]
+        assert rates == {"default": 10, "/api/sns/web/v2/comment": 5}
+        assert limiter.requests == 3
+
+    @pytest.mark.asyncio
+    async def test_block_slows_down_and_recovers(self):
+        """Block status codes halve the rate, which recovers after the quiet period"""
+        limiter = RateLimiter("xhs")
+        url = "https://edith.xiaohongshu.com/api/sns/web/v1/feed"
+        await limiter.acquire(url)
+
+        limiter.observe(200)
+        assert limiter.blocks == 0
+        limiter.observe(461)
+        limiter.observe(471)
+        assert limiter.blocks == 2
+        assert limiter.get_metrics()["rates"]["default"] == 2.5
+
+        with patch('config.RATE_LIMIT_RECOVERY_SEC', 0):
+            await limiter.acquire(url)
+            await limiter.acquire(url)
+        assert limiter.get_metrics()["rates"]["default"] == 10
+
+    @pytest.mark.asyncio
+    async def test_disabled_does_not_wait(self):
+        """No tokens are taken when the limiter is disabled"""
+        limiter = RateLimiter("xhs")
+        with patch('config.ENABLE_RATE_LIMITER', False):
+            for _ in range(10):
+                await limiter.acquire("https://edith.xiaohongshu.com/api/sns/web/v1/feed")
+            limiter.on_blocked()
+        assert limiter.requests == 0 and limiter.blocks == 0
+
+    @pytest.mark.asyncio
+    async def test_waiting_for_token_releases_concurrency_slot(self):
+        """With a semaphore of 1, a second task starts while the first is waiting for a token"""
+        limiter = RateLimiter("xhs")
+        semaphore = asyncio.Semaphore(1)
+        url = "https://edith.xiaohongshu.com/api/sns/web/v1/feed"
+        events = []
+
+        # 用完突发令牌，下一次 acquire 需要等待约 0.1s
+        await limiter.acquire(url)
+        await limiter.acquire(url)
+
+        async def first():
+            async with concurrency_slot(semaphore):
+                events.append("first start")
+                await limiter.acquire(url)
+                events.append("first got token")
+
+        async def second():
+            await asyncio.sleep(0.01)
+            async with concurrency_slot(semaphore):
+                events.append("second start")
+
+        await asyncio.gather(first(), second())
+        assert events == ["first start", "second start", "first got token"]
+        # 两个任务退出后名额全部归还
+        assert not semaphore.locked()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_waiting_does_not_over_release(self):
+        """Cancelling a task that yielded its slot leaves the semaphore balanced"""
+        limiter = RateLimiter("xhs")
+        semaphore = asyncio.Semaphore(1)
+        url = "https://edith.xiaohongshu.com/api/sns/web/v1/feed"
+        await limiter.acquire(url)
+        await limiter.acquire(url)
+
+        async def worker():
+            async with concurrency_slot(semaphore):
+                await limiter.acquire(url)
+
+        task = asyncio.create_task(worker())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert semaphore._value == 1
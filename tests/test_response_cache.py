@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_response_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the client response cache decorator
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from cache.sqlite_cache import SqliteCache
+from tools.response_cache import ResponseCache, cache_response
+
+
+class FakeClient:
+    """Stand-in for a platform client that counts real fetches"""
+
+    def __init__(self):
+        self.fetch_count = 0
+
+    @cache_response("xhs", key_params=("note_id",))
+    async def get_note_by_id(self, note_id: str, xsec_source: str = "", xsec_token: str = ""):
+        self.fetch_count += 1
+        if note_id == "empty":
+            return {}
+        return {"note_id": note_id, "xsec_token": xsec_token}
+
+
+@patch('config.ENABLE_RESPONSE_CACHE', True)
+@patch('config.XHS_RESPONSE_CACHE_TTL', {"get_note_by_id": 60})
+class TestResponseCache:
+    """Test cases for cache_response"""
+
+    @pytest.fixture(autouse=True)
+    def response_cache(self, tmp_path):
+        """Use an isolated sqlite backend for every test"""
+        ResponseCache._instance = ResponseCache(SqliteCache(db_path=str(tmp_path / "cache.db")))
+        yield ResponseCache._instance
+        ResponseCache._instance.backend.close()
+        ResponseCache._instance = None
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_fetch(self, response_cache):
+        """A second call with the same key params is served from the cache"""
+        client = FakeClient()
+        first = await client.get_note_by_id("n1", "pc_search", "token_a")
+        second = await client.get_note_by_id("n1", "pc_feed", "token_b")
+
+        assert client.fetch_count == 1
+        assert second == first
+        assert (response_cache.hits, response_cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_empty_result_is_not_cached(self):
+        """Empty responses (e.g. rate limited) are fetched again next time"""
+        client = FakeClient()
+        await client.get_note_by_id("empty")
+        await client.get_note_by_id("empty")
+        assert client.fetch_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_or_zero_ttl_bypasses_cache(self):
+        """Nothing is cached when the switch is off or the endpoint has no TTL"""
+        client = FakeClient()
+        with patch('config.ENABLE_RESPONSE_CACHE', False):
+            await client.get_note_by_id("n1")
+            await client.get_note_by_id("n1")
+        with patch('config.XHS_RESPONSE_CACHE_TTL', {}):
+            await client.get_note_by_id("n2")
+            await client.get_note_by_id("n2")
+        assert client.fetch_count == 4
+
+    def test_key_is_canonical(self):
+        """Parameter order does not change the cache key"""
+        key_a = ResponseCache.make_key("xhs", "get_note_by_id", {"a": 1, "b": 2})
+        key_b = ResponseCache.make_key("xhs", "get_note_by_id", {"b": 2, "a": 1})
+        assert key_a == key_b
+        assert key_a.startswith("response:xhs:get_note_by_id:")
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_seen_index.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the seen-ID dedup index
+"""
+
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from store.seen_index import SeenIndex
+
+
+def _write_jsonl(path, records):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n", encoding="utf-8")
+
+
+@patch('config.ENABLE_SEEN_INDEX', True)
+@patch('config.SEEN_INDEX_FRESHNESS_HOURS', 24)
+@patch('config.SAVE_DATA_OPTION', 'jsonl')
+class TestSeenIndex:
+    """Test cases for SeenIndex"""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch, sample_xhs_note, sample_xhs_comment):
+        """Lay out a data/xhs/jsonl directory with one fresh and one stale note"""
+        monkeypatch.chdir(tmp_path)
+        now_ms = int(time.time() * 1000)
+        stale_ms = now_ms - 48 * 3600 * 1000
+        base = tmp_path / "data" / "xhs" / "jsonl"
+        _write_jsonl(base / "search_contents_2025-01-01.jsonl", [
+            {**sample_xhs_note, "note_id": "fresh", "last_modify_ts": now_ms},
+            {**sample_xhs_note, "note_id": "stale", "last_modify_ts": stale_ms},
+        ])
+        _write_jsonl(base / "search_comments_2025-01-01.jsonl", [
+            {**sample_xhs_comment, "note_id": "fresh", "last_modify_ts": now_ms},
+        ])
+        return base
+
+    @pytest.mark.asyncio
+    async def test_load_from_jsonl(self, data_dir):
+        """Fresh contents are skipped, stale and unknown ones are kept"""
+        index = SeenIndex("xhs")
+        await index.load()
+
+        assert index.filter_contents(["fresh", "stale", "new"]) == ["stale", "new"]
+        assert index.filter_comments(["fresh", "stale"]) == ["stale"]
+        assert index.get_metrics()["skipped_contents"] == 1
+
+    @pytest.mark.asyncio
+    async def test_zero_window_skips_all_known(self, data_dir):
+        """A freshness window of 0 skips every known content"""
+        index = SeenIndex("xhs")
+        await index.load()
+        with patch('config.SEEN_INDEX_FRESHNESS_HOURS', 0):
+            assert index.filter_contents(["fresh", "stale", "new"]) == ["new"]
+
+    def test_mark_during_run(self):
+        """Contents crawled earlier in the same run are skipped afterwards"""
+        index = SeenIndex("xhs")
+        items = [{"id": "a"}, {"id": "b"}]
+        index.mark_content("a")
+        index.mark_comments("b")
+
+        assert index.filter_contents(items, lambda x: x["id"]) == [{"id": "b"}]
+        assert index.filter_comments(items, lambda x: x["id"]) == [{"id": "a"}]
+
+    def test_disabled_keeps_everything(self):
+        """Nothing is filtered when the index is disabled"""
+        index = SeenIndex("xhs")
+        index.mark_content("a")
+        with patch('config.ENABLE_SEEN_INDEX', False):
+            index.mark_content("b")
+            assert index.filter_contents(["a", "b"]) == ["a", "b"]
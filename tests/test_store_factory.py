@@ -32,6 +32,12 @@ class TestXhsStoreFactory:
         store = XhsStoreFactory.create_store()
         assert isinstance(store, XhsJsonStoreImplement)
     
+    @patch('config.SAVE_DATA_OPTION', 'jsonl')
+    def test_create_jsonl_store(self):
+        """Test creating JSON Lines store (served by the JSON store)"""
+        store = XhsStoreFactory.create_store()
+        assert isinstance(store, XhsJsonStoreImplement)
+
     @patch('config.SAVE_DATA_OPTION', 'db')
     def test_create_db_store(self):
         """Test creating database store"""
@@ -67,7 +73,7 @@ class TestXhsStoreFactory:
     
     def test_all_stores_registered(self):
         """Test that all store types are registered"""
-        expected_stores = ['csv', 'json', 'db', 'sqlite', 'mongodb', 'excel']
+        expected_stores = ['csv', 'json', 'jsonl', 'db', 'sqlite', 'mongodb', 'excel']
         
         for store_type in expected_stores:
             assert store_type in XhsStoreFactory.STORES
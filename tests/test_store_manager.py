@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_store_manager.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the per-run store lifecycle manager
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from base.base_crawler import AbstractStore
+from store.store_manager import StoreManager
+from store.xhs import XhsCsvStoreImplement, XhsStoreFactory
+from var import crawler_type_var
+
+
+class _RecordingStore(AbstractStore):
+    """Store that records lifecycle hook calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def store_content(self, content_item):
+        pass
+
+    async def store_comment(self, comment_item):
+        pass
+
+    async def store_creator(self, creator):
+        pass
+
+    async def open(self):
+        self.calls.append("open")
+
+    async def flush(self):
+        self.calls.append("flush")
+
+    async def close(self):
+        self.calls.append("close")
+
+
+@patch('config.SAVE_DATA_OPTION', 'csv')
+class TestStoreManager:
+    """Test cases for StoreManager"""
+
+    @pytest.fixture(autouse=True)
+    def reset_registry(self):
+        StoreManager._stores.clear()
+        StoreManager._opened.clear()
+        yield
+        StoreManager._stores.clear()
+        StoreManager._opened.clear()
+
+    def test_factory_returns_one_store_per_run(self):
+        """Repeated create_store() calls share one store and one file writer"""
+        crawler_type_var.set("search")
+        first = XhsStoreFactory.create_store()
+        second = XhsStoreFactory.create_store()
+        assert isinstance(first, XhsCsvStoreImplement)
+        assert first is second
+        assert first.writer is second.writer
+
+        crawler_type_var.set("detail")
+        assert XhsStoreFactory.create_store() is not first
+
+    @pytest.mark.asyncio
+    async def test_lifecycle_hooks(self):
+        """open() runs once per key, close_all() flushes, closes and clears the registry"""
+        store = StoreManager.get_store("test", _RecordingStore)
+        await StoreManager.open("test", store)
+        await StoreManager.open("test", store)
+        await StoreManager.flush_all()
+        await StoreManager.close_all()
+        await StoreManager.close_all()
+
+        assert store.calls == ["open", "flush", "flush", "close"]
+        assert StoreManager.get_store("test", _RecordingStore) is not store
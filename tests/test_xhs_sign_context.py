@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_xhs_sign_context.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Unit tests for the xhs batched signing context
+"""
+
+import asyncio
+
+import pytest
+
+from media_platform.xhs.playwright_sign import XhsSignContext
+
+
+class FakePage:
+    """Stand-in for playwright Page that records evaluate calls"""
+
+    def __init__(self, b1: str = "b1_value", fail: bool = False):
+        self.b1 = b1
+        self.fail = fail
+        self.calls = []
+
+    async def evaluate(self, expression, arg=None):
+        self.calls.append(arg)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("page closed")
+        items, need_b1 = arg
+        return {
+            "signs": [f"mnsv2:{md5}" for _, md5 in items],
+            "b1": self.b1 if need_b1 else None,
+        }
+
+
+class TestXhsSignContext:
+    """Test cases for XhsSignContext"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_signs_share_one_evaluate(self):
+        """Concurrent requests are signed in a single evaluate round trip"""
+        page = FakePage()
+        ctx = XhsSignContext(page)
+        results = await asyncio.gather(*[
+            ctx.sign(f"/api/sns/web/v2/comment/page?i={i}", {"note_id": str(i)}, a1="a1", method="GET")
+            for i in range(5)
+        ])
+
+        assert len(page.calls) == 1
+        assert len(page.calls[0][0]) == 5
+        assert all(r["x-s"].startswith("XYS_") for r in results)
+        assert ctx.get_metrics()["avg_batch_size"] == 5
+
+    @pytest.mark.asyncio
+    async def test_b1_is_cached_until_invalidated(self):
+        """b1 is read once and re-read after invalidation or a1 change"""
+        page = FakePage()
+        ctx = XhsSignContext(page)
+        await ctx.sign("/api/a", {"k": "v"}, a1="a1")
+        await ctx.sign("/api/b", {"k": "v"}, a1="a1")
+        assert [need_b1 for _, need_b1 in page.calls] == [True, False]
+
+        ctx.invalidate_b1()
+        await ctx.sign("/api/c", {"k": "v"}, a1="a1")
+        await ctx.sign("/api/d", {"k": "v"}, a1="a1_new")
+        assert [need_b1 for _, need_b1 in page.calls] == [True, False, True, True]
+        assert ctx.get_metrics()["b1_refresh_count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_evaluate_error_returns_empty_sign(self):
+        """A failed evaluate resolves every pending request instead of hanging"""
+        ctx = XhsSignContext(FakePage(fail=True))
+        results = await asyncio.gather(*[ctx.sign("/api/a", {"i": i}, a1="a1") for i in range(3)])
+
+        assert len(results) == 3
+        assert ctx.get_metrics()["evaluate_error_count"] == 1
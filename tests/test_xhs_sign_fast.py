@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tests/test_xhs_sign_fast.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+"""
+Golden-vector tests for the fast xhs x-s / x-s-common encoders
+"""
+
+import json
+import random
+import string
+
+import pytest
+
+from media_platform.xhs import xhs_sign, xhs_sign_fast
+
+# 由 xhs_sign.py 参考实现生成，快速实现必须逐位一致
+B64_GOLDEN = [
+    ('', ''),
+    ('a', 'Gc=='),
+    ('ab', 'GnH='),
+    ('abc', 'GnQ0'),
+    ('Hello, 小红书!', 'aBpVJBuVHwnI0X2Ci1aEkjr='),
+    ('{"x0":"4.2.1","x1":"xhs-pc-web","x2":"Mac OS","x3":"mns0101_abc","x4":"object"}',
+     '2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQ+GnPW/MPjNsQhPUHCHfM1qAZlPebKGnQ0HjIj2ecjwjQ6GfkSG7cjKc=='),
+    ("~()*!.'%+/= ", 'KjWktjr1QUL3NAFW'),
+    ('emoji 😀 é', '8nM6yfDWuQXGWseexc=='),
+]
+
+MRC_GOLDEN = [
+    ('', 3988292384),
+    ('1', -2442892137),
+    ('1700000000000', -1827637985),
+    ('1700000000000XYS_2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQgynEDJ74AHjIj2ePjwjQTJdPIPAZlg', -44488565),
+    # 只有前 57 个字符参与计算
+    ('1700000000000XYS_2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQgynEDJ74AHjIj2ePjwjQTJdPIPAZlgI2b1value',
+     -44488565),
+]
+
+
+class TestXhsSignFast:
+    """Test cases for xhs_sign_fast"""
+
+    @pytest.mark.parametrize("text,expected", B64_GOLDEN)
+    def test_b64_golden(self, text, expected):
+        assert xhs_sign_fast.b64_encode(xhs_sign_fast.encode_utf8(text)) == expected
+        assert xhs_sign.b64_encode(xhs_sign.encode_utf8(text)) == expected
+
+    @pytest.mark.parametrize("text,expected", MRC_GOLDEN)
+    def test_mrc_golden(self, text, expected):
+        assert xhs_sign_fast.mrc(text) == expected
+        assert xhs_sign.mrc(text) == expected
+
+    def test_b64_accepts_byte_list(self):
+        """b64_encode keeps accepting the list[int] produced by the reference encode_utf8"""
+        data = xhs_sign.encode_utf8("小红书 x-s-common")
+        assert xhs_sign_fast.b64_encode(data) == xhs_sign.b64_encode(data)
+
+    def test_random_inputs_match_reference(self):
+        """Randomized inputs are bit-exact with the reference implementation"""
+        rnd = random.Random(20250101)
+        alphabet = string.printable + "中文测试€😀é%~()*!.'"
+        for _ in range(500):
+            text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 200)))
+            assert list(xhs_sign_fast.encode_utf8(text)) == xhs_sign.encode_utf8(text)
+            assert (xhs_sign_fast.b64_encode(xhs_sign_fast.encode_utf8(text))
+                    == xhs_sign.b64_encode(xhs_sign.encode_utf8(text)))
+
+            ascii_text = "".join(rnd.choice(string.ascii_letters + string.digits + "+/=_") for _ in range(rnd.randint(0, 120)))
+            assert xhs_sign_fast.mrc(ascii_text) == xhs_sign.mrc(ascii_text)
+
+    def test_xs_common_payload_matches_reference(self):
+        """A full x-s-common payload encodes identically"""
+        payload = {
+            "s0": 3, "s1": "", "x0": "1", "x1": "4.2.2", "x2": "Mac OS", "x3": "xhs-pc-web", "x4": "4.74.0",
+            "x5": "18c0a1b2c3d4e5f6a1", "x6": "1700000000000", "x7": "XYS_2UQhPsHCH0c1Pjh9HjIj2erjwjQhyoPTqBPT49pj",
+            "x8": "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMFYnqthIhJeSBMDKutRI3KsYorWHPtGrbV0P9W",
+            "x10": 154, "x11": "normal",
+        }
+        payload["x9"] = xhs_sign.mrc(payload["x6"] + payload["x7"] + payload["x8"])
+        assert xhs_sign_fast.mrc(payload["x6"] + payload["x7"] + payload["x8"]) == payload["x9"]
+
+        raw = json.dumps(payload, separators=(",", ":"))
+        assert xhs_sign_fast.b64_encode(xhs_sign_fast.encode_utf8(raw)) == xhs_sign.b64_encode(xhs_sign.encode_utf8(raw))
+
+    def test_mrc_rejects_non_latin1_like_reference(self):
+        """Characters outside the CRC table raise the same error as the reference"""
+        with pytest.raises(IndexError):
+            xhs_sign.mrc("中")
+        with pytest.raises(IndexError):
+            xhs_sign_fast.mrc("中")
@@ -21,36 +21,219 @@ import csv
 import json
 import os
 import pathlib
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
 import aiofiles
 import config
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
+
+class JsonLinesSink:
+    """
+    JSON Lines 追加写入器：每个文件一个实例，长期持有文件句柄
+    记录先进入内存缓冲，达到条数或时间阈值后批量写盘，并按间隔 fsync，
+    单条记录的写入成本与文件大小无关
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.lock = asyncio.Lock()
+        self._buffer: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._last_flush_ts = time.monotonic()
+        self._last_fsync_ts = time.monotonic()
+
+    async def write(self, item: Dict):
+        line = json.dumps(item, ensure_ascii=False)
+        async with self.lock:
+            self._buffer.append(line)
+            if (len(self._buffer) >= config.JSONL_FLUSH_BATCH_SIZE
+                    or time.monotonic() - self._last_flush_ts >= config.JSONL_FLUSH_INTERVAL_SEC):
+                await self._flush_locked()
+
+    async def write_many(self, items: List[Dict]):
+        lines = [json.dumps(item, ensure_ascii=False) for item in items]
+        async with self.lock:
+            self._buffer.extend(lines)
+            if (len(self._buffer) >= config.JSONL_FLUSH_BATCH_SIZE
+                    or time.monotonic() - self._last_flush_ts >= config.JSONL_FLUSH_INTERVAL_SEC):
+                await self._flush_locked()
+
+    async def flush(self, fsync: bool = False):
+        async with self.lock:
+            await self._flush_locked(force_fsync=fsync)
+
+    async def close(self):
+        async with self.lock:
+            await self._flush_locked(force_fsync=True)
+            if self._file is not None:
+                await asyncio.to_thread(self._file.close)
+                self._file = None
+
+    async def _flush_locked(self, force_fsync: bool = False):
+        now = time.monotonic()
+        need_fsync = force_fsync or now - self._last_fsync_ts >= config.JSONL_FSYNC_INTERVAL_SEC
+        if not self._buffer and not (need_fsync and self._file is not None):
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._write_lines, lines, need_fsync)
+        self._last_flush_ts = now
+        if need_fsync:
+            self._last_fsync_ts = now
+
+    def _write_lines(self, lines: List[str], fsync: bool):
+        if self._file is None:
+            self._file = open(self.file_path, "a", encoding="utf-8")
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+
+class CsvSink:
+    """
+    CSV 追加写入器：每个文件一个实例，长期持有文件句柄并记住表头
+    记录先进入内存缓冲，达到条数或时间阈值、或爬虫结束时批量写盘。
+    出现表头中没有的新字段时不会错位写入，而是切换到带序号的新文件（如 search_comments_2025-01-01_1.csv）
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.lock = asyncio.Lock()
+        self.current_path = file_path
+        self.fieldnames: Optional[List[str]] = None
+        self._rows: List[Dict] = []
+        self._file: Optional[TextIO] = None
+        self._writer: Optional[csv.DictWriter] = None
+        self._last_flush_ts = time.monotonic()
+
+    async def write_many(self, items: List[Dict]):
+        async with self.lock:
+            for item in items:
+                if self.fieldnames is None:
+                    await asyncio.to_thread(self._select_file, list(item.keys()))
+                elif not set(item.keys()).issubset(self.fieldnames):
+                    # 字段发生变化：先把旧字段的缓冲写完，再切换文件
+                    await self._flush_locked()
+                    await asyncio.to_thread(self._select_file, list(item.keys()))
+                self._rows.append(item)
+            if (len(self._rows) >= config.CSV_FLUSH_BATCH_SIZE
+                    or time.monotonic() - self._last_flush_ts >= config.CSV_FLUSH_INTERVAL_SEC):
+                await self._flush_locked()
+
+    async def flush(self):
+        async with self.lock:
+            await self._flush_locked()
+
+    async def close(self):
+        async with self.lock:
+            await self._flush_locked()
+            if self._file is not None:
+                await asyncio.to_thread(self._close_file)
+
+    async def _flush_locked(self):
+        self._last_flush_ts = time.monotonic()
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        await asyncio.to_thread(self._write_rows, rows)
+
+    def _select_file(self, keys: List[str]):
+        """
+        为给定字段选择写入文件：优先沿用表头兼容的已有文件，否则使用下一个序号的新文件
+        """
+        self._close_file()
+        stem, ext = os.path.splitext(self.file_path)
+        index = 0
+        while True:
+            path = self.file_path if index == 0 else f"{stem}_{index}{ext}"
+            header = self._read_header(path)
+            if header is None or set(keys).issubset(header):
+                break
+            index += 1
+        if index > 0:
+            utils.logger.warning(f"[CsvSink] Fields changed, writing to {path} instead of {self.file_path}")
+        self.current_path = path
+        self.fieldnames = header or keys
+
+    @staticmethod
+    def _read_header(path: str) -> Optional[List[str]]:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            return next(csv.reader(f), None)
+
+    def _write_rows(self, rows: List[Dict]):
+        if self._file is None:
+            self._file = open(self.current_path, "a", newline="", encoding="utf-8-sig")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, restval="")
+            if self._file.tell() == 0:
+                self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
 class AsyncFileWriter:
+    # 以文件路径为 key 的 JSON Lines 写入器，跨 AsyncFileWriter 实例共享，保证同一文件只有一个句柄和一把锁
+    _jsonl_sinks: Dict[str, JsonLinesSink] = {}
+    # 以文件路径为 key 的 CSV 写入器，同上
+    _csv_sinks: Dict[str, CsvSink] = {}
+
     def __init__(self, platform: str, crawler_type: str):
         self.lock = asyncio.Lock()
         self.platform = platform
         self.crawler_type = crawler_type
         self.wordcloud_generator = AsyncWordCloudGenerator() if config.ENABLE_GET_WORDCLOUD else None
+        # (file_type, item_type) -> (日期, 文件路径)，同一天内不再重复 mkdir
+        self._file_paths: Dict[Tuple[str, str], Tuple[str, str]] = {}
 
     def _get_file_path(self, file_type: str, item_type: str) -> str:
+        current_date = utils.get_current_date()
+        cached = self._file_paths.get((file_type, item_type))
+        if cached is not None and cached[0] == current_date:
+            return cached[1]
         base_path = f"data/{self.platform}/{file_type}"
         pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
-        file_name = f"{self.crawler_type}_{item_type}_{utils.get_current_date()}.{file_type}"
-        return f"{base_path}/{file_name}"
+        file_name = f"{self.crawler_type}_{item_type}_{current_date}.{file_type}"
+        file_path = f"{base_path}/{file_name}"
+        self._file_paths[(file_type, item_type)] = (current_date, file_path)
+        return file_path
 
     async def write_to_csv(self, item: Dict, item_type: str):
+        await self._get_csv_sink(item_type).write_many([item])
+
+    async def write_rows_to_csv(self, items: List[Dict], item_type: str):
+        """
+        批量写入 CSV 记录，与 write_to_csv 共用同一个 CsvSink
+        Args:
+            items: 记录列表
+            item_type: 记录类型 contents/comments/creators 等
+        """
+        if not items:
+            return
+        await self._get_csv_sink(item_type).write_many(items)
+
+    def _get_csv_sink(self, item_type: str) -> CsvSink:
         file_path = self._get_file_path('csv', item_type)
-        async with self.lock:
-            file_exists = os.path.exists(file_path)
-            async with aiofiles.open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=item.keys())
-                if not file_exists or await f.tell() == 0:
-                    await writer.writeheader()
-                await writer.writerow(item)
+        sink = AsyncFileWriter._csv_sinks.get(file_path)
+        if sink is None:
+            sink = CsvSink(file_path)
+            AsyncFileWriter._csv_sinks[file_path] = sink
+        return sink
 
     async def write_single_item_to_json(self, item: Dict, item_type: str):
+        if config.SAVE_DATA_OPTION == "jsonl":
+            # jsonl 保存模式下 JSON 存储改为追加写，避免每条记录都读写整个文件
+            await self.write_to_jsonl(item, item_type)
+            return
         file_path = self._get_file_path('json', item_type)
         async with self.lock:
             existing_data = []
@@ -70,33 +253,166 @@ class AsyncFileWriter:
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
 
-    async def generate_wordcloud_from_comments(self):
+    async def write_items_to_json(self, items: List[Dict], item_type: str):
         """
-        Generate wordcloud from comments data
-        Only works when ENABLE_GET_WORDCLOUD and ENABLE_GET_COMMENTS are True
+        一次读写 JSON 文件追加一批记录，jsonl 保存模式下整批追加到 JSON Lines 文件
+        Args:
+            items: 记录列表
+            item_type: 记录类型 contents/comments/creators 等
         """
-        if not config.ENABLE_GET_WORDCLOUD or not config.ENABLE_GET_COMMENTS:
+        if not items:
             return
-
-        if not self.wordcloud_generator:
+        if config.SAVE_DATA_OPTION == "jsonl":
+            await self._get_jsonl_sink(item_type).write_many(items)
             return
+        file_path = self._get_file_path('json', item_type)
+        async with self.lock:
+            existing_data = []
+            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+                    try:
+                        content = await f.read()
+                        if content:
+                            existing_data = json.loads(content)
+                        if not isinstance(existing_data, list):
+                            existing_data = [existing_data]
+                    except json.JSONDecodeError:
+                        existing_data = []
 
-        try:
-            # Read comments from JSON file
+            existing_data.extend(items)
+
+            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
+                await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
+
+    async def write_to_jsonl(self, item: Dict, item_type: str):
+        """
+        以 JSON Lines 格式追加写入一条记录
+        Args:
+            item: 记录
+            item_type: 记录类型 contents/comments/creators 等
+        """
+        await self._get_jsonl_sink(item_type).write(item)
+
+    def _get_jsonl_sink(self, item_type: str) -> JsonLinesSink:
+        file_path = self._get_file_path('jsonl', item_type)
+        sink = AsyncFileWriter._jsonl_sinks.get(file_path)
+        if sink is None:
+            sink = JsonLinesSink(file_path)
+            AsyncFileWriter._jsonl_sinks[file_path] = sink
+        return sink
+
+    async def flush(self):
+        """
+        把本写入器（平台 + 爬虫类型）对应的 CSV / JSON Lines 缓冲写盘，json 为同步写入，无需刷新
+        """
+        prefix = f"data/{self.platform}/jsonl/{self.crawler_type}_"
+        for file_path, sink in list(AsyncFileWriter._jsonl_sinks.items()):
+            if file_path.startswith(prefix):
+                await sink.flush(fsync=True)
+        prefix = f"data/{self.platform}/csv/{self.crawler_type}_"
+        for file_path, csv_sink in list(AsyncFileWriter._csv_sinks.items()):
+            if file_path.startswith(prefix):
+                await csv_sink.flush()
+
+    @classmethod
+    async def close_all(cls, finalize_json: Optional[bool] = None):
+        """
+        刷新并关闭所有 CSV / JSON Lines 写入器，在爬虫结束时调用
+        Args:
+            finalize_json: 是否额外生成标准 JSON 数组文件，默认取 JSONL_FINALIZE_TO_JSON
+        """
+        if finalize_json is None:
+            finalize_json = config.JSONL_FINALIZE_TO_JSON
+        csv_sinks = list(cls._csv_sinks.values())
+        cls._csv_sinks.clear()
+        for csv_sink in csv_sinks:
+            try:
+                await csv_sink.close()
+            except Exception as e:
+                utils.logger.error(f"[AsyncFileWriter.close_all] Close csv file {csv_sink.current_path} error: {e}")
+        sinks = list(cls._jsonl_sinks.values())
+        cls._jsonl_sinks.clear()
+        for sink in sinks:
+            try:
+                await sink.close()
+                if finalize_json:
+                    await asyncio.to_thread(cls._finalize_jsonl_to_json, sink.file_path)
+            except Exception as e:
+                utils.logger.error(f"[AsyncFileWriter.close_all] Close jsonl file {sink.file_path} error: {e}")
+
+    @staticmethod
+    def _finalize_jsonl_to_json(jsonl_path: str) -> str:
+        """
+        逐行读取 jsonl 文件，流式生成同名的 JSON 数组文件（data/<platform>/json/ 下）
+        Args:
+            jsonl_path: jsonl 文件路径
+
+        Returns:
+            生成的 json 文件路径
+        """
+        jsonl_file = pathlib.Path(jsonl_path)
+        json_dir = jsonl_file.parent.parent / "json"
+        json_dir.mkdir(parents=True, exist_ok=True)
+        json_path = json_dir / f"{jsonl_file.stem}.json"
+        count = 0
+        with open(jsonl_file, "r", encoding="utf-8") as src, open(json_path, "w", encoding="utf-8") as dst:
+            dst.write("[")
+            for line in src:
+                line = line.strip()
+                if not line:
+                    continue
+                dst.write(",\n" if count else "\n")
+                dst.write(line)
+                count += 1
+            dst.write("\n]" if count else "]")
+        utils.logger.info(f"[AsyncFileWriter._finalize_jsonl_to_json] Finalized {count} items to {json_path}")
+        return str(json_path)
+
+    async def _load_comments_for_wordcloud(self) -> List[Dict]:
+        """
+        读取当天评论数据，兼容 json 与 jsonl 两种保存方式
+        """
+        if config.SAVE_DATA_OPTION == "jsonl":
+            comments_file_path = self._get_file_path('jsonl', 'comments')
+        else:
             comments_file_path = self._get_file_path('json', 'comments')
-            if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
-                utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
-                return
+        if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
+            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
+            return []
 
-            async with aiofiles.open(comments_file_path, 'r', encoding='utf-8') as f:
+        comments_data = []
+        async with aiofiles.open(comments_file_path, 'r', encoding='utf-8') as f:
+            if comments_file_path.endswith('.jsonl'):
+                async for line in f:
+                    line = line.strip()
+                    if line:
+                        comments_data.append(json.loads(line))
+            else:
                 content = await f.read()
                 if not content:
                     utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Comments file is empty")
-                    return
-
+                    return []
                 comments_data = json.loads(content)
                 if not isinstance(comments_data, list):
                     comments_data = [comments_data]
+        return comments_data
+
+    async def generate_wordcloud_from_comments(self):
+        """
+        Generate wordcloud from comments data
+        Only works when ENABLE_GET_WORDCLOUD and ENABLE_GET_COMMENTS are True
+        """
+        if not config.ENABLE_GET_WORDCLOUD or not config.ENABLE_GET_COMMENTS:
+            return
+
+        if not self.wordcloud_generator:
+            return
+
+        try:
+            # Read comments from JSON / JSON Lines file
+            comments_data = await self._load_comments_for_wordcloud()
+            if not comments_data:
+                return
 
             # Filter comments data to only include 'content' field
             # Handle different comment data structures across platforms
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/async_pipeline.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""分阶段异步流水线：搜索 -> 详情 -> 存储/评论/媒体，各阶段用有界队列连接，独立并发"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from tools import utils
+
+StageHandler = Callable[[Any], Awaitable[None]]
+
+
+@dataclass
+class _Stage:
+    name: str
+    handler: StageHandler
+    workers: int
+    queue: asyncio.Queue
+    tasks: List[asyncio.Task] = field(default_factory=list)
+    processed: int = 0
+    failed: int = 0
+
+
+class AsyncPipeline:
+    """
+    分阶段流水线
+
+    - 每个阶段一个有界队列 + 若干 worker，队列满时 put() 等待，形成背压，内存占用有上限
+    - 阶段处理函数通过 put() 把结果交给后续阶段，阶段按 add_stage 的顺序排列，只能向后投递
+    - run(producer) 在生产者结束后按顺序等待各阶段队列清空，然后停止 worker
+    - 单条数据处理失败只记录日志，不影响其它数据
+
+    使用方法：
+        pipeline = AsyncPipeline("xhs.search")
+        pipeline.add_stage("detail", fetch_detail, workers=2)
+        pipeline.add_stage("comments", fetch_comments, workers=2)
+        await pipeline.run(search_producer())
+    """
+
+    def __init__(self, name: str, queue_size: int = 0):
+        self.name = name
+        self.queue_size = queue_size
+        self._stages: Dict[str, _Stage] = {}
+
+    def add_stage(self, name: str, handler: StageHandler, workers: int = 1, queue_size: Optional[int] = None) -> "AsyncPipeline":
+        """
+        添加一个阶段
+        Args:
+            name: 阶段名
+            handler: 处理单条数据的协程函数
+            workers: 该阶段的并发 worker 数
+            queue_size: 队列长度上限，默认取流水线的 queue_size，0 表示不限
+        """
+        maxsize = self.queue_size if queue_size is None else queue_size
+        self._stages[name] = _Stage(name, handler, max(1, workers), asyncio.Queue(maxsize=maxsize))
+        return self
+
+    async def put(self, stage_name: str, item: Any):
+        """
+        向阶段投递一条数据，队列满时等待
+        """
+        await self._stages[stage_name].queue.put(item)
+
+    async def run(self, producer: Awaitable[None]):
+        """
+        启动所有阶段并运行生产者，直到所有数据处理完成
+        Args:
+            producer: 生产者协程，通过 put() 向第一个阶段投递数据
+        """
+        for stage in self._stages.values():
+            stage.tasks = [
+                asyncio.create_task(self._worker(stage), name=f"{self.name}.{stage.name}.{i}")
+                for i in range(stage.workers)
+            ]
+        try:
+            await producer
+            for stage in self._stages.values():
+                await stage.queue.join()
+        finally:
+            for stage in self._stages.values():
+                for task in stage.tasks:
+                    task.cancel()
+                await asyncio.gather(*stage.tasks, return_exceptions=True)
+                stage.tasks = []
+        utils.logger.info(f"[AsyncPipeline.run] {self.name} finished, metrics: {self.get_metrics()}")
+
+    async def _worker(self, stage: _Stage):
+        while True:
+            item = await stage.queue.get()
+            try:
+                await stage.handler(item)
+                stage.processed += 1
+            except Exception as e:
+                stage.failed += 1
+                utils.logger.error(f"[AsyncPipeline] {self.name}.{stage.name} handle item error: {e}")
+            finally:
+                stage.queue.task_done()
+
+    def get_metrics(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"processed": stage.processed, "failed": stage.failed, "pending": stage.queue.qsize()}
+            for name, stage in self._stages.items()
+        }
@@ -29,6 +29,7 @@ import random
 import re
 import urllib
 import urllib.parse
+from decimal import Decimal
 from io import BytesIO
 from typing import Dict, List, Optional, Tuple, cast
 
@@ -174,6 +175,27 @@ def match_interact_info_count(count_str: str) -> int:
         return 0
 
 
+_COUNT_UNITS = {"": 1, "k": 1000, "w": 10000, "万": 10000, "亿": 100000000}
+_COUNT_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)(k|w|万|亿)?\+?$", re.IGNORECASE)
+
+
+def parse_count(value) -> Optional[int]:
+    """
+    把平台返回的计数统一转成整数，如 "1.2万" -> 12000、"10万+" -> 100000、"1,234" -> 1234
+    无法识别的值返回 None
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().replace(",", "").replace(" ", "")
+    match = _COUNT_PATTERN.match(text)
+    if not match:
+        return None
+    number, unit = match.groups()
+    return int(Decimal(number) * _COUNT_UNITS[(unit or "").lower()])
+
+
 def format_proxy_info(ip_proxy_info) -> Tuple[Optional[Dict], Optional[str]]:
     """format proxy info for playwright and httpx"""
     # fix circular import issue
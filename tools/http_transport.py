@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/http_transport.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""共享 HTTP 传输层：按 (platform, proxy) 复用长连接的 httpx.AsyncClient"""
+import asyncio
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+import config
+from tools import utils
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class SharedHttpTransport:
+    """
+    全局共享的 httpx.AsyncClient 管理器
+
+    - 同一 (platform, proxy) 复用一个开启 keep-alive 的客户端，避免每次请求重新握手
+    - 代理切换后旧客户端延迟关闭，保证仍在进行中的请求可以正常结束
+    - 客户端不持久化 cookie，请求仍然以各平台 client 自己维护的 Cookie 请求头为准
+    """
+
+    _clients: Dict[Tuple[str, Optional[str]], httpx.AsyncClient] = {}
+    _retiring_tasks: List[asyncio.Task] = []
+    _http2_fallback_warned = False
+
+    @classmethod
+    def _build_client(cls, proxy: Optional[str]) -> httpx.AsyncClient:
+        """
+        创建一个新的长连接客户端
+        Args:
+            proxy: httpx 代理URL
+
+        Returns:
+            httpx.AsyncClient
+        """
+        limits = httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        )
+        if config.ENABLE_HTTP2 and not HTTP2_AVAILABLE and not cls._http2_fallback_warned:
+            cls._http2_fallback_warned = True
+            utils.logger.warning(
+                '[SharedHttpTransport._build_client] ENABLE_HTTP2 is on but h2 is not installed, '
+                'fallback to HTTP/1.1 (pip install "httpx[http2]")'
+            )
+        client = httpx.AsyncClient(
+            proxy=proxy,
+            http2=config.ENABLE_HTTP2 and HTTP2_AVAILABLE,
+            limits=limits,
+        )
+        # 拒绝所有域名的 cookie，避免共享客户端把响应里的 Set-Cookie 带到后续请求中
+        # AsyncClient(cookies=...) 会把传入的 jar 复制成新的 CookieJar 而丢掉策略，所以直接设置客户端自己的 jar
+        client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return client
+
+    @classmethod
+    def get_client(cls, platform: str, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        获取 (platform, proxy) 对应的共享客户端，不存在或已关闭时新建
+        Args:
+            platform: 平台标识（一般使用 client 类名）
+            proxy: httpx 代理URL
+
+        Returns:
+            httpx.AsyncClient
+        """
+        key = (platform, proxy)
+        client = cls._clients.get(key)
+        if client is None or client.is_closed:
+            client = cls._build_client(proxy)
+            cls._clients[key] = client
+            utils.logger.info(f"[SharedHttpTransport.get_client] Create shared http client for {platform}, proxy: {proxy}")
+        return client
+
+    @classmethod
+    def retire(cls, platform: str, proxy: Optional[str], grace_seconds: Optional[float] = None) -> None:
+        """
+        代理切换后下线旧客户端，等待 grace_seconds 后再关闭，让进行中的请求正常完成
+        Args:
+            platform: 平台标识
+            proxy: 旧的 httpx 代理URL
+            grace_seconds: 延迟关闭的秒数，默认取 HTTP_CLIENT_RETIRE_GRACE_SEC
+        """
+        client = cls._clients.pop((platform, proxy), None)
+        if client is None or client.is_closed:
+            return
+        if grace_seconds is None:
+            grace_seconds = config.HTTP_CLIENT_RETIRE_GRACE_SEC
+        task = asyncio.create_task(cls._close_later(client, grace_seconds))
+        cls._retiring_tasks.append(task)
+        task.add_done_callback(cls._retiring_tasks.remove)
+
+    @staticmethod
+    async def _close_later(client: httpx.AsyncClient, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            await client.aclose()
+
+    @classmethod
+    async def close_all(cls) -> None:
+        """
+        关闭所有共享客户端，在爬虫退出时调用
+        """
+        for task in list(cls._retiring_tasks):
+            task.cancel()
+        if cls._retiring_tasks:
+            await asyncio.gather(*cls._retiring_tasks, return_exceptions=True)
+
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                utils.logger.error(f"[SharedHttpTransport.close_all] Close http client error: {e}")
+        if clients:
+            utils.logger.info(f"[SharedHttpTransport.close_all] Closed {len(clients)} shared http clients")
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/js_sign_engine.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""JS 签名引擎：常驻 Node 进程池 + 可 await 的签名调用"""
+import asyncio
+import itertools
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+import config
+from tools import utils
+
+LIBS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "libs"))
+WORKER_JS_PATH = os.path.join(LIBS_DIR, "js_sign_worker.js")
+
+# 签名结果可能较长，放宽 StreamReader 单行长度限制
+_STREAM_LIMIT = 4 * 1024 * 1024
+
+
+class JsSignError(Exception):
+    """签名脚本执行失败或签名进程异常"""
+
+
+class _NodeWorker:
+    """
+    单个常驻 Node 进程，一次只处理一个请求
+    """
+
+    def __init__(self, node_path: str, script_path: str):
+        self.node_path = node_path
+        self.script_path = script_path
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self, timeout: float):
+        self._process = await asyncio.create_subprocess_exec(
+            self.node_path, WORKER_JS_PATH, self.script_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=_STREAM_LIMIT,
+        )
+        ready = await self._read_response(timeout)
+        if ready.get("result") != "ready":
+            await self.close()
+            raise JsSignError(f"sign worker start failed: {ready.get('error')}")
+
+    async def call(self, fn: str, args: List[Any], timeout: float) -> Any:
+        request_id = next(self._ids)
+        line = json.dumps({"id": request_id, "fn": fn, "args": args}, ensure_ascii=False) + "\n"
+        self._process.stdin.write(line.encode("utf-8"))
+        await self._process.stdin.drain()
+        response = await self._read_response(timeout)
+        if response.get("id") != request_id:
+            raise ConnectionError(f"sign worker response id mismatch: {response.get('id')} != {request_id}")
+        if "error" in response:
+            raise JsSignError(f"{fn} failed: {response['error']}")
+        return response.get("result")
+
+    async def _read_response(self, timeout: float) -> Dict:
+        raw = await asyncio.wait_for(self._process.stdout.readline(), timeout)
+        if not raw:
+            raise ConnectionError("sign worker exited unexpectedly")
+        return json.loads(raw)
+
+    async def close(self):
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+class JsSignEngine:
+    """
+    按签名脚本维护的签名引擎单例
+
+    - 有 Node 时启动 JS_SIGN_WORKER_COUNT 个常驻进程，通过管道收发请求，签名不再阻塞事件循环
+    - 进程崩溃或超时会被关闭，下一次使用时自动重启
+    - 找不到 Node 时回退到 execjs，并放到线程池中执行
+    """
+
+    _instances: Dict[str, "JsSignEngine"] = {}
+
+    @classmethod
+    def get_instance(cls, script_path: str) -> "JsSignEngine":
+        """
+        获取签名脚本对应的引擎
+        Args:
+            script_path: 签名 JS 文件路径
+
+        Returns:
+            JsSignEngine
+        """
+        script_path = os.path.abspath(script_path)
+        if script_path not in cls._instances:
+            cls._instances[script_path] = cls(script_path)
+        return cls._instances[script_path]
+
+    @classmethod
+    async def close_all(cls):
+        """
+        关闭所有签名进程，在爬虫退出时调用
+        """
+        engines = list(cls._instances.values())
+        cls._instances.clear()
+        for engine in engines:
+            await engine.close()
+
+    def __init__(self, script_path: str, worker_count: Optional[int] = None):
+        self.script_path = script_path
+        self.worker_count = worker_count or config.JS_SIGN_WORKER_COUNT
+        self.node_path = shutil.which(config.JS_SIGN_NODE_PATH)
+        self._workers: List[_NodeWorker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._execjs_ctx = None
+        if not self.node_path:
+            utils.logger.warning(
+                f"[JsSignEngine] Node runtime {config.JS_SIGN_NODE_PATH} not found, fallback to execjs in thread pool"
+            )
+
+    async def sign(self, fn: str, *args) -> Any:
+        """
+        调用签名脚本中的函数
+        Args:
+            fn: JS 函数名
+            *args: 函数参数，需要可以 JSON 序列化
+
+        Returns:
+            JS 函数返回值
+        """
+        if not self.node_path:
+            return await asyncio.to_thread(self._call_execjs, fn, *args)
+
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.worker_count):
+                worker = _NodeWorker(self.node_path, self.script_path)
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+
+        idle = self._idle
+        worker = await idle.get()
+        try:
+            if not worker.alive:
+                await worker.start(config.JS_SIGN_TIMEOUT_SEC)
+            return await worker.call(fn, list(args), config.JS_SIGN_TIMEOUT_SEC)
+        except JsSignError:
+            # 脚本内抛出的异常不影响进程，继续复用
+            raise
+        except (asyncio.TimeoutError, OSError, ValueError) as e:
+            # 超时、管道断开、响应无法解析时关闭进程，下次使用时重启
+            await worker.close()
+            raise JsSignError(f"{fn} failed: {e!r}") from e
+        finally:
+            idle.put_nowait(worker)
+
+    def _call_execjs(self, fn: str, *args) -> Any:
+        if self._execjs_ctx is None:
+            import execjs
+            with open(self.script_path, encoding="utf-8-sig") as f:
+                self._execjs_ctx = execjs.compile(f.read(), cwd=LIBS_DIR)
+        return self._execjs_ctx.call(fn, *args)
+
+    async def close(self):
+        """
+        关闭该脚本的全部签名进程
+        """
+        for worker in self._workers:
+            await worker.close()
+        self._workers = []
+        self._idle = None
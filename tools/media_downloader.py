@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/media_downloader.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""共享媒体下载器：下载任务进入队列，由后台 worker 流式写入临时文件，支持断点续传和按域名限流"""
+import asyncio
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import aiofiles
+import httpx
+
+import config
+from tools import utils
+from tools.http_transport import SharedHttpTransport
+
+PART_SUFFIX = ".part"
+
+
+@dataclass
+class MediaDownloadTask:
+    url: str
+    save_path: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    proxy: Optional[str] = None
+    # 任务结束后的回调，参数为任务和是否成功（目标文件已存在也视为成功）
+    callback: Optional[Callable[["MediaDownloadTask", bool], Awaitable[None]]] = None
+
+
+class _RetryableDownloadError(Exception):
+    """服务端 5xx 或续传位置异常，可以重试"""
+
+
+class MediaDownloader:
+    """
+    全局共享的媒体下载器（单例）
+
+    - submit() 只把任务放进有界队列，爬取流程不等待图片/视频下载完成
+    - MEDIA_DOWNLOAD_WORKERS 个 worker 用 aiter_bytes 分块写入 <文件名>.part，下载完成后原子重命名，
+      内存占用与文件大小无关，也不会留下写了一半的目标文件
+    - 连接中断时按 .part 的大小发送 Range 请求续传，服务端不支持 Range（返回 200）时从头下载
+    - 同一域名最多 MEDIA_DOWNLOAD_PER_HOST_LIMIT 个并发下载，避免单个 CDN 占满 worker
+    - 目标文件已存在时跳过，上次中断留下的 .part 文件会在下次运行时续传
+    """
+
+    _instance: Optional["MediaDownloader"] = None
+
+    @classmethod
+    def get_instance(cls) -> "MediaDownloader":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    async def close_all(cls, wait: bool = True):
+        """
+        关闭下载器，在爬虫退出时调用
+        Args:
+            wait: 是否等待队列中的任务下载完成，中断退出时传 False，未完成的 .part 文件留待下次续传
+        """
+        instance, cls._instance = cls._instance, None
+        if instance is not None:
+            await instance.close(wait=wait)
+
+    def __init__(self, workers: Optional[int] = None, per_host_limit: Optional[int] = None):
+        self.workers = workers or config.MEDIA_DOWNLOAD_WORKERS
+        self.per_host_limit = per_host_limit or config.MEDIA_DOWNLOAD_PER_HOST_LIMIT
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # 已提交但尚未完成的目标路径，避免同一文件被重复下载
+        self._pending: Set[str] = set()
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.resumed = 0
+        self.bytes = 0
+
+    async def submit(
+        self,
+        url: str,
+        save_path: str,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+        callback: Optional[Callable[[MediaDownloadTask, bool], Awaitable[None]]] = None,
+    ):
+        """
+        提交一个下载任务，队列满时等待
+        Args:
+            url: 媒体地址
+            save_path: 保存路径，目录不存在时自动创建
+            headers: 请求头，如 Referer / User-Agent / Cookie
+            proxy: httpx 代理URL
+            callback: 下载结束后在 worker 中调用 callback(task, ok)
+        """
+        task = MediaDownloadTask(url, save_path, dict(headers or {}), proxy, callback)
+        if save_path in self._pending:
+            self.skipped += 1
+            return
+        if os.path.exists(save_path):
+            self.skipped += 1
+            if callback is not None:
+                await callback(task, True)
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=config.MEDIA_DOWNLOAD_QUEUE_SIZE)
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"MediaDownloader.{i}")
+                for i in range(self.workers)
+            ]
+        self._pending.add(save_path)
+        await self._queue.put(task)
+
+    async def join(self):
+        """
+        等待已提交的任务全部完成
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self, wait: bool = True):
+        if self._queue is None:
+            return
+        try:
+            if wait:
+                await self._queue.join()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            self._queue = None
+            self._pending.clear()
+        utils.logger.info(f"[MediaDownloader.close] Media downloader closed, metrics: {self.get_metrics()}")
+
+    async def _worker(self):
+        while True:
+            task = await self._queue.get()
+            try:
+                ok = False
+                try:
+                    await self.download(task)
+                    ok = True
+                except Exception as e:
+                    self.failed += 1
+                    utils.logger.error(f"[MediaDownloader] download {task.url} -> {task.save_path} failed: {e!r}")
+                # 先移出 _pending 再回调，回调期间再次提交同一路径时不会被当作重复任务丢弃
+                self._pending.discard(task.save_path)
+                if task.callback is not None:
+                    try:
+                        await task.callback(task, ok)
+                    except Exception as e:
+                        utils.logger.error(f"[MediaDownloader] callback for {task.save_path} failed: {e!r}")
+            finally:
+                self._pending.discard(task.save_path)
+                self._queue.task_done()
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def download(self, task: MediaDownloadTask):
+        """
+        下载单个文件：写入 .part，失败时按已写入的长度续传，完成后重命名为目标文件
+        """
+        if os.path.exists(task.save_path):
+            self.skipped += 1
+            return
+        part_path = task.save_path + PART_SUFFIX
+        await asyncio.to_thread(os.makedirs, os.path.dirname(task.save_path) or ".", exist_ok=True)
+
+        async with self._host_semaphore(task.url):
+            for attempt in range(config.MEDIA_DOWNLOAD_MAX_RETRIES + 1):
+                try:
+                    await self._fetch(task, part_path)
+                    break
+                except (httpx.TransportError, _RetryableDownloadError) as e:
+                    if attempt >= config.MEDIA_DOWNLOAD_MAX_RETRIES:
+                        raise
+                    delay = min(2 ** attempt, 10)
+                    utils.logger.warning(
+                        f"[MediaDownloader.download] {task.url} interrupted: {e!r}, retry {attempt + 1} in {delay}s"
+                    )
+                    await asyncio.sleep(delay)
+
+        await asyncio.to_thread(os.replace, part_path, task.save_path)
+        self.downloaded += 1
+        utils.logger.info(f"[MediaDownloader.download] save media {task.save_path} success ...")
+
+    async def _fetch(self, task: MediaDownloadTask, part_path: str):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = dict(task.headers)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        client = SharedHttpTransport.get_client(self.__class__.__name__, task.proxy)
+        async with client.stream(
+            "GET", task.url, headers=headers, follow_redirects=True,
+            timeout=config.MEDIA_DOWNLOAD_TIMEOUT_SEC,
+        ) as response:
+            if response.status_code == 416 and offset:
+                # .part 已经是完整文件（上次写完后未来得及重命名），否则丢弃后从头下载
+                if _content_range_total(response.headers.get("Content-Range")) == offset:
+                    return
+                await asyncio.to_thread(os.remove, part_path)
+                raise _RetryableDownloadError(f"invalid resume offset {offset}")
+            if response.status_code >= 500:
+                raise _RetryableDownloadError(f"HTTP {response.status_code}")
+            response.raise_for_status()
+
+            resume = offset > 0 and response.status_code == 206
+            if resume:
+                start = _content_range_start(response.headers.get("Content-Range"))
+                if start != offset:
+                    # 返回的区间与续传位置不一致，追加会写坏文件，丢弃 .part 后从头下载
+                    await asyncio.to_thread(os.remove, part_path)
+                    raise _RetryableDownloadError(
+                        f"Content-Range start {start} does not match resume offset {offset}"
+                    )
+                self.resumed += 1
+            async with aiofiles.open(part_path, "ab" if resume else "wb") as f:
+                async for chunk in response.aiter_bytes(config.MEDIA_DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+                    self.bytes += len(chunk)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "downloaded": self.downloaded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "resumed": self.resumed,
+            "bytes": self.bytes,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+def _content_range_start(content_range: Optional[str]) -> Optional[int]:
+    """解析 Content-Range: bytes 100-199/12345 中的起始位置"""
+    match = re.match(r"\s*bytes\s+(\d+)-", content_range or "")
+    return int(match.group(1)) if match else None
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """解析 Content-Range: bytes */12345 中的总长度"""
+    match = re.search(r"/(\d+)\s*$", content_range or "")
+    return int(match.group(1)) if match else None
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/rate_limiter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""令牌桶限速：替代各处固定的 asyncio.sleep(CRAWLER_MAX_SLEEP_SEC)，按平台/接口控制请求速率"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import config
+from tools import utils
+
+
+class _ConcurrencySlot:
+    """爬虫并发名额（信号量）的持有状态，等待令牌时可临时让出"""
+
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self.semaphore = semaphore
+        self.held = False
+
+    async def acquire(self):
+        await self.semaphore.acquire()
+        self.held = True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            self.semaphore.release()
+
+
+# 当前协程持有的并发名额，由 concurrency_slot() 设置
+_held_slot: ContextVar[Optional[_ConcurrencySlot]] = ContextVar("rate_limiter_held_slot", default=None)
+
+
+@asynccontextmanager
+async def concurrency_slot(semaphore: asyncio.Semaphore) -> AsyncIterator[None]:
+    """
+    占用一个爬虫并发名额，代替 async with semaphore
+    名额内的请求需要等待令牌时，RateLimiter 会先让出名额，拿到令牌后再重新占用
+    Args:
+        semaphore: 爬虫并发信号量（MAX_CONCURRENCY_NUM）
+    """
+    slot = _ConcurrencySlot(semaphore)
+    await slot.acquire()
+    token = _held_slot.set(slot)
+    try:
+        yield
+    finally:
+        _held_slot.reset(token)
+        slot.release()
+
+
+class TokenBucket:
+    """
+    令牌桶：以 rate 个/秒的速度补充令牌，最多积攒 burst 个
+    多个协程按到达顺序排队
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self) -> bool:
+        """
+        不等待地取一个令牌，有协程正在排队或令牌不足时返回 False
+        """
+        if self._lock.locked():
+            return False
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> float:
+        """
+        取一个令牌，令牌不足时等待
+        Returns:
+            本次等待的秒数
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def slow_down(self, factor: float, min_rate: float):
+        """按 factor 降低速率并清空已积攒的令牌"""
+        self._refill(time.monotonic())
+        self.rate = max(min_rate, self.rate * factor)
+        self.tokens = min(self.tokens, 0.0)
+
+    def recover(self, factor: float):
+        """按 1/factor 逐步恢复速率，不超过初始速率"""
+        self._refill(time.monotonic())
+        self.rate = min(self.base_rate, self.rate / factor)
+
+
+class RateLimiter:
+    """
+    平台级限速器（按平台单例），在 client.request() 发起请求前调用 acquire()
+
+    - 每个接口一个令牌桶，速率默认取 RATE_LIMIT_REQUESTS_PER_SEC / RATE_LIMIT_BURST，
+      可在 config/<platform>_config.py 的 <PLATFORM>_RATE_LIMITS 中按接口路径覆盖
+    - 出现风控信号（IPBlockError、HTTP 461/471 等）时，该平台所有接口降速 RATE_LIMIT_BACKOFF_FACTOR 倍，
+      之后每隔 RATE_LIMIT_RECOVERY_SEC 没有再被风控就逐步恢复
+    """
+
+    _instances: Dict[str, "RateLimiter"] = {}
+
+    @classmethod
+    def get_instance(cls, platform: str) -> "RateLimiter":
+        """
+        获取平台对应的限速器
+        Args:
+            platform: 平台标识，对应 config 中 <PLATFORM>_RATE_LIMITS
+        """
+        if platform not in cls._instances:
+            cls._instances[platform] = cls(platform)
+        return cls._instances[platform]
+
+    def __init__(self, platform: str):
+        self.platform = platform
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._last_block_ts: Optional[float] = None
+        self._last_recover_ts = 0.0
+        self.requests = 0
+        self.blocks = 0
+        self.wait_seconds = 0.0
+
+    def _endpoint_rule(self, endpoint: str) -> Tuple[str, float, int]:
+        rules: Dict[str, Tuple[float, int]] = getattr(config, f"{self.platform.upper()}_RATE_LIMITS", {})
+        for prefix, (rate, burst) in rules.items():
+            if endpoint.startswith(prefix):
+                return prefix, rate, burst
+        return "", config.RATE_LIMIT_REQUESTS_PER_SEC, config.RATE_LIMIT_BURST
+
+    def _get_bucket(self, url: str) -> TokenBucket:
+        key, rate, burst = self._endpoint_rule(urlparse(url).path)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, url: str):
+        """
+        请求前取令牌，未开启限速时直接返回
+        在 concurrency_slot() 内调用且需要等待时，等待期间让出并发名额
+        Args:
+            url: 请求地址，按路径匹配接口规则
+        """
+        if not config.ENABLE_RATE_LIMITER:
+            return
+        self._maybe_recover()
+        self.requests += 1
+        bucket = self._get_bucket(url)
+        slot = _held_slot.get()
+        if slot is None or not slot.held:
+            self.wait_seconds += await bucket.acquire()
+            return
+        if bucket.try_acquire():
+            return
+        slot.release()
+        self.wait_seconds += await bucket.acquire()
+        # 被取消时名额保持让出状态，concurrency_slot 退出时不会重复释放
+        await slot.acquire()
+
+    def observe(self, status_code: int):
+        """
+        根据响应状态码判断是否被风控
+        """
+        if status_code in config.RATE_LIMIT_BLOCK_STATUS_CODES:
+            self.on_blocked()
+
+    def on_blocked(self):
+        """
+        出现风控信号，平台所有接口降速
+        """
+        if not config.ENABLE_RATE_LIMITER:
+            return
+        self.blocks += 1
+        self._last_block_ts = time.monotonic()
+        for bucket in self._buckets.values():
+            bucket.slow_down(config.RATE_LIMIT_BACKOFF_FACTOR, config.RATE_LIMIT_MIN_REQUESTS_PER_SEC)
+        utils.logger.warning(
+            f"[RateLimiter.on_blocked] {self.platform} blocked, slow down to {self.get_metrics()['rates']} req/s"
+        )
+
+    def _maybe_recover(self):
+        if self._last_block_ts is None:
+            return
+        now = time.monotonic()
+        if now - max(self._last_block_ts, self._last_recover_ts) < config.RATE_LIMIT_RECOVERY_SEC:
+            return
+        self._last_recover_ts = now
+        recovered = True
+        for bucket in self._buckets.values():
+            bucket.recover(config.RATE_LIMIT_BACKOFF_FACTOR)
+            recovered = recovered and bucket.rate >= bucket.base_rate
+        if recovered:
+            self._last_block_ts = None
+
+    def get_metrics(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "blocks": self.blocks,
+            "wait_seconds": round(self.wait_seconds, 2),
+            "rates": {k or "default": round(b.rate, 3) for k, b in self._buckets.items()},
+        }
+
+
+def get_crawl_interval() -> float:
+    """
+    爬取间隔：开启限速时由令牌桶控制请求节奏，不再在持有并发名额时固定 sleep
+    """
+    if config.ENABLE_RATE_LIMITER:
+        return 0
+    return config.CRAWLER_MAX_SLEEP_SEC
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/response_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+"""接口级响应缓存：详情/主页类接口命中缓存时跳过签名和网络请求"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import config
+from cache.abs_cache import AbstractCache
+from cache.cache_factory import CacheFactory
+from tools import utils
+
+
+class ResponseCache:
+    """
+    按 (平台, 接口, 规范化参数) 缓存接口返回值
+
+    - 后端复用 cache/ 下的实现：memory / redis / sqlite，由 RESPONSE_CACHE_TYPE 指定
+    - 各接口的缓存时间在 config/<platform>_config.py 的 <PLATFORM>_RESPONSE_CACHE_TTL 中配置，未配置的接口不缓存
+    """
+
+    _instance: Optional["ResponseCache"] = None
+
+    @classmethod
+    def get_instance(cls) -> "ResponseCache":
+        if cls._instance is None:
+            cls._instance = cls(CacheFactory.create_cache(config.RESPONSE_CACHE_TYPE))
+        return cls._instance
+
+    def __init__(self, backend: AbstractCache):
+        self.backend = backend
+        # 内存缓存直接读写，其余后端有 IO，放到线程池中执行
+        self._blocking = config.RESPONSE_CACHE_TYPE != config.CACHE_TYPE_MEMORY
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(platform: str, endpoint: str, params: Dict[str, Any]) -> str:
+        """
+        生成缓存 key，参数按 key 排序后序列化，保证同一组参数得到同一个 key
+        """
+        canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+        return f"response:{platform}:{endpoint}:{digest}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            if self._blocking:
+                return await asyncio.to_thread(self.backend.get, key)
+            return self.backend.get(key)
+        except Exception as e:
+            utils.logger.error(f"[ResponseCache.get] Read cache error: {e}")
+            return None
+
+    async def set(self, key: str, value: Any, expire_time: int) -> None:
+        try:
+            if self._blocking:
+                await asyncio.to_thread(self.backend.set, key, value, expire_time)
+            else:
+                self.backend.set(key, value, expire_time)
+        except Exception as e:
+            utils.logger.error(f"[ResponseCache.set] Write cache error: {e}")
+
+
+def get_response_cache_ttl(platform: str, endpoint: str) -> int:
+    """
+    读取接口的缓存时间（秒），0 表示不缓存
+    """
+    ttl_map: Dict[str, int] = getattr(config, f"{platform.upper()}_RESPONSE_CACHE_TTL", {})
+    return int(ttl_map.get(endpoint, 0))
+
+
+def cache_response(platform: str, key_params: Optional[Sequence[str]] = None) -> Callable:
+    """
+    平台 client 接口方法的响应缓存装饰器，ENABLE_RESPONSE_CACHE 开启且接口配置了 TTL 时生效
+    命中缓存时直接返回，不会执行签名和网络请求；空结果不缓存
+    Args:
+        platform: 平台标识，对应 config 中 <PLATFORM>_RESPONSE_CACHE_TTL
+        key_params: 参与生成缓存 key 的参数名，默认使用全部参数（如 xsec_token 这类每次都变化的参数应排除）
+    """
+
+    def decorator(func: Callable) -> Callable:
+        endpoint = func.__name__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            ttl = get_response_cache_ttl(platform, endpoint)
+            if not config.ENABLE_RESPONSE_CACHE or ttl <= 0:
+                return await func(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                name: value for name, value in list(bound.arguments.items())[1:]
+                if key_params is None or name in key_params
+            }
+            response_cache = ResponseCache.get_instance()
+            key = response_cache.make_key(platform, endpoint, params)
+
+            cached = await response_cache.get(key)
+            if cached is not None:
+                response_cache.hits += 1
+                utils.logger.info(f"[cache_response] Hit {platform}.{endpoint} {params}")
+                return cached
+
+            response_cache.misses += 1
+            result = await func(self, *args, **kwargs)
+            if result:
+                await response_cache.set(key, result, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
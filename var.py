@@ -20,12 +20,16 @@
 
 from asyncio.tasks import Task
 from contextvars import ContextVar
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 
 import aiomysql
 
+if TYPE_CHECKING:
+    from proxy.proxy_mixin import ProxyLease
+
 request_keyword_var: ContextVar[str] = ContextVar("request_keyword", default="")
 crawler_type_var: ContextVar[str] = ContextVar("crawler_type", default="")
 comment_tasks_var: ContextVar[List[Task]] = ContextVar("comment_tasks", default=[])
 db_conn_pool_var: ContextVar[aiomysql.Pool] = ContextVar("db_conn_pool_var")
 source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
+proxy_lease_var: ContextVar[Optional["ProxyLease"]] = ContextVar("proxy_lease", default=None)
@@ -48,7 +48,8 @@ async def get_data_list(
     source_keyword: Optional[str] = Query(None, description="爬虫源关键词(精确匹配)"),
     sort_by: Optional[str] = Query("liked_count", description="排序字段: liked_count, comment_count, create_time"),
     page: int = Query(1, ge=1, description="页码"),
-    page_size: int = Query(10, ge=1, le=100, description="每页数量")
+    page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，传入后按游标翻页并忽略 page")
 ):
     """获取统一格式的数据列表，支持分页、筛选和排序"""
     try:
@@ -58,10 +59,11 @@ async def get_data_list(
             source_keyword=source_keyword,
             sort_by=sort_by,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor
         )
         return {"code": 200, "message": "获取成功", "data": result}
-    except ValueError as e: # 捕获 crud 中抛出的平台不支持错误
+    except ValueError as e: # 捕获 crud 中抛出的平台不支持、游标无效错误
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"数据库查询失败: {e}")
\ No newline at end of file